@@ -89,11 +89,16 @@ def as_handle(handleish, mode='r', **kwargs):
         yield handleish
 
 
-def _open_for_random_access(filename):
+def _open_for_random_access(filename, use_mmap=False):
     """Open a file in binary mode, spot if it is BGZF format etc (PRIVATE).
 
     This funcationality is used by the Bio.SeqIO and Bio.SearchIO index
     and index_db functions.
+
+    If use_mmap is True, an uncompressed (non-empty) file is memory
+    mapped read only, and the mmap object is returned in place of the
+    file handle. This supports the same read, readline, seek and tell
+    methods (without any system calls), and can also be sliced.
     """
     handle = open(filename, "rb")
     from . import bgzf
@@ -103,6 +108,14 @@ def _open_for_random_access(filename):
         assert "BGZF" in str(e)
         # Not a BGZF file after all, rewind to start:
         handle.seek(0)
+    if use_mmap and os.path.getsize(filename):
+        # Can't memory map an empty file, but don't need to either
+        import mmap
+        try:
+            return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        finally:
+            # The mmap object keeps its own reference to the file
+            handle.close()
     return handle
 
 
@@ -247,9 +260,14 @@ class _IndexedSeqFileDict(_dict_base):
 
     Note that this dictionary is essentially read only. You cannot
     add or change values, pop values, nor clear the dictionary.
+
+    If keep_lengths is True, the record lengths (in bytes) reported by the
+    random access proxy are kept in memory as well as the offsets. This
+    costs more memory but means get_raw can read the record directly,
+    rather than scanning it line by line to find where it ends.
     """
     def __init__(self, random_access_proxy, key_function,
-                 repr, obj_repr):
+                 repr, obj_repr, keep_lengths=False):
         # Use key_function=None for default value
         self._proxy = random_access_proxy
         self._key_function = key_function
@@ -261,10 +279,15 @@ class _IndexedSeqFileDict(_dict_base):
         else:
             offset_iter = random_access_proxy
         offsets = {}
+        if keep_lengths:
+            lengths = {}
+        else:
+            lengths = None
         for key, offset, length in offset_iter:
-            # Note - we don't store the length because I want to minimise the
-            # memory requirements. With the SQLite backend the length is kept
-            # and is used to speed up the get_raw method (by about 3 times).
+            # Note - by default we don't store the length because I want to
+            # minimise the memory requirements. With the SQLite backend (or
+            # keep_lengths) the length is kept and is used to speed up the
+            # get_raw method (by about 3 times).
             # The length should be provided by all the current backends except
             # SFF where there is an existing Roche index we can reuse (very fast
             # but lacks the record lengths)
@@ -276,7 +299,10 @@ class _IndexedSeqFileDict(_dict_base):
                 raise ValueError("Duplicate key '%s'" % key)
             else:
                 offsets[key] = offset
+                if lengths is not None:
+                    lengths[key] = length
         self._offsets = offsets
+        self._lengths = lengths
 
     def __repr__(self):
         return self._repr
@@ -370,8 +396,95 @@ class _IndexedSeqFileDict(_dict_base):
 
         NOTE - This functionality is not supported for every file format.
         """
+        offset = self._offsets[key]
+        if self._lengths:
+            length = self._lengths[key]
+            if length:
+                # Shortcut if we have the length (as in the SQLite backend),
+                # which with a memory mapped file is just a slice
+                h = self._proxy._handle
+                h.seek(offset)
+                return h.read(length)
         # Pass the offset to the proxy
-        return self._proxy.get_raw(self._offsets[key])
+        return self._proxy.get_raw(offset)
+
+    def get_many(self, keys, file_order=False):
+        """Iterate over (key, record) pairs for many keys at once.
+
+        The records are read from the file in the order they appear in
+        it (so the reads are sequential rather than random access), and
+        by default are returned in the order of the given keys (which
+        means holding them all in memory). Use file_order=True to have
+        each record returned as soon as it is read, in file order.
+
+        If any key is not found, a KeyError exception is raised before
+        any records are read.
+        """
+        return self._get_many(keys, file_order, raw=False)
+
+    def get_raw_many(self, keys, file_order=False):
+        """Iterate over (key, raw string) pairs for many keys at once.
+
+        This is the get_raw equivalent of the get_many method, returning
+        each record as a raw bytes string.
+
+        NOTE - This functionality is not supported for every file format.
+        """
+        return self._get_many(keys, file_order, raw=True)
+
+    def _lookup_many(self, keys):
+        """Returns list of (file number, offset, length, key) tuples (PRIVATE).
+
+        Any duplicated keys are only included once. Raises a KeyError
+        for any missing key.
+        """
+        offsets = self._offsets
+        lengths = self._lengths
+        lookups = []
+        for key in set(keys):
+            if lengths:
+                lookups.append((0, offsets[key], lengths[key], key))
+            else:
+                lookups.append((0, offsets[key], 0, key))
+        return lookups
+
+    def _get_proxy(self, file_number):
+        """Returns the random access proxy for this file number (PRIVATE)."""
+        return self._proxy
+
+    def _get_many(self, keys, file_order, raw):
+        """Shared code for the get_many and get_raw_many methods (PRIVATE)."""
+        keys = list(keys)
+        # Do this now so any KeyError is raised before reading anything
+        lookups = self._lookup_many(keys)
+        lookups.sort(key=lambda l: (l[0], l[1]))
+        if file_order:
+            return self._read_many(lookups, raw)
+        else:
+            values = dict(self._read_many(lookups, raw))
+            return ((key, values[key]) for key in keys)
+
+    def _read_many(self, lookups, raw):
+        """Iterate over (key, record or raw string) pairs in given order (PRIVATE)."""
+        key_function = self._key_function
+        for file_number, offset, length, key in lookups:
+            proxy = self._get_proxy(file_number)
+            if not raw:
+                record = proxy.get(offset)
+                if key_function:
+                    key2 = key_function(record.id)
+                else:
+                    key2 = record.id
+                if key != key2:
+                    raise ValueError("Key did not match (%s vs %s)" % (key, key2))
+                yield key, record
+            elif length:
+                # Shortcut if we have the length
+                h = proxy._handle
+                h.seek(offset)
+                yield key, h.read(length)
+            else:
+                yield key, proxy.get_raw(offset)
 
     def __setitem__(self, key, value):
         """Would allow setting or replacing records, but not implemented."""
@@ -689,6 +802,49 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
             else:
                 return proxy.get_raw(offset)
 
+    def _lookup_many(self, keys):
+        """Returns list of (file number, offset, length, key) tuples (PRIVATE).
+
+        Any duplicated keys are only included once. Raises a KeyError
+        for any missing key.
+        """
+        wanted = list(set(keys))
+        con = self._con
+        lookups = []
+        # SQLite limits the number of variables in a single query (by
+        # default to 999), so ask for the keys in large batches:
+        for i in range(0, len(wanted), 500):
+            batch = wanted[i:i + 500]
+            lookups.extend((file_number, offset, length, str(key)) for
+                           (key, file_number, offset, length) in con.execute(
+                "SELECT key, file_number, offset, length FROM offset_data "
+                "WHERE key IN (%s);" % ",".join("?" * len(batch)), batch))
+        if len(lookups) != len(wanted):
+            found = set(l[3] for l in lookups)
+            for key in wanted:
+                if key not in found:
+                    raise KeyError(key)
+        return lookups
+
+    def _get_proxy(self, file_number):
+        """Returns the random access proxy for this file number (PRIVATE).
+
+        Opens the file if required (closing an old handle if there are
+        already the maximum number of files open).
+        """
+        proxies = self._proxies
+        try:
+            return proxies[file_number]
+        except KeyError:
+            if len(proxies) >= self._max_open:
+                # Close an old handle...
+                proxies.popitem()[1]._handle.close()
+            # Open a new handle...
+            proxy = self._proxy_factory(self._format,
+                                        self._filenames[file_number])
+            proxies[file_number] = proxy
+            return proxy
+
     def close(self):
         """Close any open file handles."""
         proxies = self._proxies
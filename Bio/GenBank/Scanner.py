@@ -34,6 +34,7 @@ from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
 from Bio.Alphabet import generic_protein
 from Bio import BiopythonParserWarning
+from Bio._py3k import StringIO
 
 
 class InsdcScanner(object):
@@ -133,7 +134,7 @@ class InsdcScanner(object):
         self.line = line
         return header_lines
 
-    def parse_features(self, skip=False):
+    def parse_features(self, skip=False, feature_types=None):
         """Return list of tuples for the features (if present)
 
         Each feature is returned as a tuple (key, location, qualifiers)
@@ -141,6 +142,9 @@ class InsdcScanner(object):
         "complement(join(490883..490885,1..879))") while qualifiers
         is a list of two string tuples (feature qualifier keys and values).
 
+        If feature_types is given (e.g. ["gene", "CDS"]), any other features
+        are skipped without parsing their location and qualifiers.
+
         Assumes you have already read to the start of the features table.
         """
         if self.line.rstrip() not in self.FEATURE_START_MARKERS:
@@ -204,10 +208,43 @@ class InsdcScanner(object):
                     # white space (e.g. out of spec files with too much indentation)
                     feature_lines.append(line[self.FEATURE_QUALIFIER_INDENT:].strip())
                     line = self.handle.readline()
+                if feature_types is not None and feature_key not in feature_types:
+                    continue
                 features.append(self.parse_feature(feature_key, feature_lines))
         self.line = line
         return features
 
+    def _read_feature_table(self):
+        """Return the feature table as a string, without parsing it (PRIVATE).
+
+        This reads the same lines as the parse_features method, leaving the
+        scanner at the start of the sequence, but just joins them up so that
+        the features can be parsed later (if at all). Returns an empty string
+        if there is no feature table.
+        """
+        if self.line.rstrip() not in self.FEATURE_START_MARKERS:
+            return ""
+        lines = [self.line]
+        line = self.handle.readline()
+        while True:
+            if not line:
+                raise ValueError("Premature end of line during features table")
+            lines.append(line)
+            if line[:self.HEADER_WIDTH].rstrip() in self.SEQUENCE_HEADERS:
+                # Keep this in the text too, it marks the end of the table
+                break
+            line = line.rstrip()
+            if line == "//":
+                raise ValueError("Premature end of features table, marker '//' found")
+            if line in self.FEATURE_END_MARKERS:
+                line = self.handle.readline()
+                break
+            line = self.handle.readline()
+        self.line = line
+        if not lines[0].endswith("\n"):
+            lines[0] += "\n"
+        return "".join(lines)
+
     def parse_feature(self, feature_key, lines):
         """Expects a feature as a list of strings, returns a tuple (key, location, qualifiers)
 
@@ -378,6 +415,26 @@ class InsdcScanner(object):
                 else:
                     consumer.feature_qualifier(q_key, q_value.replace("\n", " "))
 
+    def _feed_lazy_feature_table(self, consumer, text, feature_types=None):
+        """Pass the consumer a function to parse the feature table later (PRIVATE).
+
+        Takes the feature table as a string (from the _read_feature_table
+        method). Used by the parse_records() and parse() methods when
+        lazy_features=True.
+        """
+        scanner = self.__class__(self.debug)
+
+        def feed_features(feature_consumer):
+            if text:
+                scanner.set_handle(StringIO(text))
+                scanner.line = scanner.handle.readline()
+                feature_tuples = scanner.parse_features(feature_types=feature_types)
+            else:
+                feature_tuples = []
+            scanner._feed_feature_table(feature_consumer, feature_tuples)
+
+        consumer.lazy_feature_table(feed_features)
+
     def _feed_misc_lines(self, consumer, lines):
         """Handle any lines between features and sequence (list of strings), passing data to the consumer
 
@@ -387,7 +444,8 @@ class InsdcScanner(object):
         """
         pass
 
-    def feed(self, handle, consumer, do_features=True):
+    def feed(self, handle, consumer, do_features=True, lazy_features=False,
+             feature_types=None):
         """Feed a set of data into the consumer.
 
         This method is intended for use with the "old" code in Bio.GenBank
@@ -397,6 +455,11 @@ class InsdcScanner(object):
         consumer - The consumer that should be informed of events.
         do_features - Boolean, should the features be parsed?
                       Skipping the features can be much faster.
+        lazy_features - Boolean, should parsing the features be left until
+                      they are used? This needs a consumer with a
+                      lazy_feature_table method (i.e. for SeqRecord objects).
+        feature_types - Optional list of the feature types wanted (e.g.
+                      ["gene", "CDS"]), any others are skipped.
 
         Return values:
         true  - Passed a record
@@ -419,10 +482,14 @@ class InsdcScanner(object):
         self._feed_header_lines(consumer, self.parse_header())
 
         # Features (common to both EMBL and GenBank):
-        if do_features:
-            self._feed_feature_table(consumer, self.parse_features(skip=False))
-        else:
+        if not do_features:
             self.parse_features(skip=True)  # ignore the data
+        elif lazy_features:
+            self._feed_lazy_feature_table(consumer, self._read_feature_table(),
+                                          feature_types)
+        else:
+            self._feed_feature_table(consumer,
+                                     self.parse_features(feature_types=feature_types))
 
         # Footer and sequence
         misc_lines, sequence_string = self.parse_footer()
@@ -437,9 +504,15 @@ class InsdcScanner(object):
         # And we are done
         return True
 
-    def parse(self, handle, do_features=True):
+    def parse(self, handle, do_features=True, lazy_features=False,
+              feature_types=None):
         """Returns a SeqRecord (with SeqFeatures if do_features=True)
 
+        With lazy_features=True the feature table is kept as a string, and
+        the SeqFeature objects are only built when the record's features
+        are used. The features can be limited to those of the types given
+        in the feature_types list.
+
         See also the method parse_records() for use on multi-record files.
         """
         from Bio.GenBank import _FeatureConsumer
@@ -448,23 +521,27 @@ class InsdcScanner(object):
         consumer = _FeatureConsumer(use_fuzziness=1,
                                     feature_cleaner=FeatureValueCleaner())
 
-        if self.feed(handle, consumer, do_features):
+        if self.feed(handle, consumer, do_features, lazy_features, feature_types):
             return consumer.data
         else:
             return None
 
-    def parse_records(self, handle, do_features=True):
+    def parse_records(self, handle, do_features=True, lazy_features=False,
+                      feature_types=None):
         """Returns a SeqRecord object iterator
 
         Each record (from the ID/LOCUS line to the // line) becomes a SeqRecord
 
-        The SeqRecord objects include SeqFeatures if do_features=True
+        The SeqRecord objects include SeqFeatures if do_features=True, which
+        are only built when first used if lazy_features=True, and which can
+        be limited to those with a type in the feature_types list.
 
         This method is intended for use in Bio.SeqIO
         """
         # This is a generator function
         while True:
-            record = self.parse(handle, do_features)
+            record = self.parse(handle, do_features, lazy_features,
+                                feature_types)
             if record is None:
                 break
             if record.id is None:
@@ -856,7 +933,7 @@ class _ImgtScanner(EmblScanner):
                              "FH   Key                 Location/Qualifiers",
                              "FH"]
 
-    def parse_features(self, skip=False):
+    def parse_features(self, skip=False, feature_types=None):
         """Return list of tuples for the features (if present)
 
         Each feature is returned as a tuple (key, location, qualifiers)
@@ -864,6 +941,9 @@ class _ImgtScanner(EmblScanner):
         "complement(join(490883..490885,1..879))") while qualifiers
         is a list of two string tuples (feature qualifier keys and values).
 
+        If feature_types is given (e.g. ["gene", "CDS"]), any other features
+        are skipped without parsing their location and qualifiers.
+
         Assumes you have already read to the start of the features table.
         """
         if self.line.rstrip() not in self.FEATURE_START_MARKERS:
@@ -922,6 +1002,8 @@ class _ImgtScanner(EmblScanner):
                     assert line[:2] == "FT"
                     feature_lines.append(line[self.FEATURE_QUALIFIER_INDENT:].strip())
                     line = self.handle.readline()
+                if feature_types is not None and feature_key not in feature_types:
+                    continue
                 feature_key, location, qualifiers = \
                     self.parse_feature(feature_key, feature_lines)
                 # Try to handle known problems with IMGT locations here:
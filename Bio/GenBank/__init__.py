@@ -44,6 +44,8 @@ from __future__ import print_function
 import re
 import sys  # for checking if Python 2
 
+from Bio._py3k import intern
+
 # other Biopython stuff
 from Bio import SeqFeature
 
@@ -950,10 +952,31 @@ class _FeatureConsumer(_BaseGenBankConsumer):
             self.data.annotations['references'].append(self._cur_reference)
             self._cur_reference = None
 
+    def lazy_feature_table(self, feed_features):
+        """Leave building the features until the record's features are used.
+
+        Takes a function which will feed the feature table to a consumer
+        (via the start_feature_table, feature_key, location and
+        feature_qualifier methods). This is called with a new consumer
+        the first time the SeqRecord's features are used.
+        """
+        self.start_feature_table()
+        # The feature locations depend on the sequence type and length
+        # (from the LOCUS/ID line), but not on anything else in the record
+        consumer = _FeatureConsumer(self._use_fuzziness, self._feature_cleaner)
+        consumer._seq_type = self._seq_type
+        consumer._expected_size = self._expected_size
+
+        def load_features():
+            feed_features(consumer)
+            return consumer.data.features
+
+        self.data._feature_loader = load_features
+
     def feature_key(self, content):
         # start a new feature
         self._cur_feature = SeqFeature.SeqFeature()
-        self._cur_feature.type = content
+        self._cur_feature.type = intern(content)
         self.data.features.append(self._cur_feature)
 
     def location(self, content):
@@ -1112,6 +1135,8 @@ class _FeatureConsumer(_BaseGenBankConsumer):
 
         Can receive None, since you can have valueless keys such as /pseudo
         """
+        # Share the key strings between features to save memory
+        key = intern(key)
         # Hack to try to preserve historical behaviour of /pseudo etc
         if value is None:
             # if the key doesn't exist yet, add an empty string
@@ -1124,6 +1149,10 @@ class _FeatureConsumer(_BaseGenBankConsumer):
         value = value.replace('"', '')
         if self._feature_cleaner is not None:
             value = self._feature_cleaner.clean_value(key, value)
+        if len(value) <= 20:
+            # Short values like /codon_start=1 or gene names are often
+            # repeated, so share these too
+            value = intern(value)
 
         # if the qualifier name exists, append the value
         if key in self._cur_feature.qualifiers:
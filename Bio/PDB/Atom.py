@@ -16,6 +16,11 @@ from Bio.Data import IUPACData
 
 
 class Atom(object):
+    # Bio.PDB.AtomArray object holding this atom's data (if any), where the
+    # coord attribute is a view of row _atom_index of its coords array
+    _atom_array = None
+    _atom_index = None
+
     def __init__(self, name, coord, bfactor, occupancy, altloc, fullname, serial_number,
                  element=None):
         """
@@ -130,18 +135,30 @@ class Atom(object):
 
     def set_serial_number(self, n):
         self.serial_number=n
+        if self._atom_array is not None:
+            self._atom_array.serial_numbers[self._atom_index] = -1 if n is None else n
 
     def set_bfactor(self, bfactor):
         self.bfactor=bfactor
+        if self._atom_array is not None:
+            self._atom_array.bfactors[self._atom_index] = bfactor
 
     def set_coord(self, coord):
-        self.coord=coord
+        if self._atom_array is None:
+            self.coord=coord
+        else:
+            # Update our row of the AtomArray in place
+            self.coord[:]=coord
 
     def set_altloc(self, altloc):
         self.altloc=altloc
 
     def set_occupancy(self, occupancy):
         self.occupancy=occupancy
+        if self._atom_array is not None:
+            if occupancy is None:
+                occupancy = float("NaN")
+            self._atom_array.occupancies[self._atom_index] = occupancy
 
     def set_sigatm(self, sigatm_array):
         """
@@ -272,7 +289,7 @@ class Atom(object):
         @param tran: the translation vector
         @type tran: size 3 Numeric array
         """
-        self.coord=numpy.dot(self.coord, rot)+tran
+        self.set_coord(numpy.dot(self.coord, rot)+tran)
 
     def get_vector(self):
         """
@@ -292,6 +309,9 @@ class Atom(object):
         # Do a shallow copy then explicitly copy what needs to be deeper.
         shallow = copy.copy(self)
         shallow.detach_parent()
+        # The copy does not belong to our AtomArray (if any)
+        shallow._atom_array = None
+        shallow._atom_index = None
         shallow.set_coord(copy.copy(self.get_coord()))
         shallow.xtra = self.xtra.copy()
         return shallow
@@ -326,6 +346,8 @@ class DisorderedAtom(DisorderedEntityWrapper):
         atom.flag_disorder()
         # set the residue parent of the added atom
         residue=self.get_parent()
+        if residue is not None:
+            residue._reset_atom_slice()
         atom.set_parent(residue)
         altloc=atom.get_altloc()
         occupancy=atom.get_occupancy()
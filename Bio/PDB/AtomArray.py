@@ -0,0 +1,222 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Atom coordinates and properties held as NumPy arrays (structure of arrays).
+
+Normally each Atom object holds its own small coordinate array, so any
+operation on a whole structure (like a rigid body transformation) has to
+loop over the atoms one by one. An AtomArray gathers the coordinates of a
+list of atoms, or of all the atoms in a Structure, Model, Chain or Residue,
+into a single contiguous N x 3 float32 NumPy array, with parallel arrays for
+the B factors, occupancies, serial numbers, elements and atom names.
+
+The coordinates of each atom are then a view of a row of the AtomArray, so
+changes made via the AtomArray are seen by the Atom objects and vice versa:
+
+>>> from Bio.PDB import PDBParser
+>>> from Bio.PDB.AtomArray import AtomArray
+>>> structure = PDBParser().get_structure("1A8O", "PDB/1A8O.pdb")
+>>> atoms = AtomArray(structure)
+>>> print(len(atoms))
+644
+>>> print(atoms.coords.shape)
+(644, 3)
+>>> atom = structure[0]["A"][152]["CA"]
+>>> print([round(x, 3) for x in atom.get_coord().tolist()])
+[21.835, 36.306, 28.144]
+>>> atoms.coords += (1, 2, 3)
+>>> print([round(x, 3) for x in atom.get_coord().tolist()])
+[22.835, 38.306, 31.144]
+
+Selections become simple NumPy boolean operations on the parallel arrays,
+with the select method mapping these back to the Atom objects:
+
+>>> selected = atoms.select((atoms.names == "CA") & (atoms.bfactors < 15))
+>>> print(len(selected))
+19
+
+Once a Structure (or Model, Chain or Residue) has been packed into an
+AtomArray, its transform method acts on the contiguous block of coordinates
+with a single matrix multiplication rather than atom by atom. Either way,
+all the alternative locations of disordered atoms (and all the residues of
+point mutations) are moved. Adding or removing atoms or residues is still
+allowed, and simply switches the entities affected back to the atom by atom
+route.
+
+The Atom methods set_coord, set_bfactor, set_occupancy, set_serial_number
+and transform keep the arrays up to date, but assigning directly to the
+coord (or bfactor etc) attribute of a packed Atom does not. Likewise, if an
+atom is later packed into a second AtomArray, the first no longer owns its
+coordinates, and entity transformations no longer use the first AtomArray.
+Copies of atoms and entities are not packed.
+"""
+
+from __future__ import print_function
+
+import numpy
+
+from Bio.PDB.Entity import Entity, DisorderedEntityWrapper
+
+
+def _float_array(values):
+    """Float32 array of the values, with None mapped to NaN (PRIVATE)."""
+    return numpy.array([numpy.nan if v is None else v for v in values],
+                       numpy.float32)
+
+
+def _unpack_entity(entity, atoms, blocks):
+    """Add the entity's atoms to the list, including all alternatives (PRIVATE).
+
+    Records (entity, start, end) for the entity and all its descendants in
+    the blocks list.
+    """
+    start = len(atoms)
+    for child in entity.get_list():
+        if isinstance(child, DisorderedEntityWrapper):
+            children = child.disordered_get_list()
+        else:
+            children = [child]
+        for member in children:
+            if isinstance(member, Entity):
+                _unpack_entity(member, atoms, blocks)
+            else:
+                atoms.append(member)
+    blocks.append((entity, start, len(atoms)))
+
+
+class AtomArray(object):
+    """Coordinates, B factors, occupancies etc of atoms as NumPy arrays.
+
+    Arguments:
+     - entity - A Structure, Model, Chain or Residue object, or a list of
+                atoms (e.g. from the get_atoms method of an entity, or from
+                Bio.PDB.Selection.unfold_entities).
+
+    For an entity, all the atoms it contains are included, including all the
+    alternative locations of disordered atoms. For a list of atoms, each
+    DisorderedAtom is represented by its currently selected Atom, so that
+    the rows of the arrays match the list given.
+
+    Attributes:
+     - atoms         - List of the Atom objects, in the same order as the
+                       rows of the arrays.
+     - coords        - N x 3 float32 array of coordinates, shared with the
+                       Atom objects.
+     - bfactors      - float32 array of isotropic B factors.
+     - occupancies   - float32 array of occupancies (NaN if missing).
+     - serial_numbers - int32 array of atom serial numbers (-1 if missing).
+     - elements      - string array of the elements (e.g. "C").
+     - names         - string array of the atom names (e.g. "CA").
+
+    Use the set_bfactors and set_occupancies methods to change all the B
+    factors or occupancies, so that the Atom objects are updated too.
+    """
+
+    def __init__(self, entity):
+        blocks = []
+        if isinstance(entity, Entity):
+            atoms = []
+            _unpack_entity(entity, atoms, blocks)
+        else:
+            atoms = [a.disordered_get() if isinstance(a, DisorderedEntityWrapper)
+                     else a for a in entity]
+            if len(set(id(a) for a in atoms)) != len(atoms):
+                raise ValueError("Repeated atoms in the atom list")
+        self.atoms = atoms
+        self.coords = numpy.array([a.coord for a in atoms],
+                                  numpy.float32).reshape(-1, 3)
+        self.bfactors = _float_array(a.bfactor for a in atoms)
+        self.occupancies = _float_array(a.occupancy for a in atoms)
+        self.serial_numbers = numpy.array(
+            [-1 if a.serial_number is None else a.serial_number for a in atoms],
+            numpy.int32)
+        self.elements = numpy.array([a.element for a in atoms], str)
+        self.names = numpy.array([a.name for a in atoms], str)
+        # Take ownership of the atoms' coordinates:
+        self._linked = True
+        for index, atom in enumerate(atoms):
+            if atom._atom_array is not None:
+                atom._atom_array._linked = False
+            atom.coord = self.coords[index]
+            atom._atom_array = self
+            atom._atom_index = index
+        for entity, start, end in blocks:
+            entity._atom_slice = (self, start, end)
+
+    def __repr__(self):
+        return "<AtomArray of %i atoms>" % len(self.atoms)
+
+    def __len__(self):
+        """Return the number of atoms."""
+        return len(self.atoms)
+
+    def __getstate__(self):
+        # Pickling (or deep copying) does not preserve the coordinate views
+        # held by the atoms, so the copy does not own the coordinates.
+        state = self.__dict__.copy()
+        state["_linked"] = False
+        return state
+
+    def _transform(self, rot, tran, start, end):
+        """Apply rotation and translation to a block of the atoms (PRIVATE)."""
+        block = self.coords[start:end]
+        block[:] = numpy.dot(block, rot) + tran
+
+    def transform(self, rot, tran):
+        """Apply rotation and translation to all the atomic coordinates.
+
+        This updates the coordinates in place, as a single vectorised
+        operation, so the Atom objects see the new coordinates too.
+
+        @param rot: A right multiplying rotation matrix
+        @type rot: 3x3 Numeric array
+
+        @param tran: the translation vector
+        @type tran: size 3 Numeric array
+        """
+        self._transform(rot, tran, 0, len(self.atoms))
+
+    def select(self, mask):
+        """Return a list of the atoms selected by a boolean mask or indices.
+
+        The mask would usually be made by comparisons on the arrays, e.g.
+        atoms.select(atoms.elements == "S") for all the sulphur atoms.
+        """
+        atoms = self.atoms
+        indices = numpy.arange(len(atoms))[mask]
+        return [atoms[i] for i in indices.tolist()]
+
+    def set_bfactors(self, bfactors):
+        """Set the B factors of all the atoms from a sequence or array."""
+        self.bfactors[:] = bfactors
+        for atom, bfactor in zip(self.atoms, self.bfactors.tolist()):
+            atom.bfactor = bfactor
+
+    def set_occupancies(self, occupancies):
+        """Set the occupancies of all the atoms from a sequence or array."""
+        self.occupancies[:] = occupancies
+        for atom, occupancy in zip(self.atoms, self.occupancies.tolist()):
+            atom.occupancy = occupancy
+
+
+def _test():
+    """Run the module's doctests (PRIVATE).
+
+    This will try and locate the unit tests directory, and run the doctests
+    from there in order that the relative paths used in the examples work.
+    """
+    import doctest
+    import os
+    if os.path.isdir(os.path.join("..", "..", "..", "Tests")):
+        print("Running doctests...")
+        cur_dir = os.path.abspath(os.curdir)
+        os.chdir(os.path.join("..", "..", "..", "Tests"))
+        doctest.testmod()
+        os.chdir(cur_dir)
+        del cur_dir
+        print("Done")
+
+
+if __name__ == "__main__":
+    _test()
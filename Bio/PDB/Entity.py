@@ -18,6 +18,10 @@ class Entity(object):
     Basic container object. Structure, Model, Chain and Residue
     are subclasses of Entity. It deals with storage and lookup.
     """
+    # Tuple (AtomArray, start, end) if this entity's atoms are held as a
+    # contiguous block of a Bio.PDB.AtomArray object
+    _atom_slice = None
+
     def __init__(self, id):
         self.id=id
         self.full_id=None
@@ -71,8 +75,20 @@ class Entity(object):
         "Detach the parent."
         self.parent=None
 
+    def _reset_atom_slice(self):
+        """Forget any AtomArray block of this entity and its parents (PRIVATE).
+
+        Called when children are added or removed, as the atoms of the entity
+        (and its parents) then no longer match the block in the AtomArray.
+        """
+        entity=self
+        while entity is not None and entity._atom_slice is not None:
+            entity._atom_slice=None
+            entity=entity.get_parent()
+
     def detach_child(self, id):
         "Remove a child."
+        self._reset_atom_slice()
         child=self.child_dict[id]
         child.detach_parent()
         del self.child_dict[id]
@@ -84,6 +100,7 @@ class Entity(object):
         if self.has_id(entity_id):
             raise PDBConstructionException(
                 "%s defined twice" % str(entity_id))
+        self._reset_atom_slice()
         entity.set_parent(self)
         self.child_list.append(entity)
         self.child_dict[entity_id]=entity
@@ -94,6 +111,7 @@ class Entity(object):
         if self.has_id(entity_id):
             raise PDBConstructionException(
                 "%s defined twice" % str(entity_id))
+        self._reset_atom_slice()
         entity.set_parent(self)
         self.child_list[pos:pos] = [entity]
         self.child_dict[entity_id]=entity
@@ -165,12 +183,28 @@ class Entity(object):
 
         @param tran: the translation vector
         @type tran: size 3 Numeric array
+
+        All the alternative locations of disordered atoms (and all the
+        residues of point mutations) are moved, not just the selected ones.
+        If the entity has been packed into a Bio.PDB.AtomArray, this is
+        done as a single vectorised operation on its block of coordinates.
         """
+        atom_slice=self._atom_slice
+        if atom_slice is not None and atom_slice[0]._linked:
+            atom_array, start, end=atom_slice
+            atom_array._transform(rot, tran, start, end)
+            return
         for o in self.get_list():
-            o.transform(rot, tran)
+            if isinstance(o, DisorderedEntityWrapper):
+                for child in o.disordered_get_list():
+                    child.transform(rot, tran)
+            else:
+                o.transform(rot, tran)
 
     def copy(self):
         shallow = copy(self)
+        # The copy does not belong to our AtomArray (if any)
+        shallow._atom_slice = None
 
         shallow.child_list = []
         shallow.child_dict = {}
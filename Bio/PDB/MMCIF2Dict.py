@@ -3,66 +3,296 @@
 # license.  Please see the LICENSE file that should have been included
 # as part of this package.
 
-"""Turn an mmCIF file into a dictionary."""
+"""Turn an mmCIF file into a dictionary.
+
+The MMCIF2Dict class loads the whole file into a dictionary of strings (for
+single data items) and lists of strings (for the columns of loops). For very
+large files, the parse_categories function reads the file one category at a
+time, optionally skipping all but the selected categories and converting
+numeric columns straight to NumPy arrays:
+
+>>> from Bio.PDB.MMCIF2Dict import parse_categories
+>>> dtypes = {"_atom_site.Cartn_x": "f", "_atom_site.id": int}
+>>> for category, items in parse_categories("PDB/1A8O.cif", ["_atom_site"],
+...                                         dtypes):
+...     print(category)
+...     print(items["_atom_site.id"][:3])
+...     print(items["_atom_site.label_atom_id"][:3])
+...     print(items["_atom_site.Cartn_x"].dtype)
+_atom_site
+[1 2 3]
+['N', 'CA', 'C']
+float32
+"""
 
 from __future__ import print_function
 
+import re
+
 from Bio._py3k import input as _input
 
-import shlex
+from Bio.File import as_handle
 
 
-class MMCIF2Dict(dict):
+# A token is a quoted string (where the closing quote must be followed by
+# whitespace, so a value like 'O5'' can contain quotes), or any other run
+# of non-whitespace. An unquoted token starting with # begins a comment.
+_token_re = re.compile(r"""'(.*?)'(?=\s|$)|"(.*?)"(?=\s|$)|(\S+)""")
 
-    def __init__(self, filename):
-        with open(filename) as handle:
-            loop_flag = False
-            key = None
-            tokens = self._tokenize(handle)
-            token = next(tokens)
-            self[token[0:5]]=token[5:]
-            for token in tokens:
-                if token=="loop_":
-                    loop_flag = True
-                    keys = []
-                    i = 0
-                    n = 0
-                    continue
-                elif loop_flag:
-                    if token.startswith("_"):
-                        if i > 0:
-                            loop_flag = False
-                        else:
-                            self[token] = []
-                            keys.append(token)
-                            n += 1
-                            continue
+# Reserved words (which are case insensitive)
+_reserved_words = ("loop_", "data_", "save_", "globa", "stop_")
+
+# Number of loop values to gather before splitting them into columns (and
+# converting any numeric columns into arrays)
+_chunk_size = 1000000
+
+
+def _get_numpy():
+    """Import NumPy, needed to convert columns to arrays (PRIVATE)."""
+    try:
+        import numpy
+    except ImportError:
+        from Bio import MissingPythonDependencyError
+        raise MissingPythonDependencyError(
+            "Install NumPy if you want to convert mmCIF columns to arrays.")
+    return numpy
+
+
+def _is_keyword(token):
+    """Is this unquoted token a data name or reserved word? (PRIVATE)."""
+    return token[0] == "_" or token[:5].lower() in _reserved_words
+
+
+def _tokenize_lines(handle):
+    """Split an mmCIF file into tokens, line by line (PRIVATE).
+
+    Yields a tuple for each line, giving a list of the tokens and a list
+    of the indexes of any tokens which are data names or reserved words
+    (which is usually empty). Multi-line text fields (between lines starting
+    with a semicolon) are given as a single token, with the lines stripped
+    and joined together.
+    """
+    for line in handle:
+        if line.startswith("#"):
+            continue
+        elif line.startswith(";"):
+            token = line[1:].strip()
+            for line in handle:
+                line = line.strip()
+                if line == ";":
+                    break
+                token += line
+            yield [token], []
+        elif "'" in line or '"' in line or "#" in line:
+            tokens = []
+            keywords = []
+            for match in _token_re.finditer(line):
+                single_quoted, double_quoted, token = match.groups()
+                if token is None:
+                    if single_quoted is None:
+                        tokens.append(double_quoted)
                     else:
-                        self[keys[i%n]].append(token)
-                        i+=1
-                        continue
-                if key is None:
-                    key = token
+                        tokens.append(single_quoted)
+                elif token[0] == "#":
+                    break
+                else:
+                    if _is_keyword(token):
+                        keywords.append(len(tokens))
+                    tokens.append(token)
+            yield tokens, keywords
+        else:
+            tokens = line.split()
+            if "_" in line:
+                yield tokens, [i for i, token in enumerate(tokens)
+                               if _is_keyword(token)]
+            else:
+                yield tokens, []
+
+
+def _to_array(values, dtype):
+    """Convert a list of strings into a NumPy array (PRIVATE).
+
+    For floating point types, the mmCIF null values "?" (unknown) and "."
+    (not applicable) become NaN.
+    """
+    numpy = _get_numpy()
+    dtype = numpy.dtype(dtype)
+    values = numpy.array(values, str)
+    if dtype.kind != "f":
+        return values.astype(dtype)
+    missing = (values == "?") | (values == ".")
+    if not missing.any():
+        return values.astype(dtype)
+    array = numpy.empty(len(values), dtype)
+    array[missing] = numpy.nan
+    array[~missing] = values[~missing].astype(dtype)
+    return array
+
+
+class _CategoryReader(object):
+    """Gathers the tokens of an mmCIF file into categories (PRIVATE)."""
+
+    def __init__(self, categories=None, dtypes=None):
+        if categories is not None:
+            categories = set(categories)
+        self.categories = categories
+        self.dtypes = dtypes or {}
+        # Finished (category, items) tuples, waiting to be returned
+        self.finished = []
+        self.category = None
+        self.items = {}
+        self.wanted = False
+        # Data name waiting for its value
+        self.key = None
+        # Data names of the current loop (if any), and its values so far
+        self.loop_names = None
+        self.loop_body = False
+        self.loop_values = []
+        self.loop_chunks = []
+
+    def _start_category(self, category):
+        if category != self.category:
+            self.finish()
+            self.category = category
+            self.items = {}
+            self.wanted = self.categories is None or category in self.categories
+
+    def finish(self):
+        """Add the current category (if wanted) to the finished list."""
+        self._end_loop()
+        if self.category is not None and self.wanted:
+            self.finished.append((self.category, self.items))
+        self.category = None
+
+    def _split_loop_values(self, final=False):
+        """Move the loop values gathered so far into a chunk of columns.
+
+        Unless this is the final chunk, any partial row is left for the
+        next chunk. Otherwise the values of a partial row are shared out
+        between the first columns (as in MMCIF2Dict).
+        """
+        names = self.loop_names
+        n = len(names)
+        values = self.loop_values
+        if final:
+            self.loop_values = []
+        else:
+            size = len(values) - len(values) % n
+            values, self.loop_values = values[:size], values[size:]
+        chunk = []
+        for i, name in enumerate(names):
+            column = values[i::n]
+            if name in self.dtypes:
+                column = _to_array(column, self.dtypes[name])
+            chunk.append(column)
+        self.loop_chunks.append(chunk)
+
+    def _end_loop(self):
+        if self.loop_names is None:
+            return
+        if self.wanted and self.loop_names:
+            self._split_loop_values(final=True)
+            for i, name in enumerate(self.loop_names):
+                columns = [chunk[i] for chunk in self.loop_chunks]
+                if name in self.dtypes:
+                    self.items[name] = _get_numpy().concatenate(columns)
+                elif len(columns) == 1:
+                    self.items[name] = columns[0]
                 else:
-                    self[key] = token
-                    key = None
+                    self.items[name] = [v for column in columns for v in column]
+        self.loop_names = None
+        self.loop_body = False
+        self.loop_values = []
+        self.loop_chunks = []
 
-    def _tokenize(self, handle):
-        for line in handle:
-            if line.startswith("#"):
+    def feed(self, tokens, keywords):
+        """Process the tokens from a line of the file."""
+        if self.loop_body and not keywords:
+            # Quick route for the body of a loop
+            if self.wanted:
+                self.loop_values.extend(tokens)
+                if len(self.loop_values) >= _chunk_size:
+                    self._split_loop_values()
+            return
+        for i, token in enumerate(tokens):
+            if keywords and i in keywords:
+                if token[0] == "_":
+                    if self.loop_names is not None and not self.loop_body:
+                        # Part of a loop header
+                        if not self.loop_names:
+                            # First name gives the category of the loop
+                            self.loop_names = None
+                            self._start_category(token.split(".", 1)[0])
+                            self.loop_names = []
+                        self.loop_names.append(token)
+                    else:
+                        self._end_loop()
+                        self._start_category(token.split(".", 1)[0])
+                        self.key = token
+                    continue
+                reserved = token[:5].lower()
+                if reserved == "loop_":
+                    self._end_loop()
+                    self.loop_names = []
+                elif reserved == "data_":
+                    self._start_category("data_")
+                    self.items["data_"] = token[5:]
+                    self.finish()
+                else:
+                    # Global and save frames are not used in mmCIF files
+                    self._end_loop()
                 continue
-            elif line.startswith(";"):
-                token = line[1:].strip()
-                for line in handle:
-                    line = line.strip()
-                    if line==';':
-                        break
-                    token += line
-                yield token
-            else:
-                tokens = shlex.split(line)
-                for token in tokens:
-                    yield token
+            if self.loop_names:
+                self.loop_body = True
+                if self.wanted:
+                    self.loop_values.append(token)
+            elif self.key is not None:
+                if self.wanted:
+                    self.items[self.key] = token
+                self.key = None
+
+
+def parse_categories(handle, categories=None, dtypes=None):
+    """Iterate over the categories in an mmCIF file.
+
+    Arguments:
+     - handle     - Filename or an open handle of an mmCIF file.
+     - categories - Optional list of the categories wanted (e.g.
+                    ["_atom_site", "_cell"]), by default all categories are
+                    returned. Other categories are skipped without storing
+                    their values, saving time and memory.
+     - dtypes     - Optional dictionary mapping data names (e.g.
+                    "_atom_site.Cartn_x") to NumPy types (e.g. float, int or
+                    "f" for float32). The columns of these names in loops are
+                    returned as NumPy arrays, with the null values "?" and
+                    "." as NaN for floating point types.
+
+    Yields a tuple of the category name and a dictionary of its data items,
+    as strings or (for loops) lists of strings or arrays. The block header
+    (e.g. data_1A8O) is given as a category "data_" with an item of the
+    same name (e.g. "1A8O").
+
+    Large loops are converted into columns a chunk at a time, so converting
+    numeric columns into arrays also keeps the peak memory use down.
+    """
+    reader = _CategoryReader(categories, dtypes)
+    with as_handle(handle) as handle:
+        for tokens, keywords in _tokenize_lines(handle):
+            reader.feed(tokens, keywords)
+            if reader.finished:
+                for result in reader.finished:
+                    yield result
+                reader.finished = []
+    reader.finish()
+    for result in reader.finished:
+        yield result
+
+
+class MMCIF2Dict(dict):
+
+    def __init__(self, filename):
+        for category, items in parse_categories(filename):
+            self.update(items)
 
 
 if __name__=="__main__":
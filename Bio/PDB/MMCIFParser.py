@@ -13,14 +13,28 @@ import numpy
 
 from Bio._py3k import range
 
-from Bio.PDB.MMCIF2Dict import MMCIF2Dict
+from Bio.PDB.MMCIF2Dict import parse_categories
 from Bio.PDB.StructureBuilder import StructureBuilder
 from Bio.PDB.PDBExceptions import PDBConstructionException
 
 
+# The only categories used to build the structure, and the numeric
+# columns of these which are read straight into arrays
+_categories = ["_atom_site", "_cell", "_symmetry"]
+_dtypes = dict((name, "d") for name in [
+    "_atom_site.Cartn_x", "_atom_site.Cartn_y", "_atom_site.Cartn_z",
+    "_atom_site.aniso_U[1][1]", "_atom_site.aniso_U[1][2]",
+    "_atom_site.aniso_U[1][3]", "_atom_site.aniso_U[2][2]",
+    "_atom_site.aniso_U[2][3]", "_atom_site.aniso_U[3][3]"])
+
+
 class MMCIFParser(object):
     def get_structure(self, structure_id, filename):
-        self._mmcif_dict=MMCIF2Dict(filename)
+        # Only read the categories we need (skipping the rest of the file
+        # without storing it), with the coordinates etc as NumPy arrays
+        self._mmcif_dict={}
+        for category, items in parse_categories(filename, _categories, _dtypes):
+            self._mmcif_dict.update(items)
         self._structure_builder=StructureBuilder()
         self._build_structure(structure_id)
         return self._structure_builder.get_structure()
@@ -35,12 +49,23 @@ class MMCIFParser(object):
             element_list = None
         seq_id_list=mmcif_dict["_atom_site.label_seq_id"]
         chain_id_list=mmcif_dict["_atom_site.label_asym_id"]
-        x_list = [float(x) for x in mmcif_dict["_atom_site.Cartn_x"]]
-        y_list = [float(x) for x in mmcif_dict["_atom_site.Cartn_y"]]
-        z_list = [float(x) for x in mmcif_dict["_atom_site.Cartn_z"]]
+        coords=numpy.empty((len(atom_id_list), 3), 'f')
+        coords[:, 0]=mmcif_dict["_atom_site.Cartn_x"]
+        coords[:, 1]=mmcif_dict["_atom_site.Cartn_y"]
+        coords[:, 2]=mmcif_dict["_atom_site.Cartn_z"]
+        if numpy.isnan(coords).any():
+            raise PDBConstructionException("Invalid or missing coordinate(s)")
         alt_list=mmcif_dict["_atom_site.label_alt_id"]
-        b_factor_list=mmcif_dict["_atom_site.B_iso_or_equiv"]
-        occupancy_list=mmcif_dict["_atom_site.occupancy"]
+        try:
+            b_factor_list=numpy.array(mmcif_dict["_atom_site.B_iso_or_equiv"],
+                                      str).astype(float).tolist()
+        except ValueError:
+            raise PDBConstructionException("Invalid or missing B factor")
+        try:
+            occupancy_list=numpy.array(mmcif_dict["_atom_site.occupancy"],
+                                       str).astype(float).tolist()
+        except ValueError:
+            raise PDBConstructionException("Invalid or missing occupancy")
         fieldname_list=mmcif_dict["_atom_site.group_PDB"]
         try:
             serial_list = [int(n) for n in mmcif_dict["_atom_site.pdbx_PDB_model_num"]]
@@ -51,12 +76,10 @@ class MMCIFParser(object):
             # Invalid model number (malformed file)
             raise PDBConstructionException("Invalid model number")
         try:
-            aniso_u11=mmcif_dict["_atom_site.aniso_U[1][1]"]
-            aniso_u12=mmcif_dict["_atom_site.aniso_U[1][2]"]
-            aniso_u13=mmcif_dict["_atom_site.aniso_U[1][3]"]
-            aniso_u22=mmcif_dict["_atom_site.aniso_U[2][2]"]
-            aniso_u23=mmcif_dict["_atom_site.aniso_U[2][3]"]
-            aniso_u33=mmcif_dict["_atom_site.aniso_U[3][3]"]
+            anisou=numpy.column_stack([mmcif_dict["_atom_site.aniso_U[%s]" % u]
+                for u in ("1][1", "1][2", "1][3", "2][2", "2][3", "3][3")]).astype('f')
+            # Atoms without anisotropic B factors have null values (NaN)
+            aniso_flags=~numpy.isnan(anisou).any(axis=1)
             aniso_flag=1
         except KeyError:
             # no anisotropic B factors
@@ -78,9 +101,6 @@ class MMCIFParser(object):
         current_model_id = 0
         current_serial_id = 0
         for i in range(0, len(atom_id_list)):
-            x=x_list[i]
-            y=y_list[i]
-            z=z_list[i]
             resname=residue_id_list[i]
             chainid=chain_id_list[i]
             altloc=alt_list[i]
@@ -89,14 +109,8 @@ class MMCIFParser(object):
             resseq=seq_id_list[i]
             name=atom_id_list[i]
             # occupancy & B factor
-            try:
-                tempfactor=float(b_factor_list[i])
-            except ValueError:
-                raise PDBConstructionException("Invalid or missing B factor")
-            try:
-                occupancy=float(occupancy_list[i])
-            except ValueError:
-                raise PDBConstructionException("Invalid or missing occupancy")
+            tempfactor=b_factor_list[i]
+            occupancy=occupancy_list[i]
             fieldname=fieldname_list[i]
             if fieldname=="HETATM":
                 hetatm_flag="H"
@@ -125,16 +139,12 @@ class MMCIFParser(object):
                 icode, int_resseq=self._get_icode(resseq)
                 structure_builder.init_residue(resname, hetatm_flag, int_resseq,
                     icode)
-            coord=numpy.array((x, y, z), 'f')
+            coord=coords[i]
             element = element_list[i] if element_list else None
             structure_builder.init_atom(name, coord, tempfactor, occupancy, altloc,
                 name, element=element)
-            if aniso_flag==1:
-                u=(aniso_u11[i], aniso_u12[i], aniso_u13[i],
-                    aniso_u22[i], aniso_u23[i], aniso_u33[i])
-                mapped_anisou = [float(x) for x in u]
-                anisou_array=numpy.array(mapped_anisou, 'f')
-                structure_builder.set_anisou(anisou_array)
+            if aniso_flag==1 and aniso_flags[i]:
+                structure_builder.set_anisou(anisou[i])
         # Now try to set the cell
         try:
             a=float(mmcif_dict["_cell.length_a"])
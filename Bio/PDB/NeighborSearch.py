@@ -7,12 +7,68 @@
 
 from __future__ import print_function
 
+from itertools import product
+
 import numpy
 
 from Bio.KDTree import KDTree
 
+from Bio.PDB.AtomArray import AtomArray
 from Bio.PDB.PDBExceptions import PDBException
-from Bio.PDB.Selection import unfold_entities, entity_levels, uniqueify
+from Bio.PDB.Selection import unfold_entities, entity_levels
+
+
+def entity_indices(atom_list, level):
+    """Map each atom to its parent entity at the given level.
+
+    Arguments:
+     - atom_list - list of atoms, or an AtomArray.
+     - level     - char (A, R, C, M, S)
+
+    Returns a list of the entities at that level (e.g. residues), in order
+    of their first atom in the list, and an integer NumPy array giving the
+    index in this list of each atom's entity. For level "A" these are the
+    atoms themselves, and the indices 0 to N-1.
+    """
+    if level not in entity_levels:
+        raise PDBException("%s: Unknown level" % level)
+    if isinstance(atom_list, AtomArray):
+        atom_list = atom_list.atoms
+    entities = list(atom_list)
+    indices = numpy.arange(len(entities))
+    for i in range(entity_levels.index(level)):
+        # Number the parents of the entities at the level below
+        parents = []
+        positions = {}
+        parent_indices = []
+        for entity in entities:
+            parent = entity.get_parent()
+            key = id(parent)
+            if key not in positions:
+                positions[key] = len(parents)
+                parents.append(parent)
+            parent_indices.append(positions[key])
+        indices = numpy.array(parent_indices, int)[indices]
+        entities = parents
+    return entities, indices
+
+
+def _as_coords(centers):
+    """Nx3 float array of centers, atoms, or an AtomArray's coordinates (PRIVATE)."""
+    if isinstance(centers, AtomArray):
+        return centers.coords.astype(float)
+    if len(centers) and hasattr(centers[0], "get_coord"):
+        centers = [a.get_coord() for a in centers]
+    return numpy.array(centers, float).reshape(-1, 3)
+
+
+def _unique_pairs(first, second, size):
+    """Sorted unique (first, second) index pairs, as two arrays (PRIVATE).
+
+    The second indices must be less than size.
+    """
+    keys = numpy.unique(first.astype(numpy.int64) * size + second)
+    return keys // size, keys % size
 
 
 class NeighborSearch(object):
@@ -26,46 +82,185 @@ class NeighborSearch(object):
     a fixed radius of each other.
 
     NeighborSearch makes use of the Bio.KDTree C++ module, so it's fast.
+
+    The search and search_all methods return lists of entities (or of
+    tuples of entities). For large numbers of queries, the search_many,
+    search_all_pairs and contact_map methods return NumPy arrays of
+    indices instead, referring to the list of entities at the requested
+    level given by the get_entities method (which, for atoms, is the atom
+    list searched). For example, the residues within 5A of each atom of
+    a ligand:
+
+        ns = NeighborSearch(protein_atoms)
+        offsets, indices = ns.search_many(ligand_atoms, 5.0, "R")
+        residues = ns.get_entities("R")
+        # Residues near ligand atom i:
+        near = [residues[j] for j in indices[offsets[i]:offsets[i + 1]]]
+
+    For a periodic system (e.g. a simulation box), give the lengths of the
+    sides of the (rectangular) box, and atoms are found using the nearest
+    periodic image. The search radius must then be at most half the length
+    of the shortest side.
     """
-    def __init__(self, atom_list, bucket_size=10):
+    def __init__(self, atom_list, bucket_size=10, box=None):
         """
-        o atom_list - list of atoms. This list is used in the queries.
-        It can contain atoms from different structures.
+        o atom_list - list of atoms, or an AtomArray. This list is used in
+        the queries. It can contain atoms from different structures.
         o bucket_size - bucket size of KD tree. You can play around
         with this to optimize speed if you feel like it.
+        o box - optional lengths of the sides of a periodic box, starting
+        at the origin (coordinates outside the box are wrapped into it).
         """
-        self.atom_list=atom_list
-        # get the coordinates
-        coord_list = [a.get_coord() for a in atom_list]
-        # to Nx3 array of type float
-        self.coords=numpy.array(coord_list).astype("f")
+        if isinstance(atom_list, AtomArray):
+            # Take a copy of the coordinates, already an Nx3 float array
+            self.atom_list=atom_list.atoms
+            self.coords=atom_list.coords.copy()
+        else:
+            self.atom_list=atom_list
+            # get the coordinates
+            coord_list = [a.get_coord() for a in atom_list]
+            # to Nx3 array of type float
+            self.coords=numpy.array(coord_list).astype("f")
         assert(bucket_size>1)
         assert(self.coords.shape[1]==3)
+        if box is not None:
+            box = numpy.array(box, float)
+            if box.shape != (3,) or box.min() <= 0:
+                raise ValueError("Expected three positive box lengths")
+            self.coords = numpy.mod(self.coords, box).astype("f")
+        self.box = box
         self.kdt=KDTree(3, bucket_size)
         self.kdt.set_coords(self.coords)
+        # Cache of (entities, atom to entity indices) for each level
+        self._entity_indices = {}
 
     # Private
 
-    def _get_unique_parent_pairs(self, pair_list):
-        # translate a list of (entity, entity) tuples to
-        # a list of (parent entity, parent entity) tuples,
-        # thereby removing duplicate (parent entity, parent entity)
-        # pairs.
-        # o pair_list - a list of (entity, entity) tuples
-        parent_pair_list=[]
-        for (e1, e2) in pair_list:
-            p1=e1.get_parent()
-            p2=e2.get_parent()
-            if p1==p2:
+    def _get_entity_indices(self, level):
+        if level not in self._entity_indices:
+            self._entity_indices[level] = entity_indices(self.atom_list, level)
+        return self._entity_indices[level]
+
+    def _query_points(self, centers, radius):
+        # Return the points to search around, and the index of the center
+        # each is for. With a periodic box, this includes images of any
+        # centers near the sides.
+        if self.box is None:
+            return centers, numpy.arange(len(centers))
+        box = self.box
+        if radius * 2 > box.min():
+            raise ValueError("Search radius is more than half the box size")
+        centers = numpy.mod(centers, box)
+        points = [centers]
+        numbers = [numpy.arange(len(centers))]
+        for shift in product((-1, 0, 1), repeat=3):
+            if shift == (0, 0, 0):
                 continue
-            elif p1<p2:
-                parent_pair_list.append((p1, p2))
-            else:
-                parent_pair_list.append((p2, p1))
-        return uniqueify(parent_pair_list)
+            shift = numpy.array(shift)
+            # Image of the center in the neighboring box, if within radius
+            # of the atoms in this box
+            images = centers + shift * box
+            mask = ((images + radius >= 0) & (images - radius < box)).all(axis=1)
+            points.append(images[mask])
+            numbers.append(numpy.flatnonzero(mask))
+        return numpy.concatenate(points), numpy.concatenate(numbers)
 
     # Public
 
+    def get_entities(self, level="A"):
+        """Return the list of entities at the given level.
+
+        The index arrays returned by search_many, search_all_pairs and
+        contact_map refer to this list. For level "A" it is the list of
+        atoms searched, otherwise it is the parents of these (e.g. their
+        residues for level "R") in order of their first atom.
+        """
+        return self._get_entity_indices(level)[0]
+
+    def search_many(self, centers, radius, level="A"):
+        """Neighbor search around many centers, giving NumPy index arrays.
+
+        o centers - Nx3 array of positions, list of atoms, or an AtomArray
+        o radius - float
+        o level - char (A, R, C, M, S)
+
+        Returns two integer arrays in compressed sparse row format, offsets
+        (of length N+1) and indices, where the entities with at least one
+        atom within radius of center i have indices (into the list from
+        get_entities) indices[offsets[i]:offsets[i + 1]], in increasing
+        order. No Atom or Entity objects are used, so this is much faster
+        than calling search for each center.
+        """
+        entities, atom_entities = self._get_entity_indices(level)
+        centers = _as_coords(centers)
+        points, numbers = self._query_points(centers, radius)
+        found = []
+        counts = []
+        search = self.kdt.search
+        get_indices = self.kdt.get_indices
+        for point in points:
+            search(point, radius)
+            indices = get_indices()
+            found.append(indices)
+            counts.append(len(indices))
+        if found:
+            found = atom_entities[numpy.concatenate(found).astype(int)]
+        else:
+            found = numpy.zeros(0, int)
+        rows, indices = _unique_pairs(numpy.repeat(numbers, counts), found,
+                                      max(len(entities), 1))
+        offsets = numpy.searchsorted(rows, numpy.arange(len(centers) + 1))
+        return offsets, indices
+
+    def search_all_pairs(self, radius, level="A"):
+        """All neighbor search, giving a NumPy array of index pairs.
+
+        o radius - float
+        o level - char (A, R, C, M, S)
+
+        Returns a Kx2 integer array of the pairs of entities with atoms
+        within radius of each other, as indices into the list from
+        get_entities. Each pair is given once, with the lower index first,
+        and the pairs are sorted. At levels above "A", pairs of atoms in the
+        same entity (e.g. both in one residue) are ignored.
+        """
+        entities, atom_entities = self._get_entity_indices(level)
+        if self.box is None:
+            self.kdt.all_search(radius)
+            pairs = numpy.asarray(self.kdt.all_get_indices(), int).reshape(-1, 2)
+            first, second = pairs[:, 0], pairs[:, 1]
+        else:
+            offsets, second = self.search_many(self.coords, radius)
+            first = numpy.repeat(numpy.arange(len(self.coords)),
+                                 numpy.diff(offsets))
+        first = atom_entities[first]
+        second = atom_entities[second]
+        mask = first != second
+        first, second = first[mask], second[mask]
+        first, second = _unique_pairs(numpy.minimum(first, second),
+                                      numpy.maximum(first, second),
+                                      max(len(entities), 1))
+        return numpy.column_stack((first, second)).astype(int)
+
+    def contact_map(self, atom_list, radius, level="A"):
+        """Contact map between the searched atoms and another atom list.
+
+        o atom_list - list of atoms, or an AtomArray
+        o radius - float
+        o level - char (A, R, C, M, S)
+
+        Returns a boolean NumPy array with a row for each entity from
+        get_entities(level), and a column for each entity of the atoms
+        given (as from entity_indices(atom_list, level)), which is True
+        where the two entities have atoms within radius of each other.
+        """
+        columns, column_indices = entity_indices(atom_list, level)
+        offsets, rows = self.search_many(atom_list, radius, level)
+        contacts = numpy.zeros((len(self.get_entities(level)), len(columns)),
+                               bool)
+        contacts[rows, numpy.repeat(column_indices, numpy.diff(offsets))] = True
+        return contacts
+
     def search(self, center, radius, level="A"):
         """Neighbor search.
 
@@ -81,8 +276,11 @@ class NeighborSearch(object):
         """
         if level not in entity_levels:
             raise PDBException("%s: Unknown level" % level)
-        self.kdt.search(center, radius)
-        indices=self.kdt.get_indices()
+        if self.box is None:
+            self.kdt.search(center, radius)
+            indices=self.kdt.get_indices()
+        else:
+            offsets, indices = self.search_many([center], radius)
         n_atom_list=[]
         atom_list=self.atom_list
         for i in indices:
@@ -102,24 +300,9 @@ class NeighborSearch(object):
         o radius - float
         o level - char (A, R, C, M, S)
         """
-        if level not in entity_levels:
-            raise PDBException("%s: Unknown level" % level)
-        self.kdt.all_search(radius)
-        indices=self.kdt.all_get_indices()
-        atom_list=self.atom_list
-        atom_pair_list=[]
-        for i1, i2 in indices:
-            a1=atom_list[i1]
-            a2=atom_list[i2]
-            atom_pair_list.append((a1, a2))
-        if level=="A":
-            # return atoms
-            return atom_pair_list
-        next_level_pair_list=atom_pair_list
-        for l in ["R", "C", "M", "S"]:
-            next_level_pair_list=self._get_unique_parent_pairs(next_level_pair_list)
-            if level==l:
-                return next_level_pair_list
+        pairs = self.search_all_pairs(radius, level)
+        entities = self.get_entities(level)
+        return [(entities[i], entities[j]) for i, j in pairs.tolist()]
 
 if __name__=="__main__":
 
@@ -22,11 +22,109 @@ from Bio.PDB.PDBExceptions import PDBConstructionException
 from Bio.PDB.PDBExceptions import PDBConstructionWarning
 
 from Bio.PDB.StructureBuilder import StructureBuilder
+from Bio.PDB.Atom import Atom
+from Bio.PDB.Residue import Residue
 from Bio.PDB.parse_pdb_header import _parse_pdb_header_list
 
 
 # If PDB spec says "COLUMNS 18-20" this means line[17:20]
 
+# Fixed width columns of ATOM and HETATM records used in fast mode,
+# as (field name, start, end) following Python slicing:
+_atom_columns = [("record_type", 0, 6),
+                 ("serial_number", 6, 11),
+                 ("fullname", 12, 16),
+                 ("altloc", 16, 17),
+                 ("resname", 17, 20),
+                 ("chainid", 21, 22),
+                 ("resseq", 22, 26),
+                 ("icode", 26, 27),
+                 ("x", 30, 38),
+                 ("y", 38, 46),
+                 ("z", 46, 54),
+                 ("occupancy", 54, 60),
+                 ("bfactor", 60, 66),
+                 ("segid", 72, 76),
+                 ("element", 76, 78)]
+
+# Columns of the values in ANISOU, SIGUIJ and SIGATM records, and the
+# scaling applied to them (U's and their sigmas are scaled by 10^4):
+_atom_extra_columns = {
+    "ANISOU": ([(28, 35), (35, 42), (43, 49), (49, 56), (56, 63), (63, 70)],
+               10000.0),
+    "SIGUIJ": ([(28, 35), (35, 42), (42, 49), (49, 56), (56, 63), (63, 70)],
+               10000.0),
+    "SIGATM": ([(30, 38), (38, 45), (46, 54), (54, 60), (60, 66)], None)}
+
+
+def _decode_numbers(chars, text, integer=False):
+    """Decode a fixed width column of decimal numbers using NumPy (PRIVATE).
+
+    Arguments:
+     - chars   - 2D array of character codes, one row per line, for the
+                 columns holding the numbers.
+     - text    - Array of the same columns as strings.
+     - integer - Expect integers (no decimal point)?
+
+    Simple numbers like "-12.345" (with any spaces before or after) are
+    decoded with integer arithmetic on the digits, one column at a time,
+    giving exactly the same values as float or int. If there is anything
+    else (like an exponent) this falls back on the NumPy conversion of the
+    strings, which raises a ValueError for invalid numbers (including blanks).
+    """
+    count = len(chars)
+    mantissa = numpy.zeros(count, numpy.int64)
+    fraction_digits = numpy.zeros(count, numpy.int64)
+    digit_count = numpy.zeros(count, numpy.int64)
+    started = numpy.zeros(count, bool)
+    ended = numpy.zeros(count, bool)
+    negative = numpy.zeros(count, bool)
+    dotted = numpy.zeros(count, bool)
+    bad = numpy.zeros(count, bool)
+    for column in range(chars.shape[1]):
+        code = chars[:, column].astype(numpy.int64)
+        # NULs pad any short lines
+        blank = (code == 32) | (code == 0)
+        digit = (code >= 48) & (code <= 57)
+        minus = code == 45
+        dot = code == 46
+        # Allow a single run of characters, with any minus sign first and
+        # at most one decimal point
+        bad |= ~blank & (ended | ~(digit | dot | (minus & ~started)))
+        bad |= dot & dotted
+        ended |= blank & started
+        started |= ~blank
+        negative |= minus
+        mantissa = numpy.where(digit, mantissa * 10 + (code - 48), mantissa)
+        fraction_digits += digit & dotted
+        digit_count += digit
+        dotted |= dot
+    bad |= digit_count == 0
+    if integer:
+        bad |= dotted
+    if bad.any():
+        return text.astype(int if integer else "d")
+    if integer:
+        return numpy.where(negative, -mantissa, mantissa)
+    values = mantissa / 10.0 ** fraction_digits
+    return numpy.where(negative, -values, values)
+
+
+def _record_dtype(columns):
+    """NumPy record dtype to view 80 column text lines as fields (PRIVATE).
+
+    Takes a list of (field name, start, end) tuples. Uses the native str
+    type (bytes on Python 2, unicode on Python 3), where the trailing NULs
+    padding short lines are dropped from each field.
+    """
+    char_size = numpy.dtype((str, 1)).itemsize
+    return numpy.dtype({"names": [c[0] for c in columns],
+                        "formats": [(str, end - start)
+                                    for name, start, end in columns],
+                        "offsets": [start * char_size
+                                    for name, start, end in columns],
+                        "itemsize": 80 * char_size})
+
 
 class PDBParser(object):
     """
@@ -34,7 +132,7 @@ class PDBParser(object):
     """
 
     def __init__(self, PERMISSIVE=True, get_header=False,
-                 structure_builder=None, QUIET=False):
+                 structure_builder=None, QUIET=False, fast=False):
         """
         The PDB parser call a number of standard methods in an aggregated
         StructureBuilder object. Normally this object is instanciated by the
@@ -53,6 +151,15 @@ class PDBParser(object):
         o QUIET - Evaluated as a Boolean. If true, warnings issued in constructing
         the SMCRA data will be suppressed. If false (DEFAULT), they will be shown.
         These warnings might be indicative of problems in the PDB file!
+
+        o fast - Evaluated as a Boolean. If true, the ATOM and HETATM records
+        are decoded column by column using NumPy, and residues without any
+        disordered or duplicated atoms are built in bulk. The resulting
+        structure is the same, with the atomic coordinates of each atom being
+        a view of a single array for the whole file. Files with missing or
+        invalid fields are still parsed record by record (in order to give
+        the usual warnings or errors), as are all files when using your own
+        structure_builder. Default False.
         """
         if structure_builder is not None:
             self.structure_builder = structure_builder
@@ -63,6 +170,7 @@ class PDBParser(object):
         self.line_counter = 0
         self.PERMISSIVE = bool(PERMISSIVE)
         self.QUIET = bool(QUIET)
+        self.fast = bool(fast)
 
     # Public methods
 
@@ -106,7 +214,10 @@ class PDBParser(object):
         # Extract the header; return the rest of the file
         self.header, coords_trailer = self._get_header(header_coords_trailer)
         # Parse the atomic data; return the PDB file trailer
-        self.trailer = self._parse_coordinates(coords_trailer)
+        if self.fast and type(self.structure_builder) is StructureBuilder:
+            self.trailer = self._parse_coordinates_fast(coords_trailer)
+        else:
+            self.trailer = self._parse_coordinates(coords_trailer)
 
     def _get_header(self, header_coords_trailer):
         "Get the header of the PDB file, return the rest."
@@ -226,11 +337,7 @@ class PDBParser(object):
                 except PDBConstructionException as message:
                     self._handle_PDB_exception(message, global_line_counter)
             elif record_type == "ANISOU":
-                anisou = [float(x) for x in (line[28:35], line[35:42], line[43:49],
-                                             line[49:56], line[56:63], line[63:70])]
-                # U's are scaled by 10^4
-                anisou_array = (numpy.array(anisou, "f") / 10000.0).astype("f")
-                structure_builder.set_anisou(anisou_array)
+                structure_builder.set_anisou(self._parse_atom_extra(line))
             elif record_type == "MODEL ":
                 try:
                     serial_num = int(line[10:14])
@@ -252,23 +359,261 @@ class PDBParser(object):
                 current_chain_id = None
                 current_residue_id = None
             elif record_type == "SIGUIJ":
-                # standard deviation of anisotropic B factor
-                siguij = [float(x) for x in (line[28:35], line[35:42], line[42:49],
-                                             line[49:56], line[56:63], line[63:70])]
-                # U sigma's are scaled by 10^4
-                siguij_array = (numpy.array(siguij, "f") / 10000.0).astype("f")
-                structure_builder.set_siguij(siguij_array)
+                structure_builder.set_siguij(self._parse_atom_extra(line))
             elif record_type == "SIGATM":
-                # standard deviation of atomic positions
-                sigatm = [float(x) for x in (line[30:38], line[38:45], line[46:54],
-                                             line[54:60], line[60:66])]
-                sigatm_array = numpy.array(sigatm, "f")
-                structure_builder.set_sigatm(sigatm_array)
+                structure_builder.set_sigatm(self._parse_atom_extra(line))
             local_line_counter += 1
         # EOF (does not end in END or CONECT)
         self.line_counter = self.line_counter + local_line_counter
         return []
 
+    def _parse_atom_extra(self, line):
+        "Parse an ANISOU, SIGUIJ or SIGATM record, returning an array."
+        columns, scale = _atom_extra_columns[line[0:6]]
+        values = numpy.array([float(line[start:end]) for start, end in columns],
+                             "f")
+        if scale:
+            values = (values / scale).astype("f")
+        return values
+
+    def _parse_atom_extras(self, lines):
+        """Parse ANISOU, SIGUIJ or SIGATM records of one type using NumPy.
+
+        Returns a 2D array, with a row for each line.
+        """
+        columns, scale = _atom_extra_columns[lines[0][0:6]]
+        names = ["f%i" % i for i in range(len(columns))]
+        text = numpy.array(lines, (str, 80))
+        records = text.view(_record_dtype(
+            [(name, start, end) for name, (start, end) in zip(names, columns)]))
+        chars = text.view("u%i" % text.dtype.alignment).reshape(len(lines), 80)
+        values = numpy.empty((len(lines), len(columns)), "f")
+        try:
+            for i, (start, end) in enumerate(columns):
+                values[:, i] = _decode_numbers(chars[:, start:end],
+                                               records[names[i]])
+        except ValueError:
+            # Let the record by record parser complain
+            return numpy.array([self._parse_atom_extra(line) for line in lines])
+        if scale:
+            values = (values / scale).astype("f")
+        return values
+
+    def _parse_coordinates_fast(self, coords_trailer):
+        """Parse the atomic data in the PDB file using NumPy (fast mode).
+
+        This gives the same structure as _parse_coordinates (which it falls
+        back on for records with missing or invalid fields), but decodes all
+        the ATOM/HETATM records at once, and builds residues without any
+        disordered or duplicated atoms directly rather than via the
+        StructureBuilder's init_atom method.
+        """
+        # First pass, just look at the record types:
+        atom_rows = []
+        # (number of atoms before the model, MODEL line or None, row)
+        models = []
+        # (number of atoms before the record, record line)
+        extras = []
+        end = None
+        model_open = False
+        for i, line in enumerate(coords_trailer):
+            record_type = line[0:6]
+            if record_type == "ATOM  " or record_type == "HETATM":
+                if not model_open:
+                    # There was no explicit MODEL record
+                    models.append((len(atom_rows), None, i))
+                    model_open = True
+                atom_rows.append(i)
+            elif record_type == "ANISOU" or record_type == "SIGUIJ" \
+                    or record_type == "SIGATM":
+                extras.append((len(atom_rows), line))
+            elif record_type == "MODEL ":
+                models.append((len(atom_rows), line, i))
+                model_open = True
+            elif record_type == "ENDMDL":
+                model_open = False
+            elif record_type == "END   " or record_type == "CONECT":
+                end = i
+                break
+
+        # Decode all the ATOM/HETATM records at once, both as fields and
+        # as a matrix of character codes:
+        lines = numpy.array([coords_trailer[i] for i in atom_rows], (str, 80))
+        records = lines.view(_record_dtype(_atom_columns))
+        chars = lines.view("u%i" % lines.dtype.alignment).reshape(len(lines), 80)
+        try:
+            coords = numpy.empty((len(records), 3), "f")
+            coords[:, 0] = _decode_numbers(chars[:, 30:38], records["x"])
+            coords[:, 1] = _decode_numbers(chars[:, 38:46], records["y"])
+            coords[:, 2] = _decode_numbers(chars[:, 46:54], records["z"])
+            occupancies = _decode_numbers(chars[:, 54:60],
+                                          records["occupancy"]).tolist()
+            bfactors = _decode_numbers(chars[:, 60:66],
+                                       records["bfactor"]).tolist()
+            resseqs = _decode_numbers(chars[:, 22:26], records["resseq"], True)
+        except ValueError:
+            # Let the standard parser deal with (or complain about) this
+            return self._parse_coordinates(coords_trailer)
+        try:
+            serial_numbers = _decode_numbers(chars[:, 6:11],
+                                             records["serial_number"],
+                                             True).tolist()
+        except ValueError:
+            serial_numbers = []
+            for serial_number in records["serial_number"].tolist():
+                try:
+                    serial_numbers.append(int(serial_number))
+                except ValueError:
+                    serial_numbers.append(0)
+        fullnames = records["fullname"].tolist()
+        names = []
+        for fullname in fullnames:
+            split_list = fullname.split()
+            if len(split_list) != 1:
+                # atom name has internal spaces, so we do not strip spaces
+                names.append(fullname)
+            else:
+                names.append(split_list[0])
+        record_types = records["record_type"].tolist()
+        resnames = records["resname"].tolist()
+        chainids = records["chainid"].tolist()
+        icodes = records["icode"].tolist()
+        altlocs = records["altloc"].tolist()
+        segids = records["segid"].tolist()
+        elements = [element.strip() for element in records["element"].tolist()]
+
+        # Residues start where the record type, residue or chain changes,
+        # or at the start of a model:
+        new_residue = numpy.ones(len(records), bool)
+        for column in (records["record_type"], records["resname"],
+                       records["chainid"], resseqs, records["icode"]):
+            new_residue[1:] &= column[1:] == column[:-1]
+        new_residue = ~new_residue
+        new_residue[[n for n, line, i in models if n < len(records)]] = True
+        starts = numpy.flatnonzero(new_residue).tolist()
+        ends = starts[1:] + [len(records)]
+        # Residues with disordered atoms or changing segid are built atom
+        # by atom using the StructureBuilder, as are any with duplicate
+        # atom names (checked below)
+        complex_atoms = numpy.cumsum(records["altloc"] != " ")
+        segid_changes = numpy.zeros(len(records), int)
+        segid_changes[1:] = numpy.cumsum(records["segid"][1:] != records["segid"][:-1])
+        complex_atoms = complex_atoms.tolist()
+        segid_changes = segid_changes.tolist()
+        resseqs = resseqs.tolist()
+
+        structure_builder = self.structure_builder
+        atoms = [None] * len(records)
+        current_model_id = 0
+        current_chain_id = None
+        current_segid = None
+        models.reverse()
+        for start, end_atom in zip(starts, ends):
+            while models and models[-1][0] <= start:
+                self._init_model_fast(models.pop(), current_model_id)
+                current_model_id += 1
+                current_chain_id = None
+            resname = resnames[start]
+            chainid = chainids[start]
+            resseq = resseqs[start]
+            icode = icodes[start]
+            if record_types[start] == "HETATM":  # hetero atom flag
+                if resname == "HOH" or resname == "WAT":
+                    hetero_flag = "W"
+                else:
+                    hetero_flag = "H"
+            else:
+                hetero_flag = " "
+            global_line_counter = self.line_counter + atom_rows[start] + 1
+            structure_builder.set_line_counter(global_line_counter)
+            if current_segid != segids[start]:
+                current_segid = segids[start]
+                structure_builder.init_seg(current_segid)
+            if current_chain_id != chainid:
+                current_chain_id = chainid
+                structure_builder.init_chain(current_chain_id)
+            try:
+                structure_builder.init_residue(resname, hetero_flag, resseq, icode)
+            except PDBConstructionException as message:
+                self._handle_PDB_exception(message, global_line_counter)
+            residue = structure_builder.residue
+            if type(residue) is Residue and not residue.child_list \
+                    and complex_atoms[start] == complex_atoms[end_atom - 1] \
+                    and altlocs[start] == " " \
+                    and segid_changes[start] == segid_changes[end_atom - 1] \
+                    and len(set(names[start:end_atom])) == end_atom - start:
+                # Simple residue, add the atoms directly
+                child_list = residue.child_list
+                child_dict = residue.child_dict
+                for i in range(start, end_atom):
+                    atom = Atom(names[i], coords[i], bfactors[i], occupancies[i],
+                                " ", fullnames[i], serial_numbers[i], elements[i])
+                    atom.parent = residue
+                    child_list.append(atom)
+                    child_dict[names[i]] = atom
+                    atoms[i] = atom
+                structure_builder.atom = atom
+                continue
+            for i in range(start, end_atom):
+                global_line_counter = self.line_counter + atom_rows[i] + 1
+                structure_builder.set_line_counter(global_line_counter)
+                if current_segid != segids[i]:
+                    current_segid = segids[i]
+                    structure_builder.init_seg(current_segid)
+                try:
+                    structure_builder.init_atom(names[i], coords[i], bfactors[i],
+                                                occupancies[i], altlocs[i],
+                                                fullnames[i], serial_numbers[i],
+                                                elements[i])
+                except PDBConstructionException as message:
+                    self._handle_PDB_exception(message, global_line_counter)
+                atoms[i] = getattr(structure_builder, "atom", None)
+        # Any trailing models without atoms
+        while models:
+            self._init_model_fast(models.pop(), current_model_id)
+            current_model_id += 1
+
+        # ANISOU, SIGUIJ and SIGATM records apply to the preceding atom
+        setters = {"ANISOU": structure_builder.set_anisou,
+                   "SIGUIJ": structure_builder.set_siguij,
+                   "SIGATM": structure_builder.set_sigatm}
+        for record_type, setter in setters.items():
+            counts = [count for count, line in extras
+                      if line[0:6] == record_type]
+            if not counts:
+                continue
+            values = self._parse_atom_extras([line for count, line in extras
+                                              if line[0:6] == record_type])
+            for count, value in zip(counts, values):
+                if count:
+                    structure_builder.atom = atoms[count - 1]
+                setter(value)
+
+        if end is None:
+            # EOF (does not end in END or CONECT)
+            self.line_counter += len(coords_trailer)
+            return []
+        # End of atomic data, return the trailer
+        self.line_counter += end
+        return coords_trailer[end:]
+
+    def _init_model_fast(self, model, model_id):
+        "Start a model for _parse_coordinates_fast."
+        count, line, i = model
+        global_line_counter = self.line_counter + i + 1
+        self.structure_builder.set_line_counter(global_line_counter)
+        if line is None:
+            # There was no explicit MODEL record
+            self.structure_builder.init_model(model_id)
+            return
+        try:
+            serial_num = int(line[10:14])
+        except:
+            self._handle_PDB_exception("Invalid or missing model serial number",
+                                       global_line_counter)
+            serial_num = 0
+        self.structure_builder.init_model(model_id, serial_num)
+
     def _handle_PDB_exception(self, message, line_counter):
         """
         This method catches an exception that occurs in the StructureBuilder
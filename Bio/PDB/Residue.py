@@ -157,6 +157,8 @@ class DisorderedResidue(DisorderedEntityWrapper):
         # add chain parent to residue
         chain=self.get_parent()
         residue.set_parent(chain)
+        if chain is not None:
+            chain._reset_atom_slice()
         assert(not self.disordered_has_id(resname))
         self[resname]=residue
         self.disordered_select(resname)
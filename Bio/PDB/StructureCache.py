@@ -0,0 +1,627 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Binary cache files of parsed structures, for quick reloading.
+
+Parsing a large PDB or mmCIF file is slow compared with reading back the
+same data as typed binary arrays. The write_structure function saves a
+Structure as a compact binary file holding NumPy arrays of the atom data
+(coordinates, B factors, occupancies, names, elements etc) plus tables of
+the residues, chains and models giving the hierarchy:
+
+>>> import os
+>>> import tempfile
+>>> from Bio.PDB import PDBParser
+>>> from Bio.PDB.StructureCache import write_structure, read_structure
+>>> structure = PDBParser().get_structure("1A8O", "PDB/1A8O.pdb")
+>>> handle, filename = tempfile.mkstemp()
+>>> os.close(handle)
+>>> write_structure(structure, filename)
+>>> copy = read_structure(filename)
+>>> print(copy.id)
+1A8O
+>>> print(len(list(copy.get_atoms())))
+644
+>>> atom = copy[0]["A"][152]["CA"]
+>>> print([round(x, 3) for x in atom.get_coord().tolist()])
+[21.835, 36.306, 28.144]
+
+Here read_structure rebuilds the usual Structure, Model, Chain, Residue and
+Atom objects (including any disordered atoms and residues), which takes a
+fraction of the time needed to parse the original file. When only the
+arrays are needed, a StructureArrays object gives a lazy view of the file
+without building any of these objects. By default the file is memory
+mapped, so only the arrays actually used are read from disk:
+
+>>> from Bio.PDB.StructureCache import StructureArrays
+>>> arrays = StructureArrays(filename)
+>>> print(len(arrays))
+644
+>>> print(arrays.coords.shape)
+(644, 3)
+>>> print(arrays.residue_names[:3].tolist())
+['MSE', 'ASP', 'ILE']
+>>> del arrays
+>>> os.remove(filename)
+
+The residues of each chain, chains of each model, and atoms of each
+residue are given as offsets into the following table (so the atoms of
+residue i are rows residue_atoms[i] to residue_atoms[i + 1] of the atom
+arrays). Each alternative location of a disordered atom, and each residue
+of a point mutation, has its own row, with the atom_groups (or
+residue_groups) array numbering the disordered entity it belongs to (-1 if
+not disordered), and the atom_selected (or residue_selected) array marking
+the currently selected alternative.
+
+Finally, the StructureCache class keeps a directory of these files, keyed
+by the path, modification time and size of the original file, so that a
+structure is only parsed the first time it is used.
+
+The files start with a version number, and are read with the byte order
+and types recorded when they were written. The structure header must be
+something which can be stored as JSON (as are those from the parsers in
+Bio.PDB), and the xtra dictionaries of the entities are not stored.
+Coordinates are stored as float32 (as used by the parsers), and strings
+(like the atom names) as UTF-8.
+"""
+
+from __future__ import print_function
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import warnings
+
+import numpy
+
+from Bio import BiopythonWarning
+from Bio._py3k import range
+
+from Bio.PDB.Atom import Atom, DisorderedAtom
+from Bio.PDB.Chain import Chain
+from Bio.PDB.Model import Model
+from Bio.PDB.PDBExceptions import PDBConstructionWarning
+from Bio.PDB.Residue import Residue, DisorderedResidue
+from Bio.PDB.Structure import Structure
+
+
+_magic = b"BIOPDBSC"
+_format_version = 1
+# Arrays start at multiples of this offset in the file
+_alignment = 64
+
+# Arrays of each type of data, which must be present in the file
+_string_arrays = ["residue_hetflags", "residue_icodes", "residue_names",
+                  "residue_segids", "chain_ids", "elements", "names",
+                  "fullnames", "altlocs"]
+_other_arrays = ["model_ids", "model_serial_numbers", "model_chains",
+                 "chain_residues", "residue_numbers", "residue_disordered",
+                 "residue_groups", "residue_selected", "residue_atoms",
+                 "coords", "bfactors", "occupancies", "serial_numbers",
+                 "atom_groups", "atom_selected"]
+# Optional arrays, only present if at least one atom has the values
+_extra_arrays = ["anisou", "siguij", "sigatm"]
+
+
+def _members(entity):
+    """List of the children of an entity, with the disorder details (PRIVATE).
+
+    Returns a list of (child, group, selected) tuples, where disordered
+    entities are replaced by all their alternatives, each with the same
+    group number (counting from zero), and a flag for the selected one.
+    Otherwise the group number is -1 (and the selected flag False).
+    """
+    members = []
+    group = 0
+    for child in entity.get_list():
+        if child.is_disordered() == 2:
+            selected = child.disordered_get()
+            for member in child.disordered_get_list():
+                members.append((member, group, member is selected))
+            group += 1
+        else:
+            members.append((child, -1, False))
+    return members
+
+
+def _renumber(groups, start):
+    """Offset the group numbers of a list of members (PRIVATE)."""
+    return [group + start if group >= 0 else group for group in groups]
+
+
+def _optional_rows(values):
+    """2D float32 array from arrays or None, with NaN rows for None (PRIVATE).
+
+    Returns None if all the values are None.
+    """
+    width = None
+    for value in values:
+        if value is not None:
+            width = len(value)
+            break
+    if width is None:
+        return None
+    array = numpy.empty((len(values), width), numpy.float32)
+    array[:] = numpy.nan
+    for index, value in enumerate(values):
+        if value is not None:
+            array[index] = value
+    return array
+
+
+def _utf8_array(values):
+    """Array of the strings as UTF-8 encoded bytes (PRIVATE).
+
+    This takes a byte per character for ASCII text, rather than the four
+    used by a NumPy unicode array.
+    """
+    return numpy.array([v if isinstance(v, bytes) else (u"%s" % v).encode("utf-8")
+                        for v in values], "S")
+
+
+def write_structure(structure, filename):
+    """Save a Structure as a binary cache file.
+
+    Arguments:
+     - structure - A Structure object.
+     - filename  - Name of the file to write.
+
+    All the alternative locations of any disordered atoms (and all the
+    residues of any point mutations) are included, remembering which one is
+    currently selected.
+    """
+    _write(structure, filename, None)
+
+
+def _write(structure, filename, source):
+    """Save a Structure, with details of the original file (PRIVATE)."""
+    if structure.get_level() != "S":
+        raise ValueError("Expected a Structure, not a %s object"
+                         % structure.__class__.__name__)
+    columns = dict((name, []) for name in _string_arrays + _other_arrays +
+                   _extra_arrays)
+    atom_groups = 0
+    residue_groups = 0
+    for model in structure:
+        columns["model_ids"].append(model.id)
+        columns["model_serial_numbers"].append(
+            -1 if model.serial_num is None else model.serial_num)
+        columns["model_chains"].append(len(columns["chain_ids"]))
+        for chain in model:
+            columns["chain_ids"].append(chain.id)
+            columns["chain_residues"].append(len(columns["residue_names"]))
+            residues = _members(chain)
+            for residue, group, selected in residues:
+                hetflag, resseq, icode = residue.id
+                columns["residue_hetflags"].append(hetflag)
+                columns["residue_numbers"].append(resseq)
+                columns["residue_icodes"].append(icode)
+                columns["residue_names"].append(residue.resname)
+                columns["residue_segids"].append(residue.segid)
+                columns["residue_disordered"].append(bool(residue.disordered))
+                columns["residue_selected"].append(selected)
+                columns["residue_atoms"].append(len(columns["names"]))
+                atoms = _members(residue)
+                for atom, group, selected in atoms:
+                    columns["coords"].append(atom.coord)
+                    columns["bfactors"].append(atom.bfactor)
+                    columns["occupancies"].append(atom.occupancy)
+                    columns["serial_numbers"].append(atom.serial_number)
+                    columns["elements"].append(atom.element)
+                    columns["names"].append(atom.name)
+                    columns["fullnames"].append(atom.fullname)
+                    columns["altlocs"].append(atom.altloc)
+                    columns["atom_selected"].append(selected)
+                    columns["anisou"].append(atom.anisou_array)
+                    columns["siguij"].append(atom.siguij_array)
+                    columns["sigatm"].append(atom.sigatm_array)
+                groups = [group for atom, group, selected in atoms]
+                columns["atom_groups"].extend(_renumber(groups, atom_groups))
+                atom_groups += len(set(groups) - set([-1]))
+            groups = [group for residue, group, selected in residues]
+            columns["residue_groups"].extend(_renumber(groups, residue_groups))
+            residue_groups += len(set(groups) - set([-1]))
+    columns["model_chains"].append(len(columns["chain_ids"]))
+    columns["chain_residues"].append(len(columns["residue_names"]))
+    columns["residue_atoms"].append(len(columns["names"]))
+
+    arrays = {}
+    for name in _string_arrays:
+        arrays[name] = _utf8_array(columns[name])
+    for name in ["bfactors", "occupancies"]:
+        arrays[name] = numpy.array([numpy.nan if v is None else v
+                                    for v in columns[name]], numpy.float64)
+    for name in ["model_serial_numbers", "serial_numbers"]:
+        arrays[name] = numpy.array([-1 if v is None else v
+                                    for v in columns[name]], numpy.int64)
+    for name in ["model_ids", "model_chains", "chain_residues",
+                 "residue_numbers", "residue_atoms"]:
+        arrays[name] = numpy.array(columns[name], numpy.int64)
+    for name in ["residue_groups", "atom_groups"]:
+        arrays[name] = numpy.array(columns[name], numpy.int32)
+    for name in ["residue_disordered", "residue_selected", "atom_selected"]:
+        arrays[name] = numpy.array(columns[name], bool)
+    arrays["coords"] = numpy.array(columns["coords"],
+                                   numpy.float32).reshape(-1, 3)
+    for name in _extra_arrays:
+        array = _optional_rows(columns[name])
+        if array is not None:
+            arrays[name] = array
+
+    # Work out where each array goes, after the header
+    layout = {}
+    names = sorted(arrays)
+    header = {"structure_id": structure.id,
+              "header": getattr(structure, "header", None),
+              "source": source, "arrays": layout}
+    offset = 0
+    for name in names:
+        array = arrays[name]
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape),
+                        "offset": offset}
+        offset += -(-array.nbytes // _alignment) * _alignment
+    # The offsets are relative to the end of the (padded) header
+    text = json.dumps(header).encode("utf-8")
+    start = len(_magic) + 8 + len(text)
+    start = -(-start // _alignment) * _alignment
+    with open(filename, "wb") as handle:
+        handle.write(_magic)
+        handle.write(struct.pack("<II", _format_version, len(text)))
+        handle.write(text)
+        for name in names:
+            handle.seek(start + layout[name]["offset"])
+            arrays[name].tofile(handle)
+        # Make sure the file covers the padding of the final array
+        handle.seek(start + offset)
+        handle.truncate()
+
+
+class StructureArrays(object):
+    """Lazy view of a structure cache file as NumPy arrays.
+
+    Arguments:
+     - filename - Name of a file from write_structure (or StructureCache).
+     - mmap     - Memory map the file (default), rather than reading it all.
+
+    The arrays are read only. Those describing the atoms (one row per atom,
+    counting every alternative location of disordered atoms) match the
+    attributes of a Bio.PDB.AtomArray for the whole structure, i.e. coords,
+    bfactors, occupancies, serial_numbers, elements and names, as well as
+    fullnames and altlocs. Missing occupancies are NaN, and missing serial
+    numbers are -1. The anisou, siguij and sigatm arrays (2D arrays with NaN
+    rows for atoms without these values) are None if no atoms have them.
+    The other attributes are:
+
+     - structure_id - The structure's id.
+     - header       - The structure's header dictionary (or None).
+     - model_ids, model_serial_numbers, model_chains - one entry per model
+       (plus a final entry for model_chains), with the offsets of the chains
+       of each model.
+     - chain_ids, chain_residues - one entry per chain (plus a final entry
+       for chain_residues), with the offsets of the residues of each chain.
+     - residue_hetflags, residue_numbers, residue_icodes, residue_names,
+       residue_segids, residue_disordered, residue_groups, residue_selected,
+       residue_atoms - one entry per residue (plus a final entry for
+       residue_atoms), with the offsets of the atoms of each residue.
+     - atom_groups, atom_selected - disorder details of each atom.
+    """
+
+    def __init__(self, filename, mmap=True):
+        with open(filename, "rb") as handle:
+            if handle.read(len(_magic)) != _magic:
+                raise ValueError("%s is not a structure cache file" % filename)
+            version, size = struct.unpack("<II", handle.read(8))
+            if version != _format_version:
+                raise ValueError("Structure cache file %s has format version "
+                                 "%i, expected %i"
+                                 % (filename, version, _format_version))
+            header = json.loads(handle.read(size).decode("utf-8"))
+            if mmap:
+                data = _mmap_file(handle)
+            else:
+                handle.seek(0)
+                data = handle.read()
+        start = len(_magic) + 8 + size
+        start = -(-start // _alignment) * _alignment
+        self.structure_id = header["structure_id"]
+        self.header = header["header"]
+        self._source = header["source"]
+        for name in _extra_arrays:
+            setattr(self, name, None)
+        for name, details in header["arrays"].items():
+            dtype = numpy.dtype(str(details["dtype"]))
+            shape = tuple(details["shape"])
+            count = int(numpy.prod(shape))
+            array = numpy.frombuffer(data, dtype, count,
+                                     start + details["offset"])
+            if name in _string_arrays and bytes is not str:
+                # Python 3, decode the UTF-8 strings
+                array = numpy.char.decode(array, "utf-8")
+            setattr(self, str(name), array.reshape(shape))
+        for name in _string_arrays + _other_arrays:
+            if not hasattr(self, name):
+                raise ValueError("Structure cache file %s has no %s array"
+                                 % (filename, name))
+
+    def __repr__(self):
+        return "<StructureArrays id=%s with %i atoms>" \
+            % (self.structure_id, len(self))
+
+    def __len__(self):
+        """Return the number of atoms (counting all alternative locations)."""
+        return len(self.names)
+
+    def get_structure(self, structure_id=None):
+        """Build the Structure object, with all its models, chains etc.
+
+        Arguments:
+         - structure_id - Optional id for the structure, by default the id
+                          of the structure saved.
+
+        The coordinates of the atoms are views of a single (writable) copy
+        of the coords array, as in a structure parsed in PDBParser's fast
+        mode.
+        """
+        if structure_id is None:
+            structure_id = self.structure_id
+        structure = Structure(structure_id)
+        if self.header is not None:
+            structure.header = self.header
+        model_chains = self.model_chains.tolist()
+        serial_numbers = self.model_serial_numbers.tolist()
+        chain_ids = self.chain_ids.tolist()
+        chain_residues = self.chain_residues.tolist()
+        residue_groups = self.residue_groups.tolist()
+        residue_selected = self.residue_selected.tolist()
+        builder = _ResidueBuilder(self)
+        for m, model_id in enumerate(self.model_ids.tolist()):
+            serial_number = serial_numbers[m]
+            model = Model(model_id, None if serial_number < 0 else serial_number)
+            structure.add(model)
+            for c in range(model_chains[m], model_chains[m + 1]):
+                chain = Chain(chain_ids[c])
+                model.add(chain)
+                r = chain_residues[c]
+                end = chain_residues[c + 1]
+                while r < end:
+                    group = residue_groups[r]
+                    if group < 0:
+                        chain.add(builder.build(r))
+                        r += 1
+                        continue
+                    wrapper = DisorderedResidue(builder.residue_id(r))
+                    chain.add(wrapper)
+                    selected = None
+                    while r < end and residue_groups[r] == group:
+                        residue = builder.build(r)
+                        wrapper.disordered_add(residue)
+                        if residue_selected[r]:
+                            selected = residue.resname
+                        r += 1
+                    if selected is not None:
+                        wrapper.disordered_select(selected)
+        return structure
+
+
+def _mmap_file(handle):
+    """Memory map an open file (PRIVATE)."""
+    return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class _ResidueBuilder(object):
+    """Builds the residues of a StructureArrays object with their atoms (PRIVATE).
+
+    All the Atom objects are made up front, and the arrays are converted
+    into lists once, so building each residue only needs list lookups.
+    """
+
+    def __init__(self, arrays):
+        self.hetflags = arrays.residue_hetflags.tolist()
+        self.numbers = arrays.residue_numbers.tolist()
+        self.icodes = arrays.residue_icodes.tolist()
+        self.resnames = arrays.residue_names.tolist()
+        self.segids = arrays.residue_segids.tolist()
+        self.disordered = arrays.residue_disordered.tolist()
+        self.residue_atoms = arrays.residue_atoms.tolist()
+        self.names = arrays.names.tolist()
+        self.groups = arrays.atom_groups.tolist()
+        self.selected = arrays.atom_selected.tolist()
+        # Number of atoms in each residue which are part of a DisorderedAtom
+        grouped = numpy.zeros(len(self.groups) + 1, numpy.int64)
+        numpy.cumsum(arrays.atom_groups >= 0, out=grouped[1:])
+        self.grouped = numpy.diff(grouped[arrays.residue_atoms]).tolist()
+
+        occupancies = [None if v != v else v
+                       for v in arrays.occupancies.tolist()]
+        serial_numbers = [None if v < 0 else v
+                          for v in arrays.serial_numbers.tolist()]
+        # Writable copy of the coordinates, with a view of a row per atom
+        coords = list(numpy.array(arrays.coords, numpy.float32))
+        with warnings.catch_warnings():
+            # Atoms saved without a known element would warn again
+            warnings.simplefilter("ignore", PDBConstructionWarning)
+            self.atoms = [Atom(*values) for values in zip(
+                self.names, coords, arrays.bfactors.tolist(), occupancies,
+                arrays.altlocs.tolist(), arrays.fullnames.tolist(),
+                serial_numbers, arrays.elements.tolist())]
+        for name in _extra_arrays:
+            values = getattr(arrays, name)
+            if values is not None:
+                values = numpy.array(values, numpy.float32)
+                present = ~numpy.isnan(values).any(axis=1)
+                for index in numpy.flatnonzero(present).tolist():
+                    getattr(self.atoms[index], "set_" + name)(values[index])
+
+    def residue_id(self, r):
+        """Return the id tuple of residue r."""
+        return (self.hetflags[r], self.numbers[r], self.icodes[r])
+
+    def build(self, r):
+        """Build residue r, with its atoms."""
+        residue = Residue(self.residue_id(r), self.resnames[r], self.segids[r])
+        if self.disordered[r]:
+            residue.flag_disordered()
+        start = self.residue_atoms[r]
+        end = self.residue_atoms[r + 1]
+        if not self.grouped[r]:
+            # No disordered atoms, so add all the atoms directly
+            atoms = self.atoms[start:end]
+            for atom in atoms:
+                atom.parent = residue
+            residue.child_list = atoms
+            residue.child_dict = dict(zip(self.names[start:end], atoms))
+            return residue
+        groups = self.groups
+        a = start
+        while a < end:
+            atom = self.atoms[a]
+            group = groups[a]
+            if group < 0:
+                residue.add(atom)
+                a += 1
+                continue
+            wrapper = DisorderedAtom(atom.name)
+            residue.add(wrapper)
+            selected = None
+            while a < end and groups[a] == group:
+                atom = self.atoms[a]
+                wrapper.disordered_add(atom)
+                if self.selected[a]:
+                    selected = atom.altloc
+                a += 1
+            if selected is not None:
+                wrapper.disordered_select(selected)
+        return residue
+
+
+def read_structure(filename, structure_id=None):
+    """Load a Structure from a binary cache file.
+
+    Arguments:
+     - filename     - Name of a file from write_structure.
+     - structure_id - Optional id for the structure, by default the id of
+                      the structure saved.
+    """
+    return StructureArrays(filename).get_structure(structure_id)
+
+
+class StructureCache(object):
+    """Directory of binary cache files of parsed structures.
+
+    Arguments:
+     - directory - Directory for the cache files (created if needed).
+     - parser    - Parser object with a get_structure(id, filename) method,
+                   by default a PDBParser (or MMCIFParser for filenames
+                   ending .cif).
+
+    The get_structure method returns the structure from the cache file for
+    the given filename, if it exists and records the same modification time
+    and size as the original file. Otherwise the original file is parsed,
+    and the structure saved to the cache for next time:
+
+    >>> import shutil
+    >>> import tempfile
+    >>> from Bio.PDB.StructureCache import StructureCache
+    >>> directory = tempfile.mkdtemp()
+    >>> cache = StructureCache(directory)
+    >>> structure = cache.get_structure("1A8O", "PDB/1A8O.pdb")
+    >>> structure = cache.get_structure("1A8O", "PDB/1A8O.pdb")
+    >>> print(len(list(structure.get_atoms())))
+    644
+    >>> shutil.rmtree(directory)
+
+    The cache files are named after a hash of the absolute path of the
+    original file. If you use different parser settings (like PERMISSIVE)
+    for the same files, use a separate cache directory for each.
+    """
+
+    def __init__(self, directory, parser=None):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.directory = directory
+        self.parser = parser
+
+    def _get_parser(self, filename):
+        """Return the parser to use for this file (PRIVATE)."""
+        if self.parser is not None:
+            return self.parser
+        if filename.lower().endswith(".cif"):
+            from Bio.PDB.MMCIFParser import MMCIFParser
+            return MMCIFParser()
+        from Bio.PDB.PDBParser import PDBParser
+        return PDBParser()
+
+    def cache_filename(self, filename):
+        """Return the name of the cache file for the given structure file."""
+        path = os.path.abspath(filename)
+        key = hashlib.sha1(path.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key + ".structure")
+
+    def get_structure(self, structure_id, filename):
+        """Return the structure in the file, from the cache if up to date.
+
+        Arguments:
+         - structure_id - The id of the structure.
+         - filename     - Name of the structure file (not a handle).
+
+        If the structure can't be saved to the cache, a warning is issued
+        and the parsed structure is returned anyway.
+        """
+        path = os.path.abspath(filename)
+        info = os.stat(path)
+        source = {"filename": path, "mtime": info.st_mtime,
+                  "size": info.st_size}
+        cache_filename = self.cache_filename(path)
+        try:
+            arrays = StructureArrays(cache_filename)
+        except (IOError, OSError, ValueError):
+            # Missing, unreadable or an old format, parse the file again
+            arrays = None
+        if arrays is not None and arrays._source == source:
+            return arrays.get_structure(structure_id)
+        del arrays
+        structure = self._get_parser(path).get_structure(structure_id, path)
+        # Write to a temporary file first, so that other processes never
+        # see a partly written cache file
+        handle, temp_filename = tempfile.mkstemp(dir=self.directory)
+        os.close(handle)
+        try:
+            _write(structure, temp_filename, source)
+            if os.path.exists(cache_filename):
+                # Needed on Windows, where rename will not replace a file
+                os.remove(cache_filename)
+            os.rename(temp_filename, cache_filename)
+        except (IOError, OSError, ValueError, TypeError) as err:
+            # e.g. disk full, or a header which can't be stored as JSON,
+            # still return the structure, just without caching it
+            warnings.warn("Could not cache structure from %s: %s"
+                          % (filename, err), BiopythonWarning)
+        finally:
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+        return structure
+
+
+def _test():
+    """Run the module's doctests (PRIVATE).
+
+    This will try and locate the unit tests directory, and run the doctests
+    from there in order that the relative paths used in the examples work.
+    """
+    import doctest
+    if os.path.isdir(os.path.join("..", "..", "..", "Tests")):
+        print("Running doctests...")
+        cur_dir = os.path.abspath(os.curdir)
+        os.chdir(os.path.join("..", "..", "..", "Tests"))
+        doctest.testmod()
+        os.chdir(cur_dir)
+        del cur_dir
+        print("Done")
+
+
+if __name__ == "__main__":
+    _test()
@@ -10,9 +10,17 @@ from __future__ import print_function
 import numpy
 
 from Bio.SVDSuperimposer import SVDSuperimposer
+from Bio.PDB.AtomArray import AtomArray
 from Bio.PDB.PDBExceptions import PDBException
 
 
+def _get_coords(atoms):
+    """Return the coordinates of the atoms as an N x 3 array (PRIVATE)."""
+    if isinstance(atoms, AtomArray):
+        return atoms.coords.astype("d")
+    return numpy.array([a.get_coord() for a in atoms], "d").reshape(-1, 3)
+
+
 class Superimposer(object):
     """
     Rotate/translate one set of atoms on top of another,
@@ -29,16 +37,12 @@ class Superimposer(object):
 
         @param fixed: list of (fixed) atoms
         @param moving: list of (moving) atoms
-        @type fixed,moving: [L{Atom}, L{Atom},...]
+        @type fixed,moving: [L{Atom}, L{Atom},...] or L{AtomArray}
         """
         if not (len(fixed)==len(moving)):
             raise PDBException("Fixed and moving atom lists differ in size")
-        l=len(fixed)
-        fixed_coord=numpy.zeros((l, 3))
-        moving_coord=numpy.zeros((l, 3))
-        for i in range(0, len(fixed)):
-            fixed_coord[i]=fixed[i].get_coord()
-            moving_coord[i]=moving[i].get_coord()
+        fixed_coord=_get_coords(fixed)
+        moving_coord=_get_coords(moving)
         sup=SVDSuperimposer()
         sup.set(fixed_coord, moving_coord)
         sup.run()
@@ -47,13 +51,17 @@ class Superimposer(object):
 
     def apply(self, atom_list):
         """
-        Rotate/translate a list of atoms.
+        Rotate/translate a list of atoms (or an AtomArray, or an entity).
         """
         if self.rotran is None:
             raise PDBException("No transformation has been calculated yet")
         rot, tran=self.rotran
         rot=rot.astype('f')
         tran=tran.astype('f')
+        if hasattr(atom_list, "transform"):
+            # AtomArray or Entity, can do them all at once
+            atom_list.transform(rot, tran)
+            return
         for atom in atom_list:
             atom.transform(rot, tran)
 
@@ -39,6 +39,12 @@ from .PDBIO import PDBIO, Select
 # from a list of Atoms.
 from . import Selection
 
+# Coordinates etc of many atoms as NumPy arrays
+from .AtomArray import AtomArray
+
+# Binary cache files of parsed structures
+from .StructureCache import StructureCache
+
 # Superimpose atom sets
 from .Superimposer import Superimposer
 
@@ -0,0 +1,502 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+"""Nucleotide sequences stored at two bits per base (requires NumPy).
+
+The Seq object holds its sequence as a Python string, using (at least) one
+byte per base. If you want to keep many large sequences like complete
+genomes in memory at once, the PackedSeq object offers the same read only
+interface while storing the four bases A, C, G and T (or U) in two bits
+each, about a quarter of the memory:
+
+>>> from Bio.PackedSeq import PackedSeq
+>>> from Bio.Alphabet import generic_dna
+>>> my_dna = PackedSeq("ACGTNNNNNNacgtaRTTTGCA", generic_dna)
+>>> my_dna
+PackedSeq('ACGTNNNNNNacgtaRTTTGCA', DNAAlphabet())
+>>> len(my_dna)
+22
+>>> print(my_dna)
+ACGTNNNNNNacgtaRTTTGCA
+
+Any other letters (like runs of N, or other IUPAC ambiguity codes) are
+recorded separately as runs of identical letters, and lower case soft
+masking is recorded as a list of masked regions, so the original sequence
+is always recovered exactly.
+
+Slicing, complement and reverse complement work directly on the packed
+form, and give new PackedSeq objects:
+
+>>> my_dna[10:16]
+PackedSeq('acgtaR', DNAAlphabet())
+>>> my_dna.reverse_complement()
+PackedSeq('TGCAAAYtacgtNNNNNNACGT', DNAAlphabet())
+
+The count and find methods, and translation, unpack the sequence a window
+at a time rather than all at once:
+
+>>> my_dna.count("T")
+4
+>>> my_dna.find("TTTG")
+16
+>>> my_dna[16:].translate()
+Seq('FA', ExtendedIUPACProtein())
+
+Any other Seq method (e.g. transcribe or split) works on the full
+unpacked sequence as a string and returns ordinary Seq objects. Likewise,
+turning the sequence into a string (e.g. when writing a SeqRecord out with
+Bio.SeqIO) unpacks the full sequence.
+
+To pack the sequences of records read with Bio.SeqIO, just replace their
+seq property:
+
+>>> from Bio import SeqIO
+>>> records = []
+>>> for record in SeqIO.parse("GenBank/NC_005816.fna", "fasta"):
+...     record.seq = PackedSeq(str(record.seq), record.seq.alphabet)
+...     records.append(record)
+>>> print(records[0].seq[:20])
+TGTAACGAACGGTGCAATAG
+"""
+
+from __future__ import print_function
+
+import sys
+
+from Bio._py3k import _as_bytes, _bytes_to_string
+from Bio._py3k import basestring
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.PackedSeq.")
+
+from Bio import Alphabet
+from Bio.Seq import Seq, _translate_str
+from Bio.Seq import _dna_complement_table, _rna_complement_table
+
+# How many bases to unpack at a time for count, find and translate
+_window = 1 << 20
+
+
+def _byte_table(mapping, default):
+    """Make a 256 entry uint8 array for mapping byte values (PRIVATE)."""
+    table = numpy.empty(256, numpy.uint8)
+    table[:] = default
+    for before, after in mapping.items():
+        table[before] = after
+    return table
+
+
+# Letters to two bit codes (any other letters are 255, and stored as runs):
+_code_tables = dict((letters, _byte_table(dict((ord(c), i)
+                                               for i, c in enumerate(letters)),
+                                          255))
+                    for letters in ("ACGT", "ACGU"))
+# Two bit codes to letters:
+_letter_tables = dict((letters, numpy.frombuffer(_as_bytes(letters),
+                                                 numpy.uint8).copy())
+                      for letters in ("ACGT", "ACGU"))
+# For soft masking, ASCII upper to lower case:
+_lower_table = numpy.arange(256).astype(numpy.uint8)
+_lower_table[65:91] += 32
+# For reversing the order of the four bases in a byte:
+_reverse_table = numpy.array([((b & 3) << 6) | (((b >> 2) & 3) << 4) |
+                              (((b >> 4) & 3) << 2) | (b >> 6)
+                              for b in range(256)], numpy.uint8)
+_no_runs = (numpy.zeros(0, numpy.intp), numpy.zeros(0, numpy.intp))
+_no_letter_runs = _no_runs + (numpy.zeros(0, numpy.uint8),)
+
+
+def _runs(mask):
+    """Start and end offsets of runs of True values in a boolean array (PRIVATE)."""
+    edges = numpy.concatenate(([False], mask, [False]))
+    edges = numpy.flatnonzero(edges[1:] != edges[:-1])
+    return edges[0::2], edges[1::2]
+
+
+def _letter_runs(mask, letters):
+    """Start and end offsets and letters of runs of identical letters (PRIVATE).
+
+    Only positions where the boolean mask array is True are considered.
+    """
+    before = numpy.concatenate(([False], mask[:-1]))
+    after = numpy.concatenate((mask[1:], [False]))
+    starts = numpy.flatnonzero(mask & ~(before & numpy.concatenate(
+        ([False], letters[1:] == letters[:-1]))))
+    ends = numpy.flatnonzero(mask & ~(after & numpy.concatenate(
+        (letters[1:] == letters[:-1], [False])))) + 1
+    return starts, ends, letters[starts]
+
+
+def _overlapping(runs, start, end):
+    """Indices i, j of the runs overlapping the region start to end (PRIVATE)."""
+    i = numpy.searchsorted(runs[1], start, "right")
+    j = numpy.searchsorted(runs[0], end, "left")
+    return i, j
+
+
+def _clip(runs, start, end):
+    """Runs within start to end, with offsets relative to the start (PRIVATE)."""
+    i, j = _overlapping(runs, start, end)
+    starts = numpy.maximum(runs[0][i:j], start) - start
+    ends = numpy.minimum(runs[1][i:j], end) - start
+    return (starts, ends) + tuple(values[i:j] for values in runs[2:])
+
+
+def _expand(starts, ends):
+    """Array of all the offsets within the (non-empty, sorted) runs (PRIVATE)."""
+    lengths = ends - starts
+    steps = numpy.ones(lengths.sum(), numpy.intp)
+    if len(steps):
+        steps[0] = starts[0]
+        steps[numpy.cumsum(lengths)[:-1]] = starts[1:] - ends[:-1] + 1
+    return numpy.cumsum(steps)
+
+
+def _pack(data):
+    """Pack a sequence string (PRIVATE).
+
+    Returns the two bit packed data as bytes (four bases per byte, first
+    base in the high bits), the four letters used for the codes, the runs
+    of any other letters, and the runs of lower case (masked) letters.
+    """
+    data = _as_bytes(data)
+    upper = data.upper()
+    if b"U" in upper and b"T" not in upper:
+        letters = "ACGU"
+    else:
+        letters = "ACGT"
+    upper = numpy.frombuffer(upper, numpy.uint8)
+    masked = _runs(numpy.frombuffer(data, numpy.uint8) != upper)
+    codes = _code_tables[letters][upper]
+    other = codes == 255
+    if other.any():
+        exceptions = _letter_runs(other, upper)
+        codes[other] = 0
+    else:
+        exceptions = _no_letter_runs
+    padding = -len(codes) % 4
+    if padding:
+        codes = numpy.concatenate((codes, numpy.zeros(padding, numpy.uint8)))
+    codes = codes.reshape(-1, 4)
+    packed = (codes[:, 0] << 6) | (codes[:, 1] << 4) | (codes[:, 2] << 2) \
+        | codes[:, 3]
+    return packed.tobytes(), letters, exceptions, masked
+
+
+class PackedSeq(Seq):
+    """A read-only nucleotide sequence object packed at two bits per base.
+
+    This is a subclass of the Seq object, so it can be used in its place
+    (e.g. as the sequence of a SeqRecord). See the module documentation
+    for more details.
+    """
+
+    def __init__(self, data, alphabet=Alphabet.generic_alphabet):
+        """Create a PackedSeq object.
+
+        Arguments:
+         - seq      - Sequence, required (string)
+         - alphabet - Optional argument, an Alphabet object from Bio.Alphabet
+        """
+        if not isinstance(data, basestring):
+            raise TypeError("The sequence data given to a PackedSeq object "
+                            "should be a string (not another Seq object etc)")
+        self._packed, self._letters, self._exceptions, self._masked = \
+            _pack(data)
+        self._offset = 0
+        self._length = len(data)
+        self.alphabet = alphabet
+
+    def _new(self, packed, offset, length, exceptions, masked,
+             alphabet=None):
+        """Make a new PackedSeq object from packed data (PRIVATE)."""
+        answer = self.__class__.__new__(self.__class__)
+        answer._packed = packed
+        answer._letters = self._letters
+        answer._exceptions = exceptions
+        answer._masked = masked
+        answer._offset = offset
+        answer._length = length
+        if alphabet is None:
+            alphabet = self.alphabet
+        answer.alphabet = alphabet
+        return answer
+
+    @property
+    def _data(self):
+        """The full sequence as a string, unpacked when needed (PRIVATE)."""
+        return self._unpack(0, self._length)
+
+    def _unpack_array(self, start, end):
+        """Unpack the region start to end as a uint8 array of letters (PRIVATE)."""
+        end = min(end, self._length)
+        if start >= end:
+            return numpy.zeros(0, numpy.uint8)
+        first = self._offset + start
+        last = self._offset + end
+        block = numpy.frombuffer(self._packed, numpy.uint8,
+                                 (last + 3) // 4 - first // 4, first // 4)
+        codes = numpy.empty((len(block), 4), numpy.uint8)
+        codes[:, 0] = block >> 6
+        codes[:, 1] = (block >> 4) & 3
+        codes[:, 2] = (block >> 2) & 3
+        codes[:, 3] = block & 3
+        codes = codes.ravel()[first % 4:first % 4 + end - start]
+        letters = _letter_tables[self._letters][codes]
+        starts, ends, values = _clip(self._exceptions, start, end)
+        if len(starts):
+            letters[_expand(starts, ends)] = numpy.repeat(values, ends - starts)
+        starts, ends = _clip(self._masked, start, end)
+        if len(starts):
+            offsets = _expand(starts, ends)
+            letters[offsets] = _lower_table[letters[offsets]]
+        return letters
+
+    def _unpack(self, start, end):
+        """Unpack the region start to end as a string (PRIVATE)."""
+        return _bytes_to_string(self._unpack_array(start, end).tobytes())
+
+    def _slice(self, start, end):
+        """Returns the region start to end as a new PackedSeq (PRIVATE)."""
+        end = max(start, end)
+        first = self._offset + start
+        last = self._offset + end
+        return self._new(self._packed[first // 4:(last + 3) // 4],
+                         first % 4, end - start,
+                         _clip(self._exceptions, start, end),
+                         _clip(self._masked, start, end))
+
+    def _reversed(self):
+        """Returns the sequence backwards as a new PackedSeq (PRIVATE)."""
+        block = numpy.frombuffer(self._packed, numpy.uint8)
+        length = self._length
+        exceptions = self._exceptions
+        masked = self._masked
+        return self._new(_reverse_table[block[::-1]].tobytes(),
+                         4 * len(block) - self._offset - length, length,
+                         (length - exceptions[1][::-1],
+                          length - exceptions[0][::-1],
+                          exceptions[2][::-1]),
+                         (length - masked[1][::-1], length - masked[0][::-1]))
+
+    def _range(self, start, end):
+        """Apply slice notation rules to the start and end (PRIVATE)."""
+        if start < 0:
+            start = max(0, start + self._length)
+        if end < 0:
+            end = max(0, end + self._length)
+        return start, min(end, self._length)
+
+    def __repr__(self):
+        """Returns a (truncated) representation of the sequence for debugging."""
+        if self._length > 60:
+            return "%s('%s...%s', %r)" % (self.__class__.__name__,
+                                         self._unpack(0, 54),
+                                         self._unpack(self._length - 3,
+                                                      self._length),
+                                         self.alphabet)
+        else:
+            return "%s(%r, %r)" % (self.__class__.__name__, self._data,
+                                   self.alphabet)
+
+    def __len__(self):
+        """Returns the length of the sequence, use len(my_seq)."""
+        return self._length
+
+    def __getitem__(self, index):
+        """Returns a single letter, or a subsequence as a PackedSeq object.
+
+        >>> from Bio.PackedSeq import PackedSeq
+        >>> my_dna = PackedSeq("ACGTNNACGTRY")
+        >>> my_dna[4]
+        'N'
+        >>> my_dna[4:9]
+        PackedSeq('NNACG', Alphabet())
+        >>> my_dna[::-2]
+        PackedSeq('YTCNTC', Alphabet())
+        """
+        if not isinstance(index, slice):
+            if index < 0:
+                index += self._length
+            if index < 0 or index >= self._length:
+                raise IndexError("sequence index out of range")
+            return self._unpack(index, index + 1)
+        start, stop, step = index.indices(self._length)
+        if step == 1:
+            return self._slice(start, stop)
+        elif step == -1:
+            return self._slice(stop + 1, start + 1)._reversed()
+        elif step > 0:
+            data = self._unpack(start, stop)[::step]
+        elif start <= stop:
+            data = ""
+        else:
+            data = self._unpack(stop + 1, start + 1)[::-1][::-step]
+        return self.__class__(data, self.alphabet)
+
+    def count(self, sub, start=0, end=sys.maxsize):
+        """Non-overlapping count method, like that of a python string.
+
+        Behaves like the Seq object's count method, but unpacks the
+        sequence a window at a time.
+
+        >>> from Bio.PackedSeq import PackedSeq
+        >>> my_dna = PackedSeq("AAAATGAAAA")
+        >>> my_dna.count("A")
+        8
+        >>> my_dna.count("AA")
+        4
+        >>> my_dna.count("AA", 3, -1)
+        1
+        """
+        sub_str = self._get_seq_str_and_check_alphabet(sub)
+        start, end = self._range(start, end)
+        if not sub_str:
+            return max(0, end - start + 1)
+        try:
+            sub_str = _as_bytes(sub_str)
+        except UnicodeError:
+            return 0
+        extra = len(sub_str) - 1
+        total = 0
+        while start < end:
+            stop = min(start + _window, end)
+            window = self._unpack_array(start,
+                                        min(stop + extra, end)).tobytes()
+            # Any match counted here starts before stop:
+            count = window.count(sub_str)
+            total += count
+            if count and window.count(sub_str, 0, stop - start) < count:
+                # Last match runs past stop, find where it ends.
+                low = stop - start + 1
+                high = len(window)
+                while low < high:
+                    middle = (low + high) // 2
+                    if window.count(sub_str, 0, middle) < count:
+                        low = middle + 1
+                    else:
+                        high = middle
+                stop = start + low
+            start = stop
+        return total
+
+    def __contains__(self, char):
+        """Implements the 'in' keyword, like a python string."""
+        return self.find(char) != -1
+
+    def find(self, sub, start=0, end=sys.maxsize):
+        """Find method, like that of a python string.
+
+        Behaves like the Seq object's find method, but unpacks the sequence
+        a window at a time.
+
+        >>> from Bio.PackedSeq import PackedSeq
+        >>> my_rna = PackedSeq("GUCAUGGCCAUUGUAAUGGGCCGCUGAAAGGGUGCCCGAUAGUUG")
+        >>> my_rna.find("AUG")
+        3
+        >>> my_rna.find("AUG", 4)
+        15
+        """
+        sub_str = self._get_seq_str_and_check_alphabet(sub)
+        start, end = self._range(start, end)
+        if not sub_str:
+            if start <= end:
+                return start
+            return -1
+        try:
+            sub_str = _as_bytes(sub_str)
+        except UnicodeError:
+            return -1
+        extra = len(sub_str) - 1
+        while start < end:
+            stop = min(start + _window, end)
+            window = self._unpack_array(start,
+                                        min(stop + extra, end)).tobytes()
+            index = window.find(sub_str)
+            if index != -1:
+                return start + index
+            start = stop
+        return -1
+
+    def upper(self):
+        """Returns an upper case copy of the sequence.
+
+        >>> from Bio.PackedSeq import PackedSeq
+        >>> PackedSeq("acgtNNnnACGT").upper()
+        PackedSeq('ACGTNNNNACGT', Alphabet())
+        """
+        return self._new(self._packed, self._offset, self._length,
+                         self._exceptions, _no_runs, self.alphabet._upper())
+
+    def lower(self):
+        """Returns a lower case copy of the sequence.
+
+        >>> from Bio.PackedSeq import PackedSeq
+        >>> PackedSeq("acgtNNnnACGT").lower()
+        PackedSeq('acgtnnnnacgt', Alphabet())
+        """
+        if self._length:
+            masked = (numpy.array([0], numpy.intp),
+                      numpy.array([self._length], numpy.intp))
+        else:
+            masked = _no_runs
+        return self._new(self._packed, self._offset, self._length,
+                         self._exceptions, masked, self.alphabet._lower())
+
+    def complement(self):
+        """Returns the complement sequence. New PackedSeq object.
+
+        >>> from Bio.PackedSeq import PackedSeq
+        >>> from Bio.Alphabet import generic_dna
+        >>> PackedSeq("CCCCCgatA-GD", generic_dna).complement()
+        PackedSeq('GGGGGctaT-CH', DNAAlphabet())
+        """
+        base = Alphabet._get_base_alphabet(self.alphabet)
+        if isinstance(base, Alphabet.ProteinAlphabet):
+            raise ValueError("Proteins do not have complements!")
+        other = _bytes_to_string(self._exceptions[2].tobytes())
+        if isinstance(base, Alphabet.DNAAlphabet):
+            ttable = _dna_complement_table
+        elif isinstance(base, Alphabet.RNAAlphabet):
+            ttable = _rna_complement_table
+        elif self._letters == "ACGU" and "T" not in other:
+            ttable = _rna_complement_table
+        elif self._letters == "ACGT" and "U" not in other:
+            ttable = _dna_complement_table
+        else:
+            ttable = None
+        if ttable is None or \
+                self._letters.translate(ttable) != self._letters[::-1]:
+            # Mixed DNA/RNA or similar, so use the string based code
+            return self.__class__(str(Seq.complement(self)), self.alphabet)
+        # Complementing the two bit codes just means inverting the bits
+        block = numpy.frombuffer(self._packed, numpy.uint8)
+        starts, ends, values = self._exceptions
+        values = numpy.frombuffer(_as_bytes(other.translate(ttable)),
+                                  numpy.uint8)
+        return self._new(numpy.invert(block).tobytes(), self._offset,
+                         self._length, (starts, ends, values), self._masked)
+
+    def _translate(self, codon_table, stop_symbol, to_stop, cds):
+        """Translate the sequence a window at a time (PRIVATE)."""
+        size = 3 * (_window // 3)
+        if cds or self._length <= size:
+            return Seq._translate(self, codon_table, stop_symbol,
+                                  to_stop, cds)
+        proteins = []
+        for start in range(0, self._length, size):
+            protein = _translate_str(self._unpack(start, start + size),
+                                     codon_table, stop_symbol, to_stop)
+            proteins.append(protein)
+            if to_stop and len(protein) < size // 3:
+                break
+        return "".join(proteins)
+
+
+if __name__ == "__main__":
+    from Bio._utils import run_doctest
+    run_doctest()
@@ -19,9 +19,13 @@ import string  # for maketrans only
 import array
 import sys
 import warnings
+import weakref
+from itertools import repeat
 
 from Bio._py3k import range
 from Bio._py3k import basestring
+from Bio._py3k import map, zip
+from Bio._py3k import _bytes_to_string
 
 from Bio import Alphabet
 from Bio.Alphabet import IUPAC
@@ -959,8 +963,7 @@ class Seq(object):
                 # The same table can be used for RNA or DNA (we use this for
                 # translating strings).
                 codon_table = CodonTable.ambiguous_generic_by_id[table_id]
-        protein = _translate_str(str(self), codon_table,
-                                 stop_symbol, to_stop, cds)
+        protein = self._translate(codon_table, stop_symbol, to_stop, cds)
         if stop_symbol in protein:
             alphabet = Alphabet.HasStopCodon(codon_table.protein_alphabet,
                                              stop_symbol=stop_symbol)
@@ -968,6 +971,16 @@ class Seq(object):
             alphabet = codon_table.protein_alphabet
         return Seq(protein, alphabet)
 
+    def _translate(self, codon_table, stop_symbol, to_stop, cds):
+        """Translate the sequence using a CodonTable object (PRIVATE).
+
+        Returns a string, used by the translate method once the codon
+        table has been chosen. Subclasses which don't hold the sequence
+        as a string (e.g. PackedSeq) can override this.
+        """
+        return _translate_str(str(self), codon_table,
+                              stop_symbol, to_stop, cds)
+
     def ungap(self, gap=None):
         """Return a copy of the sequence without the gap character(s).
 
@@ -1883,6 +1896,143 @@ def back_transcribe(rna):
         return rna.replace('U', 'T').replace('u', 't')
 
 
+# Markers used in the output of the codon lookups, replaced or checked
+# for once the whole sequence has been translated:
+_stop_marker = "\x01"
+_pos_stop_marker = "\x02"
+_invalid_marker = "\x00"
+_codon_lookups = weakref.WeakKeyDictionary()
+
+
+def _valid_letters(table):
+    """Set of the (upper case) letters allowed in codons for a table (PRIVATE)."""
+    if table.nucleotide_alphabet.letters is not None:
+        return set(table.nucleotide_alphabet.letters.upper())
+    else:
+        # Assume the worst case, ambiguous DNA or RNA:
+        return set(IUPAC.ambiguous_dna.letters.upper() +
+                   IUPAC.ambiguous_rna.letters.upper())
+
+
+class _CodonLookup(object):
+    """Precomputed translation of every possible codon for a table (PRIVATE).
+
+    The codons attribute is a dictionary mapping codons as tuples of three
+    (upper case) letters to a single character, either the amino acid, or
+    one of the markers for a stop codon or a possible stop codon (e.g. TAN
+    or NNN). Any codon not in the dictionary is invalid.
+
+    For long sequences, if NumPy is available this is also used as a flat
+    lookup array indexed by the three letter codes of each codon, so that
+    the whole sequence can be translated in one go.
+    """
+
+    def __init__(self, codons):
+        self.codons = codons
+        self._array = None
+
+    def translate(self, sequence):
+        """Translate an upper case string, ignoring any partial codon.
+
+        Returns a string of amino acids and markers, one per codon.
+        """
+        if len(sequence) >= 3000 and self._array is not False:
+            try:
+                return self._translate_array(sequence)
+            except (ImportError, UnicodeError):
+                # No NumPy, or not a simple ASCII sequence
+                pass
+        return "".join(map(self.codons.get,
+                           zip(sequence[0::3], sequence[1::3], sequence[2::3]),
+                           repeat(_invalid_marker)))
+
+    def _translate_array(self, sequence):
+        """Translate an upper case string using NumPy (PRIVATE)."""
+        if self._array is None:
+            try:
+                import numpy
+            except ImportError:
+                self._array = False
+                raise
+            letters = sorted(set(c for codon in self.codons for c in codon))
+            size = len(letters) + 1  # last code is for any other character
+            codes = [size - 1] * 256
+            for i, c in enumerate(letters):
+                codes[ord(c)] = i
+            array = numpy.zeros(size ** 3, numpy.uint8)  # _invalid_marker
+            for (c1, c2, c3), amino in self.codons.items():
+                array[(codes[ord(c1)] * size + codes[ord(c2)]) * size
+                      + codes[ord(c3)]] = ord(amino)
+            self._codes = bytes(bytearray(codes))
+            self._size = size
+            self._numpy = numpy
+            self._array = array
+        numpy = self._numpy
+        size = self._size
+        data = sequence.encode("ascii").translate(self._codes)
+        codons = numpy.frombuffer(data, numpy.uint8)
+        codons = codons[:len(codons) - len(codons) % 3].reshape(-1, 3)
+        codons = codons.astype(numpy.intp)
+        index = (codons[:, 0] * size + codons[:, 1]) * size + codons[:, 2]
+        return _bytes_to_string(self._array[index].tobytes())
+
+
+def _codon_lookup(table):
+    """Returns a _CodonLookup object for the table, or None (PRIVATE).
+
+    These are built once for each CodonTable object, trying every
+    combination of the letters which could occur in a codon (including
+    ambiguous nucleotides), and give the same answers as looking up each
+    codon in turn.
+
+    Returns None if this is not possible, e.g. a forward table with amino
+    acids given as more than one letter, or an unknown forward table type.
+    """
+    try:
+        return _codon_lookups[table]
+    except KeyError:
+        pass
+    forward_table = table.forward_table
+    stop_codons = table.stop_codons
+    valid_letters = _valid_letters(table)
+    letters = set(valid_letters)
+    if isinstance(forward_table, CodonTable.AmbiguousForwardTable):
+        letters.update(forward_table.ambiguous_nucleotide)
+        simple_table = forward_table.forward_table
+    else:
+        simple_table = forward_table
+    lookup = None
+    if type(simple_table) is dict:
+        for codon in list(simple_table) + list(stop_codons):
+            letters.update(codon)
+        codons = {}
+        for c1 in letters:
+            for c2 in letters:
+                for c3 in letters:
+                    codon = c1 + c2 + c3
+                    try:
+                        amino = forward_table[codon]
+                    except (KeyError, CodonTable.TranslationError):
+                        if codon in stop_codons:
+                            amino = _stop_marker
+                        elif valid_letters.issuperset(codon):
+                            amino = _pos_stop_marker
+                        else:
+                            continue
+                    if not isinstance(amino, basestring) or len(amino) != 1:
+                        codons = None
+                        break
+                    codons[(c1, c2, c3)] = amino
+                if codons is None:
+                    break
+            if codons is None:
+                break
+        if codons is not None:
+            lookup = _CodonLookup(codons)
+    _codon_lookups[table] = lookup
+    return lookup
+
+
 def _translate_str(sequence, table, stop_symbol="*", to_stop=False,
                    cds=False, pos_stop="X"):
     """Helper function to translate a nucleotide string (PRIVATE).
@@ -1947,12 +2097,6 @@ def _translate_str(sequence, table, stop_symbol="*", to_stop=False,
     amino_acids = []
     forward_table = table.forward_table
     stop_codons = table.stop_codons
-    if table.nucleotide_alphabet.letters is not None:
-        valid_letters = set(table.nucleotide_alphabet.letters.upper())
-    else:
-        # Assume the worst case, ambiguous DNA or RNA:
-        valid_letters = set(IUPAC.ambiguous_dna.letters.upper() +
-                            IUPAC.ambiguous_rna.letters.upper())
     n = len(sequence)
     if cds:
         if str(sequence[:3]).upper() not in table.start_codons:
@@ -1974,6 +2118,29 @@ def _translate_str(sequence, table, stop_symbol="*", to_stop=False,
                       "Explicitly trim the sequence or add trailing N before "
                       "translation. This may become an error in future.",
                       BiopythonWarning)
+    lookup = _codon_lookup(table)
+    if lookup is not None:
+        # Translate all the codons at once (zip ignores any partial codon)
+        protein = lookup.translate(sequence)
+        stop = protein.find(_stop_marker)
+        invalid = protein.find(_invalid_marker)
+        if invalid != -1 and (stop == -1 or invalid < stop
+                              or not (cds or to_stop)):
+            raise CodonTable.TranslationError(
+                "Codon '%s' is invalid" % sequence[3*invalid:3*invalid+3])
+        if stop != -1:
+            if cds:
+                raise CodonTable.TranslationError(
+                    "Extra in frame stop codon found.")
+            if to_stop:
+                protein = protein[:stop]
+            else:
+                protein = protein.replace(_stop_marker, stop_symbol)
+        protein = protein.replace(_pos_stop_marker, pos_stop)
+        amino_acids.append(protein)
+        return "".join(amino_acids)
+    # Fall back on looking up each codon in turn
+    valid_letters = _valid_letters(table)
     for i in range(0, n - n%3, 3):
         codon = sequence[i:i+3]
         try:
@@ -2084,6 +2251,48 @@ def translate(sequence, table="Standard", stop_symbol="*", to_stop=False,
         return _translate_str(sequence, codon_table, stop_symbol, to_stop, cds)
 
 
+def translate_six_frames(sequence, table="Standard", stop_symbol="*"):
+    """Translate a nucleotide sequence in all six reading frames.
+
+    Returns a tuple of six translations, for the forward strand starting at
+    the first, second and third letter, then for the reverse complement
+    starting at its first, second and third letter. Any partial codon at
+    the end of a frame is ignored. If given a string, returns strings.
+    Given a Seq or MutableSeq, returns Seq objects with a protein alphabet.
+
+    Arguments:
+     - table - Which codon table to use?  This can be either a name (string),
+               an NCBI identifier (integer), or a CodonTable object (useful
+               for non-standard genetic codes).  Defaults to the "Standard"
+               table.
+     - stop_symbol - Single character string, what to use for any
+                     terminators, defaults to the asterisk, "*".
+
+    e.g.
+
+    >>> for protein in translate_six_frames("GTGGCCATTGTAATGGGCCGCTGAAAGGGTGC"):
+    ...     print(protein)
+    VAIVMGR*KG
+    WPL*WAAERV
+    GHCNGPLKGC
+    APFQRPITMA
+    HPFSGPLQWP
+    TLSAAHYNGH
+
+    The codons are translated in bulk using a lookup table precomputed
+    for each codon table, so this is suitable for large sequences like
+    assembled genomes.
+    """
+    if isinstance(sequence, MutableSeq):
+        sequence = sequence.toseq()
+    frames = []
+    for strand in (sequence, reverse_complement(sequence)):
+        for frame in range(3):
+            end = frame + 3 * max(0, (len(strand) - frame) // 3)
+            frames.append(translate(strand[frame:end], table, stop_symbol))
+    return tuple(frames)
+
+
 def reverse_complement(sequence):
     """Returns the reverse complement sequence of a nucleotide string.
 
@@ -54,6 +54,29 @@ from __future__ import print_function
 from Bio.Seq import MutableSeq, reverse_complement
 
 
+# Large annotated files can give hundreds of thousands of features and
+# locations, so these classes use __slots__ to save memory. For the
+# SeqFeature a __dict__ slot means extra attributes can still be added
+# (e.g. BioSQL does this), but the dictionary is only created if needed.
+# The following are used for pickling (which under Python 2 with protocols
+# 0 and 1 requires __getstate__ when there are slots):
+
+def _get_slots_state(obj):
+    """Returns a dictionary of the attributes of a slotted object (PRIVATE)."""
+    state = dict(getattr(obj, "__dict__", {}))
+    for cls in obj.__class__.__mro__:
+        for name in cls.__dict__.get("__slots__", ()):
+            if name not in ("__dict__", "__weakref__") and hasattr(obj, name):
+                state[name] = getattr(obj, name)
+    return state
+
+
+def _set_slots_state(obj, state):
+    """Restores the attributes of a slotted object when unpickling (PRIVATE)."""
+    for name, value in state.items():
+        setattr(obj, name, value)
+
+
 class SeqFeature(object):
     """Represent a Sequence Feature on an object.
 
@@ -85,6 +108,11 @@ class SeqFeature(object):
     This is now superceded by a CompoundFeatureLocation as the location,
     and should not be used (DEPRECATED).
     """
+    __slots__ = ("location", "type", "id", "qualifiers", "_sub_features",
+                 "__dict__")
+    __getstate__ = _get_slots_state
+    __setstate__ = _set_slots_state
+
     def __init__(self, location = None, type = '', location_operator = '',
                  strand = None, id = "<unknown id>",
                  qualifiers = None, sub_features = None,
@@ -584,6 +612,10 @@ class FeatureLocation(object):
     as well, for example a GenBank location like complement(<123..150)
     would use a BeforePosition object for the start.
     """
+    __slots__ = ("_start", "_end", "_strand", "ref", "ref_db")
+    __getstate__ = _get_slots_state
+    __setstate__ = _set_slots_state
+
     def __init__(self, start, end, strand=None, ref=None, ref_db=None):
         """Specify the start, end, strand etc of a sequence feature.
 
@@ -935,6 +967,10 @@ class FeatureLocation(object):
 
 class CompoundLocation(object):
     """For handling joins etc where a feature location has several parts."""
+    __slots__ = ("operator", "parts")
+    __getstate__ = _get_slots_state
+    __setstate__ = _set_slots_state
+
     def __init__(self, parts, operator="join"):
         """Create a compound location with several parts.
 
@@ -1223,6 +1259,8 @@ class CompoundLocation(object):
 class AbstractPosition(object):
     """Abstract base class representing a position.
     """
+    # Subclasses with attributes (e.g. WithinPosition) get a __dict__
+    __slots__ = ()
 
     def __repr__(self):
         """String representation of the location for debugging."""
@@ -1262,6 +1300,8 @@ class ExactPosition(int, AbstractPosition):
     15
 
     """
+    __slots__ = ()
+
     def __new__(cls, position, extension = 0):
         if extension != 0:
             raise AttributeError("Non-zero extension %s for exact position."
@@ -1297,7 +1337,7 @@ class UncertainPosition(ExactPosition):
     This is used in UniProt, e.g. ?222 for uncertain position 222, or in the
     XML format explicitly marked as uncertain. Does not apply to GenBank/EMBL.
     """
-    pass
+    __slots__ = ()
 
 
 class UnknownPosition(AbstractPosition):
@@ -1305,6 +1345,7 @@ class UnknownPosition(AbstractPosition):
 
     This is used in UniProt, e.g. ? or in the XML as unknown.
     """
+    __slots__ = ()
 
     def __repr__(self):
         """String representation of the UnknownPosition location for debugging."""
@@ -1423,6 +1464,10 @@ class WithinPosition(int, AbstractPosition):
         obj._right = right
         return obj
 
+    def __getnewargs__(self):
+        """Arguments for __new__ when copying or unpickling (PRIVATE)."""
+        return (int(self), self._left, self._right)
+
     def __repr__(self):
         """String representation of the WithinPosition location for debugging."""
         return "%s(%i, left=%i, right=%i)" \
@@ -1525,6 +1570,10 @@ class BetweenPosition(int, AbstractPosition):
         obj._right = right
         return obj
 
+    def __getnewargs__(self):
+        """Arguments for __new__ when copying or unpickling (PRIVATE)."""
+        return (int(self), self._left, self._right)
+
     def __repr__(self):
         """String representation of the WithinPosition location for debugging."""
         return "%s(%i, left=%i, right=%i)" \
@@ -1752,6 +1801,10 @@ class OneOfPosition(int, AbstractPosition):
         obj.position_choices = choices
         return obj
 
+    def __getnewargs__(self):
+        """Arguments for __new__ when copying or unpickling (PRIVATE)."""
+        return (int(self), self.position_choices)
+
     @property
     def position(self):
         """Legacy attribute to get (left) position as integer (OBSOLETE)."""
@@ -33,7 +33,7 @@ http://www.ebi.ac.uk/imgt/hla/docs/manual.html
 
 from __future__ import print_function
 
-from Bio.Seq import UnknownSeq
+from Bio.Seq import Seq, MutableSeq, UnknownSeq
 from Bio.GenBank.Scanner import GenBankScanner, EmblScanner, _ImgtScanner
 from Bio import Alphabet
 from .Interfaces import SequentialSequenceWriter
@@ -50,40 +50,56 @@ from Bio._py3k import basestring
 # However, all the writing code is in this file.
 
 
-def GenBankIterator(handle):
+def GenBankIterator(handle, lazy_features=False, feature_types=None):
     """Breaks up a Genbank file into SeqRecord objects.
 
     Every section from the LOCUS line to the terminating // becomes
     a single SeqRecord with associated annotation and features.
 
     Note that for genomes or chromosomes, there is typically only
-    one record."""
+    one record.
+
+    Set lazy_features=True to keep each feature table as a string, and only
+    build the SeqFeature objects when the record's features are used. This
+    is much faster if you only need the sequences or just a few records'
+    features. Use feature_types to give a list of the wanted feature types
+    (e.g. ["gene", "CDS"]) to skip parsing any others."""
     # This calls a generator function:
-    return GenBankScanner(debug=0).parse_records(handle)
+    return GenBankScanner(debug=0).parse_records(handle,
+                                                 lazy_features=lazy_features,
+                                                 feature_types=feature_types)
 
 
-def EmblIterator(handle):
+def EmblIterator(handle, lazy_features=False, feature_types=None):
     """Breaks up an EMBL file into SeqRecord objects.
 
     Every section from the LOCUS line to the terminating // becomes
     a single SeqRecord with associated annotation and features.
 
     Note that for genomes or chromosomes, there is typically only
-    one record."""
+    one record.
+
+    See GenBankIterator for the lazy_features and feature_types options."""
     # This calls a generator function:
-    return EmblScanner(debug=0).parse_records(handle)
+    return EmblScanner(debug=0).parse_records(handle,
+                                              lazy_features=lazy_features,
+                                              feature_types=feature_types)
 
 
-def ImgtIterator(handle):
+def ImgtIterator(handle, lazy_features=False, feature_types=None):
     """Breaks up an IMGT file into SeqRecord objects.
 
     Every section from the LOCUS line to the terminating // becomes
     a single SeqRecord with associated annotation and features.
 
     Note that for genomes or chromosomes, there is typically only
-    one record."""
+    one record.
+
+    See GenBankIterator for the lazy_features and feature_types options."""
     # This calls a generator function:
-    return _ImgtScanner(debug=0).parse_records(handle)
+    return _ImgtScanner(debug=0).parse_records(handle,
+                                               lazy_features=lazy_features,
+                                               feature_types=feature_types)
 
 
 def GenBankCdsFeatureIterator(handle, alphabet=Alphabet.generic_protein):
@@ -282,13 +298,20 @@ class _InsdcWriter(SequentialSequenceWriter):
                        "direction", "estimated_length", "mod_base", "number",
                        "rpt_type", "rpt_unit_range", "tag_peptide",
                        "transl_except", "transl_table")
+    # Features are written in batches, and the sequence in chunks (which
+    # must be a multiple of the 60 letters per line):
+    FEATURES_PER_WRITE = 250
+    SEQUENCE_CHUNK = 60 * 1000
 
     def _write_feature_qualifier(self, key, value=None, quote=None):
+        self.handle.write(self._feature_qualifier_str(key, value, quote))
+
+    def _feature_qualifier_str(self, key, value=None, quote=None):
+        """Returns a feature qualifier as a string of wrapped lines (PRIVATE)."""
         if not value:
-            self.handle.write("%s/%s\n" % (self.QUALIFIER_INDENT_STR, key))
-            return
+            return "%s/%s\n" % (self.QUALIFIER_INDENT_STR, key)
         # Quick hack with no line wrapping, may be useful for testing:
-        # self.handle.write('%s/%s="%s"\n' % (self.QUALIFIER_INDENT_STR, key, value))
+        # return '%s/%s="%s"\n' % (self.QUALIFIER_INDENT_STR, key, value)
         if quote is None:
             # Try to mimic unwritten rules about when quotes can be left out:
             if _is_int_or_long(value) or key in self.FTQUAL_NO_QUOTE:
@@ -300,23 +323,22 @@ class _InsdcWriter(SequentialSequenceWriter):
         else:
             line = '%s/%s=%s' % (self.QUALIFIER_INDENT_STR, key, value)
         if len(line) <= self.MAX_WIDTH:
-            self.handle.write(line + "\n")
-            return
+            return line + "\n"
+        lines = []
         while line.lstrip():
             if len(line) <= self.MAX_WIDTH:
-                self.handle.write(line + "\n")
-                return
-            # Insert line break...
-            for index in range(min(len(line) - 1, self.MAX_WIDTH),
-                               self.QUALIFIER_INDENT + 1, -1):
-                if line[index] == " ":
-                    break
-            if line[index] != " ":
+                lines.append(line)
+                break
+            # Insert line break at the last space which fits (if any)...
+            index = line.rfind(" ", self.QUALIFIER_INDENT + 2,
+                               min(len(line) - 1, self.MAX_WIDTH) + 1)
+            if index == -1:
                 # No nice place to break...
                 index = self.MAX_WIDTH
-            assert index <= self.MAX_WIDTH
-            self.handle.write(line[:index] + "\n")
+            lines.append(line[:index])
             line = self.QUALIFIER_INDENT_STR + line[index:].lstrip()
+        lines.append("")
+        return "\n".join(lines)
 
     def _wrap_location(self, location):
         """Split a feature location into lines (break at commas)."""
@@ -336,23 +358,69 @@ class _InsdcWriter(SequentialSequenceWriter):
 
     def _write_feature(self, feature, record_length):
         """Write a single SeqFeature object to features table."""
+        self.handle.write(self._feature_str(feature, record_length))
+
+    def _feature_str(self, feature, record_length):
+        """Returns a single SeqFeature object as a string of lines (PRIVATE)."""
         assert feature.type, feature
         location = _insdc_location_string(feature.location, record_length)
         f_type = feature.type.replace(" ", "_")
-        line = (self.QUALIFIER_INDENT_TMP % f_type)[:self.QUALIFIER_INDENT] \
-               + self._wrap_location(location) + "\n"
-        self.handle.write(line)
+        lines = [(self.QUALIFIER_INDENT_TMP % f_type)[:self.QUALIFIER_INDENT] +
+                 self._wrap_location(location) + "\n"]
         # Now the qualifiers...
+        qualifier_str = self._feature_qualifier_str
         for key, values in feature.qualifiers.items():
             if isinstance(values, list) or isinstance(values, tuple):
                 for value in values:
-                    self._write_feature_qualifier(key, value)
+                    lines.append(qualifier_str(key, value))
             elif values:
                 # String, int, etc
-                self._write_feature_qualifier(key, values)
+                lines.append(qualifier_str(key, values))
             else:
                 # e.g. a /pseudo entry
-                self._write_feature_qualifier(key)
+                lines.append(qualifier_str(key))
+        return "".join(lines)
+
+    def _write_features(self, record):
+        """Write all the record's SeqFeature objects to the features table (PRIVATE).
+
+        The features are formatted as strings and written in batches, which
+        is much faster than writing each line in turn, while not needing to
+        hold the whole feature table in memory.
+        """
+        rec_length = len(record)
+        handle = self.handle
+        feature_str = self._feature_str
+        batch = []
+        for feature in record.features:
+            batch.append(feature_str(feature, rec_length))
+            if len(batch) >= self.FEATURES_PER_WRITE:
+                handle.write("".join(batch))
+                batch = []
+        if batch:
+            handle.write("".join(batch))
+
+    def _get_seq_chunks(self, record):
+        """Iterator giving the sequence as lower case strings to write (PRIVATE).
+
+        Each string is SEQUENCE_CHUNK letters long (except the last), which
+        is a multiple of the 60 letters per line used in the sequence block,
+        so that this can be formatted a chunk at a time. Sequence objects
+        not held as a single string in memory (e.g. a Bio.PackedSeq or a
+        Bio.faidx.IndexedFastaSeq) are only turned into a string a chunk at
+        a time, so the memory needed stays bounded even for huge contigs.
+        """
+        size = self.SEQUENCE_CHUNK
+        seq = record.seq
+        if type(seq) in (Seq, MutableSeq) or not isinstance(seq, Seq) \
+                or len(seq) <= size:
+            # This catches the sequence being None
+            data = self._get_seq_string(record)
+            return (data[start:start + size].lower()
+                    for start in range(0, len(data), size))
+        else:
+            return (str(seq[start:start + size]).lower()
+                    for start in range(0, len(seq), size))
 
     def _get_annotation_str(self, record, key, default=".", just_first=False):
         """Get an annotation dictionary entry (as a string).
@@ -713,15 +781,27 @@ class GenBankWriter(_InsdcWriter):
             return
 
         # Catches sequence being None:
-        data = self._get_seq_string(record).lower()
-        seq_len = len(data)
-        self.handle.write("ORIGIN\n")
-        for line_number in range(0, seq_len, LETTERS_PER_LINE):
-            self.handle.write(str(line_number + 1).rjust(SEQUENCE_INDENT))
-            for words in range(line_number,
-                               min(line_number + LETTERS_PER_LINE, seq_len), 10):
-                self.handle.write(" %s" % data[words:words + 10])
-            self.handle.write("\n")
+        chunks = self._get_seq_chunks(record)
+        handle = self.handle
+        handle.write("ORIGIN\n")
+        offset = 1
+        for data in chunks:
+            # Format all the full lines in one go,
+            seq_len = len(data)
+            full = seq_len - seq_len % LETTERS_PER_LINE
+            lines = ["%9i %s %s %s %s %s %s\n"
+                     % (offset + i, data[i:i + 10], data[i + 10:i + 20],
+                        data[i + 20:i + 30], data[i + 30:i + 40],
+                        data[i + 40:i + 50], data[i + 50:i + 60])
+                     for i in range(0, full, LETTERS_PER_LINE)]
+            if full < seq_len:
+                # then the final partial line (only in the last chunk)
+                lines.append(str(offset + full).rjust(SEQUENCE_INDENT) +
+                             "".join(" %s" % data[i:i + 10]
+                                     for i in range(full, seq_len, 10)) +
+                             "\n")
+            handle.write("".join(lines))
+            offset += seq_len
 
     def write_record(self, record):
         """Write a single record to the output file."""
@@ -804,9 +884,7 @@ class GenBankWriter(_InsdcWriter):
             self._write_comment(record)
 
         handle.write("FEATURES             Location/Qualifiers\n")
-        rec_length = len(record)
-        for feature in record.features:
-            self._write_feature(feature, rec_length)
+        self._write_features(record)
         self._write_sequence(record)
         handle.write("//\n")
 
@@ -842,43 +920,47 @@ class EmblWriter(_InsdcWriter):
             return
 
         # Catches sequence being None
-        data = self._get_seq_string(record).lower()
-        seq_len = len(data)
+        chunks = self._get_seq_chunks(record)
 
         # Get the base alphabet (underneath any Gapped or StopCodon encoding)
         a = Alphabet._get_base_alphabet(record.seq.alphabet)
         if isinstance(a, Alphabet.DNAAlphabet):
             # TODO - What if we have RNA?
-            a_count = data.count('A') + data.count('a')
-            c_count = data.count('C') + data.count('c')
-            g_count = data.count('G') + data.count('g')
-            t_count = data.count('T') + data.count('t')
+            seq_len = a_count = c_count = g_count = t_count = 0
+            for data in chunks:
+                seq_len += len(data)
+                a_count += data.count('a')
+                c_count += data.count('c')
+                g_count += data.count('g')
+                t_count += data.count('t')
             other = seq_len - (a_count + c_count + g_count + t_count)
             handle.write("SQ   Sequence %i BP; %i A; %i C; %i G; %i T; %i other;\n"
                          % (seq_len, a_count, c_count, g_count, t_count, other))
+            # Will need to go through the sequence again
+            chunks = self._get_seq_chunks(record)
         else:
             handle.write("SQ   \n")
 
-        for line_number in range(0, seq_len // LETTERS_PER_LINE):
-            handle.write("    ")  # Just four, not five
-            for block in range(BLOCKS_PER_LINE):
-                index = LETTERS_PER_LINE * line_number + \
-                    LETTERS_PER_BLOCK * block
-                handle.write((" %s" % data[index:index + LETTERS_PER_BLOCK]))
-            handle.write(str((line_number + 1)
-                             * LETTERS_PER_LINE).rjust(POSITION_PADDING))
-            handle.write("\n")
-        if seq_len % LETTERS_PER_LINE:
-            # Final (partial) line
-            line_number = (seq_len // LETTERS_PER_LINE)
-            handle.write("    ")  # Just four, not five
-            for block in range(BLOCKS_PER_LINE):
-                index = LETTERS_PER_LINE * line_number + \
-                    LETTERS_PER_BLOCK * block
-                handle.write(
-                    (" %s" % data[index:index + LETTERS_PER_BLOCK]).ljust(11))
-            handle.write(str(seq_len).rjust(POSITION_PADDING))
-            handle.write("\n")
+        offset = 0
+        for data in chunks:
+            # Format all the full lines in one go (just four spaces, not five)
+            seq_len = len(data)
+            full = seq_len - seq_len % LETTERS_PER_LINE
+            lines = ["     %s %s %s %s %s %s%10i\n"
+                     % (data[i:i + 10], data[i + 10:i + 20],
+                        data[i + 20:i + 30], data[i + 30:i + 40],
+                        data[i + 40:i + 50], data[i + 50:i + 60],
+                        offset + i + LETTERS_PER_LINE)
+                     for i in range(0, full, LETTERS_PER_LINE)]
+            offset += seq_len
+            if full < seq_len:
+                # Final (partial) line, only in the last chunk
+                lines.append("    " +
+                             "".join((" %s" % data[i:i + LETTERS_PER_BLOCK]).ljust(11)
+                                     for i in range(full, full + LETTERS_PER_LINE,
+                                                    LETTERS_PER_BLOCK)) +
+                             str(offset).rjust(POSITION_PADDING) + "\n")
+            handle.write("".join(lines))
 
     def _write_single_line(self, tag, text):
         assert len(tag) == 2
@@ -1102,9 +1184,7 @@ class EmblWriter(_InsdcWriter):
             self._write_comment(record)
 
         handle.write(self.FEATURE_HEADER)
-        rec_length = len(record)
-        for feature in record.features:
-            self._write_feature(feature, rec_length)
+        self._write_features(record)
 
         self._write_sequence(record)
         handle.write("//\n")
@@ -372,6 +372,10 @@ from Bio.SeqIO.Interfaces import SequentialSequenceWriter
 from math import log
 import warnings
 from Bio import BiopythonWarning, BiopythonParserWarning
+from Bio._py3k import _as_bytes, _bytes_to_string
+from Bio._py3k import map, zip
+from itertools import repeat
+from array import array
 
 
 # define score offsets. See discussion for differences between Sanger and
@@ -538,6 +542,59 @@ def _get_phred_quality(record):
                          "letter_annotations of SeqRecord (id=%s)."
                          % record.id)
 
+
+def _quality_bytes(qualities):
+    """Return array("B") or NumPy uint8 qualities as raw bytes, else None (PRIVATE).
+
+    This lets the FASTQ and QUAL writers convert qualities held as an array
+    of unsigned bytes in one go (using a translation table), rather than
+    looking up each value in turn:
+
+    >>> from array import array
+    >>> _quality_bytes(array("B", [40, 30, 20])) == b"(\x1e\x14"
+    True
+    >>> print(_quality_bytes([40, 30, 20]))
+    None
+    """
+    if isinstance(qualities, array):
+        if qualities.typecode != "B":
+            return None
+    elif str(getattr(qualities, "dtype", "")) != "uint8":
+        return None
+    try:
+        return qualities.tobytes()
+    except AttributeError:
+        # Python 2 arrays, and older versions of NumPy
+        return qualities.tostring()
+
+
+def _quality_table(scores):
+    """Turn a list of 256 encoded characters into a translation table (PRIVATE)."""
+    assert len(scores) == 256
+    return _as_bytes("".join(scores))
+
+
+def _quality_array(quality_string, offset, max_score):
+    """Decode a FASTQ quality string into an array("B") of scores (PRIVATE)."""
+    table, valid = _quality_decoders[offset, max_score]
+    raw = _as_bytes(quality_string)
+    if raw.translate(None, valid):
+        raise ValueError("Invalid character in quality string")
+    return array("B", raw.translate(table))
+
+
+# For decoding FASTQ quality strings as array("B"), maps (offset, max score)
+# to a translation table (ASCII to score) and the valid characters:
+_quality_decoders = dict(
+    ((offset, max_score),
+     (_quality_table([chr((i - offset) % 256) for i in range(256)]),
+      _as_bytes("".join(chr(i) for i in range(offset, offset + max_score + 1)))))
+    for offset, max_score in [(SANGER_SCORE_OFFSET, 93),
+                              (SOLEXA_SCORE_OFFSET, 62)])
+# For checking array("B") PHRED scores fit in the FASTQ variants:
+_phred_upto_93 = _as_bytes("".join(chr(i) for i in range(93 + 1)))
+_phred_upto_62 = _as_bytes("".join(chr(i) for i in range(62 + 1)))
+
 # Only map 0 to 93, we need to give a warning on truncating at 93
 _phred_to_sanger_quality_str = dict((qp, chr(min(126, qp + SANGER_SCORE_OFFSET)))
                                     for qp in range(0, 93 + 1))
@@ -546,6 +603,9 @@ _solexa_to_sanger_quality_str = dict(
     (qs, chr(min(126, int(round(phred_quality_from_solexa(qs))) +
      SANGER_SCORE_OFFSET)))
     for qs in range(-5, 93 + 1))
+# Maps array("B") PHRED scores to Sanger ASCII, truncating at 93
+_phred_to_sanger_table = _quality_table(
+    [chr(min(126, qp + SANGER_SCORE_OFFSET)) for qp in range(256)])
 
 
 def _get_sanger_quality_str(record):
@@ -602,6 +662,15 @@ def _get_sanger_quality_str(record):
     >>> _get_sanger_quality_str(r6)
     'I?5+$"'
 
+    If the PHRED qualities are held as an array("B") or NumPy uint8 array,
+    they are all converted in one go:
+
+    >>> from array import array
+    >>> r7 = SeqRecord(Seq("ACGTAN"), id="Test7",
+    ...      letter_annotations = {"phred_quality": array("B", [50, 40, 30, 20, 10, 0])})
+    >>> _get_sanger_quality_str(r7)
+    'SI?5+!'
+
     Notice that due to the limited range of printable ASCII characters, a
     PHRED quality of 93 is the maximum that can be held in an Illumina FASTQ
     file (using ASCII 126, the tilde). This function will issue a warning
@@ -617,6 +686,12 @@ def _get_sanger_quality_str(record):
         # Fall back on solexa scores...
         pass
     else:
+        raw = _quality_bytes(qualities)
+        if raw is not None:
+            if raw.translate(None, _phred_upto_93):
+                warnings.warn("Data loss - max PHRED quality 93 in Sanger FASTQ",
+                              BiopythonWarning)
+            return _bytes_to_string(raw.translate(_phred_to_sanger_table))
         # Try and use the precomputed mapping:
         try:
             return "".join(_phred_to_sanger_quality_str[qp]
@@ -665,6 +740,9 @@ _phred_to_illumina_quality_str = dict((qp, chr(qp + SOLEXA_SCORE_OFFSET))
 _solexa_to_illumina_quality_str = dict(
     (qs, chr(int(round(phred_quality_from_solexa(qs))) + SOLEXA_SCORE_OFFSET))
     for qs in range(-5, 62 + 1))
+# Maps array("B") PHRED scores to Illumina ASCII, truncating at 62
+_phred_to_illumina_table = _quality_table(
+    [chr(min(126, qp + SOLEXA_SCORE_OFFSET)) for qp in range(256)])
 
 
 def _get_illumina_quality_str(record):
@@ -685,6 +763,12 @@ def _get_illumina_quality_str(record):
         # Fall back on solexa scores...
         pass
     else:
+        raw = _quality_bytes(qualities)
+        if raw is not None:
+            if raw.translate(None, _phred_upto_62):
+                warnings.warn("Data loss - max PHRED quality 62 in Illumina FASTQ",
+                              BiopythonWarning)
+            return _bytes_to_string(raw.translate(_phred_to_illumina_table))
         # Try and use the precomputed mapping:
         try:
             return "".join(_phred_to_illumina_quality_str[qp]
@@ -734,6 +818,9 @@ _phred_to_solexa_quality_str = dict(
     (qp, chr(min(126, int(round(solexa_quality_from_phred(qp))) +
      SOLEXA_SCORE_OFFSET)))
     for qp in range(0, 62 + 1))
+# Maps array("B") PHRED scores to Solexa ASCII, truncating at 62
+_phred_to_solexa_table = _quality_table(
+    [_phred_to_solexa_quality_str.get(qp, chr(126)) for qp in range(256)])
 
 
 def _get_solexa_quality_str(record):
@@ -776,6 +863,12 @@ def _get_solexa_quality_str(record):
         raise ValueError("No suitable quality scores found in "
                          "letter_annotations of SeqRecord (id=%s)."
                          % record.id)
+    raw = _quality_bytes(qualities)
+    if raw is not None:
+        if raw.translate(None, _phred_upto_62):
+            warnings.warn("Data loss - max Solexa quality 62 in Solexa FASTQ",
+                          BiopythonWarning)
+        return _bytes_to_string(raw.translate(_phred_to_solexa_table))
     # Try and use the precomputed mapping:
     try:
         return "".join(_phred_to_solexa_quality_str[qp]
@@ -954,10 +1047,249 @@ def FastqGeneralIterator(handle):
 
         # Return the record and then continue...
         yield (title_line, seq_string, quality_string)
-    raise StopIteration
 
 
-def FastqPhredIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
+# Parser states used in FastqBytesIterator (PRIVATE):
+_START, _TITLE, _SEQ_FIRST, _SEQ, _QUAL_FIRST, _QUAL = range(6)
+_at_char = _as_bytes("@")
+_plus_char = _as_bytes("+")
+_new_line = _as_bytes("\n")
+_empty_bytes = _as_bytes("")
+_space_char = _as_bytes(" ")
+_tab_char = _as_bytes("\t")
+
+
+def FastqBytesIterator(handle, quality_offset=None, chunk_size=1048576):
+    """Iterate over FASTQ records as tuples of bytes (not as SeqRecord objects).
+
+    Arguments:
+     - handle         - input file opened in binary mode (or a BGZF handle)
+     - quality_offset - optional ASCII offset (e.g. 33 for Sanger FASTQ, or
+                        64 for Solexa/Illumina 1.3 to 1.7 FASTQ), in which
+                        case the quality is returned as a NumPy uint8 array
+                        of scores rather than as bytes (requires NumPy).
+     - chunk_size     - number of bytes to read from the handle at a time.
+
+    This is a faster alternative to FastqGeneralIterator for when you do
+    not need SeqRecord objects, and follows the same rules (including for
+    line wrapped records). Rather than calling readline several times per
+    record, the file is read in large chunks which are split into lines in
+    bulk, and simple four line records are handled without any string
+    concatenation. The title, sequence and quality are returned as bytes
+    so no decoding is done either:
+
+    >>> with open("Quality/tricky.fastq", "rb") as handle:
+    ...     for (title, sequence, quality) in FastqBytesIterator(handle):
+    ...         print("%s %i" % (title.decode(), len(sequence)))
+    ...
+    071113_EAS56_0053:1:1:998:236 36
+    071113_EAS56_0053:1:1:182:712 36
+    071113_EAS56_0053:1:1:153:10 36
+    071113_EAS56_0053:1:3:990:501 36
+
+    If you just want the quality scores as a vector (for example for quality
+    control), give the ASCII offset used in the file and each quality string
+    is turned into a NumPy uint8 array of scores, e.g. for a Sanger FASTQ
+    file use FastqBytesIterator(handle, 33) to get PHRED scores.
+    In this case a ValueError is raised if a quality character is below the
+    offset (or above 126, the tilde).
+    """
+    if quality_offset is None:
+        return _fastq_bytes_tuples(handle, chunk_size)
+    try:
+        import numpy
+    except ImportError:
+        from Bio import MissingPythonDependencyError
+        raise MissingPythonDependencyError(
+            "Install NumPy if you want FASTQ quality scores as arrays.")
+    return _fastq_bytes_arrays(_fastq_bytes_tuples(handle, chunk_size),
+                               quality_offset, numpy)
+
+
+def _fastq_bytes_arrays(tuples, quality_offset, numpy):
+    """Convert quality bytes into NumPy uint8 score arrays (PRIVATE)."""
+    offset = numpy.uint8(quality_offset)
+    valid = _as_bytes("".join(chr(ascii) for ascii in
+                              range(quality_offset, 127)))
+    uint8 = numpy.uint8
+    frombuffer = numpy.frombuffer
+    for title, seq, qual in tuples:
+        # Deleting all the valid characters should leave nothing
+        if qual.translate(None, valid):
+            raise ValueError("Invalid character in quality string for %s"
+                             % _bytes_to_string(title))
+        scores = frombuffer(qual, uint8)
+        yield title, seq, scores - offset
+
+
+def _fastq_simple_block(lines):
+    """Split a list of lines into simple four line FASTQ records (PRIVATE).
+
+    Returns a list of (title, sequence, quality) tuples as bytes, or None if
+    the lines are not all simple four line records (in which case the caller
+    should fall back on the line by line parser, which gives the appropriate
+    error message if required). The checks are done a whole column at a time
+    to avoid Python level work per record.
+    """
+    titles = lines[0::4]
+    seqs = lines[1::4]
+    pluses = lines[2::4]
+    quals = lines[3::4]
+    if not all(map(bytes.startswith, titles, repeat(_at_char))):
+        return None
+    titles = [title[1:] for title in map(bytes.rstrip, titles)]
+    if not all(map(bytes.__eq__, pluses, repeat(_plus_char))):
+        # Repeated titles on the "+" lines must match
+        if [plus.rstrip()[1:] or title for plus, title in zip(pluses, titles)] \
+                != titles or not all(map(bytes.startswith, pluses,
+                                         repeat(_plus_char))):
+            return None
+    seqs = list(map(bytes.rstrip, seqs))
+    quals = list(map(bytes.rstrip, quals))
+    if list(map(len, seqs)) != list(map(len, quals)):
+        return None
+    joined = _empty_bytes.join(seqs)
+    if _space_char in joined or _tab_char in joined:
+        return None
+    return list(zip(titles, seqs, quals))
+
+
+def _fastq_bytes_tuples(handle, chunk_size):
+    """Chunked FASTQ tokenizer used by FastqBytesIterator (PRIVATE).
+
+    This mirrors the logic of FastqGeneralIterator (as a state machine so
+    that records can span chunks), with a fast path for the common case of
+    a complete four line record within the current chunk.
+    """
+    state = _START
+    title = seq = qual = None
+    pending = _empty_bytes
+    data = True
+    while data:
+        data = handle.read(chunk_size)
+        if not isinstance(data, bytes):
+            raise ValueError("Is this handle in text mode not binary mode?")
+        if data:
+            data = pending + data
+            cut = data.rfind(_new_line) + 1
+            if not cut:
+                # No complete line yet, must be a very long line
+                pending = data
+                continue
+            pending = data[cut:]
+            lines = data[:cut].split(_new_line)
+            lines.pop()  # Empty string after the final new line
+        elif pending:
+            # Last line without a trailing new line
+            lines = [pending]
+        else:
+            break
+        i = 0
+        n = len(lines)
+        if state == _START:
+            # Skip any text before the first record
+            while i < n and lines[i][:1] != _at_char:
+                i += 1
+            if i < n:
+                state = _TITLE
+        try_block = True
+        while i < n:
+            if state == _TITLE and try_block:
+                # Try to take all the complete four line records in this
+                # chunk in one go (once per chunk, as this costs a pass
+                # over the lines). We need to see the line after a record
+                # to know it has ended, unless this is the end of the file.
+                try_block = False
+                stop = i + 4 * ((n - i) // 4)
+                if stop == n and data:
+                    stop -= 4
+                if i < stop and (stop == n or lines[stop][:1] == _at_char):
+                    block = _fastq_simple_block(lines[i:stop])
+                    if block is not None:
+                        for values in block:
+                            yield values
+                        i = stop
+                        continue
+            if state == _TITLE and i + 3 < n:
+                # Fast path for a simple four line record, provided we can
+                # see that the next line starts a new record (or is EOF):
+                line = lines[i]
+                plus = lines[i + 2]
+                if line[:1] == _at_char and plus[:1] == _plus_char \
+                        and (lines[i + 4][:1] == _at_char if i + 4 < n
+                             else not data):
+                    seq = lines[i + 1].rstrip()
+                    qual = lines[i + 3].rstrip()
+                    if len(seq) == len(qual):
+                        title = line[1:].rstrip()
+                        second_title = plus[1:].rstrip()
+                        if second_title and second_title != title:
+                            raise ValueError(
+                                "Sequence and quality captions differ.")
+                        if _space_char in seq or _tab_char in seq:
+                            raise ValueError(
+                                "Whitespace is not allowed in the sequence.")
+                        yield (title, seq, qual)
+                        i += 4
+                        continue
+            # General case, one line at a time:
+            line = lines[i].rstrip()
+            i += 1
+            if state == _QUAL:
+                if line[:1] == _at_char and len(qual) >= len(seq):
+                    # Start of the next record (see FastqGeneralIterator)
+                    if len(seq) != len(qual):
+                        raise ValueError(
+                            "Lengths of sequence and quality values differs "
+                            " for %s (%i and %i)."
+                            % (_bytes_to_string(title), len(seq), len(qual)))
+                    yield (title, seq, qual)
+                    state = _TITLE
+                    i -= 1
+                else:
+                    qual += line
+            elif state == _SEQ:
+                if line[:1] == _plus_char:
+                    # The title here is optional, but if present must match!
+                    second_title = line[1:]
+                    if second_title and second_title != title:
+                        raise ValueError(
+                            "Sequence and quality captions differ.")
+                    if _space_char in seq or _tab_char in seq:
+                        raise ValueError(
+                            "Whitespace is not allowed in the sequence.")
+                    state = _QUAL_FIRST
+                else:
+                    seq += line
+            elif state == _SEQ_FIRST:
+                seq = line
+                state = _SEQ
+            elif state == _QUAL_FIRST:
+                qual = line
+                state = _QUAL
+            else:
+                assert state == _TITLE, state
+                if line[:1] != _at_char:
+                    raise ValueError(
+                        "Records in Fastq files should start with '@' "
+                        "character")
+                title = line[1:]
+                state = _SEQ_FIRST
+    # End of file
+    if state in (_SEQ_FIRST, _SEQ):
+        raise ValueError("End of file without quality information.")
+    elif state in (_QUAL_FIRST, _QUAL):
+        if state == _QUAL_FIRST:
+            qual = _empty_bytes
+        if len(seq) != len(qual):
+            raise ValueError("Lengths of sequence and quality values differs "
+                             " for %s (%i and %i)."
+                             % (_bytes_to_string(title), len(seq), len(qual)))
+        yield (title, seq, qual)
+
+
+def FastqPhredIterator(handle, alphabet=single_letter_alphabet, title2ids=None,
+                       quality_array=False):
     """Generator function to iterate over FASTQ records (as SeqRecord objects).
 
      - handle - input file
@@ -968,6 +1300,9 @@ def FastqPhredIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
                    strings.  If this is not given, then the entire title line
                    will be used as the description, and the first word as the
                    id and name.
+     - quality_array - If True, the PHRED qualities are stored as an array
+                   of unsigned bytes, array("B"), rather than a list of
+                   integers (default False).
 
     Note that use of title2ids matches that of Bio.SeqIO.FastaIO.
 
@@ -1020,6 +1355,27 @@ def FastqPhredIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
     >>> print(record.letter_annotations["phred_quality"])
     [26, 26, 26, 26, 26, 26, 26, 26, 26, 26, 26, 24, 26, 22, 26, 26, 13, 22, 26, 18, 24, 18, 18, 18, 18]
 
+    For large numbers of reads these lists take a lot of memory (each entry
+    is a separate Python object). Instead you can ask for the qualities as
+    an array of unsigned bytes, which are converted in one go. This array
+    is kept when the record is sliced or reverse complemented, and used
+    directly by the FASTQ and QUAL writers:
+
+    >>> with open("Quality/example.fastq") as handle:
+    ...     for record in FastqPhredIterator(handle, quality_array=True):
+    ...         print("%s %i" % (record.id, max(record.letter_annotations["phred_quality"])))
+    EAS54_6_R1_2_1_413_324 26
+    EAS54_6_R1_2_1_540_792 26
+    EAS54_6_R1_2_1_443_348 26
+    >>> print(record.letter_annotations["phred_quality"][:5])
+    array('B', [26, 26, 26, 26, 26])
+    >>> print(record[5:15].reverse_complement().format("fastq"))
+    @<unknown id> <unknown description>
+    CACGCCAGAA
+    +
+    ;7;9;;;;;;
+    <BLANKLINE>
+
     """
     assert SANGER_SCORE_OFFSET == ord("!")
     # Originally, I used a list expression for each record:
@@ -1039,9 +1395,12 @@ def FastqPhredIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
             name = id
         record = SeqRecord(Seq(seq_string, alphabet),
                            id=id, name=name, description=descr)
-        qualities = [q_mapping[letter] for letter in quality_string]
-        if qualities and (min(qualities) < 0 or max(qualities) > 93):
-            raise ValueError("Invalid character in quality string")
+        if quality_array:
+            qualities = _quality_array(quality_string, SANGER_SCORE_OFFSET, 93)
+        else:
+            qualities = [q_mapping[letter] for letter in quality_string]
+            if qualities and (min(qualities) < 0 or max(qualities) > 93):
+                raise ValueError("Invalid character in quality string")
         # For speed, will now use a dirty trick to speed up assigning the
         # qualities. We do this to bypass the length check imposed by the
         # per-letter-annotations restricted dict (as this has already been
@@ -1209,7 +1568,8 @@ def FastqSolexaIterator(handle, alphabet=single_letter_alphabet, title2ids=None)
         yield record
 
 
-def FastqIlluminaIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
+def FastqIlluminaIterator(handle, alphabet=single_letter_alphabet, title2ids=None,
+                          quality_array=False):
     """Parse Illumina 1.3 to 1.7 FASTQ like files (which differ in the quality mapping).
 
     The optional arguments are the same as those for the FastqPhredIterator.
@@ -1250,9 +1610,12 @@ def FastqIlluminaIterator(handle, alphabet=single_letter_alphabet, title2ids=Non
             name = id
         record = SeqRecord(Seq(seq_string, alphabet),
                            id=id, name=name, description=descr)
-        qualities = [q_mapping[letter] for letter in quality_string]
-        if qualities and (min(qualities) < 0 or max(qualities) > 62):
-            raise ValueError("Invalid character in quality string")
+        if quality_array:
+            qualities = _quality_array(quality_string, SOLEXA_SCORE_OFFSET, 62)
+        else:
+            qualities = [q_mapping[letter] for letter in quality_string]
+            if qualities and (min(qualities) < 0 or max(qualities) > 62):
+                raise ValueError("Invalid character in quality string")
         # Dirty trick to speed up this line:
         # record.letter_annotations["phred_quality"] = qualities
         dict.__setitem__(record._per_letter_annotations,
@@ -1451,6 +1814,9 @@ class FastqPhredWriter(SequentialSequenceWriter):
         self.handle.write("@%s\n%s\n+\n%s\n" % (title, seq_str, qualities_str))
 
 
+_int_strs = [str(i) for i in range(256)]
+
+
 class QualPhredWriter(SequentialSequenceWriter):
     """Class to write QUAL format files (using PHRED quality scores).
 
@@ -1524,15 +1890,20 @@ class QualPhredWriter(SequentialSequenceWriter):
         handle.write(">%s\n" % title)
 
         qualities = _get_phred_quality(record)
-        try:
-            # This rounds to the nearest integer.
-            # TODO - can we record a float in a qual file?
-            qualities_strs = [("%i" % round(q, 0)) for q in qualities]
-        except TypeError as e:
-            if None in qualities:
-                raise TypeError("A quality value of None was found")
-            else:
-                raise e
+        raw = _quality_bytes(qualities)
+        if raw is not None:
+            # Integers from an array("B") or NumPy uint8 array
+            qualities_strs = list(map(_int_strs.__getitem__, bytearray(raw)))
+        else:
+            try:
+                # This rounds to the nearest integer.
+                # TODO - can we record a float in a qual file?
+                qualities_strs = [("%i" % round(q, 0)) for q in qualities]
+            except TypeError as e:
+                if None in qualities:
+                    raise TypeError("A quality value of None was found")
+                else:
+                    raise e
 
         if wrap > 5:
             # Fast wrapping
@@ -252,6 +252,17 @@ _mft = b".mft"
 _flag = b"\xff"
 
 
+def _get_numpy():
+    """Import NumPy on demand, needed for flowgrams as arrays (PRIVATE)."""
+    try:
+        import numpy
+    except ImportError:
+        from Bio import MissingPythonDependencyError
+        raise MissingPythonDependencyError(
+            "Install NumPy if you want SFF flowgrams as arrays.")
+    return numpy
+
+
 def _sff_file_header(handle):
     """Read in an SFF file header (PRIVATE).
 
@@ -564,8 +575,15 @@ _valid_UAN_read_name = re.compile(r'^[a-zA-Z0-9]{14}$')
 
 
 def _sff_read_seq_record(handle, number_of_flows_per_read, flow_chars,
-                         key_sequence, alphabet, trim=False):
-    """Parse the next read in the file, return data as a SeqRecord (PRIVATE)."""
+                         key_sequence, alphabet, trim=False,
+                         flow_arrays=False):
+    """Parse the next read in the file, return data as a SeqRecord (PRIVATE).
+
+    If flow_arrays is true, the flow values and flow index are returned as
+    read only NumPy arrays (big endian unsigned 16 bit and unsigned 8 bit
+    integers respectively), each made with a single frombuffer call, rather
+    than as tuples of Python integers.
+    """
     # Now on to the reads...
     # the read header format (fixed part):
     # read_header_length     H
@@ -658,8 +676,15 @@ def _sff_read_seq_record(handle, number_of_flows_per_read, flow_chars,
             seq = seq[:clip_left].lower() + \
                 seq[clip_left:clip_right].upper() + \
                 seq[clip_right:].lower()
-        annotations = {"flow_values": struct.unpack(read_flow_fmt, flow_values),
-                       "flow_index": struct.unpack(temp_fmt, flow_index),
+        if flow_arrays:
+            numpy = _get_numpy()
+            flow_values = numpy.frombuffer(flow_values, ">u2")
+            flow_index = numpy.frombuffer(flow_index, numpy.uint8)
+        else:
+            flow_values = struct.unpack(read_flow_fmt, flow_values)
+            flow_index = struct.unpack(temp_fmt, flow_index)
+        annotations = {"flow_values": flow_values,
+                       "flow_index": flow_index,
                        "flow_chars": flow_chars,
                        "flow_key": key_sequence,
                        "clip_qual_left": clip_qual_left,
@@ -806,13 +831,17 @@ class _AddTellHandle(object):
 
 
 # This is a generator function!
-def SffIterator(handle, alphabet=Alphabet.generic_dna, trim=False):
+def SffIterator(handle, alphabet=Alphabet.generic_dna, trim=False,
+                flow_arrays=False):
     """Iterate over Standard Flowgram Format (SFF) reads (as SeqRecord objects).
 
     handle - input file, an SFF file, e.g. from Roche 454 sequencing.
              This must NOT be opened in universal read lines mode!
     alphabet - optional alphabet, defaults to generic DNA.
     trim - should the sequences be trimmed?
+    flow_arrays - should the "flow_values" and "flow_index" annotations
+             be (read only) NumPy arrays rather than tuples? This needs
+             less memory and is faster for large files (requires NumPy).
 
     The resulting SeqRecord objects should match those from a paired FASTA
     and QUAL file converted from the SFF file using the Roche 454 tool
@@ -921,7 +950,8 @@ def SffIterator(handle, alphabet=Alphabet.generic_dna, trim=False):
                                    flow_chars,
                                    key_sequence,
                                    alphabet,
-                                   trim)
+                                   trim,
+                                   flow_arrays)
     _check_eof(handle, index_offset, index_length)
 
 
@@ -991,6 +1021,196 @@ def _check_eof(handle, index_offset, index_length):
                          "see offset %i" % offset)
 
 
+class SffFlowgramIndex(object):
+    """Memory mapped random and bulk access to the reads in an SFF file.
+
+    This maps the SFF file into memory read only, and locates the reads via
+    any Roche style read index block in the file (otherwise by scanning the
+    reads, which is slower). The fixed part of every read header is then
+    decoded in one go, so the sequence lengths and clipping values of all
+    the reads are available as NumPy arrays, and the flow values for many
+    reads can be fetched as a single two dimensional array (one row per
+    read, one column per flow) without creating any SeqRecord objects.
+    Requires NumPy.
+
+    The reads are kept in the order they appear in the file (attributes
+    names and offsets). Like a dictionary keyed on the read names, indexing
+    this object gives SeqRecord objects as from SffIterator with the option
+    flow_arrays=True. Call the close method (or use a with statement) when
+    finished to release the memory map.
+
+    The read_headers attribute is a NumPy record array of the fixed header
+    fields of each read (read_header_length, name_length, seq_len,
+    clip_qual_left, clip_qual_right, clip_adapter_left and
+    clip_adapter_right), with the values as stored in the file - meaning
+    left clip values are one based, with zero for no clipping.
+    """
+    _read_header_dtype = [("read_header_length", ">u2"),
+                          ("name_length", ">u2"),
+                          ("seq_len", ">u4"),
+                          ("clip_qual_left", ">u2"),
+                          ("clip_qual_right", ">u2"),
+                          ("clip_adapter_left", ">u2"),
+                          ("clip_adapter_right", ">u2")]
+
+    def __init__(self, filename, alphabet=Alphabet.generic_dna, trim=False):
+        """Create the index for the given SFF filename."""
+        numpy = _get_numpy()
+        import mmap
+        with open(filename, "rb") as handle:
+            # The mmap object keeps its own reference to the file
+            self._handle = mmap.mmap(handle.fileno(), 0,
+                                     access=mmap.ACCESS_READ)
+        try:
+            self._load(numpy)
+        except Exception:
+            self._handle.close()
+            raise
+        self._alphabet = alphabet
+        self._trim = trim
+
+    def _load(self, numpy):
+        """Find the reads and decode their fixed headers (PRIVATE)."""
+        handle = self._handle
+        header_length, index_offset, index_length, number_of_reads, \
+            self._flows_per_read, self._flow_chars, self._key_sequence \
+            = _sff_file_header(handle)
+        reads = None
+        if index_offset and index_length:
+            try:
+                reads = list(_sff_read_roche_index(handle))
+            except ValueError as err:
+                import warnings
+                from Bio import BiopythonParserWarning
+                warnings.warn("Could not parse the SFF index: %s" % err,
+                              BiopythonParserWarning)
+        if reads is None:
+            reads = list(_sff_do_slow_index(handle))
+        if len(reads) != number_of_reads:
+            raise ValueError("Indexed %i records, expected %i"
+                             % (len(reads), number_of_reads))
+        # Roche indexes are sorted by name, we want the file order:
+        reads.sort(key=lambda read: read[1])
+        if reads:
+            # Parse the final read, should then be at the end of the file
+            handle.seek(reads[-1][1])
+            _sff_read_raw_record(handle, self._flows_per_read)
+        _check_eof(handle, index_offset, index_length)
+        self.names = [name for name, offset in reads]
+        self.offsets = numpy.array([offset for name, offset in reads],
+                                   numpy.int64)
+        self._rows = dict((name, row) for row, name in enumerate(self.names))
+        if len(self._rows) != len(self.names):
+            raise ValueError("Duplicate read names in SFF file")
+
+        self._data = numpy.frombuffer(handle, numpy.uint8)
+        dtype = numpy.dtype(self._read_header_dtype)
+        assert dtype.itemsize == 16
+        headers = self._take(self.offsets, dtype.itemsize)
+        headers = headers.view(dtype).ravel()
+        self.read_headers = headers.astype(dtype.newbyteorder("="))
+        bad = (headers["read_header_length"] % 8 != 0) | \
+            (headers["read_header_length"] < 16 + headers["name_length"])
+        if bad.any():
+            row = numpy.flatnonzero(bad)[0]
+            raise ValueError("Malformed read header for %s, says length is %i"
+                             % (self.names[row],
+                                headers["read_header_length"][row]))
+        self._flow_offsets = self.offsets + headers["read_header_length"]
+        ends = self._flow_offsets + 2 * self._flows_per_read \
+            + 3 * headers["seq_len"].astype(numpy.int64)
+        if len(ends) and ends.max() > len(self._data):
+            raise ValueError("Premature end of file, read data truncated")
+
+    def _take(self, offsets, width):
+        """Copy width bytes from each offset, as a 2D uint8 array (PRIVATE)."""
+        numpy = _get_numpy()
+        data = self._data
+        if len(data) < width:
+            return numpy.zeros((0, width), numpy.uint8)
+        # A read only view of every width byte window in the file,
+        # so fancy indexing its rows copies just the bytes we want:
+        windows = numpy.lib.stride_tricks.as_strided(
+            data, shape=(len(data) - width + 1, width),
+            strides=(data.strides[0], data.strides[0]))
+        return windows[offsets]
+
+    def _row(self, key):
+        """Map a read name to its row number (PRIVATE)."""
+        try:
+            return self._rows[key]
+        except KeyError:
+            raise KeyError(key)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def keys(self):
+        """Return a list of the read names, in the order of the file."""
+        return list(self.names)
+
+    def __getitem__(self, key):
+        """Return the named read as a SeqRecord."""
+        handle = self._handle
+        handle.seek(int(self.offsets[self._row(key)]))
+        return _sff_read_seq_record(handle,
+                                    self._flows_per_read,
+                                    self._flow_chars,
+                                    self._key_sequence,
+                                    self._alphabet,
+                                    self._trim,
+                                    flow_arrays=True)
+
+    def get_flow_values(self, key):
+        """Return the flow values of the named read as a uint16 NumPy array."""
+        numpy = _get_numpy()
+        start = int(self._flow_offsets[self._row(key)])
+        data = self._data[start:start + 2 * self._flows_per_read]
+        return data.view(">u2").astype(numpy.uint16)
+
+    def get_flow_index(self, key):
+        """Return the flow index of the named read as a uint8 NumPy array."""
+        row = self._row(key)
+        start = int(self._flow_offsets[row]) + 2 * self._flows_per_read
+        return self._data[start:start + int(self.read_headers["seq_len"][row])].copy()
+
+    def flow_values(self, keys=None):
+        """Return the flow values of many reads as a 2D uint16 NumPy array.
+
+        keys - optional list of read names, defaults to all the reads
+               (in the order of the file).
+
+        There is one row per read, and one column per flow. This is built
+        with a single vectorised copy from the memory mapped file, so is
+        far faster than looking at the reads one by one.
+        """
+        numpy = _get_numpy()
+        if keys is None:
+            offsets = self._flow_offsets
+        else:
+            offsets = self._flow_offsets[[self._row(k) for k in keys]]
+        values = self._take(numpy.asarray(offsets, numpy.int64),
+                            2 * self._flows_per_read)
+        return values.view(">u2").astype(numpy.uint16)
+
+    def close(self):
+        """Release the memory map of the SFF file."""
+        self._data = None
+        self._handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
 # This is a generator function!
 def _SffTrimIterator(handle, alphabet=Alphabet.generic_dna):
     """Iterate over SFF reads (as SeqRecord objects) with trimming (PRIVATE)."""
@@ -1279,8 +1499,23 @@ class SffWriter(SequenceWriter):
         read_flow_fmt = ">%iH" % self._number_of_flows_per_read
         read_flow_size = struct.calcsize(read_flow_fmt)
         temp_fmt = ">%iB" % seq_len  # used for flow index and quals
-        data += struct.pack(read_flow_fmt, *flow_values) \
-            + struct.pack(temp_fmt, *flow_index) \
+        if hasattr(flow_values, "dtype"):
+            # NumPy array, e.g. from SffIterator with flow_arrays=True
+            if len(flow_values) != self._number_of_flows_per_read:
+                raise ValueError("Expected %i flow values for %s, not %i"
+                                 % (self._number_of_flows_per_read,
+                                    record.id, len(flow_values)))
+            flow_values = flow_values.astype(">u2").tobytes()
+        else:
+            flow_values = struct.pack(read_flow_fmt, *flow_values)
+        if hasattr(flow_index, "dtype"):
+            if len(flow_index) != seq_len:
+                raise ValueError("Expected %i flow index values for %s, not %i"
+                                 % (seq_len, record.id, len(flow_index)))
+            flow_index = flow_index.astype("u1").tobytes()
+        else:
+            flow_index = struct.pack(temp_fmt, *flow_index)
+        data += flow_values + flow_index \
             + seq \
             + struct.pack(temp_fmt, *quals)
         # now any final padding...
@@ -488,7 +488,7 @@ def write(sequences, handle, format):
     return count
 
 
-def parse(handle, format, alphabet=None):
+def parse(handle, format, alphabet=None, **kwargs):
     r"""Turns a sequence file into an iterator returning SeqRecords.
 
      - handle   - handle to the file, or the filename as a string
@@ -498,6 +498,11 @@ def parse(handle, format, alphabet=None):
                   cannot be automatically inferred from the file itself
                   (e.g. format="fasta" or "tab")
 
+    Any other keyword arguments are passed to the parser for that format,
+    for example lazy_features=True or feature_types=["CDS"] for "genbank"
+    and "embl" (see Bio.SeqIO.InsdcIO), or quality_array=True for "fastq"
+    (see Bio.SeqIO.QualityIO).
+
     Typical usage, opening a file to read in, and looping over the record(s):
 
     >>> from Bio import SeqIO
@@ -539,6 +544,16 @@ def parse(handle, format, alphabet=None):
     Alpha ACCGGATGTA
     Beta AGGCTCGGTTA
 
+    For GenBank or EMBL files where you only need the sequences, or the
+    features of just a few records, the lazy_features option means the
+    features are only parsed when used:
+
+    >>> for record in SeqIO.parse("GenBank/cor6_6.gb", "genbank",
+    ...                           lazy_features=True, feature_types=["CDS"]):
+    ...     if record.id == "X62281.1":
+    ...         print("%s %i" % (record.id, len(record.features)))
+    X62281.1 1
+
     Use the Bio.SeqIO.read(...) function when you expect a single record
     only.
     """
@@ -569,13 +584,17 @@ def parse(handle, format, alphabet=None):
         if format in _FormatToIterator:
             iterator_generator = _FormatToIterator[format]
             if alphabet is None:
-                i = iterator_generator(fp)
+                i = iterator_generator(fp, **kwargs)
             else:
                 try:
-                    i = iterator_generator(fp, alphabet=alphabet)
+                    i = iterator_generator(fp, alphabet=alphabet, **kwargs)
                 except TypeError:
-                    i = _force_alphabet(iterator_generator(fp), alphabet)
+                    i = _force_alphabet(iterator_generator(fp, **kwargs),
+                                        alphabet)
         elif format in AlignIO._FormatToIterator:
+            if kwargs:
+                raise TypeError("Unexpected keyword argument(s) for format "
+                                "'%s': %s" % (format, ", ".join(sorted(kwargs))))
             # Use Bio.AlignIO to read in the alignments
             i = (r for alignment in AlignIO.parse(fp, format,
                                                   alphabet=alphabet)
@@ -602,7 +621,7 @@ def _force_alphabet(record_iterator, alphabet):
                              % (repr(alphabet), repr(record.seq.alphabet)))
 
 
-def read(handle, format, alphabet=None):
+def read(handle, format, alphabet=None, **kwargs):
     """Turns a sequence file into a single SeqRecord.
 
      - handle   - handle to the file, or the filename as a string
@@ -612,6 +631,9 @@ def read(handle, format, alphabet=None):
                   cannot be automatically inferred from the file itself
                   (e.g. format="fasta" or "tab")
 
+    Any other keyword arguments are passed to the parser, as in the
+    Bio.SeqIO.parse(...) function.
+
     This function is for use parsing sequence files containing
     exactly one record.  For example, reading a GenBank file:
 
@@ -645,7 +667,7 @@ def read(handle, format, alphabet=None):
     Use the Bio.SeqIO.parse(handle, format) function if you want
     to read multiple records from the handle.
     """
-    iterator = parse(handle, format, alphabet)
+    iterator = parse(handle, format, alphabet, **kwargs)
     try:
         first = next(iterator)
     except StopIteration:
@@ -722,7 +744,7 @@ def to_dict(sequences, key_function=None):
     return d
 
 
-def index(filename, format, alphabet=None, key_function=None):
+def index(filename, format, alphabet=None, key_function=None, use_mmap=False):
     """Indexes a sequence file and returns a dictionary like object.
 
      - filename - string giving name of file to be indexed
@@ -733,6 +755,9 @@ def index(filename, format, alphabet=None, key_function=None):
      - key_function - Optional callback function which when given a
                   SeqRecord identifier string should return a unique
                   key for the dictionary.
+     - use_mmap - Optional boolean, memory map the file (if uncompressed)
+                  and keep the length of each record in the index, so
+                  that get_raw is a simple slice of the mapped file.
 
     This indexing function will return a dictionary like object, giving the
     SeqRecord objects as values:
@@ -828,6 +853,29 @@ def index(filename, format, alphabet=None, key_function=None):
     to be completely parsed while building the index. Right now this is
     usually avoided.
 
+    If you will be making a lot of lookups, especially with the get_raw
+    method, consider the use_mmap option. This memory maps the file (so
+    reading a record needs no system calls), and also records the length
+    of each record in the index, so get_raw does not need to scan the
+    record line by line to find where it ends:
+
+    >>> from Bio import SeqIO
+    >>> records = SeqIO.index("Quality/example.fastq", "fastq", use_mmap=True)
+    >>> len(records)
+    3
+    >>> raw = records.get_raw("EAS54_6_R1_2_1_540_792")
+    >>> print(raw.decode("ascii"))
+    @EAS54_6_R1_2_1_540_792
+    TTGGCAGGCCAAGGCCGATGGATCA
+    +
+    ;;;;;;;;;;;7;;;;;-;;;3;83
+    <BLANKLINE>
+    >>> records.close()
+
+    This does take more memory (for the record lengths), and BGZF
+    compressed files are not memory mapped (but the record lengths
+    are still used).
+
     See also: Bio.SeqIO.index_db() and Bio.SeqIO.to_dict()
     """
     # Try and give helpful error messages:
@@ -852,8 +900,11 @@ def index(filename, format, alphabet=None, key_function=None):
         raise ValueError("Unsupported format %r" % format)
     repr = "SeqIO.index(%r, %r, alphabet=%r, key_function=%r)" \
         % (filename, format, alphabet, key_function)
-    return _IndexedSeqFileDict(proxy_class(filename, format, alphabet),
-                               key_function, repr, "SeqRecord")
+    if use_mmap:
+        repr = repr[:-1] + ", use_mmap=True)"
+    return _IndexedSeqFileDict(proxy_class(filename, format, alphabet, use_mmap),
+                               key_function, repr, "SeqRecord",
+                               keep_lengths=use_mmap)
 
 
 def index_db(index_filename, filenames=None, format=None, alphabet=None,
@@ -895,10 +946,25 @@ def index_db(index_filename, filenames=None, format=None, alphabet=None,
     'gi|7525076|ref|NP_051101.1| Ycf2 [Arabidopsis thaliana]'
     >>> records["45478717"].description
     'gi|45478717|ref|NP_995572.1| pesticin [Yersinia pestis biovar Microtus str. 91001]'
-    >>> records.close()
 
     In this example the two files contain 85 and 10 records respectively.
 
+    To fetch lots of records at once, the get_many method (or get_raw_many)
+    looks up all the keys together and reads the records sorted by file and
+    offset, which avoids random access to the files. This gives (key, record)
+    pairs in the order of the keys given, or with file_order=True as soon as
+    each is read (in the order the records are stored in the files):
+
+    >>> for key, record in records.get_many(["45478717", "7525076"]):
+    ...     print("%s %s" % (key, record.id))
+    45478717 gi|45478717|ref|NP_995572.1|
+    7525076 gi|7525076|ref|NP_051101.1|
+    >>> for key, record in records.get_many(["45478717", "7525076"], file_order=True):
+    ...     print("%s %s" % (key, record.id))
+    7525076 gi|7525076|ref|NP_051101.1|
+    45478717 gi|45478717|ref|NP_995572.1|
+    >>> records.close()
+
     BGZF compressed files are supported, and detected automatically. Ordinary
     GZIP compressed files are not supported.
 
@@ -941,7 +1007,81 @@ def index_db(index_filename, filenames=None, format=None, alphabet=None,
                                    key_function, repr)
 
 
-def convert(in_file, in_format, out_file, out_format, alphabet=None):
+def byte_ranges(filename, format, chunks):
+    """Split a sequence file into byte ranges starting on record boundaries.
+
+     - filename - string giving the name of the (uncompressed) file
+     - format   - lower case string describing the file format
+     - chunks   - number of ranges wanted
+
+    Returns a list of (start, end) byte offsets, one for each chunk, which
+    between them cover the whole file. Each range starts at the start of a
+    record (or the start of the file), and they are roughly equal in size.
+    Some ranges may be empty (start equals end), for example if there are
+    more chunks than records.
+
+    This is intended for parsing different parts of a large file in parallel
+    (e.g. using the multiprocessing module, or a cluster) without first
+    writing out the parts as separate files, using the parse_range function:
+
+    >>> from Bio import SeqIO
+    >>> ranges = SeqIO.byte_ranges("GenBank/cor6_6.gb", "genbank", 3)
+    >>> ranges
+    [(0, 6221), (6221, 10775), (10775, 14967)]
+    >>> for start, end in ranges:
+    ...     print([r.id for r in SeqIO.parse_range("GenBank/cor6_6.gb", "genbank", start, end)])
+    ['X55053.1', 'X62281.1']
+    ['M81224.1', 'AJ237582.1']
+    ['L31939.1', 'AF297471.1']
+
+    Only plain text record based formats supported by Bio.SeqIO.index(...)
+    can be split, such as "fasta", "fastq", "genbank", "embl" and "tab".
+    For FASTQ, line wrapped records are never used as split points (as the
+    start of such a record can't be reliably found from the middle of the
+    file), so the ranges may be less well balanced.
+    """
+    if not isinstance(format, basestring):
+        raise TypeError("Need a string for the file format (lower case)")
+    if format != format.lower():
+        raise ValueError("Format string '%s' should be lower case" % format)
+    from ._index import _record_boundaries  # Lazy import
+    return _record_boundaries(filename, format, chunks)
+
+
+def parse_range(filename, format, start, end, alphabet=None):
+    """Turns part of a sequence file into an iterator returning SeqRecords.
+
+     - filename - string giving the name of the (uncompressed) file
+     - format   - lower case string describing the file format
+     - start    - byte offset where parsing should start, which must be
+                  the start of a record (or the start of the file)
+     - end      - byte offset where parsing should stop, which should be
+                  the start of a record (or the end of the file)
+     - alphabet - optional Alphabet object (see the parse function)
+
+    This is like the parse function, but only reads the given byte range of
+    the file. Typically you would get the ranges from the byte_ranges
+    function, but the offsets could come from elsewhere (e.g. a previous
+    scan of the file):
+
+    >>> from Bio import SeqIO
+    >>> for record in SeqIO.parse_range("Quality/example.fastq", "fastq", 156, 234):
+    ...     print("%s %s" % (record.id, record.seq))
+    EAS54_6_R1_2_1_443_348 GTTGCTTCTGGCGTGGGTGGGGGGG
+
+    This only supports plain text file formats.
+    """
+    if format in _BinaryFormats:
+        raise ValueError("Parsing a byte range of %s files is not supported"
+                         % format)
+    from ._index import _ByteRangeHandle  # Lazy import
+    with _ByteRangeHandle(filename, start, end) as handle:
+        for record in parse(handle, format, alphabet):
+            yield record
+
+
+def convert(in_file, in_format, out_file, out_format, alphabet=None,
+            processes=1):
     """Convert between two sequence file formats, return number of records.
 
      - in_file - an input handle or filename
@@ -949,6 +1089,16 @@ def convert(in_file, in_format, out_file, out_format, alphabet=None):
      - out_file - an output handle or filename
      - out_format - output file format, lower case string
      - alphabet - optional alphabet to assume
+     - processes - optional number of worker processes to use (default 1)
+
+    Using more than one process requires the input as a filename (of an
+    uncompressed file) in a format which can be split on record boundaries
+    (e.g. FASTA, FASTQ, GenBank or EMBL), and an output format without a
+    header or footer (e.g. FASTA, QUAL, tab, FASTQ, GenBank or EMBL).
+    The input is split into chunks which are converted in worker processes
+    (using the multiprocessing module), and the output written in the
+    original order. Any problem with the input will still raise an error,
+    but the output file may have been partly written.
 
     NOTE - If you provide an output filename, it will be opened which will
     overwrite any existing file without warning. This may happen if even
@@ -986,6 +1136,17 @@ def convert(in_file, in_format, out_file, out_format, alphabet=None):
     else:
         out_mode = 'w'
 
+    if processes > 1:
+        if not isinstance(in_file, basestring):
+            raise ValueError("Using multiple processes requires the input "
+                             "as a filename, not a handle")
+        from ._convert import _parallel_convert  # Lazy import
+        with as_handle(out_file, out_mode) as out_handle:
+            count = _parallel_convert(in_file, in_format,
+                                      out_handle, out_format,
+                                      alphabet, processes)
+        return count
+
     # This will check the arguments and issue error messages,
     # after we have opened the file which is a shame.
     from ._convert import _handle_convert  # Lazy import
@@ -24,6 +24,10 @@ means that using Bio.SeqIO.convert() may be faster, as well as more convenient.
 All these file format specific optimisations are handled by this (private) module.
 """
 
+import os
+import warnings
+from itertools import islice
+
 from Bio import SeqIO
 # NOTE - Lots of lazy imports further on...
 
@@ -373,3 +377,78 @@ def _handle_convert(in_handle, in_format, out_handle, out_format, alphabet=None)
     else:
         records = SeqIO.parse(in_handle, in_format, alphabet)
         return SeqIO.write(records, out_handle, out_format)
+
+
+# Output formats where the records are written independently (no header or
+# footer), so that chunks of output can simply be concatenated:
+_concatenable_formats = ["fasta", "qual", "tab", "genbank", "gb", "embl",
+                         "imgt", "fastq", "fastq-sanger", "fastq-solexa",
+                         "fastq-illumina"]
+
+# Target size of the input chunks handed to each worker process:
+_chunk_size = 16 * 1024 * 1024
+
+
+def _convert_byte_range(task):
+    """Convert the records in part of a file, for use in a worker process (PRIVATE).
+
+    Returns the number of records, the converted text, and a list of any
+    warnings (as message and category pairs) for the parent process to
+    show.
+    """
+    from Bio._py3k import StringIO
+    from Bio.SeqIO._index import _ByteRangeHandle
+    filename, start, end, in_format, out_format, alphabet = task
+    out_handle = StringIO()
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        with _ByteRangeHandle(filename, start, end) as in_handle:
+            count = _handle_convert(in_handle, in_format,
+                                    out_handle, out_format, alphabet)
+    return count, out_handle.getvalue(), \
+        [(str(w.message), w.category) for w in caught]
+
+
+def _parallel_convert(in_filename, in_format, out_handle, out_format,
+                      alphabet=None, processes=2):
+    """SeqIO conversion using several worker processes (PRIVATE).
+
+    The input file is split into chunks on record boundaries, which are
+    converted in a pool of worker processes. The output of each chunk is
+    written to the output handle in the original order.
+    """
+    from multiprocessing import Pool
+    from Bio.SeqIO._index import _record_boundaries
+    if out_format not in _concatenable_formats:
+        raise ValueError("Conversion to %r using multiple processes is not "
+                         "supported" % out_format)
+    # Use more chunks than processes to spread the load, and to limit
+    # the memory needed for each chunk's output:
+    chunks = max(4 * processes,
+                 os.path.getsize(in_filename) // _chunk_size + 1)
+    tasks = [(in_filename, start, end, in_format, out_format, alphabet)
+             for start, end in _record_boundaries(in_filename, in_format,
+                                                  chunks)
+             if start < end]
+    # Keep a limited number of chunks queued (so that the converted text
+    # waiting to be written doesn't grow without limit), and wait for any
+    # queued chunks to finish if there is an error (as terminating the
+    # workers part way through a chunk is not safe).
+    tasks = iter(tasks)
+    count = 0
+    pool = Pool(processes)
+    try:
+        pending = [pool.apply_async(_convert_byte_range, (task,))
+                   for task in islice(tasks, 2 * processes)]
+        while pending:
+            chunk_count, text, caught = pending.pop(0).get()
+            for task in islice(tasks, 1):
+                pending.append(pool.apply_async(_convert_byte_range, (task,)))
+            for message, category in caught:
+                warnings.warn(message, category)
+            out_handle.write(text)
+            count += chunk_count
+    finally:
+        pool.close()
+        pool.join()
+    return count
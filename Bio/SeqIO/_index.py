@@ -36,8 +36,8 @@ from Bio.File import _IndexedSeqFileProxy, _open_for_random_access
 
 
 class SeqFileRandomAccess(_IndexedSeqFileProxy):
-    def __init__(self, filename, format, alphabet):
-        self._handle = _open_for_random_access(filename)
+    def __init__(self, filename, format, alphabet, use_mmap=False):
+        self._handle = _open_for_random_access(filename, use_mmap)
         self._alphabet = alphabet
         self._format = format
         # Load the parser class/function once an avoid the dict lookup in each
@@ -64,6 +64,26 @@ class SeqFileRandomAccess(_IndexedSeqFileProxy):
         # Should be overridden for binary file formats etc:
         return self._parse(StringIO(_bytes_to_string(self.get_raw(offset))))
 
+    def _next_record_start(self, offset):
+        """Offset of the first record starting at or after offset (PRIVATE).
+
+        Used for splitting a file into chunks which can be parsed separately.
+        Should be overridden for file formats where this is possible.
+        """
+        raise ValueError("Splitting %s files on record boundaries is not "
+                         "supported" % self._format)
+
+    def _seek_line_start(self, offset):
+        """Move to the first line starting at or after offset (PRIVATE)."""
+        handle = self._handle
+        if offset <= 0:
+            handle.seek(0)
+        else:
+            # Will read the rest of the line (if offset is mid-line), or just
+            # the new line character of the previous line:
+            handle.seek(offset - 1)
+            handle.readline()
+
 
 ####################
 # Special indexers #
@@ -74,8 +94,8 @@ class SeqFileRandomAccess(_IndexedSeqFileProxy):
 # number of flows.
 class SffRandomAccess(SeqFileRandomAccess):
     """Random access to a Standard Flowgram Format (SFF) file."""
-    def __init__(self, filename, format, alphabet):
-        SeqFileRandomAccess.__init__(self, filename, format, alphabet)
+    def __init__(self, filename, format, alphabet, use_mmap=False):
+        SeqFileRandomAccess.__init__(self, filename, format, alphabet, use_mmap)
         header_length, index_offset, index_length, number_of_reads, \
             self._flows_per_read, self._flow_chars, self._key_sequence \
             = SeqIO.SffIO._sff_file_header(self._handle)
@@ -164,8 +184,8 @@ class SffTrimedRandomAccess(SffRandomAccess):
 ###################
 
 class SequentialSeqFileRandomAccess(SeqFileRandomAccess):
-    def __init__(self, filename, format, alphabet):
-        SeqFileRandomAccess.__init__(self, filename, format, alphabet)
+    def __init__(self, filename, format, alphabet, use_mmap=False):
+        SeqFileRandomAccess.__init__(self, filename, format, alphabet, use_mmap)
         marker = {"ace": "CO ",
                   "embl": "ID ",
                   "fasta": ">",
@@ -212,6 +232,17 @@ class SequentialSeqFileRandomAccess(SeqFileRandomAccess):
                     length += len(line)
         assert not line, repr(line)
 
+    def _next_record_start(self, offset):
+        """Offset of the first record starting at or after offset (PRIVATE)."""
+        self._seek_line_start(offset)
+        handle = self._handle
+        marker_re = self._marker_re
+        while True:
+            start_offset = handle.tell()
+            line = handle.readline()
+            if marker_re.match(line) or not line:
+                return start_offset
+
     def get_raw(self, offset):
         """Similar to the get method, but returns the record as a raw string."""
         # For non-trivial file formats this must be over-ridden in the subclass
@@ -368,6 +399,9 @@ class SwissRandomAccess(SequentialSeqFileRandomAccess):
 
 class UniprotRandomAccess(SequentialSeqFileRandomAccess):
     """Random access to a UniProt XML file."""
+    # Chunks of the file could not be parsed without the XML header:
+    _next_record_start = SeqFileRandomAccess._next_record_start
+
     def __iter__(self):
         handle = self._handle
         handle.seek(0)
@@ -452,8 +486,8 @@ class UniprotRandomAccess(SequentialSeqFileRandomAccess):
 
 class IntelliGeneticsRandomAccess(SeqFileRandomAccess):
     """Random access to a IntelliGenetics file."""
-    def __init__(self, filename, format, alphabet):
-        SeqFileRandomAccess.__init__(self, filename, format, alphabet)
+    def __init__(self, filename, format, alphabet, use_mmap=False):
+        SeqFileRandomAccess.__init__(self, filename, format, alphabet, use_mmap)
         self._marker_re = re.compile(_as_bytes("^;"))
 
     def __iter__(self):
@@ -471,11 +505,20 @@ class IntelliGeneticsRandomAccess(SeqFileRandomAccess):
                     line = handle.readline()
                     if line[0:1] != semi_char and line.strip():
                         key = line.split()[0]
-                        yield _bytes_to_string(key), offset, length
                         break
                     if not line:
                         raise ValueError("Premature end of file?")
                     length += len(line)
+                # Then the sequence runs up to the next ";" line (or EOF),
+                # which must be included in the record length (as in get_raw)
+                while line and not line.startswith(semi_char):
+                    length += len(line)
+                    end_offset = handle.tell()
+                    line = handle.readline()
+                yield _bytes_to_string(key), offset, length
+                if line:
+                    # Already read the first line of the next record
+                    handle.seek(end_offset)
             elif not line:
                 # End of file
                 break
@@ -524,6 +567,11 @@ class TabRandomAccess(SeqFileRandomAccess):
         handle.seek(offset)
         return handle.readline()
 
+    def _next_record_start(self, offset):
+        """Offset of the first record starting at or after offset (PRIVATE)."""
+        self._seek_line_start(offset)
+        return self._handle.tell()
+
 
 ##########################
 # Now the FASTQ indexers #
@@ -589,6 +637,38 @@ class FastqRandomAccess(SeqFileRandomAccess):
             start_offset = end_offset
         # print("EOF")
 
+    def _next_record_start(self, offset):
+        """Offset of the first record starting at or after offset (PRIVATE).
+
+        As quality lines can also start with "@", a candidate title line
+        is only accepted if it is followed by a complete four line record
+        (sequence, "+" line, quality of the same length), and then another
+        "@" line or the end of the file. This means line wrapped records
+        are never used as split points, which is safe (if less balanced).
+        """
+        self._seek_line_start(offset)
+        handle = self._handle
+        at_char = _as_bytes("@")
+        plus_char = _as_bytes("+")
+        while True:
+            start_offset = handle.tell()
+            line = handle.readline()
+            if not line:
+                return start_offset
+            if line[0:1] != at_char:
+                continue
+            seq = handle.readline().rstrip()
+            plus = handle.readline().rstrip()
+            qual = handle.readline().rstrip()
+            after = handle.readline()
+            if plus[0:1] == plus_char and len(seq) == len(qual) \
+                    and plus[1:] in (_as_bytes(""), line[1:].rstrip()) \
+                    and (not after or after[0:1] == at_char):
+                return start_offset
+            # Try again from the line after this one
+            handle.seek(start_offset)
+            handle.readline()
+
     def get_raw(self, offset):
         """Similar to the get method, but returns the record as a raw string."""
         # TODO - Refactor this and the __init__ method to reduce code duplication?
@@ -657,3 +737,78 @@ _FormatToRandomAccess = {"ace": SequentialSeqFileRandomAccess,
                          "qual": SequentialSeqFileRandomAccess,
                          "uniprot-xml": UniprotRandomAccess,
                          }
+
+
+def _record_boundaries(filename, format, chunks):
+    """Split a file into byte ranges which start on record boundaries (PRIVATE).
+
+    Returns a list of (start, end) offsets, one for each chunk, where the
+    chunks are roughly equal in size (but some may be empty, e.g. if the
+    file is small or has very large records). Supported for plain text
+    files in record based formats like FASTA, FASTQ, GenBank and EMBL.
+    """
+    if chunks < 1:
+        raise ValueError("Need at least one chunk, not %r" % chunks)
+    try:
+        proxy_class = _FormatToRandomAccess[format]
+    except KeyError:
+        raise ValueError("Unsupported format %r" % format)
+    proxy = proxy_class(filename, format, None)
+    try:
+        if isinstance(proxy._handle, bgzf.BgzfReader):
+            raise ValueError("Splitting BGZF compressed files on record "
+                             "boundaries is not supported")
+        proxy._handle.seek(0, 2)
+        size = proxy._handle.tell()
+        offsets = [0]
+        for i in range(1, chunks):
+            offsets.append(proxy._next_record_start(size * i // chunks))
+        offsets.append(size)
+    finally:
+        proxy._handle.close()
+    return list(zip(offsets[:-1], offsets[1:]))
+
+
+class _ByteRangeHandle(object):
+    """Read only text mode handle for a byte range of a file (PRIVATE).
+
+    Supports the read and readline methods and iteration as used by the
+    SeqIO parsers, with any DOS/Windows new lines converted to Unix style.
+    """
+
+    def __init__(self, filename, start, end):
+        self._handle = open(filename, "rb")
+        self._handle.seek(start)
+        self._remaining = end - start
+
+    def readline(self):
+        if self._remaining <= 0:
+            return ""
+        line = self._handle.readline(self._remaining)
+        self._remaining -= len(line)
+        if line[-2:] == _dos_new_line:
+            line = line[:-2] + _unix_new_line
+        return _bytes_to_string(line)
+
+    def read(self, size=-1):
+        if size < 0 or size > self._remaining:
+            size = max(0, self._remaining)
+        data = self._handle.read(size)
+        self._remaining -= len(data)
+        return _bytes_to_string(data.replace(_dos_new_line, _unix_new_line))
+
+    def __iter__(self):
+        return iter(self.readline, "")
+
+    def close(self):
+        self._handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+
+_dos_new_line = _as_bytes("\r\n")
+_unix_new_line = _as_bytes("\n")
@@ -8,8 +8,13 @@
 """Represent a Sequence Record, a sequence with annotation."""
 
 
+from array import array
+from bisect import bisect_right
+
 from Bio._py3k import basestring
 
+from Bio.SeqFeature import _get_slots_state, _set_slots_state
+
 __docformat__ = "epytext en"  # Simple markup to show doctests nicely
 
 # NEEDS TO BE SYNCH WITH THE REST OF BIOPYTHON AND BIOPERL
@@ -89,6 +94,146 @@ class _RestrictedDict(dict):
             self[key] = value
 
 
+def _join_letter_annotations(first, second):
+    """Concatenate two per-letter annotations, e.g. lists or arrays (PRIVATE).
+
+    Mixed lists and array.array objects (e.g. PHRED qualities parsed with
+    quality_array=True) give an array of the same type if the values fit,
+    otherwise a list.
+    """
+    if hasattr(first, "__array__") or hasattr(second, "__array__"):
+        # NumPy arrays would be added element wise
+        from numpy import concatenate
+        return concatenate((first, second))
+    if isinstance(first, array) or isinstance(second, array):
+        typecode = (first if isinstance(first, array) else second).typecode
+        try:
+            return array(typecode, first) + array(typecode, second)
+        except (OverflowError, TypeError, ValueError):
+            return list(first) + list(second)
+    return first + second
+
+
+class _FeatureIndex(object):
+    """Interval index of a list of SeqFeature objects (PRIVATE).
+
+    This is a nested containment list (NCList, see Alekseyenko and Lee 2007,
+    doi:10.1093/bioinformatics/btl647) over the span of each feature (from
+    its start to its end, ignoring any gaps between the parts of a compound
+    location). Features whose span is contained in another's are moved to a
+    sub-list of that feature, so at each level both the starts and ends are
+    in order, and the spans overlapping a region can be found by bisection.
+
+    >>> from Bio.SeqFeature import SeqFeature, FeatureLocation
+    >>> features = [SeqFeature(FeatureLocation(0, 100), type="source"),
+    ...             SeqFeature(FeatureLocation(10, 40), type="gene"),
+    ...             SeqFeature(FeatureLocation(10, 20) + FeatureLocation(30, 40),
+    ...                        type="CDS"),
+    ...             SeqFeature(FeatureLocation(50, 60), type="gene")]
+    >>> index = _FeatureIndex(features)
+    >>> index.overlapping(22, 28)
+    [0, 1]
+    >>> index.overlapping(35, 55)
+    [0, 1, 2, 3]
+    >>> index.within(5, 45)
+    [1, 2]
+
+    The results are the positions of the features in the original list,
+    in order. Features without a location (or with an unknown start or end)
+    are not included in the index, but listed in the unindexed attribute.
+    Any features referencing another sequence are listed in the references
+    attribute.
+    """
+
+    def __init__(self, features):
+        intervals = []
+        self.unindexed = []
+        self.references = []
+        for i, feature in enumerate(features):
+            try:
+                start = feature.location.nofuzzy_start
+                end = feature.location.nofuzzy_end
+            except AttributeError:
+                start = end = None
+            if start is None or end is None:
+                self.unindexed.append(i)
+            else:
+                intervals.append((start, -end, i))
+            if feature.ref or feature.ref_db:
+                self.references.append(i)
+        intervals.sort()
+        self.features = features
+        self.size = len(features)
+        self._top = ([], [], [], [])
+        # Stack of (end, children, position) for the spans containing the
+        # current one, where children[position] is the span's sub-list
+        stack = []
+        for start, end, i in intervals:
+            end = -end
+            while stack and stack[-1][0] < end:
+                stack.pop()
+            if stack:
+                parent_end, parent_children, position = stack[-1]
+                if parent_children[position] is None:
+                    parent_children[position] = ([], [], [], [])
+                starts, ends, numbers, children = parent_children[position]
+            else:
+                starts, ends, numbers, children = self._top
+            starts.append(start)
+            ends.append(end)
+            numbers.append(i)
+            children.append(None)
+            stack.append((end, children, len(children) - 1))
+
+    def is_current(self, features):
+        """Is this still an index of the given features list?
+
+        This only checks the list is the same object, with the same length,
+        so it does not notice features replaced or edited in place.
+        """
+        return features is self.features and len(features) == self.size
+
+    def _spans(self, start, end):
+        """Yields the feature numbers of spans overlapping start to end (PRIVATE)."""
+        pending = [self._top]
+        while pending:
+            starts, ends, numbers, children = pending.pop()
+            i = bisect_right(ends, start)
+            while i < len(starts) and starts[i] < end:
+                yield numbers[i]
+                if children[i] is not None:
+                    pending.append(children[i])
+                i += 1
+
+    def overlapping(self, start, end):
+        """Returns the positions of features overlapping start to end.
+
+        For compound locations at least one part must overlap the region.
+        """
+        features = self.features
+        answer = []
+        for i in self._spans(start, end):
+            parts = features[i].location.parts
+            if len(parts) == 1 or any(part.nofuzzy_start < end and
+                                      start < part.nofuzzy_end
+                                      for part in parts):
+                answer.append(i)
+        answer.sort()
+        return answer
+
+    def within(self, start, end):
+        """Returns the positions of features with a span inside start to end."""
+        features = self.features
+        answer = []
+        # Widen the search to include any zero length spans at the ends
+        for i in self._spans(start - 1, end + 1):
+            location = features[i].location
+            if start <= location.nofuzzy_start and location.nofuzzy_end <= end:
+                answer.append(i)
+        answer.sort()
+        return answer
+
+
 class SeqRecord(object):
     """A SeqRecord object holds a sequence and information about it.
 
@@ -149,6 +294,21 @@ class SeqRecord(object):
     MKQHKAMIVALIVICITAVVAALVTRKDLCEVHIRTGQTEVAVF
 
     """
+    # Using slots saves memory when holding millions of records (e.g. from
+    # a FASTQ file), while the __dict__ slot still allows extra attributes.
+    __slots__ = ("_seq", "id", "name", "description", "dbxrefs",
+                 "annotations", "_per_letter_annotations", "_features",
+                 "_feature_loader", "_feature_index", "__dict__")
+    __setstate__ = _set_slots_state
+
+    def __getstate__(self):
+        # Build any lazily parsed features first, the loader can't be pickled
+        self.features
+        state = _get_slots_state(self)
+        # No need to save the feature index, it is easily rebuilt
+        state.pop("_feature_index", None)
+        return state
+
     def __init__(self, seq, id = "<unknown id>", name = "<unknown name>",
                  description = "<unknown description>", dbxrefs = None,
                  features = None, annotations = None,
@@ -309,6 +469,27 @@ class SeqRecord(object):
                    fset=_set_seq,
                    doc="The sequence itself, as a Seq or MutableSeq object.")
 
+    def _get_features(self):
+        if self._feature_loader is not None:
+            # Features parsed on demand, e.g. SeqIO.parse(..., lazy_features=True)
+            loader = self._feature_loader
+            self._feature_loader = None
+            self._features = loader()
+        return self._features
+
+    def _set_features(self, value):
+        self._feature_loader = None
+        self._feature_index = None
+        self._features = value
+
+    features = property(fget=_get_features,
+                        fset=_set_features,
+                        doc="""List of SeqFeature objects for the sequence.
+
+        When parsing a GenBank or EMBL file with lazy_features=True, these
+        are only built from the feature table the first time they are used.
+        """)
+
     def __getitem__(self, index):
         """Returns a sub-sequence or an individual letter.
 
@@ -445,7 +626,15 @@ class SeqRecord(object):
             if step == 1:
                 # Select relevant features, add them with shifted locations
                 #assert str(self.seq)[index] == str(self.seq)[start:stop]
-                for f in self.features:
+                # Use the interval index to find the candidates, rather than
+                # checking every feature (still checking those referencing
+                # other sequences, or without a usable location, as before)
+                features = self.features
+                feature_index = self._get_feature_index()
+                wanted = set(feature_index.within(start, stop))
+                wanted.update(feature_index.unindexed)
+                wanted.update(feature_index.references)
+                for f in (features[i] for i in sorted(wanted)):
                     if f.ref or f.ref_db:
                         # TODO - Implement this (with lots of tests)?
                         import warnings
@@ -465,6 +654,78 @@ class SeqRecord(object):
             return answer
         raise ValueError("Invalid index")
 
+    def _get_feature_index(self):
+        """Returns an interval index of the features, built if needed (PRIVATE).
+
+        The index is rebuilt if the features list is replaced or its length
+        changes, but not if the features in it are edited in place. Checking
+        every feature here would make each query as slow as a linear scan.
+        """
+        features = self.features
+        try:
+            cached = self._feature_index
+        except AttributeError:
+            # e.g. unpickled record, or a subclass not calling __init__
+            cached = None
+        if cached is None or not cached.is_current(features):
+            cached = _FeatureIndex(features)
+            self._feature_index = cached
+        return cached
+
+    def features_overlapping(self, start, end):
+        """Returns a list of the features overlapping the region start to end.
+
+        The start and end are Python style (zero based, end exclusive). The
+        features are returned in the same order as in the features list.
+        For features with a compound location (e.g. exons joined to make a
+        CDS), at least one part of the location must overlap the region.
+
+        >>> from Bio import SeqIO
+        >>> record = SeqIO.read("GenBank/NC_005816.gb", "genbank")
+        >>> for feature in record.features_overlapping(1000, 1100):
+        ...     print("%s %i %i" % (feature.type, feature.location.start,
+        ...                         feature.location.end))
+        source 0 9609
+        repeat_region 0 1954
+        gene 86 1109
+        CDS 86 1109
+
+        An interval index of the features is built the first time this (or
+        features_containing, or slicing the record) is used, so that
+        repeated queries are fast even with a very large number of features.
+        The index is rebuilt if the features list is replaced, or features
+        are added or removed, but if you replace features in the list or
+        edit their locations in place, assign the list again (e.g.
+        record.features = record.features) to update the index.
+        """
+        features = self.features
+        return [features[i] for i in
+                self._get_feature_index().overlapping(start, end)]
+
+    def features_containing(self, position):
+        """Returns a list of the features whose location includes this position.
+
+        The position is zero based, as in Python. Like the features_overlapping
+        method, this uses an interval index of the features:
+
+        >>> from Bio import SeqIO
+        >>> record = SeqIO.read("GenBank/NC_005816.gb", "genbank")
+        >>> for feature in record.features_containing(1108):
+        ...     print("%s %i %i" % (feature.type, feature.location.start,
+        ...                         feature.location.end))
+        source 0 9609
+        repeat_region 0 1954
+        gene 86 1109
+        CDS 86 1109
+        gene 1105 1888
+        CDS 1105 1888
+        misc_feature 1108 1885
+
+        This gives the same features as checking the position is in each
+        feature in turn (e.g. [f for f in record.features if 1108 in f]).
+        """
+        return self.features_overlapping(position, position + 1)
+
     def __iter__(self):
         """Iterate over the letters in the sequence.
 
@@ -834,7 +1095,8 @@ class SeqRecord(object):
         # Can append matching per-letter-annotation
         for k, v in self.letter_annotations.items():
             if k in other.letter_annotations:
-                answer.letter_annotations[k] = v + other.letter_annotations[k]
+                answer.letter_annotations[k] = \
+                    _join_letter_annotations(v, other.letter_annotations[k])
         return answer
 
     def __radd__(self, other):
@@ -0,0 +1,562 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+"""Counting and sketching nucleotide k-mers using NumPy.
+
+Each k-mer (of up to 32 bases) is encoded as an unsigned 64 bit integer at
+two bits per base (A=0, C=1, G=2, T or U=3, with the first base as the most
+significant bits), so numerical order is also alphabetical order. By
+default k-mers are canonical, meaning each k-mer and its reverse complement
+are counted together under whichever comes first alphabetically. Any k-mers
+including other letters (e.g. N) are skipped.
+
+The KmerCounts class holds the counts as a pair of sorted NumPy arrays (the
+k-mer codes and their counts), and can be built from strings, Seq objects or
+SeqRecord objects:
+
+>>> from Bio.SeqUtils.Kmers import KmerCounts
+>>> counts = KmerCounts(3)
+>>> counts.update(["ACGTTGCA", "NNACGTT"])
+>>> len(counts)
+4
+>>> counts.total()
+9
+>>> counts["ACG"], counts["CGT"], counts["AAC"]
+(4, 4, 2)
+>>> for kmer, count in counts.items():
+...     print("%s %i" % (kmer, count))
+...
+AAC 2
+ACG 4
+CAA 1
+GCA 2
+
+Counts built separately (e.g. in different processes) can be combined with
+the merge method, and the count_kmers function does this for you using the
+multiprocessing module.
+
+For comparing large sequence collections, the MinHashSketch class keeps a
+small fixed size sample of the (hashed) k-mers, from which the Jaccard index
+of the k-mer sets and the Mash distance can be estimated (Ondov et al. 2016).
+The minimizers function picks the smallest (hashed) k-mer in each window of
+consecutive k-mers, another way to summarise a sequence by a subset of its
+k-mers.
+
+Note this module requires NumPy.
+"""
+
+from __future__ import print_function
+
+from math import log
+
+from Bio._py3k import _as_bytes
+from Bio.SeqRecord import SeqRecord
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.SeqUtils.Kmers.")
+
+# Letters to two bit codes, anything else is 4:
+_code_table = numpy.zeros(256, numpy.uint8) + 4
+for _i, _letters in enumerate(["Aa", "Cc", "Gg", "TtUu"]):
+    for _letter in _letters:
+        _code_table[ord(_letter)] = _i
+del _i, _letters, _letter
+
+_empty = numpy.zeros(0, numpy.uint64)
+_two = numpy.uint64(2)
+_mask64 = 0xFFFFFFFFFFFFFFFF
+
+
+def _sequence_string(seq):
+    """Sequence of a string, Seq or SeqRecord object as a string (PRIVATE)."""
+    if isinstance(seq, SeqRecord):
+        seq = seq.seq
+    return str(seq)
+
+
+def _check_k(k):
+    """Check the k-mer length is supported (PRIVATE)."""
+    if not 0 < k <= 32:
+        raise ValueError("k-mer length must be between 1 and 32, not %r" % k)
+
+
+def _kmer_codes(seq, k, canonical):
+    """K-mer codes and their start positions in a sequence (PRIVATE).
+
+    Returns two NumPy arrays, the k-mer codes (uint64) and their positions
+    in the sequence. K-mers including letters other than ACGTU are omitted.
+    """
+    data = numpy.frombuffer(_as_bytes(_sequence_string(seq)), numpy.uint8)
+    length = len(data) - k + 1
+    if length <= 0:
+        return _empty, numpy.zeros(0, numpy.intp)
+    letters = _code_table[data]
+    bad = letters > 3
+    letters[bad] = 0
+    letters = letters.astype(numpy.uint64)
+    codes = numpy.zeros(length, numpy.uint64)
+    for i in range(k):
+        codes <<= _two
+        codes |= letters[i:i + length]
+    if canonical:
+        # Reverse complement, i.e. 3 - base, with the last base first:
+        reverse = numpy.zeros(length, numpy.uint64)
+        complement = numpy.uint64(3) - letters
+        for i in range(k):
+            reverse |= complement[i:i + length] << numpy.uint64(2 * i)
+        numpy.minimum(codes, reverse, out=codes)
+    bad_cumulative = numpy.zeros(len(data) + 1, numpy.intp)
+    numpy.cumsum(bad, out=bad_cumulative[1:])
+    positions = numpy.flatnonzero(bad_cumulative[k:] == bad_cumulative[:length])
+    return codes[positions], positions
+
+
+def kmer_codes(seq, k, canonical=True):
+    """Return the k-mers of a sequence as a NumPy array of two bit codes.
+
+    Arguments:
+     - seq       - The sequence, a string, Seq or SeqRecord object.
+     - k         - The k-mer length, between 1 and 32.
+     - canonical - Use the canonical k-mers (boolean, default True).
+
+    The k-mer codes are given in order along the sequence, omitting any
+    including letters other than A, C, G, T or U (in either case).
+
+    >>> from Bio.SeqUtils.Kmers import kmer_codes, decode_kmer
+    >>> codes = kmer_codes("ACGTNGGA", 3, canonical=False)
+    >>> [decode_kmer(code, 3) for code in codes]
+    ['ACG', 'CGT', 'GGA']
+    >>> codes = kmer_codes("ACGTNGGA", 3)
+    >>> [decode_kmer(code, 3) for code in codes]
+    ['ACG', 'ACG', 'GGA']
+    """
+    _check_k(k)
+    return _kmer_codes(seq, k, canonical)[0]
+
+
+def encode_kmer(kmer, canonical=False):
+    """Return the two bit code of a k-mer given as a string.
+
+    >>> from Bio.SeqUtils.Kmers import encode_kmer
+    >>> encode_kmer("AAC")
+    1
+    >>> encode_kmer("GTT")
+    47
+    >>> encode_kmer("GTT", canonical=True)
+    1
+    """
+    _check_k(len(kmer))
+    codes = kmer_codes(kmer, len(kmer), canonical)
+    if len(codes) != 1:
+        raise ValueError("Can only encode A, C, G, T or U in a k-mer, not %r"
+                         % kmer)
+    return int(codes[0])
+
+
+def decode_kmer(code, k):
+    """Return a k-mer as a string given its two bit code.
+
+    >>> from Bio.SeqUtils.Kmers import decode_kmer
+    >>> decode_kmer(47, 3)
+    'GTT'
+    """
+    code = int(code)
+    return "".join("ACGT"[(code >> (2 * i)) & 3] for i in range(k - 1, -1, -1))
+
+
+def _hash_codes(codes, seed):
+    """Hash k-mer codes to uniform looking 64 bit integers (PRIVATE).
+
+    This uses the 64 bit finalizer from MurmurHash3, after mixing in the
+    seed, so is a bijection (different k-mers never collide).
+    """
+    x = codes ^ numpy.uint64((seed * 0x9E3779B97F4A7C15) & _mask64)
+    x ^= x >> numpy.uint64(33)
+    x *= numpy.uint64(0xFF51AFD7ED558CCD)
+    x ^= x >> numpy.uint64(33)
+    x *= numpy.uint64(0xC4CEB9FE1A85EC53)
+    x ^= x >> numpy.uint64(33)
+    return x
+
+
+def _sum_sorted(codes, counts):
+    """Sort k-mer codes and add up the counts of duplicates (PRIVATE)."""
+    order = numpy.argsort(codes, kind="mergesort")
+    codes = codes[order]
+    counts = counts[order]
+    if not len(codes):
+        return codes, counts
+    starts = numpy.flatnonzero(numpy.concatenate(([True],
+                                                  codes[1:] != codes[:-1])))
+    return codes[starts], numpy.add.reduceat(counts, starts)
+
+
+class KmerCounts(object):
+    """Counts of k-mers, held as sorted NumPy arrays.
+
+    Arguments:
+     - k         - The k-mer length, between 1 and 32.
+     - canonical - Count canonical k-mers (boolean, default True), meaning
+                   a k-mer and its reverse complement are counted together.
+
+    The distinct k-mer codes (in sorted order) and their counts are held
+    as NumPy arrays in the codes and counts attributes. New sequences are
+    encoded immediately but only merged into these arrays in batches (which
+    is done before any of the methods look at the counts).
+    """
+
+    # Merge the pending k-mer codes once there are this many:
+    _batch_size = 1 << 22
+
+    def __init__(self, k, canonical=True):
+        _check_k(k)
+        self.k = k
+        self.canonical = canonical
+        self._codes = _empty
+        self._counts = numpy.zeros(0, numpy.int64)
+        self._pending = []
+        self._pending_size = 0
+
+    def _flush(self):
+        """Merge any pending k-mer codes into the counts (PRIVATE)."""
+        if not self._pending:
+            return
+        codes = numpy.concatenate([self._codes] + self._pending)
+        counts = numpy.concatenate([self._counts,
+                                    numpy.ones(self._pending_size, numpy.int64)])
+        self._pending = []
+        self._pending_size = 0
+        self._codes, self._counts = _sum_sorted(codes, counts)
+
+    @property
+    def codes(self):
+        """Sorted NumPy array of the distinct k-mer codes."""
+        self._flush()
+        return self._codes
+
+    @property
+    def counts(self):
+        """NumPy array of the counts, matching the codes array."""
+        self._flush()
+        return self._counts
+
+    def add(self, seq):
+        """Count the k-mers in a sequence (string, Seq or SeqRecord)."""
+        codes = _kmer_codes(seq, self.k, self.canonical)[0]
+        self._pending.append(codes)
+        self._pending_size += len(codes)
+        if self._pending_size >= self._batch_size:
+            self._flush()
+
+    def update(self, sequences):
+        """Count the k-mers in each of the sequences given."""
+        for seq in sequences:
+            self.add(seq)
+
+    def merge(self, other):
+        """Add the counts from another KmerCounts object to this one.
+
+        Both must use the same k-mer length and canonical setting.
+        """
+        if self.k != other.k or self.canonical != other.canonical:
+            raise ValueError("Can only merge k-mer counts with the same "
+                             "k-mer length and canonical setting")
+        self._flush()
+        self._codes, self._counts = _sum_sorted(
+            numpy.concatenate((self._codes, other.codes)),
+            numpy.concatenate((self._counts, other.counts)))
+
+    def __getstate__(self):
+        self._flush()
+        return self.__dict__
+
+    def __len__(self):
+        """Return the number of distinct k-mers."""
+        return len(self.codes)
+
+    def total(self):
+        """Return the total number of k-mers counted."""
+        return int(self.counts.sum())
+
+    def _index(self, kmer):
+        """Return the index of a k-mer in the codes array, or None (PRIVATE)."""
+        if len(kmer) != self.k:
+            raise ValueError("Expected a k-mer of length %i, not %r"
+                             % (self.k, kmer))
+        code = numpy.uint64(encode_kmer(kmer, self.canonical))
+        codes = self.codes
+        index = numpy.searchsorted(codes, code)
+        if index < len(codes) and codes[index] == code:
+            return index
+        return None
+
+    def __getitem__(self, kmer):
+        """Return the count of the given k-mer (string), zero if absent."""
+        index = self._index(kmer)
+        if index is None:
+            return 0
+        return int(self._counts[index])
+
+    def __contains__(self, kmer):
+        return self._index(kmer) is not None
+
+    def items(self):
+        """Iterate over (k-mer, count) tuples, in alphabetical order."""
+        k = self.k
+        for code, count in zip(self.codes.tolist(), self._counts.tolist()):
+            yield decode_kmer(code, k), count
+
+    def most_common(self, n=None):
+        """Return a list of the n most common (k-mer, count) tuples.
+
+        By default all the k-mers are returned, most common first (ties
+        are in alphabetical order).
+        """
+        counts = self.counts
+        order = numpy.argsort(-counts, kind="mergesort")[:n]
+        return [(decode_kmer(code, self.k), count) for code, count in
+                zip(self._codes[order].tolist(), counts[order].tolist())]
+
+    def jaccard(self, other):
+        """Jaccard index of the distinct k-mers in this and another object.
+
+        This is the exact value, the number of k-mers in common divided by
+        the number of distinct k-mers in either (zero if both are empty).
+        """
+        if self.k != other.k or self.canonical != other.canonical:
+            raise ValueError("Can only compare k-mer counts with the same "
+                             "k-mer length and canonical setting")
+        shared = len(numpy.intersect1d(self.codes, other.codes,
+                                       assume_unique=True))
+        union = len(self.codes) + len(other.codes) - shared
+        if not union:
+            return 0.0
+        return shared / float(union)
+
+
+def _count_batch(sequences, k, canonical):
+    """Count the k-mers in a batch of sequences, in a worker process (PRIVATE)."""
+    counts = KmerCounts(k, canonical)
+    counts.update(sequences)
+    return counts
+
+
+def _batches(sequences, batch_length):
+    """Group sequences (as strings) into batches of about this length (PRIVATE)."""
+    batch = []
+    length = 0
+    for seq in sequences:
+        seq = _sequence_string(seq)
+        batch.append(seq)
+        length += len(seq)
+        if length >= batch_length:
+            yield batch
+            batch = []
+            length = 0
+    if batch:
+        yield batch
+
+
+def count_kmers(sequences, k, canonical=True, processes=1,
+                batch_length=1000000):
+    """Count the k-mers in the given sequences, returns a KmerCounts object.
+
+    Arguments:
+     - sequences    - An iterable of strings, Seq or SeqRecord objects,
+                      e.g. from Bio.SeqIO.parse()
+     - k            - The k-mer length, between 1 and 32.
+     - canonical    - Count canonical k-mers (boolean, default True).
+     - processes    - Number of worker processes to use (default 1).
+     - batch_length - Approximate total sequence length sent to a worker
+                      process at a time.
+
+    With more than one process, batches of sequences are counted in worker
+    processes (using the multiprocessing module) and the counts merged.
+
+    >>> from Bio import SeqIO
+    >>> from Bio.SeqUtils.Kmers import count_kmers
+    >>> counts = count_kmers(SeqIO.parse("GenBank/NC_005816.fna", "fasta"), 5)
+    >>> print("%i distinct, %i in total" % (len(counts), counts.total()))
+    512 distinct, 9605 in total
+    >>> counts.most_common(3)
+    [('AAAAA', 109), ('GAAAA', 62), ('AAAAT', 57)]
+    """
+    _check_k(k)
+    if processes <= 1:
+        counts = KmerCounts(k, canonical)
+        counts.update(sequences)
+        return counts
+    from functools import partial
+    import multiprocessing
+    pool = multiprocessing.Pool(processes)
+    try:
+        counts = KmerCounts(k, canonical)
+        for batch_counts in pool.imap_unordered(
+                partial(_count_batch, k=k, canonical=canonical),
+                _batches(sequences, batch_length)):
+            counts.merge(batch_counts)
+    finally:
+        pool.close()
+        pool.join()
+    return counts
+
+
+def minimizers(seq, k, w, canonical=True, seed=0):
+    """Return the (w, k) minimizers of a sequence as two NumPy arrays.
+
+    Arguments:
+     - seq       - The sequence, a string, Seq or SeqRecord object.
+     - k         - The k-mer length, between 1 and 32.
+     - w         - Number of consecutive k-mers in each window.
+     - canonical - Use the canonical k-mers (boolean, default True).
+     - seed      - Seed for the k-mer hash function (integer).
+
+    For each window of w consecutive k-mers along the sequence, the k-mer
+    with the smallest hash value is chosen (the left most if tied). Returns
+    the start positions of the distinct chosen k-mers (in order along the
+    sequence), and their k-mer codes. Windows including any k-mers with
+    letters other than ACGTU only consider the valid k-mers.
+
+    >>> from Bio.SeqUtils.Kmers import minimizers, decode_kmer
+    >>> positions, codes = minimizers("ACGTTGCATGTCGCATGATGCATGAGAGTTGA", 5, 4)
+    >>> print(positions)
+    [ 3  7  8  9 10 13 16 17 18 22 24 25]
+    >>> print(decode_kmer(codes[0], 5))
+    TGCAA
+    """
+    _check_k(k)
+    if w < 1:
+        raise ValueError("Minimizer window must be at least one k-mer")
+    data = _sequence_string(seq)
+    codes, valid = _kmer_codes(data, k, canonical)
+    length = len(data) - k + 1
+    if length < w or not len(codes):
+        return numpy.zeros(0, numpy.intp), _empty
+    # Hashes for every k-mer position, with the maximum for invalid k-mers
+    hashes = numpy.empty(length, numpy.uint64)
+    hashes.fill(_mask64)
+    hashes[valid] = _hash_codes(codes, seed)
+    all_codes = numpy.zeros(length, numpy.uint64)
+    all_codes[valid] = codes
+    is_valid = numpy.zeros(length, bool)
+    is_valid[valid] = True
+    windows = numpy.lib.stride_tricks.as_strided(
+        hashes, shape=(length - w + 1, w),
+        strides=(hashes.strides[0], hashes.strides[0]))
+    chosen = numpy.arange(length - w + 1) + numpy.argmin(windows, axis=1)
+    chosen = numpy.unique(chosen[is_valid[chosen]])
+    return chosen, all_codes[chosen]
+
+
+class MinHashSketch(object):
+    """Bottom-s MinHash sketch of the canonical k-mers in some sequences.
+
+    Arguments:
+     - k    - The k-mer length, between 1 and 32 (default 21).
+     - size - Number of hash values to keep (default 1000).
+     - seed - Seed for the k-mer hash function (integer, default 42).
+
+    The sketch keeps the smallest (up to) size distinct hash values of the
+    k-mers seen, in the sorted NumPy array hashes. Sketches are only
+    comparable if made with the same k, size and seed:
+
+    >>> from Bio import SeqIO
+    >>> from Bio.SeqUtils.Kmers import MinHashSketch
+    >>> record = SeqIO.read("GenBank/NC_005816.gb", "genbank")
+    >>> first = MinHashSketch(k=15, size=500)
+    >>> first.add(record.seq[:6000])
+    >>> second = MinHashSketch(k=15, size=500)
+    >>> second.add(record.seq[3000:])
+    >>> print("%0.2f" % first.jaccard(second))
+    0.31
+    >>> print("%0.3f" % first.mash_distance(second))
+    0.050
+    """
+
+    def __init__(self, k=21, size=1000, seed=42):
+        _check_k(k)
+        if size < 1:
+            raise ValueError("Sketch size must be at least one")
+        self.k = k
+        self.size = size
+        self.seed = seed
+        self.hashes = _empty
+
+    def _add_hashes(self, hashes):
+        """Add more hash values, keeping the smallest (PRIVATE)."""
+        size = self.size
+        # Remove repeated values first, so as to keep size distinct values
+        hashes = numpy.unique(hashes)[:size]
+        self.hashes = numpy.union1d(self.hashes, hashes)[:size]
+
+    def add(self, seq):
+        """Add the k-mers in a sequence (string, Seq or SeqRecord)."""
+        codes = _kmer_codes(seq, self.k, True)[0]
+        self._add_hashes(_hash_codes(codes, self.seed))
+
+    def update(self, sequences):
+        """Add the k-mers in each of the sequences given."""
+        for seq in sequences:
+            self.add(seq)
+
+    def _check(self, other):
+        """Check another sketch is comparable to this one (PRIVATE)."""
+        if (self.k, self.size, self.seed) != (other.k, other.size, other.seed):
+            raise ValueError("MinHash sketches differ in k, size or seed")
+
+    def merge(self, other):
+        """Add the hash values from another sketch, giving their union."""
+        self._check(other)
+        self._add_hashes(other.hashes)
+
+    def __len__(self):
+        """Return the number of hash values in the sketch."""
+        return len(self.hashes)
+
+    def jaccard(self, other):
+        """Estimate the Jaccard index of the k-mers in two sketches.
+
+        This takes the smallest size hash values of the union of the two
+        sketches, and returns the fraction of these in both sketches.
+        """
+        self._check(other)
+        union = numpy.union1d(self.hashes, other.hashes)[:self.size]
+        if not len(union):
+            return 0.0
+        shared = numpy.intersect1d(self.hashes, other.hashes,
+                                   assume_unique=True)
+        shared = numpy.searchsorted(shared, union[-1], "right")
+        return shared / float(len(union))
+
+    def mash_distance(self, other):
+        """Estimate the Mash distance (mutation rate) between two sketches.
+
+        Calculated from the Jaccard estimate j as -log(2j / (1 + j)) / k,
+        and given as 1.0 if the sketches share no hash values.
+        """
+        j = self.jaccard(other)
+        if not j:
+            return 1.0
+        return -log(2.0 * j / (1.0 + j)) / self.k
+
+
+def _test():
+    """Run the module's doctests (PRIVATE)."""
+    import os
+    import doctest
+    if os.path.isdir(os.path.join("..", "..", "Tests")):
+        print("Running doctests...")
+        cur_dir = os.path.abspath(os.curdir)
+        os.chdir(os.path.join("..", "..", "Tests"))
+        doctest.testmod()
+        os.chdir(cur_dir)
+        del cur_dir
+        print("Done")
+
+
+if __name__ == "__main__":
+    _test()
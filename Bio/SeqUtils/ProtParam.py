@@ -23,12 +23,25 @@ from __future__ import print_function
 import sys
 from . import ProtParamData  # Local
 from . import IsoelectricPoint  # Local
+from Bio._py3k import _as_bytes
 from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
 from Bio.Alphabet import IUPAC
 from Bio.Data import IUPACData
 from Bio.SeqUtils import molecular_weight
 
 
+def _get_numpy():
+    """Import NumPy on demand, needed for ProteinAnalysisBatch (PRIVATE)."""
+    try:
+        import numpy
+    except ImportError:
+        from Bio import MissingPythonDependencyError
+        raise MissingPythonDependencyError(
+            "Install NumPy if you want to use ProteinAnalysisBatch.")
+    return numpy
+
+
 class ProteinAnalysis(object):
     """Class containing methods for protein analysis.
 
@@ -277,3 +290,303 @@ class ProteinAnalysis(object):
         sheet = sum(aa_percentages[r] for r in 'EMAL')
 
         return helix, turn, sheet
+
+
+class ProteinAnalysisBatch(object):
+    """Protein analysis of many sequences at once, using NumPy.
+
+    This offers the same calculations as the ProteinAnalysis class, but for
+    a whole list of protein sequences at once. All the sequences are held
+    as a single NumPy array of letters, with one amino acid composition
+    matrix (a row per sequence), and each method returns a NumPy array with
+    one value per sequence (or for the profiles, a list of NumPy arrays).
+    The isoelectric points are found by bisection of all the sequences at
+    once, and the sliding window profiles are calculated along all the
+    sequences together.
+
+    The constructor takes an iterable of sequences (strings, Seq objects
+    or SeqRecord objects), and the optional monoisotopic argument as for
+    ProteinAnalysis. The sequences are converted to upper case.
+
+    Where ProteinAnalysis would give an error for a sequence containing
+    letters other than the standard amino acids (e.g. X), the batch methods
+    give NaN for that sequence instead. For very large numbers of proteins,
+    analyse them in chunks of (say) a hundred thousand sequences at a time.
+    """
+
+    #: The amino acids counted, giving the columns of the composition matrix
+    letters = IUPACData.protein_letters
+
+    def __init__(self, sequences, monoisotopic=False):
+        numpy = _get_numpy()
+        data = []
+        for seq in sequences:
+            if isinstance(seq, SeqRecord):
+                seq = seq.seq
+            data.append(str(seq).upper())
+        self.monoisotopic = monoisotopic
+        self.lengths = numpy.array([len(seq) for seq in data], numpy.int64)
+        self.starts = numpy.zeros(len(data), numpy.int64)
+        numpy.cumsum(self.lengths[:-1], out=self.starts[1:])
+        self._data = numpy.frombuffer(_as_bytes("".join(data)), numpy.uint8)
+        # Which sequence each letter belongs to:
+        self._owner = numpy.repeat(numpy.arange(len(data)), self.lengths)
+        codes = numpy.zeros(256, numpy.intp) + len(self.letters)
+        for i, letter in enumerate(self.letters):
+            codes[ord(letter)] = i
+        self._codes = codes[self._data]
+        self._counts = None
+
+    def __len__(self):
+        """Return the number of sequences."""
+        return len(self.lengths)
+
+    def _table(self, values, default=float("nan")):
+        """Lookup table of values for each letter, as a NumPy array (PRIVATE)."""
+        numpy = _get_numpy()
+        table = numpy.zeros(256, float) + default
+        for letter, value in values.items():
+            table[ord(letter)] = value
+        return table
+
+    def _per_sequence(self, values):
+        """Add up the per letter values for each sequence (PRIVATE)."""
+        numpy = _get_numpy()
+        return numpy.bincount(self._owner, weights=values,
+                              minlength=len(self.lengths))
+
+    def _fraction(self, letters):
+        """Combined fraction of the given amino acids in each sequence (PRIVATE)."""
+        numpy = _get_numpy()
+        columns = [self.letters.index(letter) for letter in letters]
+        counts = self.count_amino_acids()[:, columns].sum(axis=1)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            return counts / self.lengths.astype(float)
+
+    def count_amino_acids(self):
+        """Count standard amino acids, returns a NumPy array.
+
+        Returns an integer matrix with a row for each sequence, and a column
+        for each of the standard amino acids (in the order of the letters
+        attribute). The return value is cached.
+        """
+        if self._counts is None:
+            numpy = _get_numpy()
+            size = len(self.letters) + 1
+            counts = numpy.bincount(self._owner * size + self._codes,
+                                    minlength=len(self.lengths) * size)
+            self._counts = counts.reshape(len(self.lengths), size)[:, :-1]
+        return self._counts
+
+    def get_amino_acids_percent(self):
+        """Calculate the amino acid content of each sequence as fractions.
+
+        Returns a NumPy array like count_amino_acids, but divided by the
+        length of each sequence.
+        """
+        numpy = _get_numpy()
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            return self.count_amino_acids() / self.lengths[:, None].astype(float)
+
+    def molecular_weight(self):
+        """Calculate the molecular weight of each sequence."""
+        if self.monoisotopic:
+            weights = IUPACData.monoisotopic_protein_weights
+            water = 18.010565
+        else:
+            weights = IUPACData.protein_weights
+            water = 18.0153
+        total = self._per_sequence(self._table(weights)[self._data])
+        return total - (self.lengths - 1) * water
+
+    def aromaticity(self):
+        """Calculate the aromaticity according to Lobry, 1994.
+
+        This is the relative frequency of Phe+Trp+Tyr in each sequence.
+        """
+        return self._fraction("YWF")
+
+    def gravy(self):
+        """Calculate the gravy according to Kyte and Doolittle."""
+        numpy = _get_numpy()
+        total = self._per_sequence(self._table(ProtParamData.kd)[self._data])
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            return total / self.lengths
+
+    def instability_index(self):
+        """Calculate the instability index according to Guruprasad et al 1990.
+
+        Any value above 40 means the protein is unstable (has a short half
+        life). See the ProteinAnalysis method of the same name.
+        """
+        numpy = _get_numpy()
+        size = len(self.letters) + 1
+        table = numpy.zeros((size, size)) + float("nan")
+        for i, this in enumerate(self.letters):
+            for j, next in enumerate(self.letters):
+                table[i, j] = ProtParamData.DIWV[this][next]
+        codes = self._codes
+        owner = self._owner
+        # Consecutive letters within the same sequence:
+        same = owner[:-1] == owner[1:]
+        values = table[codes[:-1][same], codes[1:][same]]
+        score = numpy.bincount(owner[:-1][same], weights=values,
+                               minlength=len(self.lengths))
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            return (10.0 / self.lengths) * score
+
+    def _profiles(self, values, coefficients, windows):
+        """Weighted sliding window sums along each sequence (PRIVATE).
+
+        Returns a list of NumPy arrays, with the given number of windows
+        for each sequence.
+        """
+        numpy = _get_numpy()
+        size = len(coefficients)
+        count = max(0, len(values) - size + 1)
+        if len(set(coefficients)) == 1:
+            # Equal weights, so can use a cumulative sum
+            cumulative = numpy.zeros(len(values) + 1)
+            numpy.cumsum(values, out=cumulative[1:])
+            scores = (cumulative[size:] - cumulative[:count]) * coefficients[0]
+        else:
+            scores = numpy.zeros(count)
+            for offset, coefficient in enumerate(coefficients):
+                if coefficient:
+                    scores += coefficient * values[offset:offset + count]
+        windows = numpy.maximum(windows, 0)
+        return [scores[start:start + number] for start, number
+                in zip(self.starts.tolist(), windows.tolist())]
+
+    def flexibility(self):
+        """Calculate the flexibility according to Vihinen, 1994.
+
+        Returns a list of NumPy arrays, one per sequence, matching the lists
+        from the ProteinAnalysis method of the same name (using a window of
+        nine amino acids).
+        """
+        window_size = 9
+        weights = [0.25, 0.4375, 0.625, 0.8125, 1]
+        # Same weighting of the window as used in ProteinAnalysis
+        coefficients = [0.0] * window_size
+        for j in range(window_size // 2):
+            coefficients[j] += weights[j] / 5.25
+            coefficients[window_size - j - 1] += weights[j] / 5.25
+        coefficients[window_size // 2 + 1] += 1 / 5.25
+        values = self._table(ProtParamData.Flex)[self._data]
+        return self._profiles(values, coefficients,
+                              self.lengths - window_size)
+
+    def protein_scale(self, param_dict, window, edge=1.0):
+        """Compute a profile of each sequence by any amino acid scale.
+
+        Returns a list of NumPy arrays, one per sequence, as from the
+        ProteinAnalysis method of the same name. However, any letters not in
+        the scale (param_dict) count as zero, without warnings.
+        """
+        unit = 2 * (1.0 - edge) / (window - 1)
+        weights = [edge + unit * i for i in range(window // 2)]
+        sum_of_weights = sum(weights) * 2 + 1
+        coefficients = [0.0] * window
+        for j in range(window // 2):
+            coefficients[j] += weights[j] / sum_of_weights
+            coefficients[window - j - 1] += weights[j] / sum_of_weights
+        coefficients[window // 2] += 1 / sum_of_weights
+        values = self._table(param_dict, 0.0)[self._data]
+        return self._profiles(values, coefficients,
+                              self.lengths - window + 1)
+
+    def _charge(self, pH, index, charged, nterm, cterm):
+        """Total charge of the selected proteins at the given pH (PRIVATE)."""
+        positive = [(None, nterm[index])] + \
+            [(aa, IsoelectricPoint.positive_pKs[aa]) for aa in "KRH"]
+        negative = [(None, cterm[index])] + \
+            [(aa, IsoelectricPoint.negative_pKs[aa]) for aa in "DECY"]
+        positive_charge = 0.0
+        for aa, pK in positive:
+            cr = 10 ** (pK - pH)
+            partial_charge = cr / (cr + 1.0)
+            if aa is not None:
+                partial_charge *= charged[aa][index]
+            positive_charge += partial_charge
+        negative_charge = 0.0
+        for aa, pK in negative:
+            cr = 10 ** (pH - pK)
+            partial_charge = cr / (cr + 1.0)
+            if aa is not None:
+                partial_charge *= charged[aa][index]
+            negative_charge += partial_charge
+        return positive_charge - negative_charge
+
+    def isoelectric_point(self):
+        """Calculate the isoelectric point of each sequence.
+
+        Uses the same method and pK values as the IsoelectricPoint module,
+        but with the bisection done for all the sequences at once. Gives
+        NaN for any empty sequences.
+        """
+        numpy = _get_numpy()
+        counts = self.count_amino_acids()
+        charged = dict((aa, counts[:, self.letters.index(aa)].astype(float))
+                       for aa in IsoelectricPoint.charged_aas)
+        nonempty = numpy.flatnonzero(self.lengths > 0)
+        first = self._data[self.starts[nonempty]]
+        last = self._data[self.starts[nonempty] + self.lengths[nonempty] - 1]
+        nterm = numpy.zeros(len(self.lengths))
+        nterm[nonempty] = self._table(IsoelectricPoint.pKnterminal,
+                                      IsoelectricPoint.positive_pKs["Nterm"])[first]
+        cterm = numpy.zeros(len(self.lengths))
+        cterm[nonempty] = self._table(IsoelectricPoint.pKcterminal,
+                                      IsoelectricPoint.negative_pKs["Cterm"])[last]
+
+        def charge(pH, index):
+            return self._charge(pH, index, charged, nterm, cterm)
+
+        pH = numpy.zeros(len(self.lengths)) + float("nan")
+        pH[nonempty] = 7.0
+        result = numpy.zeros(len(self.lengths))
+        result[nonempty] = charge(pH[nonempty], nonempty)
+        # Bracket between pH1 and pH2, in steps of one pH unit
+        pH1 = pH.copy()
+        pH2 = pH.copy()
+        going_up = nonempty[result[nonempty] > 0.0]
+        going_down = nonempty[result[nonempty] < 0.0]
+        while len(going_up):
+            pH[going_up] = pH1[going_up] + 1.0
+            result[going_up] = charge(pH[going_up], going_up)
+            positive = result[going_up] > 0.0
+            pH1[going_up[positive]] = pH[going_up[positive]]
+            pH2[going_up[~positive]] = pH[going_up[~positive]]
+            going_up = going_up[positive]
+        while len(going_down):
+            pH[going_down] = pH2[going_down] - 1.0
+            result[going_down] = charge(pH[going_down], going_down)
+            negative = result[going_down] < 0.0
+            pH2[going_down[negative]] = pH[going_down[negative]]
+            pH1[going_down[~negative]] = pH[going_down[~negative]]
+            going_down = going_down[negative]
+        # Bisection
+        active = nonempty
+        while True:
+            active = active[(pH2[active] - pH1[active] > 0.0001) &
+                            (result[active] != 0.0)]
+            if not len(active):
+                break
+            pH[active] = (pH1[active] + pH2[active]) / 2.0
+            result[active] = charge(pH[active], active)
+            positive = result[active] > 0.0
+            pH1[active[positive]] = pH[active[positive]]
+            pH2[active[~positive]] = pH[active[~positive]]
+        return pH
+
+    def secondary_structure_fraction(self):
+        """Calculate fraction of helix, turn and sheet for each sequence.
+
+        Returns a NumPy array with three columns (helix, turn, sheet), and a
+        row for each sequence. See the ProteinAnalysis method of the same
+        name.
+        """
+        numpy = _get_numpy()
+        return numpy.column_stack((self._fraction("VIYFWL"),
+                                   self._fraction("NPGS"),
+                                   self._fraction("EMAL")))
@@ -0,0 +1,309 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+"""Sliding window statistics along a nucleotide sequence using NumPy.
+
+The SlidingWindow class counts letters (and k-mers) once along the whole
+sequence using cumulative sums, so the counts for every window are found by
+subtracting two entries of a NumPy array rather than by recounting each
+window. This makes G+C content and GC skew plots of whole bacterial
+chromosomes quick, even with small steps between overlapping windows:
+
+>>> from Bio.SeqUtils.SlidingWindow import SlidingWindow
+>>> windows = SlidingWindow("GGGCCATTTAGCGCGCAAAT", window=10)
+>>> print(windows.starts)
+[ 0 10]
+>>> print(windows.gc_content().tolist())
+[50.0, 60.0]
+>>> print(windows.gc_skew().tolist())
+[0.2, 0.0]
+>>> print(windows.at_skew().tolist())
+[-0.2, 0.5]
+
+The window size and step between windows (by default equal to the window
+size, giving adjacent windows) are in letters. Only complete windows are
+used, unless the sequence is circular (like most bacterial chromosomes and
+plasmids) in which case the final windows wrap round the origin:
+
+>>> windows = SlidingWindow("GGGCCATTTAGCGCGCAAAT", window=10, step=5,
+...                         circular=True)
+>>> print(windows.starts)
+[ 0  5 10 15]
+>>> print(windows.count("GC"))
+[5 5 6 6]
+
+All the statistics are NumPy arrays with one entry per window. To show one
+as a Bio.Graphics.GenomeDiagram graph track, the graph_data method gives the
+list of (position, value) tuples expected by the new_graph method of a
+GraphSet, using the window midpoints as the positions:
+
+>>> windows = SlidingWindow("GGGCCATTTAGCGCGCAAAT", window=10)
+>>> windows.graph_data(windows.gc_skew())
+[(5, 0.2), (15, 0.0)]
+
+Note this module requires NumPy.
+"""
+
+from __future__ import print_function
+
+from itertools import product
+
+from Bio._py3k import _as_bytes
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.SeqUtils.SlidingWindow.")
+
+
+def _letter_table(letters):
+    """Boolean lookup table for these letters, in either case (PRIVATE)."""
+    table = numpy.zeros(256, bool)
+    for letter in bytearray(_as_bytes(letters.upper() + letters.lower())):
+        table[letter] = True
+    return table
+
+
+class SlidingWindow(object):
+    """Counts and statistics for sliding windows along a sequence.
+
+    Arguments:
+     - seq      - The sequence, a string, Seq or MutableSeq object (or
+                  anything else which gives the sequence via str).
+     - window   - Window size (integer, default 1000).
+     - step     - Distance between the start of each window (integer,
+                  defaults to the window size).
+     - circular - Treat the sequence as circular (boolean, default False),
+                  meaning there is a window starting at every step along the
+                  sequence with the final windows wrapping round the origin.
+                  Otherwise only windows lying completely within the
+                  sequence are used.
+
+    Letters are counted case insensitively. The start and end (Python style)
+    of each window are held as NumPy arrays in the starts and ends
+    attributes. For circular sequences the ends of the final windows go past
+    the length of the sequence.
+    """
+
+    def __init__(self, seq, window=1000, step=None, circular=False):
+        if window < 1:
+            raise ValueError("Window size must be at least one")
+        if step is None:
+            step = window
+        elif step < 1:
+            raise ValueError("Step between windows must be at least one")
+        data = numpy.frombuffer(_as_bytes(str(seq)), numpy.uint8)
+        length = len(data)
+        if circular:
+            starts = numpy.arange(0, length, step, dtype=numpy.int64)
+            if length:
+                # Repeats the sequence as needed, even if window > length
+                data = numpy.resize(data, length + window - 1)
+        else:
+            starts = numpy.arange(0, max(0, length - window + 1), step,
+                                  dtype=numpy.int64)
+        self.window = window
+        self.step = step
+        self.circular = circular
+        self.length = length
+        self.starts = starts
+        self.ends = starts + window
+        self._data = data
+
+    def __len__(self):
+        """Return the number of windows."""
+        return len(self.starts)
+
+    @property
+    def midpoints(self):
+        """Centre of each window, as a NumPy array of positions.
+
+        For circular sequences, midpoints past the end of the sequence are
+        wrapped round to the start.
+        """
+        midpoints = self.starts + self.window // 2
+        if self.circular and self.length:
+            midpoints %= self.length
+        return midpoints
+
+    def _matches(self, letters, offset=0, size=None):
+        """Boolean array, True where the sequence has one of the letters (PRIVATE)."""
+        data = self._data
+        if size is None:
+            size = len(data) - offset
+        return _letter_table(letters)[data[offset:offset + size]]
+
+    @staticmethod
+    def _cumulative(mask):
+        """Cumulative count of a boolean array, starting from zero (PRIVATE)."""
+        cumulative = numpy.zeros(len(mask) + 1, numpy.int64)
+        numpy.cumsum(mask, out=cumulative[1:])
+        return cumulative
+
+    def count(self, letters):
+        """Count the given letter(s) in each window, returns a NumPy array.
+
+        Any of the letters in the string given are counted, so for example
+        count("GC") gives the combined count of G and C in each window.
+        """
+        cumulative = self._cumulative(self._matches(letters))
+        return cumulative[self.ends] - cumulative[self.starts]
+
+    def gc_content(self):
+        """G+C content of each window, as percentages (NumPy float array).
+
+        As in the Bio.SeqUtils.GC function, the ambiguous nucleotide S
+        (G or C) is included, and the percentage is calculated against the
+        full length of the window.
+        """
+        return self.count("GCS") * 100.0 / self.window
+
+    def _skew(self, first, second):
+        """Skew (first - second) / (first + second) for each window (PRIVATE)."""
+        first = self.count(first)
+        second = self.count(second)
+        total = first + second
+        skew = numpy.zeros(len(total), float)
+        mask = total > 0
+        skew[mask] = (first[mask] - second[mask]) / total[mask].astype(float)
+        return skew
+
+    def gc_skew(self):
+        """GC skew (G-C)/(G+C) of each window, as a NumPy float array.
+
+        Any windows without a G or C are given a skew of zero. This does NOT
+        look at any ambiguous nucleotides.
+        """
+        return self._skew("G", "C")
+
+    def at_skew(self):
+        """AT skew (A-T)/(A+T) of each window, as a NumPy float array.
+
+        Any windows without an A or T are given a skew of zero. This does NOT
+        look at any ambiguous nucleotides.
+        """
+        return self._skew("A", "T")
+
+    def cumulative_gc_skew(self):
+        """Running total of the GC skew of the windows, as a NumPy array.
+
+        For a bacterial chromosome with adjacent windows, the minimum and
+        maximum of the cumulative GC skew usually point to the origin and
+        terminus of replication.
+        """
+        return numpy.cumsum(self.gc_skew())
+
+    def _kmer_window_bounds(self, k):
+        """Range of k-mer start positions in each window (PRIVATE).
+
+        Both are limited to the number of k-mer start positions in the
+        (possibly extended) sequence, so windows shorter than the k-mer get
+        an empty range.
+        """
+        size = max(0, len(self._data) - k + 1)
+        starts = numpy.minimum(self.starts, size)
+        ends = numpy.minimum(numpy.maximum(self.ends - k + 1, self.starts), size)
+        return starts, ends
+
+    def kmer_count(self, kmer):
+        """Count (overlapping) occurrences of a k-mer in each window.
+
+        Only occurrences lying completely within a window are counted. The
+        k-mer is matched letter by letter (case insensitively), without any
+        interpretation of ambiguity codes.
+
+        >>> windows = SlidingWindow("ACGCGTTACGAA", window=6)
+        >>> print(windows.kmer_count("CG"))
+        [2 1]
+        """
+        k = len(kmer)
+        if not k:
+            raise ValueError("Need a non-empty k-mer")
+        size = max(0, len(self._data) - k + 1)
+        mask = numpy.ones(size, bool)
+        for offset, letter in enumerate(kmer):
+            mask &= self._matches(letter, offset, size)
+        cumulative = self._cumulative(mask)
+        starts, ends = self._kmer_window_bounds(k)
+        return cumulative[ends] - cumulative[starts]
+
+    def kmer_composition(self, k, letters="ACGT"):
+        """Count every k-mer of the given letters in each window.
+
+        Returns a list of the k-mers (in alphabetical order of the letters
+        given), and a two dimensional NumPy array of counts with a row for
+        each window and a column for each k-mer. Only k-mers lying completely
+        within a window are counted, and any k-mers containing other letters
+        (e.g. N) are ignored.
+
+        >>> windows = SlidingWindow("ACGCGTTACGAA", window=6)
+        >>> kmers, counts = windows.kmer_composition(1)
+        >>> print(kmers)
+        ['A', 'C', 'G', 'T']
+        >>> print(counts)
+        [[1 2 2 1]
+         [3 1 1 1]]
+        >>> kmers, counts = windows.kmer_composition(2)
+        >>> print(counts[:, kmers.index("CG")])
+        [2 1]
+
+        The memory needed grows with the number of windows times the number
+        of possible k-mers, so this is intended for small values of k.
+        """
+        if k < 1:
+            raise ValueError("k-mer length must be at least one")
+        size = len(letters)
+        codes = numpy.zeros(256, numpy.int64) - 1
+        for i, letter in enumerate(letters):
+            codes[ord(letter.upper())] = i
+            codes[ord(letter.lower())] = i
+        length = max(0, len(self._data) - k + 1)
+        kmer_codes = numpy.zeros(length, numpy.int64)
+        valid = numpy.ones(length, bool)
+        for offset in range(k):
+            letter_codes = codes[self._data[offset:offset + length]]
+            valid &= letter_codes >= 0
+            kmer_codes = kmer_codes * size + letter_codes
+        positions = numpy.flatnonzero(valid)
+        kmer_codes = kmer_codes[valid]
+        # Tabulate the k-mers by which window boundaries they fall between,
+        # then a cumulative sum gives the k-mer counts before each boundary:
+        starts, ends = self._kmer_window_bounds(k)
+        boundaries = numpy.union1d(starts, ends)
+        bins = numpy.searchsorted(boundaries, positions, "right")
+        total = size ** k
+        before = numpy.bincount(bins * total + kmer_codes,
+                                minlength=(len(boundaries) + 1) * total)
+        before = numpy.cumsum(before.reshape(len(boundaries) + 1, total),
+                              axis=0)
+        counts = before[numpy.searchsorted(boundaries, ends)] \
+            - before[numpy.searchsorted(boundaries, starts)]
+        kmers = ["".join(letter_tuple) for letter_tuple in product(letters, repeat=k)]
+        return kmers, counts
+
+    def graph_data(self, values):
+        """List of (position, value) tuples for a GenomeDiagram graph track.
+
+        The positions are the window midpoints, as Python integers, and the
+        values (e.g. from the gc_skew method) are converted to Python floats
+        or integers.
+        """
+        values = numpy.asarray(values)
+        if len(values) != len(self.starts):
+            raise ValueError("Expected %i values (one per window), not %i"
+                             % (len(self.starts), len(values)))
+        return list(zip(self.midpoints.tolist(), values.tolist()))
+
+
+def _test():
+    """Run the module's doctests (PRIVATE)."""
+    import doctest
+    print("Running doctests...")
+    doctest.testmod()
+    print("Done")
+
+
+if __name__ == "__main__":
+    _test()
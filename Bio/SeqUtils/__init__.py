@@ -97,6 +97,9 @@ def GC_skew(seq, window=100):
     and the size of the window.
 
     Does NOT look at any ambiguous nucleotides.
+
+    See also the SlidingWindow class in Bio.SeqUtils.SlidingWindow (which
+    requires NumPy), which is much faster for overlapping windows.
     """
     # 8/19/03: Iddo: added lowercase
     values = []
@@ -42,6 +42,7 @@ import sys
 if sys.version_info[0] >= 3:
     #Code for Python 3
     from builtins import open, zip, map, filter, range, input
+    from sys import intern
 
     import codecs
 
@@ -148,7 +149,7 @@ if sys.version_info[0] >= 3:
 
 else:
     #Python 2 code
-    from __builtin__ import open, basestring, unicode
+    from __builtin__ import open, basestring, unicode, intern
 
     #Import Python3 like iterator functions:
     from future_builtins import zip, map, filter
@@ -230,8 +230,9 @@ from __future__ import print_function
 import sys  # to detect when under Python 2
 import zlib
 import struct
+from bisect import bisect_right
 
-from Bio._py3k import _as_bytes, _as_string
+from Bio._py3k import _as_bytes, _as_string, basestring
 from Bio._py3k import open as _open
 
 # For Python 2 can just use: _bgzf_magic = '\x1f\x8b\x08\x04'
@@ -242,12 +243,16 @@ _bgzf_eof = b"\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00\x1b\x00
 _bytes_BC = b"BC"
 
 
-def open(filename, mode="rb"):
-    """Open a BGZF file for reading, writing or appending."""
+def open(filename, mode="rb", threads=1):
+    """Open a BGZF file for reading, writing or appending.
+
+    The optional threads argument is passed to the BgzfReader or
+    BgzfWriter, to (de)compress the BGZF blocks in worker threads.
+    """
     if "r" in mode.lower():
-        return BgzfReader(filename, mode)
+        return BgzfReader(filename, mode, threads=threads)
     elif "w" in mode.lower() or "a" in mode.lower():
-        return BgzfWriter(filename, mode)
+        return BgzfWriter(filename, mode, threads=threads)
     else:
         raise ValueError("Bad mode %r" % mode)
 
@@ -393,15 +398,126 @@ def BgzfBlocks(handle):
     data_start = 0
     while True:
         start_offset = handle.tell()
-        # This may raise StopIteration which is perfect here
-        block_length, data = _load_bgzf_block(handle)
+        try:
+            block_length, data = _load_bgzf_block(handle)
+        except StopIteration:
+            # End of file (can't let this escape a generator, see PEP 479)
+            return
         data_len = len(data)
         yield start_offset, block_length, data_start, data_len
         data_start += data_len
 
 
+def make_gzi_index(handle):
+    """Build a list of block offsets for random access (the samtools .gzi index).
+
+    Expects a BGZF compressed file opened in binary read mode using
+    the builtin open function (as for the BgzfBlocks function). Only
+    the block headers and footers are read, seeking past the compressed
+    data of each block, so this is quick even for very large files.
+
+    Returns a list of (raw start, data start) tuples, one per BGZF
+    block, i.e. the offset of each block in the compressed file and
+    the offset of its contents in the decompressed data. This can be
+    saved with write_gzi_index, loaded again with read_gzi_index, and
+    given to a BgzfReader to seek to uncompressed offsets.
+
+    >>> try:
+    ...     from __builtin__ import open # Python 2
+    ... except ImportError:
+    ...     from builtins import open # Python 3
+    ...
+    >>> handle = open("SamBam/ex1_refresh.bam", "rb")
+    >>> for values in make_gzi_index(handle):
+    ...     print("Raw start %i, data start %i" % values)
+    Raw start 0, data start 0
+    Raw start 53, data start 38
+    Raw start 18248, data start 65472
+    Raw start 36438, data start 130881
+    Raw start 54442, data start 196364
+    Raw start 71795, data start 261883
+    Raw start 89503, data start 327294
+    Raw start 107212, data start 392760
+    Raw start 124602, data start 456614
+    >>> handle.close()
+
+    Note the final entry is the empty EOF marker block (as in an index
+    made by samtools when reading a BGZF file).
+    """
+    index = []
+    data_start = 0
+    while True:
+        start_offset = handle.tell()
+        try:
+            block_size, deflate_size = _read_bgzf_header(handle)
+        except StopIteration:
+            return index
+        # Skip the compressed data and CRC, just need the length
+        handle.seek(deflate_size + 4, 1)
+        data_len = struct.unpack("<I", handle.read(4))[0]
+        index.append((start_offset, data_start))
+        data_start += data_len
+
+
+def write_gzi_index(handle, index):
+    """Write a list of block offsets as a samtools style .gzi index file.
+
+    Expects a handle opened in binary write mode, and a list of
+    (raw start, data start) tuples as from make_gzi_index. The file
+    starts with the number of entries as a 64-bit little endian
+    unsigned integer, then the pairs of offsets in the same format.
+    As in samtools, the first block (which always starts at zero in
+    both the compressed and decompressed data) is not recorded.
+
+    >>> from io import BytesIO
+    >>> handle = BytesIO()
+    >>> write_gzi_index(handle, [(0, 0), (53, 38), (18248, 65472)])
+    >>> len(handle.getvalue())
+    40
+    >>> read_gzi_index(BytesIO(handle.getvalue()))
+    [(0, 0), (53, 38), (18248, 65472)]
+
+    """
+    if index and index[0] == (0, 0):
+        index = index[1:]
+    handle.write(struct.pack("<Q", len(index)))
+    for raw_start, data_start in index:
+        handle.write(struct.pack("<QQ", raw_start, data_start))
+
+
+def read_gzi_index(handle):
+    """Load a samtools style .gzi index file as a list of block offsets.
+
+    Expects a handle opened in binary read mode, returns a list of
+    (raw start, data start) tuples (including the first block at zero)
+    as from the make_gzi_index function.
+    """
+    data = handle.read(8)
+    if len(data) != 8:
+        raise ValueError("Truncated .gzi index, missing the entry count")
+    count = struct.unpack("<Q", data)[0]
+    data = handle.read(16 * count)
+    if len(data) != 16 * count:
+        raise ValueError("Truncated .gzi index, expected %i entries" % count)
+    values = struct.unpack("<%iQ" % (2 * count), data)
+    index = [(0, 0)]
+    index.extend(zip(values[0::2], values[1::2]))
+    return index
+
+
 def _load_bgzf_block(handle, text_mode=False):
     """Internal function to load the next BGZF function (PRIVATE)."""
+    block_size, deflated, expected_crc, expected_size = _read_bgzf_block(handle)
+    return block_size, _inflate_bgzf_block(deflated, expected_crc,
+                                           expected_size, text_mode)
+
+
+def _read_bgzf_header(handle):
+    """Internal function to read the header of the next BGZF block (PRIVATE).
+
+    Returns the block size and the size of the deflated data, leaving
+    the handle at the start of the deflated data.
+    """
     magic = handle.read(4)
     if not magic:
         # End of file
@@ -427,11 +543,31 @@ def _load_bgzf_block(handle, text_mode=False):
     assert x_len == extra_len, (x_len, extra_len)
     assert block_size is not None, "Missing BC, this isn't a BGZF file!"
     # Now comes the compressed data, CRC, and length of uncompressed data.
-    deflate_size = block_size - 1 - extra_len - 19
-    d = zlib.decompressobj(-15)  # Negative window size means no headers
-    data = d.decompress(handle.read(deflate_size)) + d.flush()
+    return block_size, block_size - 1 - extra_len - 19
+
+
+def _read_bgzf_block(handle):
+    """Internal function to read the next BGZF block without decompressing it (PRIVATE).
+
+    Returns the block size, the raw deflated data, the expected CRC (as
+    bytes) and the expected decompressed length. These last three values
+    are what the _inflate_bgzf_block function needs.
+    """
+    block_size, deflate_size = _read_bgzf_header(handle)
+    deflated = handle.read(deflate_size)
     expected_crc = handle.read(4)
     expected_size = struct.unpack("<I", handle.read(4))[0]
+    return block_size, deflated, expected_crc, expected_size
+
+
+def _inflate_bgzf_block(deflated, expected_crc, expected_size, text_mode=False):
+    """Internal function to decompress and check a raw BGZF block (PRIVATE).
+
+    This does not touch any file handle, so may be called from a worker
+    thread (the zlib library releases the GIL while decompressing).
+    """
+    d = zlib.decompressobj(-15)  # Negative window size means no headers
+    data = d.decompress(deflated) + d.flush()
     assert expected_size == len(data), \
            "Decompressed to %i, not %i" % (len(data), expected_size)
     # Should cope with a mix of Python platforms...
@@ -443,9 +579,40 @@ def _load_bgzf_block(handle, text_mode=False):
     assert expected_crc == crc, \
            "CRC is %s, not %s" % (crc, expected_crc)
     if text_mode:
-        return block_size, _as_string(data)
+        return _as_string(data)
     else:
-        return block_size, data
+        return data
+
+
+def _compress_bgzf_block(block, compresslevel=6):
+    """Internal function to compress data as a complete BGZF block (PRIVATE).
+
+    Returns the BGZF block (header, deflated data, CRC and length) as
+    bytes ready to write to disk. This does not touch any file handle,
+    so may be called from a worker thread.
+    """
+    # Giving a negative window bits means no gzip/zlib headers, -15 used in samtools
+    c = zlib.compressobj(compresslevel,
+                         zlib.DEFLATED,
+                         -15,
+                         zlib.DEF_MEM_LEVEL,
+                         0)
+    compressed = c.compress(block) + c.flush()
+    del c
+    assert len(compressed) < 65536, "TODO - Didn't compress enough, try less data in this block"
+    bsize = struct.pack("<H", len(compressed) + 25)  # includes -1
+    # Should cope with a mix of Python platforms...
+    crc = struct.pack("<I", zlib.crc32(block) & 0xffffffff)
+    uncompressed_length = struct.pack("<I", len(block))
+    # Fixed 16 bytes,
+    # gzip magic bytes (4) mod time (4),
+    # gzip flag (1), os (1), extra length which is six (2),
+    # sub field which is BC (2), sub field length of two (2),
+    # Variable data,
+    # 2 bytes: block length as BC sub field (2)
+    # X bytes: the data
+    # 8 bytes: crc (4), uncompressed data length (4)
+    return _bgzf_header + bsize + compressed + crc + uncompressed_length
 
 
 class BgzfReader(object):
@@ -515,13 +682,56 @@ class BgzfReader(object):
     block can be up to 64kb, the default cache could take up to 6MB of
     RAM. The cache is not important for reading through the file in one
     pass, but is important for improving performance of random access.
+
+    Decompression is normally done one block at a time as needed. For
+    large files read sequentially you can use the threads argument to
+    read ahead of the current position, and decompress the next few
+    blocks in a pool of worker threads (the zlib library releases the
+    GIL while decompressing, so this can use more than one CPU core):
+
+    >>> handle = BgzfReader("SamBam/ex1.bam", "rb", threads=4)
+    >>> data = handle.read(65540)
+    >>> assert 1195311108 == handle.tell()
+    >>> handle.seek(2)
+    2
+    >>> handle.close()
+
+    The virtual offsets used with seek and tell are exactly the same as
+    without threads. After seeking to a block which was not already read
+    ahead, any pending blocks are discarded and reading ahead restarts
+    from the new position. The worker threads are started when first
+    needed, and stopped on reaching the end of the file, on closing the
+    reader, or if the reader is garbage collected without being closed.
+
+    If you have a block offset index (see the make_gzi_index and
+    read_gzi_index functions), giving it as the gzi argument (either
+    the list of offsets, or the filename of a samtools style .gzi file)
+    allows seeking to an offset in the decompressed data directly:
+
+    >>> try:
+    ...     from __builtin__ import open # Python 2
+    ... except ImportError:
+    ...     from builtins import open # Python 3
+    ...
+    >>> raw = open("SamBam/ex1.bam", "rb")
+    >>> index = make_gzi_index(raw)
+    >>> raw.close()
+    >>> handle = BgzfReader("SamBam/ex1.bam", "rb", gzi=index)
+    >>> split_virtual_offset(handle.seek_uncompressed(65540))
+    (18239, 4)
+    >>> handle.tell_uncompressed()
+    65540
+    >>> handle.close()
     """
 
-    def __init__(self, filename=None, mode="r", fileobj=None, max_cache=100):
+    def __init__(self, filename=None, mode="r", fileobj=None, max_cache=100,
+                 threads=1, gzi=None):
         # TODO - Assuming we can seek, check for 28 bytes EOF empty block
         # and if missing warn about possible truncation (as in samtools)?
         if max_cache < 1:
             raise ValueError("Use max_cache with a minimum of 1")
+        if threads < 1:
+            raise ValueError("Use threads with a minimum of 1")
         # Must open the BGZF file in binary mode, but we may want to
         # treat the contents as either text or binary (unicode or
         # bytes under Python 3)
@@ -544,8 +754,38 @@ class BgzfReader(object):
         self._buffers = {}
         self._block_start_offset = None
         self._block_raw_length = None
+        if gzi is None:
+            self._gzi_raw_starts = None
+        else:
+            if isinstance(gzi, basestring):
+                with _open(gzi, "rb") as gzi_handle:
+                    gzi = read_gzi_index(gzi_handle)
+            self._gzi_raw_starts = [raw_start for raw_start, data_start in gzi]
+            self._gzi_data_starts = [data_start for raw_start, data_start in gzi]
+            self._gzi_lookup = dict(gzi)
+        self._threads = threads
+        # The pool of worker threads is only started when needed, and is
+        # shut down again on reaching the end of the file (or on closing)
+        self._pool = None
+        if threads > 1:
+            from collections import deque
+            # Tuples of (start offset, block size, pending decompression)
+            self._pending = deque()
+            self._max_pending = 2 * threads
+            self._read_ahead_offset = None
         self._load_block(handle.tell())
 
+    def _close_pool(self):
+        """Stop any worker threads (PRIVATE)."""
+        if self._pool is not None:
+            self._pool.terminate()
+            # Wait for the threads to finish
+            self._pool.join()
+            self._pool = None
+        if self._threads > 1:
+            self._pending.clear()
+            self._read_ahead_offset = None
+
     def _load_block(self, start_offset=None):
         if start_offset is None:
             # If the file is being read sequentially, then _handle.tell()
@@ -566,24 +806,73 @@ class BgzfReader(object):
             # TODO - Implemente LRU cache removal?
             self._buffers.popitem()
         # Now load the block
-        handle = self._handle
-        if start_offset is not None:
-            handle.seek(start_offset)
-        self._block_start_offset = handle.tell()
-        try:
-            block_size, self._buffer = _load_bgzf_block(handle, self._text)
-        except StopIteration:
-            # EOF
-            block_size = 0
-            if self._text:
-                self._buffer = ""
-            else:
-                self._buffer = b""
+        if self._threads > 1:
+            self._block_start_offset = start_offset
+            block_size, self._buffer = self._load_read_ahead_block(start_offset)
+        else:
+            handle = self._handle
+            if start_offset is not None:
+                handle.seek(start_offset)
+            self._block_start_offset = handle.tell()
+            try:
+                block_size, self._buffer = _load_bgzf_block(handle, self._text)
+            except StopIteration:
+                # EOF
+                block_size = 0
+                if self._text:
+                    self._buffer = ""
+                else:
+                    self._buffer = b""
         self._within_block_offset = 0
         self._block_raw_length = block_size
         # Finally save the block in our cache,
         self._buffers[self._block_start_offset] = self._buffer, block_size
 
+    def _load_read_ahead_block(self, start_offset):
+        """Get a block via the worker threads, and queue up the next ones (PRIVATE).
+
+        Returns the block size and the decompressed data, which is empty
+        (with a block size of zero) at the end of the file.
+        """
+        pending = self._pending
+        # Sequential reading means the block wanted is at the front of the
+        # queue. Otherwise (random access) everything read ahead is useless:
+        while pending and pending[0][0] != start_offset:
+            pending.popleft()
+        if not pending:
+            self._read_ahead_offset = start_offset
+        if self._read_ahead_offset is not None \
+        and len(pending) < self._max_pending:
+            # Only reading the raw blocks is done on this thread
+            handle = self._handle
+            handle.seek(self._read_ahead_offset)
+            if self._pool is None:
+                from multiprocessing.pool import ThreadPool
+                self._pool = ThreadPool(self._threads)
+            while len(pending) < self._max_pending:
+                offset = handle.tell()
+                try:
+                    block_size, deflated, crc, size = _read_bgzf_block(handle)
+                except StopIteration:
+                    # EOF, nothing more to read ahead
+                    self._read_ahead_offset = None
+                    break
+                result = self._pool.apply_async(_inflate_bgzf_block,
+                                                (deflated, crc, size, self._text))
+                pending.append((offset, block_size, result))
+            else:
+                self._read_ahead_offset = handle.tell()
+        if not pending:
+            # EOF, the worker threads are no longer needed
+            self._close_pool()
+            if self._text:
+                return 0, ""
+            else:
+                return 0, b""
+        offset, block_size, result = pending.popleft()
+        assert offset == start_offset
+        return block_size, result.get()
+
     def tell(self):
         """Returns a 64-bit unsigned BGZF virtual offset."""
         if 0 < self._within_block_offset == len(self._buffer):
@@ -621,6 +910,36 @@ class BgzfReader(object):
         #       self.tell(), self._block_start_offset, self._within_block_offset)
         return virtual_offset
 
+    def seek_uncompressed(self, offset):
+        """Seek to an offset in the decompressed data, using the .gzi index.
+
+        Returns the equivalent 64-bit unsigned BGZF virtual offset. This
+        requires the reader was created with a block offset index (the
+        gzi argument).
+        """
+        if self._gzi_raw_starts is None:
+            raise ValueError("Need a .gzi block offset index (gzi argument) "
+                             "to seek to an uncompressed offset")
+        if offset < 0:
+            raise ValueError("Require a non-negative offset, got %i" % offset)
+        # Want the last block starting at or before this offset (if there
+        # are empty blocks, this means the non-empty one after them)
+        i = bisect_right(self._gzi_data_starts, offset) - 1
+        return self.seek(make_virtual_offset(self._gzi_raw_starts[i],
+                                             offset - self._gzi_data_starts[i]))
+
+    def tell_uncompressed(self):
+        """Returns the current offset in the decompressed data, using the .gzi index."""
+        if self._gzi_raw_starts is None:
+            raise ValueError("Need a .gzi block offset index (gzi argument) "
+                             "to give an uncompressed offset")
+        try:
+            data_start = self._gzi_lookup[self._block_start_offset]
+        except KeyError:
+            raise ValueError("BGZF block at %i is not in the .gzi index"
+                             % self._block_start_offset)
+        return data_start + self._within_block_offset
+
     def read(self, size=-1):
         if size < 0:
             raise NotImplementedError("Don't be greedy, that could be massive!")
@@ -692,6 +1011,7 @@ class BgzfReader(object):
         return self
 
     def close(self):
+        self._close_pool()
         self._handle.close()
         self._buffer = None
         self._block_start_offset = None
@@ -712,10 +1032,37 @@ class BgzfReader(object):
     def __exit__(self, type, value, traceback):
         self.close()
 
+    def __del__(self):
+        # Don't leave the worker threads running if never closed
+        if getattr(self, "_pool", None) is not None:
+            self._close_pool()
+
 
 class BgzfWriter(object):
+    """BGZF writer, acts like a write only handle but tell differs.
+
+    The tell method returns a BGZF 64-bit virtual offset (see the
+    BgzfReader class and the module documentation).
+
+    Compression is normally done one block at a time on the calling
+    thread. You can use the threads argument to compress the blocks
+    in a pool of worker threads instead (the zlib library releases
+    the GIL while compressing), with the compressed blocks written to
+    the file in the original order. The output is identical either way.
+    The worker threads are started when the first block is compressed,
+    and stopped by the close method (or if the writer is deleted without
+    being closed, although any data not yet written is then lost).
+
+    Calling tell must wait for any pending blocks to be compressed (it
+    needs their compressed sizes to work out the virtual offset), so
+    calling it very often (e.g. after every record while building an
+    index) limits how much work can be done in parallel.
+    """
 
-    def __init__(self, filename=None, mode="w", fileobj=None, compresslevel=6):
+    def __init__(self, filename=None, mode="w", fileobj=None, compresslevel=6,
+                 threads=1):
+        if threads < 1:
+            raise ValueError("Use threads with a minimum of 1")
         if fileobj:
             assert filename is None
             handle = fileobj
@@ -731,39 +1078,47 @@ class BgzfWriter(object):
         self._handle = handle
         self._buffer = b""
         self.compresslevel = compresslevel
+        self._threads = threads
+        # Pool of worker threads, started when first needed
+        self._pool = None
+        if threads > 1:
+            from collections import deque
+            # Pending compressed blocks, in the order they must be written
+            self._pending = deque()
+            self._max_pending = 2 * threads
+
+    def _close_pool(self):
+        """Stop any worker threads (PRIVATE)."""
+        if self._pool is not None:
+            self._pool.terminate()
+            # Wait for the threads to finish
+            self._pool.join()
+            self._pool = None
 
     def _write_block(self, block):
         #print("Saving %i bytes" % len(block))
-        start_offset = self._handle.tell()
         assert len(block) <= 65536
-        # Giving a negative window bits means no gzip/zlib headers, -15 used in samtools
-        c = zlib.compressobj(self.compresslevel,
-                             zlib.DEFLATED,
-                             -15,
-                             zlib.DEF_MEM_LEVEL,
-                             0)
-        compressed = c.compress(block) + c.flush()
-        del c
-        assert len(compressed) < 65536, "TODO - Didn't compress enough, try less data in this block"
-        crc = zlib.crc32(block)
-        # Should cope with a mix of Python platforms...
-        if crc < 0:
-            crc = struct.pack("<i", crc)
-        else:
-            crc = struct.pack("<I", crc)
-        bsize = struct.pack("<H", len(compressed) + 25)  # includes -1
-        crc = struct.pack("<I", zlib.crc32(block) & 0xffffffff)
-        uncompressed_length = struct.pack("<I", len(block))
-        # Fixed 16 bytes,
-        # gzip magic bytes (4) mod time (4),
-        # gzip flag (1), os (1), extra length which is six (2),
-        # sub field which is BC (2), sub field length of two (2),
-        # Variable data,
-        # 2 bytes: block length as BC sub field (2)
-        # X bytes: the data
-        # 8 bytes: crc (4), uncompressed data length (4)
-        data = _bgzf_header + bsize + compressed + crc + uncompressed_length
-        self._handle.write(data)
+        if self._threads == 1:
+            self._handle.write(_compress_bgzf_block(block, self.compresslevel))
+            return
+        if self._pool is None:
+            from multiprocessing.pool import ThreadPool
+            self._pool = ThreadPool(self._threads)
+        pending = self._pending
+        pending.append(self._pool.apply_async(_compress_bgzf_block,
+                                              (block, self.compresslevel)))
+        # Write out any finished blocks, in order, without letting
+        # too many blocks pile up in memory waiting to be written
+        while pending and (pending[0].ready()
+                           or len(pending) > self._max_pending):
+            self._handle.write(pending.popleft().get())
+
+    def _write_pending(self):
+        """Wait for and write out any blocks still being compressed (PRIVATE)."""
+        if self._threads > 1:
+            pending = self._pending
+            while pending:
+                self._handle.write(pending.popleft().get())
 
     def write(self, data):
         # TODO - Check bytes vs unicode
@@ -787,12 +1142,15 @@ class BgzfWriter(object):
             self._buffer = self._buffer[65535:]
         self._write_block(self._buffer)
         self._buffer = b""
+        self._write_pending()
         self._handle.flush()
 
     def close(self):
         """Flush data, write 28 bytes empty BGZF EOF marker, and close the BGZF file."""
         if self._buffer:
             self.flush()
+        self._write_pending()
+        self._close_pool()
         # samtools will look for a magic EOF marker, just a 28 byte empty BGZF block,
         # and if it is missing warns the BAM file may be truncated. In addition to
         # samtools writing this block, so too does bgzip - so we should too.
@@ -801,8 +1159,16 @@ class BgzfWriter(object):
         self._handle.close()
 
     def tell(self):
-        """Returns a BGZF 64-bit virtual offset."""
-        return make_virtual_offset(self._handle.tell(), len(self._buffer))
+        """Returns a BGZF 64-bit virtual offset.
+
+        With worker threads, this waits until the blocks already submitted
+        have been compressed (to get their sizes), but leaves them queued
+        to be written out as usual.
+        """
+        offset = self._handle.tell()
+        if self._threads > 1:
+            offset += sum(len(result.get()) for result in self._pending)
+        return make_virtual_offset(offset, len(self._buffer))
 
     def seekable(self):
         # Not seekable, but we do support tell...
@@ -820,6 +1186,11 @@ class BgzfWriter(object):
     def __exit__(self, type, value, traceback):
         self.close()
 
+    def __del__(self):
+        # Don't leave the worker threads running if never closed
+        if getattr(self, "_pool", None) is not None:
+            self._close_pool()
+
 
 if __name__ == "__main__":
     import sys
@@ -0,0 +1,346 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+"""Random access to FASTA files using a samtools style faidx index (.fai).
+
+The Bio.SeqIO.index(...) function lets you access the records in a FASTA
+file by identifier, but each record is parsed in full. For large records
+like chromosomes where you only want a small region, this is wasteful.
+
+The samtools faidx index records for each FASTA record its name, the
+sequence length, the offset of the first base in the file, the number
+of bases per line, and the number of bytes per line (including the new
+line characters). Provided all the sequence lines of a record (except
+the last) are the same length, this is enough to work out where any
+region of the sequence is stored in the file, and read just that part.
+
+The index is a simple tab separated plain text file, usually given the
+FASTA filename plus the extension ".fai":
+
+>>> from Bio.faidx import make_fai_index
+>>> with open("GenBank/NC_005816.fna", "rb") as handle:
+...     for name, length, offset, line_bases, line_width in make_fai_index(handle):
+...         print("%s %i %i %i %i" % (name, length, offset, line_bases, line_width))
+gi|45478711|ref|NC_005816.1| 9609 106 70 71
+
+This is used by the IndexedFasta class, which acts like a read only
+dictionary of lazy sequence objects. Slicing these reads only the
+region requested from the file:
+
+>>> from Bio.faidx import IndexedFasta
+>>> fasta = IndexedFasta("GenBank/NC_005816.fna")
+>>> len(fasta)
+1
+>>> seq = fasta["gi|45478711|ref|NC_005816.1|"]
+>>> len(seq)
+9609
+>>> print(seq[65:75])
+TCTCCTGATT
+>>> fasta.close()
+
+BGZF compressed FASTA files (e.g. from the bgzip tool) are also supported,
+in which case the offsets in the .fai index refer to the decompressed data
+(as in samtools), and the BGZF block offset index (.gzi file, see the
+Bio.bgzf module) is used to jump to the right part of the file.
+"""
+
+from __future__ import print_function
+
+import os
+
+from Bio._py3k import _as_bytes, _bytes_to_string
+from Bio._py3k import open as _open
+
+from Bio import bgzf
+from Bio.Alphabet import single_letter_alphabet
+from Bio.Seq import Seq
+
+_gt_char = _as_bytes(">")
+_new_lines = _as_bytes("\r\n")
+
+
+def make_fai_index(handle):
+    """Build a samtools style faidx index for a FASTA file.
+
+    Expects a handle giving the (decompressed) FASTA file contents as bytes,
+    e.g. a file opened in binary mode or a Bio.bgzf.BgzfReader in binary
+    mode. Returns a list of (name, length, offset, line bases, line width)
+    tuples, one for each record, where the name is the first word of the
+    title line and the offset is that of the first base in the decompressed
+    data (as in samtools).
+
+    Within each record every sequence line except the last must be the
+    same length, otherwise a ValueError is raised:
+
+    >>> from io import BytesIO
+    >>> make_fai_index(BytesIO(b">alpha first\\nACGT\\nACGT\\nAC\\n>beta\\nAAA\\n"))
+    [('alpha', 10, 13, 4, 5), ('beta', 3, 32, 3, 4)]
+    >>> make_fai_index(BytesIO(b">alpha\\nACGT\\nAC\\nACGT\\n"))
+    Traceback (most recent call last):
+    ...
+    ValueError: Different line length in sequence 'alpha'
+
+    """
+    index = []
+    names = set()
+    name = None
+    position = 0
+    for line in handle:
+        if line[:1] == _gt_char:
+            if name is not None:
+                index.append((name, length, offset, line_bases, line_width))
+            try:
+                name = _bytes_to_string(line[1:].split(None, 1)[0])
+            except IndexError:
+                raise ValueError("Missing name in FASTA title line at "
+                                 "offset %i" % position)
+            if name in names:
+                raise ValueError("Duplicate name %r" % name)
+            names.add(name)
+            length = 0
+            offset = position + len(line)
+            line_bases = line_width = 0
+            short_line = False
+        elif name is None:
+            if line.strip():
+                raise ValueError("Expected FASTA record starting '>', "
+                                 "not %r" % line)
+        else:
+            bases = len(line.rstrip(_new_lines))
+            if not line_bases:
+                line_bases = bases
+                line_width = len(line)
+            elif short_line and bases:
+                # Only the last line can be shorter
+                raise ValueError("Different line length in sequence %r"
+                                 % name)
+            elif bases > line_bases:
+                raise ValueError("Different line length in sequence %r"
+                                 % name)
+            if bases < line_bases or len(line) != line_width:
+                short_line = True
+            length += bases
+        position += len(line)
+    if name is not None:
+        index.append((name, length, offset, line_bases, line_width))
+    return index
+
+
+def write_fai_index(handle, index):
+    """Write a list of faidx entries as a samtools style .fai file.
+
+    Expects a handle opened in text write mode, and a list of (name,
+    length, offset, line bases, line width) tuples as from make_fai_index.
+    """
+    for values in index:
+        handle.write("%s\t%i\t%i\t%i\t%i\n" % values)
+
+
+def read_fai_index(handle):
+    """Load a samtools style .fai index file as a list of faidx entries.
+
+    Expects a handle opened in text read mode, returns a list of (name,
+    length, offset, line bases, line width) tuples as from make_fai_index.
+    Any additional columns (as used by samtools for FASTQ files) are
+    ignored.
+    """
+    index = []
+    for line in handle:
+        if not line.strip():
+            continue
+        parts = line.rstrip("\r\n").split("\t")
+        if len(parts) < 5:
+            raise ValueError("Expected at least five tab separated columns "
+                             "in .fai index, not %r" % line)
+        index.append((parts[0],) + tuple(int(v) for v in parts[1:5]))
+    return index
+
+
+class IndexedFasta(object):
+    """Read only dictionary like access to a FASTA file via a faidx index.
+
+    Arguments:
+     - filename - FASTA file (plain text, or BGZF compressed)
+     - fai      - Optional filename of the .fai index, by default the
+                  FASTA filename plus ".fai". If this file does not exist
+                  the index is built in memory (see write_fai_index if
+                  you want to save it).
+     - gzi      - Optional filename of the .gzi index for BGZF compressed
+                  files, by default the FASTA filename plus ".gzi". If this
+                  file does not exist the block offsets are found by
+                  reading the BGZF block headers.
+     - alphabet - Optional alphabet for the sequence objects.
+
+    The keys are the record names (the first word of the title line), and
+    the values are IndexedFastaSeq objects which only read the sequence
+    from the file when needed.
+    """
+
+    def __init__(self, filename, fai=None, gzi=None,
+                 alphabet=single_letter_alphabet):
+        self._filename = filename
+        self.alphabet = alphabet
+        if fai is None:
+            fai = filename + ".fai"
+            if not os.path.isfile(fai):
+                fai = None
+        handle = _open(filename, "rb")
+        if handle.read(4) == bgzf._bgzf_magic:
+            # BGZF compressed, need the block offsets to map the
+            # decompressed offsets in the .fai index to virtual offsets
+            if gzi is None:
+                gzi = filename + ".gzi"
+                if not os.path.isfile(gzi):
+                    handle.seek(0)
+                    gzi = bgzf.make_gzi_index(handle)
+            handle.close()
+            handle = bgzf.BgzfReader(filename, "rb", gzi=gzi)
+            self._seek = handle.seek_uncompressed
+        else:
+            self._seek = handle.seek
+        handle.seek(0)
+        self._handle = handle
+        if fai is None:
+            index = make_fai_index(handle)
+        else:
+            with _open(fai, "r") as fai_handle:
+                index = read_fai_index(fai_handle)
+        self._names = [values[0] for values in index]
+        self._index = dict((values[0], values) for values in index)
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, self._filename)
+
+    def __len__(self):
+        """How many records are there?"""
+        return len(self._names)
+
+    def __iter__(self):
+        """Iterate over the record names (in file order)."""
+        return iter(self._names)
+
+    def keys(self):
+        """List of the record names (in file order)."""
+        return list(self._names)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __getitem__(self, name):
+        """Returns a lazy IndexedFastaSeq object for the named record."""
+        length = self._index[name][1]
+        return IndexedFastaSeq(self, name, length, self.alphabet)
+
+    def get_length(self, name):
+        """Returns the sequence length of the named record (from the index)."""
+        return self._index[name][1]
+
+    def fetch(self, name, start=0, end=None):
+        """Returns the sequence region [start:end] of the named record as a string.
+
+        The start and end are Python style (zero based, end exclusive),
+        and are limited to the length of the sequence. Only the region
+        requested is read from the file.
+        """
+        name, length, offset, line_bases, line_width = self._index[name]
+        if end is None or end > length:
+            end = length
+        start = max(0, start)
+        if start >= end:
+            return ""
+        # Where in the (decompressed) file are the first and last bases?
+        raw_start = offset + (start // line_bases) * line_width \
+            + start % line_bases
+        raw_end = offset + ((end - 1) // line_bases) * line_width \
+            + (end - 1) % line_bases + 1
+        self._seek(raw_start)
+        data = self._handle.read(raw_end - raw_start)
+        data = _bytes_to_string(data).replace("\n", "").replace("\r", "")
+        if len(data) != end - start:
+            raise ValueError("Expected %i bases of %r, got %i; is the "
+                             ".fai index out of date?"
+                             % (end - start, name, len(data)))
+        return data
+
+    def close(self):
+        """Close the file handle being used to read the data."""
+        self._handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+
+class IndexedFastaSeq(Seq):
+    """A read only sequence object backed by a FASTA file with a faidx index.
+
+    You are expected to get these from an IndexedFasta object, rather than
+    creating them directly. Taking a slice reads only that part of the
+    FASTA file, and returns an ordinary Seq object:
+
+    >>> from Bio.faidx import IndexedFasta
+    >>> with IndexedFasta("GenBank/NC_005816.ffn") as fasta:
+    ...     seq = fasta["ref|NC_005816.1|:87-1109"]
+    ...     print(repr(seq))
+    ...     print(seq[:12])
+    ...     print(seq[-3:])
+    ...     print(seq[2])
+    ...     print(seq[:12].translate())
+    IndexedFastaSeq('ref|NC_005816.1|:87-1109', length=1023, alphabet=SingleLetterAlphabet())
+    ATGGTCACTTTT
+    TGA
+    G
+    MVTF
+
+    Any other operation (such as the translate method) will read the full
+    sequence from the file each time (it is not cached), so for repeated
+    use of a large region it is better to take a slice first.
+    """
+
+    def __init__(self, fasta, name, length, alphabet=single_letter_alphabet):
+        self._fasta = fasta
+        self._name = name
+        self._length = length
+        self.alphabet = alphabet
+
+    @property
+    def _data(self):
+        """The full sequence as a string, read from the file (PRIVATE)."""
+        return self._fasta.fetch(self._name, 0, self._length)
+
+    def __repr__(self):
+        return "%s(%r, length=%i, alphabet=%r)" \
+            % (self.__class__.__name__, self._name, self._length,
+               self.alphabet)
+
+    def __len__(self):
+        """Returns the sequence length (from the index)."""
+        return self._length
+
+    def __getitem__(self, index):
+        """Returns a single letter, or a subsequence as a Seq object."""
+        if isinstance(index, int):
+            if index < 0:
+                index += self._length
+            if index < 0 or index >= self._length:
+                raise IndexError("sequence index out of range")
+            return self._fasta.fetch(self._name, index, index + 1)
+        start, stop, step = index.indices(self._length)
+        if step == 1:
+            data = self._fasta.fetch(self._name, start, stop)
+        elif step > 0:
+            data = self._fasta.fetch(self._name, start, stop)[::step]
+        elif start <= stop:
+            data = ""
+        else:
+            # Read the region forwards, then go backwards through it
+            data = self._fasta.fetch(self._name, stop + 1, start + 1)
+            data = data[::-1][::-step]
+        return Seq(data, self.alphabet)
+
+
+if __name__ == "__main__":
+    from Bio._utils import run_doctest
+    run_doctest()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+"""Small script to estimate the memory used per SeqFeature when parsing.
+
+Usage: feature_memory.py [filename [format [repeats]]]
+
+Defaults to the GenBank file Tests/GenBank/NC_000932.gb loaded 20 times.
+Needs Python 3.4 or later for the tracemalloc module.
+"""
+from __future__ import print_function
+
+import gc
+import os
+import sys
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    sys.exit("This script needs the tracemalloc module (Python 3.4+)")
+
+from Bio import SeqIO
+
+if len(sys.argv) > 1:
+    filename = sys.argv[1]
+else:
+    filename = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "..", "..", "Tests", "GenBank", "NC_000932.gb")
+format = sys.argv[2] if len(sys.argv) > 2 else "genbank"
+repeats = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+gc.collect()
+tracemalloc.start()
+start_time = time.time()
+records = [record for i in range(repeats)
+           for record in SeqIO.parse(filename, format)]
+elapsed_time = time.time() - start_time
+current, peak = tracemalloc.get_traced_memory()
+tracemalloc.stop()
+
+num_features = sum(len(record.features) for record in records)
+num_letters = sum(len(record.seq) for record in records)
+print("Parsed %i records with %i features in %0.2f seconds"
+      % (len(records), num_features, elapsed_time))
+print("Memory in use %i KB, peak %i KB" % (current // 1024, peak // 1024))
+if num_features:
+    print("About %i bytes per feature (excluding the sequences)"
+          % ((current - num_letters) // num_features))
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""Small script to compare the speed of reading and writing GenBank/EMBL files.
+
+Usage: insdc_write.py [filename [copies]]
+
+Defaults to making a large annotated record from 30 copies of the features
+in Tests/GenBank/NC_000932.gb, with a random sequence of the same total
+length (about 4.6 Mbp, similar to a bacterial chromosome). This is written
+out as GenBank and EMBL to a temporary file, and parsed back in again.
+"""
+from __future__ import print_function
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from Bio import SeqIO
+from Bio.Seq import Seq
+
+if len(sys.argv) > 1:
+    filename = sys.argv[1]
+else:
+    filename = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "..", "..", "Tests", "GenBank", "NC_000932.gb")
+copies = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+
+record = SeqIO.read(filename, "genbank")
+length = len(record)
+random.seed(2014)
+big = record[:]
+big.seq = Seq("".join(random.choice("ACGT") for i in range(length * copies)),
+              record.seq.alphabet)
+big.features = [f._shift(i * length) for i in range(copies)
+                for f in record.features]
+big.annotations = record.annotations
+print("Record of %i bp with %i features" % (len(big), len(big.features)))
+
+handle, temp_filename = tempfile.mkstemp()
+os.close(handle)
+try:
+    for format in ["genbank", "embl"]:
+        start_time = time.time()
+        SeqIO.write(big, temp_filename, format)
+        write_time = time.time() - start_time
+        size = os.path.getsize(temp_filename) / 1024.0 / 1024.0
+
+        start_time = time.time()
+        SeqIO.read(temp_filename, format)
+        read_time = time.time() - start_time
+
+        print("%s (%0.1f MB):" % (format, size))
+        print("\tWriting took %0.2f seconds, %0.1f MB per second"
+              % (write_time, size / write_time))
+        print("\tReading took %0.2f seconds, %0.1f MB per second"
+              % (read_time, size / read_time))
+finally:
+    os.remove(temp_filename)
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+"""Small script to compare the speed of the PDB parser with and without fast mode.
+
+Usage: pdb_parse.py [filename [repeats]]
+
+Defaults to parsing Tests/PDB/2XHE.pdb (which has ANISOU records for every
+atom) ten times with each mode, and checks the structures have the same
+atoms and coordinates.
+"""
+from __future__ import print_function
+
+import os
+import sys
+import time
+
+from Bio.PDB import PDBParser
+
+if len(sys.argv) > 1:
+    filename = sys.argv[1]
+else:
+    filename = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "..", "..", "Tests", "PDB", "2XHE.pdb")
+repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+coords = []
+for fast in [False, True]:
+    parser = PDBParser(QUIET=True, fast=fast)
+    start_time = time.time()
+    for i in range(repeats):
+        structure = parser.get_structure("X", filename)
+    parse_time = (time.time() - start_time) / repeats
+    coords.append([(atom.get_full_id(), atom.get_coord().tolist())
+                   for atom in structure.get_atoms()])
+    print("fast=%s: %i atoms, %0.3f seconds per parse"
+          % (fast, len(coords[-1]), parse_time))
+assert coords[0] == coords[1], "Fast mode gave different coordinates!"
@@ -90,6 +90,7 @@ DOCTEST_MODULES = [
                    "Bio.Alphabet",
                    "Bio.Application",
                    "Bio.bgzf",
+                   "Bio.faidx",
                    "Bio.CodonAlign",
                    "Bio.Blast.Applications",
                    "Bio.Emboss.Applications",
@@ -134,8 +135,14 @@ DOCTEST_MODULES = [
 if is_numpy():
     DOCTEST_MODULES.extend(["Bio.Affy.CelFile",
                             "Bio.Statistics.lowess",
+                            "Bio.PackedSeq",
+                            "Bio.PDB.AtomArray",
+                            "Bio.PDB.MMCIF2Dict",
                             "Bio.PDB.Polypeptide",
-                            "Bio.PDB.Selection"
+                            "Bio.PDB.Selection",
+                            "Bio.PDB.StructureCache",
+                            "Bio.SeqUtils.Kmers",
+                            "Bio.SeqUtils.SlidingWindow"
                             ])
 
 
@@ -17,6 +17,65 @@ class GenBankTests(unittest.TestCase):
                              'genbank')
         self.assertRaises(ValueError, parse_invalid_product_line)
 
+    def test_invalid_product_line_lazy(self):
+        "Test lazy GenBank parsing raises ValueError when features are used"
+        rec = SeqIO.read(path.join('GenBank', 'invalid_product.gb'),
+                         'genbank', lazy_features=True)
+        self.assertEqual(len(rec), 6497)
+        self.assertRaises(ValueError, getattr, rec, "features")
+
+
+class LazyFeatureTests(unittest.TestCase):
+    """Compare lazy and feature type filtered parsing to the default."""
+
+    def compare(self, filename, format, feature_types=None):
+        def summary(feature):
+            return (feature.type, feature.id, repr(feature.location),
+                    sorted(feature.qualifiers.items()))
+        records = list(SeqIO.parse(filename, format))
+        for lazy in [False, True]:
+            parsed = list(SeqIO.parse(filename, format, lazy_features=lazy,
+                                      feature_types=feature_types))
+            self.assertEqual(len(records), len(parsed))
+            for old, new in zip(records, parsed):
+                self.assertEqual(old.id, new.id)
+                self.assertEqual(str(old.seq), str(new.seq))
+                self.assertEqual(sorted(old.annotations),
+                                 sorted(new.annotations))
+                if lazy:
+                    self.assertTrue(new._feature_loader is not None)
+                expected = [summary(f) for f in old.features
+                            if feature_types is None or f.type in feature_types]
+                self.assertEqual(expected, [summary(f) for f in new.features])
+                self.assertTrue(new._feature_loader is None)
+
+    def test_genbank(self):
+        "Lazy parsing of GenBank files"
+        for filename in ["cor6_6.gb", "NC_005816.gb", "protein_refseq2.gb"]:
+            self.compare(path.join('GenBank', filename), 'genbank')
+            self.compare(path.join('GenBank', filename), 'genbank', ['CDS'])
+
+    def test_embl(self):
+        "Lazy parsing of EMBL and IMGT files"
+        for filename in ["TRBG361.embl", "location_wrap.embl",
+                         "Human_contigs.embl", "patents.embl"]:
+            self.compare(path.join('EMBL', filename), 'embl')
+            self.compare(path.join('EMBL', filename), 'embl',
+                         ['CDS', 'source'])
+        self.compare(path.join('EMBL', 'A04195.imgt'), 'imgt')
+        self.compare(path.join('EMBL', 'A04195.imgt'), 'imgt', ['CDS'])
+
+    def test_slice_and_set(self):
+        "Slicing or replacing lazily parsed features"
+        filename = path.join('GenBank', 'NC_005816.gb')
+        record = SeqIO.read(filename, 'genbank')
+        lazy = SeqIO.read(filename, 'genbank', lazy_features=True)
+        self.assertEqual([str(f.location) for f in record[1000:5000].features],
+                         [str(f.location) for f in lazy[1000:5000].features])
+        lazy = SeqIO.read(filename, 'genbank', lazy_features=True)
+        lazy.features = []
+        self.assertEqual(lazy.features, [])
+
 
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
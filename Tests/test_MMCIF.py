@@ -28,6 +28,9 @@ from Bio.PDB.PDBExceptions import PDBConstructionException, PDBConstructionWarni
 
 from Bio.PDB import PPBuilder, CaPPBuilder
 from Bio.PDB.MMCIFParser import MMCIFParser
+from Bio.PDB import MMCIF2Dict as MMCIF2DictModule
+from Bio.PDB.MMCIF2Dict import MMCIF2Dict, parse_categories
+from Bio._py3k import StringIO
 
 
 class ParseReal(unittest.TestCase):
@@ -127,6 +130,76 @@ class ParseReal(unittest.TestCase):
                 self.assertEqual("MKPVTLYDVAEYAGVSYQTVSRVVNQASHVSAKTREKVEAAMAELNYIPNR",
                                  str(s))
 
+
+class ParseCategories(unittest.TestCase):
+    """Testing the streaming mmCIF reader."""
+
+    def test_selected(self):
+        """Read selected categories, with typed columns."""
+        dtypes = {"_atom_site.Cartn_x": float, "_atom_site.id": int,
+                  "_atom_site.pdbx_formal_charge": float}
+        results = list(parse_categories("PDB/1LCD.cif",
+                                        ["_atom_site", "_cell"], dtypes))
+        self.assertEqual([c for c, items in results], ["_cell", "_atom_site"])
+        mmcif_dict = MMCIF2Dict("PDB/1LCD.cif")
+        cell, atom_site = results[0][1], results[1][1]
+        self.assertEqual(cell["_cell.length_a"],
+                         mmcif_dict["_cell.length_a"])
+        for name, values in atom_site.items():
+            if name in dtypes:
+                self.assertTrue(isinstance(values, numpy.ndarray))
+                self.assertEqual(len(values), len(mmcif_dict[name]))
+            else:
+                self.assertEqual(values, mmcif_dict[name])
+        self.assertEqual(atom_site["_atom_site.id"].dtype, int)
+        self.assertEqual(atom_site["_atom_site.id"][-1],
+                         int(mmcif_dict["_atom_site.id"][-1]))
+        self.assertEqual(atom_site["_atom_site.Cartn_x"].tolist(),
+                         [float(x) for x in mmcif_dict["_atom_site.Cartn_x"]])
+        # Null values (all ? here) become NaN
+        self.assertTrue(numpy.isnan(atom_site["_atom_site.pdbx_formal_charge"]).all())
+        # Atom names with quotes in them
+        self.assertTrue("O5'" in atom_site["_atom_site.label_atom_id"])
+
+    def test_chunks(self):
+        """Reading large loops a chunk at a time."""
+        expected = MMCIF2Dict("PDB/1A8O.cif")
+        old_size = MMCIF2DictModule._chunk_size
+        MMCIF2DictModule._chunk_size = 7
+        try:
+            self.assertEqual(MMCIF2Dict("PDB/1A8O.cif"), expected)
+            items = dict(parse_categories("PDB/1A8O.cif", ["_atom_site"],
+                {"_atom_site.B_iso_or_equiv": "f"}))["_atom_site"]
+        finally:
+            MMCIF2DictModule._chunk_size = old_size
+        self.assertEqual(items["_atom_site.B_iso_or_equiv"].tolist(),
+                         numpy.array(expected["_atom_site.B_iso_or_equiv"],
+                                     "f").tolist())
+
+    def test_tokens(self):
+        """Quoting, comments and text fields."""
+        handle = StringIO("""data_TEST
+_a.x 'it''s' _a.y "a b" # comment
+_a.z
+;some
+text
+;
+loop_
+_b.name
+_b.value
+C5' 1.5 "O5'" ?
+'N 1' 2 ;x 3
+#
+""")
+        results = list(parse_categories(handle))
+        self.assertEqual(results,
+                         [("data_", {"data_": "TEST"}),
+                          ("_a", {"_a.x": "it''s", "_a.y": "a b",
+                                  "_a.z": "sometext"}),
+                          ("_b", {"_b.name": ["C5'", "O5'", "N 1", ";x"],
+                                  "_b.value": ["1.5", "?", "2", "3"]})])
+
+
 if __name__ == '__main__':
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
@@ -35,8 +35,12 @@ from Bio.PDB import PDBParser, PPBuilder, CaPPBuilder, PDBIO, Select
 from Bio.PDB import HSExposureCA, HSExposureCB, ExposureCN
 from Bio.PDB.PDBExceptions import PDBConstructionException, PDBConstructionWarning
 from Bio.PDB import rotmat, Vector
+from Bio.PDB import AtomArray, Superimposer
 from Bio.PDB import Residue, Atom
 from Bio.PDB import make_dssp_dict
+from Bio.PDB import StructureCache
+from Bio.PDB.MMCIFParser import MMCIFParser
+from Bio.PDB.StructureCache import StructureArrays, read_structure, write_structure
 from Bio.PDB.NACCESS import process_asa_data, process_rsa_data
 
 
@@ -1060,6 +1064,378 @@ class CopyTests(unittest.TestCase):
             self.assertFalse(e.get_list()[0] is ee.get_list()[0])
 
 
+class AtomArrayTests(unittest.TestCase):
+
+    def setUp(self):
+        warnings.simplefilter('ignore', PDBConstructionWarning)
+        try:
+            self.s = PDBParser(PERMISSIVE=True).get_structure(
+                'X', "PDB/a_structure.pdb")
+        finally:
+            warnings.filters.pop()
+        self.atoms = AtomArray(self.s)
+
+    def get_all_atoms(self, entity):
+        """All atoms of an entity, including disordered alternatives."""
+        if entity.get_level() == "A":
+            if entity.is_disordered() == 2:
+                return entity.disordered_get_list()
+            return [entity]
+        atoms = []
+        for child in entity.get_list():
+            if child.get_level() == "R" and child.is_disordered() == 2:
+                for residue in child.disordered_get_list():
+                    atoms.extend(self.get_all_atoms(residue))
+            else:
+                atoms.extend(self.get_all_atoms(child))
+        return atoms
+
+    def test_arrays(self):
+        """Arrays match the atoms, and share their coordinates."""
+        atoms = self.atoms
+        self.assertEqual(len(atoms), 818)
+        self.assertEqual(atoms.coords.shape, (818, 3))
+        self.assertEqual(atoms.coords.dtype, numpy.float32)
+        self.assertEqual(set(atoms.atoms), set(self.get_all_atoms(self.s)))
+        for i, atom in enumerate(atoms.atoms):
+            self.assertTrue(numpy.all(atom.get_coord() == atoms.coords[i]))
+            self.assertAlmostEqual(atom.get_bfactor(), atoms.bfactors[i], 5)
+            self.assertEqual(atom.get_serial_number(), atoms.serial_numbers[i])
+            self.assertEqual(atom.element, atoms.elements[i])
+            self.assertEqual(atom.get_name(), atoms.names[i])
+        atoms.coords[0] = (1, 2, 3)
+        self.assertEqual(list(atoms.atoms[0].get_coord()), [1, 2, 3])
+
+    def test_atom_list(self):
+        """Pack a list of atoms, using selected alternatives."""
+        atom_list = list(self.s[1].get_atoms())
+        atoms = AtomArray(atom_list)
+        self.assertEqual(len(atoms), len(atom_list))
+        for atom, packed in zip(atom_list, atoms.atoms):
+            if atom.is_disordered() == 2:
+                self.assertTrue(packed is atom.disordered_get())
+            else:
+                self.assertTrue(packed is atom)
+        # The model's atoms now belong to the new array
+        self.assertFalse(self.atoms._linked)
+        self.assertRaises(ValueError, AtomArray, atom_list + atom_list[:1])
+
+    def test_setters(self):
+        """Atom set methods update the arrays."""
+        atom = self.atoms.atoms[10]
+        atom.set_coord(numpy.array((1.5, 2.5, 3.5)))
+        self.assertEqual(list(self.atoms.coords[10]), [1.5, 2.5, 3.5])
+        atom.set_bfactor(42.0)
+        self.assertEqual(self.atoms.bfactors[10], 42.0)
+        atom.set_occupancy(0.5)
+        self.assertEqual(self.atoms.occupancies[10], 0.5)
+        atom.set_serial_number(None)
+        self.assertEqual(self.atoms.serial_numbers[10], -1)
+        self.atoms.set_bfactors(numpy.arange(len(self.atoms)))
+        self.assertEqual(atom.get_bfactor(), 10.0)
+        self.atoms.set_occupancies(numpy.zeros(len(self.atoms)))
+        self.assertEqual(atom.get_occupancy(), 0.0)
+
+    def test_select(self):
+        """Select atoms with a boolean mask."""
+        atoms = self.atoms
+        selected = atoms.select(atoms.names == "CA")
+        self.assertTrue(selected)
+        self.assertEqual(set(a.get_name() for a in selected), set(["CA"]))
+        self.assertEqual(atoms.select([0, 2]), [atoms.atoms[0], atoms.atoms[2]])
+
+    def test_transform(self):
+        """Vectorised transforms match atom by atom transforms."""
+        rotation = rotmat(Vector(1, 3, 5), Vector(1, 0, 0))
+        translation = numpy.array((2.4, 0, 1), 'f')
+        chain = self.s[1]["A"]
+        residue = chain[10].disordered_get()
+        for entity in (self.s, self.s[1], chain, residue, self.atoms.atoms[0]):
+            all_atoms = self.get_all_atoms(entity)
+            expected = [numpy.dot(a.get_coord(), rotation) + translation
+                        for a in all_atoms]
+            entity.transform(rotation, translation)
+            for atom, coord in zip(all_atoms, expected):
+                for i in range(3):
+                    self.assertAlmostEqual(atom.get_coord()[i], coord[i], 4)
+        # Changing the chain reverts to the atom by atom route
+        self.assertFalse(chain._atom_slice is None)
+        child = residue.copy()
+        self.assertTrue(child._atom_slice is None)
+        chain.detach_child(residue.get_id())
+        self.assertTrue(chain._atom_slice is None)
+        self.assertTrue(self.s._atom_slice is None)
+        self.assertFalse(self.s[0]._atom_slice is None)
+        before = chain.get_list()[0].get_list()[0].get_coord().copy()
+        chain.transform(rotation, translation)
+        after = chain.get_list()[0].get_list()[0].get_coord()
+        expected = numpy.dot(before, rotation) + translation
+        for i in range(3):
+            self.assertAlmostEqual(after[i], expected[i], 4)
+
+    def test_transform_unpacked(self):
+        """Packed and unpacked entities move all alternatives alike."""
+        warnings.simplefilter('ignore', PDBConstructionWarning)
+        try:
+            other = PDBParser(PERMISSIVE=True).get_structure(
+                'Y', "PDB/a_structure.pdb")
+        finally:
+            warnings.filters.pop()
+        packed = self.get_all_atoms(self.s)
+        unpacked = self.get_all_atoms(other)
+        self.assertEqual(len(packed), len(unpacked))
+        self.assertTrue(any(a.is_disordered() for a in unpacked))
+        self.assertTrue(other._atom_slice is None)
+        rotation = rotmat(Vector(1, 3, 5), Vector(1, 0, 0))
+        translation = numpy.array((2.4, 0, 1), 'f')
+        self.s.transform(rotation, translation)
+        other.transform(rotation, translation)
+        for a, b in zip(packed, unpacked):
+            self.assertEqual(a.get_full_id()[1:], b.get_full_id()[1:])
+            self.assertTrue(numpy.allclose(a.get_coord(), b.get_coord(),
+                                           atol=1e-4))
+        sup = Superimposer()
+        sup.rotran = (rotation, translation)
+        sup.apply(self.s[1])
+        sup.apply(other[1])
+        for a, b in zip(packed, unpacked):
+            self.assertTrue(numpy.allclose(a.get_coord(), b.get_coord(),
+                                           atol=1e-4))
+
+    def test_copy(self):
+        """Copies of packed atoms have their own coordinates."""
+        atom = self.atoms.atoms[0]
+        copied = atom.copy()
+        copied.set_coord(numpy.array((1.0, 2.0, 3.0)))
+        self.assertFalse(numpy.all(atom.get_coord() == copied.get_coord()))
+        self.assertTrue(numpy.all(self.atoms.coords[0] == atom.get_coord()))
+
+    def test_superimposer(self):
+        """Superimpose using AtomArray objects."""
+        warnings.simplefilter('ignore', PDBConstructionWarning)
+        try:
+            other = PDBParser(PERMISSIVE=True).get_structure(
+                'Y', "PDB/a_structure.pdb")
+        finally:
+            warnings.filters.pop()
+        other.transform(rotmat(Vector(1, 3, 5), Vector(1, 0, 0)),
+                        numpy.array((2.4, 0, 1), 'f'))
+        fixed = list(self.s[1]["A"].get_atoms())
+        moving = list(other[1]["A"].get_atoms())
+        for atom in moving[::7]:
+            atom.set_coord(atom.get_coord() + 0.5)
+        sup = Superimposer()
+        sup.set_atoms(fixed, moving)
+        fixed_array = AtomArray(fixed)
+        moving_array = AtomArray(moving)
+        sup2 = Superimposer()
+        sup2.set_atoms(fixed_array, moving_array)
+        self.assertAlmostEqual(sup.rms, sup2.rms, 4)
+        sup2.apply(moving_array)
+        diff = fixed_array.coords - moving_array.coords
+        rms = numpy.sqrt((diff * diff).sum() / len(diff))
+        self.assertAlmostEqual(rms, sup.rms, 3)
+
+
+class FastParserTests(unittest.TestCase):
+    """Compare the fast mode of PDBParser with the standard parser."""
+
+    def get_atom_data(self, structure):
+        data = []
+        for model in structure:
+            data.append((model.get_id(), model.serial_num))
+            for residue in model.get_residues():
+                residues = [residue]
+                if residue.is_disordered() == 2:
+                    residues = residue.disordered_get_list()
+                for residue in residues:
+                    data.append(residue.get_full_id() + (residue.get_segid(),))
+                    for atom in residue.get_unpacked_list():
+                        data.append((atom.get_full_id(), atom.get_fullname(),
+                                     atom.get_coord().tolist(),
+                                     atom.get_bfactor(), atom.get_occupancy(),
+                                     atom.get_serial_number(), atom.element,
+                                     atom.get_parent() is residue,
+                                     atom.get_anisou() is None or
+                                     atom.get_anisou().tolist()))
+        return data
+
+    def compare(self, filename):
+        results = []
+        for fast in (False, True):
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always", PDBConstructionWarning)
+                parser = PDBParser(PERMISSIVE=True, fast=fast)
+                structure = parser.get_structure("X", filename)
+            results.append((self.get_atom_data(structure), parser.trailer,
+                            parser.line_counter,
+                            [str(w.message) for w in caught]))
+        self.assertEqual(results[0], results[1])
+        return structure
+
+    def test_disordered(self):
+        """Fast parsing of disordered atoms and residues."""
+        structure = self.compare("PDB/a_structure.pdb")
+        self.assertEqual(len(structure), 2)
+
+    def test_anisou(self):
+        """Fast parsing with ANISOU records."""
+        structure = self.compare("PDB/2XHE.pdb")
+        atoms = list(structure.get_atoms())
+        self.assertTrue(atoms[0].get_anisou() is not None)
+        # The coordinates are all views of a single array
+        self.assertTrue(atoms[0].get_coord().base is atoms[-1].get_coord().base)
+
+    def test_missing_occupancy(self):
+        """Fast parsing falls back on the standard parser for blank fields."""
+        self.compare("PDB/occupancy.pdb")
+
+    def test_other_files(self):
+        """Fast parsing of other example PDB files."""
+        for filename in ["1A8O.pdb", "1MOT.pdb", "2BEG.pdb", "ions.pdb"]:
+            self.compare(os.path.join("PDB", filename))
+
+
+class StructureCacheTests(unittest.TestCase):
+    """Save structures to binary cache files and load them back."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "test.structure")
+
+    def tearDown(self):
+        for filename in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, filename))
+        os.rmdir(self.directory)
+
+    def get_data(self, entity):
+        """Nested lists describing the entity and its children."""
+        if entity.level == "A":
+            return (entity.get_full_id(), entity.get_fullname(),
+                    entity.get_coord().tolist(), entity.get_bfactor(),
+                    entity.get_occupancy(), entity.get_altloc(),
+                    entity.get_serial_number(), entity.element,
+                    entity.get_parent().get_id(),
+                    [None if array is None else array.tolist() for array in
+                     (entity.anisou_array, entity.siguij_array,
+                      entity.sigatm_array)])
+        if entity.level in "RA" and entity.is_disordered() == 2:
+            selected = entity.disordered_get()
+            return [(child is selected, self.get_data(child))
+                    for child in entity.disordered_get_list()]
+        data = [entity.get_full_id(), getattr(entity, "resname", None),
+                getattr(entity, "segid", None),
+                getattr(entity, "disordered", None)]
+        return data + [self.get_data(child) for child in entity]
+
+    def compare(self, structure):
+        write_structure(structure, self.filename)
+        loaded = read_structure(self.filename)
+        self.assertEqual(self.get_data(structure), self.get_data(loaded))
+        self.assertEqual(structure.header, loaded.header)
+        return loaded
+
+    def test_disordered(self):
+        """Disordered atoms and residues keep their selected children."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", PDBConstructionWarning)
+            structure = PDBParser().get_structure("X", "PDB/a_structure.pdb")
+        chain = structure[1]["A"]
+        chain[10].disordered_select("GLY")
+        chain[3]["N"].disordered_select(" ")
+        loaded = self.compare(structure)
+        chain = loaded[1]["A"]
+        self.assertEqual(chain[10].get_resname(), "GLY")
+        self.assertEqual(chain[3]["N"].get_altloc(), " ")
+
+    def test_anisou(self):
+        """Anisotropic B factors are saved, and coordinates are writable."""
+        structure = PDBParser().get_structure("2XHE", "PDB/2XHE.pdb")
+        loaded = self.compare(structure)
+        atom = next(loaded.get_atoms())
+        self.assertTrue(atom.get_anisou() is not None)
+        atom.get_coord()[:] = 0.0
+        loaded.transform(numpy.identity(3), numpy.array([1.0, 2.0, 3.0]))
+        self.assertEqual(atom.get_coord().tolist(), [1.0, 2.0, 3.0])
+
+    def test_arrays(self):
+        """Lazy view of the arrays in a cache file."""
+        structure = PDBParser().get_structure("1MOT", "PDB/1MOT.pdb")
+        write_structure(structure, self.filename)
+        for mmap in (True, False):
+            arrays = StructureArrays(self.filename, mmap)
+            atoms = AtomArray(structure)
+            self.assertEqual(len(arrays), len(atoms))
+            self.assertTrue(numpy.all(arrays.coords == atoms.coords))
+            self.assertEqual(arrays.names.tolist(), atoms.names.tolist())
+            self.assertEqual(arrays.model_ids.tolist(), list(range(20)))
+            self.assertTrue(arrays.anisou is None)
+            self.assertEqual(len(arrays.residue_atoms),
+                             len(arrays.residue_names) + 1)
+        del arrays
+
+    def test_mmcif(self):
+        """Save and load a structure from an mmCIF file."""
+        self.compare(MMCIFParser().get_structure("1LCD", "PDB/1LCD.cif"))
+
+    def test_non_ascii(self):
+        """Names which are not ASCII are saved."""
+        structure = PDBParser().get_structure("1A8O", "PDB/1A8O.pdb")
+        residue = structure[0]["A"][152]
+        atom = residue["CA"]
+        residue.detach_child("CA")
+        atom.name = atom.id = "C\xc5"
+        atom.fullname = " C\xc5 "
+        residue.add(atom)
+        residue.resname = "\xc5SP"
+        loaded = self.compare(structure)
+        self.assertEqual(loaded[0]["A"][152]["C\xc5"].get_fullname(), " C\xc5 ")
+        self.assertEqual(loaded[0]["A"][152].get_resname(), "\xc5SP")
+
+    def test_bad_file(self):
+        """Reading a file which is not a cache file."""
+        self.assertRaises(ValueError, StructureArrays, "PDB/1A8O.pdb")
+
+    def test_cache(self):
+        """Directory of cache files, updated when the file changes."""
+        pdb_filename = os.path.join(self.directory, "1A8O.pdb")
+        with open("PDB/1A8O.pdb") as handle:
+            lines = handle.readlines()
+        with open(pdb_filename, "w") as handle:
+            handle.writelines(lines)
+        cache = StructureCache(self.directory)
+        cache_filename = cache.cache_filename(pdb_filename)
+        structure = cache.get_structure("1A8O", pdb_filename)
+        self.assertTrue(os.path.isfile(cache_filename))
+        cached = cache.get_structure("1A8O", pdb_filename)
+        self.assertEqual(self.get_data(structure), self.get_data(cached))
+        self.assertEqual(cache.get_structure("X", pdb_filename).get_id(), "X")
+        # Drop the final residue (and change the modification time)
+        with open(pdb_filename, "w") as handle:
+            handle.writelines(line for line in lines
+                              if line[22:26] != " 220")
+        info = os.stat(pdb_filename)
+        os.utime(pdb_filename, (info.st_atime, info.st_mtime + 10))
+        cached = cache.get_structure("1A8O", pdb_filename)
+        self.assertEqual(len(cached[0]["A"]), len(structure[0]["A"]) - 1)
+
+        # Structures which can't be saved are still returned
+        class Parser(object):
+            def get_structure(self, structure_id, filename):
+                structure = PDBParser().get_structure(structure_id, filename)
+                structure.header = {"unsaved": set()}
+                return structure
+        cache = StructureCache(self.directory, Parser())
+        os.remove(cache_filename)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", BiopythonWarning)
+            structure = cache.get_structure("1A8O", pdb_filename)
+        self.assertEqual(len(caught), 1)
+        self.assertEqual(len(structure[0]["A"]), len(cached[0]["A"]))
+        self.assertFalse(os.path.exists(cache_filename))
+        self.assertEqual(sorted(os.listdir(self.directory)), ["1A8O.pdb"])
+
+
 class DsspTests(unittest.TestCase):
     """Tests for DSSP parsing etc which don't need the binary tool.
 
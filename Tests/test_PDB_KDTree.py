@@ -11,7 +11,10 @@
 """Unit tests for those parts of the Bio.PDB module using Bio.KDTree."""
 import unittest
 
+import warnings
+
 try:
+    import numpy
     from numpy import array
     from numpy.random import random
 except ImportError:
@@ -26,7 +29,19 @@ except ImportError:
     raise MissingExternalDependencyError(
         "C module in Bio.KDTree not compiled")
 
-from Bio.PDB.NeighborSearch import NeighborSearch
+from Bio.PDB import PDBParser
+from Bio.PDB.NeighborSearch import NeighborSearch, entity_indices
+from Bio.PDB.PDBExceptions import PDBConstructionWarning
+
+
+class RandomAtom(object):
+    def __init__(self, coord=None):
+        if coord is None:
+            coord = 100 * random(3)
+        self.coord = coord
+
+    def get_coord(self):
+        return self.coord
 
 
 class NeighborTest(unittest.TestCase):
@@ -35,13 +50,6 @@ class NeighborTest(unittest.TestCase):
 
         Based on the self test in Bio.PDB.NeighborSearch.
         """
-        class RandomAtom:
-            def __init__(self):
-                self.coord = 100 * random(3)
-
-            def get_coord(self):
-                return self.coord
-
         for i in range(0, 20):
             atoms = [RandomAtom() for j in range(100)]
             ns = NeighborSearch(atoms)
@@ -56,6 +64,88 @@ class NeighborTest(unittest.TestCase):
         self.assertEqual([], ns.search(x, 5.0, "S"))
 
 
+class BatchNeighborTest(unittest.TestCase):
+    """Compare the NumPy index array searches with brute force."""
+
+    def setUp(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", PDBConstructionWarning)
+            structure = PDBParser().get_structure("2BEG", "PDB/2BEG.pdb")
+        self.atoms = list(structure[0].get_atoms())
+        self.coords = array([a.get_coord() for a in self.atoms], float)
+        self.ns = NeighborSearch(self.atoms)
+
+    def distances(self, first, second, box=None):
+        difference = first[:, None, :] - second[None, :, :]
+        if box is not None:
+            difference -= box * numpy.round(difference / box)
+        return numpy.sqrt((difference ** 2).sum(axis=-1))
+
+    def test_search_many(self):
+        """Search around many centers at once."""
+        centers = self.coords[::10] + 0.5
+        close = self.distances(centers, self.coords) <= 4.0
+        for level in "ARC":
+            entities, indices = entity_indices(self.atoms, level)
+            self.assertEqual(entities, self.ns.get_entities(level))
+            offsets, found = self.ns.search_many(centers, 4.0, level)
+            self.assertEqual(len(offsets), len(centers) + 1)
+            for i, center in enumerate(centers):
+                expected = sorted(set(indices[close[i]].tolist()))
+                self.assertEqual(found[offsets[i]:offsets[i + 1]].tolist(),
+                                 expected)
+                self.assertEqual(
+                    set(id(e) for e in self.ns.search(center, 4.0, level)),
+                    set(id(entities[j]) for j in expected))
+
+    def test_search_all_pairs(self):
+        """Search all pairs at the atom, residue and chain levels."""
+        first, second = numpy.nonzero(numpy.triu(
+            self.distances(self.coords, self.coords) <= 4.0, 1))
+        for level in "ARC":
+            entities, indices = entity_indices(self.atoms, level)
+            pairs = set(tuple(sorted(pair)) for pair in
+                        zip(indices[first].tolist(), indices[second].tolist())
+                        if pair[0] != pair[1])
+            found = self.ns.search_all_pairs(4.0, level)
+            self.assertEqual(sorted(pairs), [tuple(p) for p in found.tolist()])
+            self.assertEqual([(entities[i], entities[j]) for i, j in
+                              sorted(pairs)],
+                             self.ns.search_all(4.0, level))
+
+    def test_contact_map(self):
+        """Residue contact map between two chains."""
+        chain_a = self.atoms[:len(self.atoms) // 5]
+        chain_b = self.atoms[len(self.atoms) // 5:]
+        contacts = NeighborSearch(chain_a).contact_map(chain_b, 5.0, "R")
+        rows, row_indices = entity_indices(chain_a, "R")
+        columns, column_indices = entity_indices(chain_b, "R")
+        close = self.distances(self.coords[:len(chain_a)],
+                               self.coords[len(chain_a):]) <= 5.0
+        expected = numpy.zeros((len(rows), len(columns)), bool)
+        i, j = numpy.nonzero(close)
+        expected[row_indices[i], column_indices[j]] = True
+        self.assertTrue(contacts.any())
+        self.assertTrue((contacts == expected).all())
+
+    def test_periodic(self):
+        """Neighbor search in a periodic box."""
+        box = array([30.0, 25.0, 20.0])
+        atoms = [RandomAtom(coord) for coord in 40 * random((300, 3)) - 5]
+        ns = NeighborSearch(atoms, box=box)
+        # The atoms are wrapped into the box, as float32 coordinates
+        coords = numpy.mod([a.get_coord() for a in atoms], box).astype("f")
+        coords = coords.astype(float)
+        first, second = numpy.nonzero(numpy.triu(
+            self.distances(coords, coords, box) <= 3.0, 1))
+        found = ns.search_all_pairs(3.0)
+        self.assertEqual(found.tolist(),
+                         [list(pair) for pair in zip(first, second)])
+        offsets, indices = ns.search_many(coords[:1] + box, 3.0)
+        self.assertEqual(len(ns.search(coords[0] + box, 3.0)), len(indices))
+        self.assertRaises(ValueError, ns.search_many, coords, 15.0)
+
+
 if __name__ == '__main__':
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
@@ -0,0 +1,179 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Tests for the PackedSeq object in Bio.PackedSeq."""
+
+import random
+import unittest
+import warnings
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.PackedSeq.")
+
+from Bio._py3k import StringIO
+
+from Bio import BiopythonWarning
+from Bio import SeqIO
+from Bio import PackedSeq as PackedSeqModule
+from Bio.Alphabet import generic_dna, generic_rna, generic_nucleotide
+from Bio.Alphabet import generic_protein
+from Bio.PackedSeq import PackedSeq
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+
+
+def random_dna(length, letters="ACGT" * 10 + "acgtNNNNnRY-"):
+    return "".join(random.choice(letters) for i in range(length))
+
+
+class PackedSeqTests(unittest.TestCase):
+    """Compare PackedSeq objects to the equivalent Seq objects."""
+
+    def setUp(self):
+        random.seed(2014)
+        self.examples = ["", "A", "ACGTN", "NNNNNNNNNN", "acgtacgtac",
+                         "ACGUNNRRY", "ACGTACGTAAAATTTTTT",
+                         random_dna(97), random_dna(1000)]
+        # Use a tiny window to test the window boundaries
+        self.old_window = PackedSeqModule._window
+        PackedSeqModule._window = 7
+
+    def tearDown(self):
+        PackedSeqModule._window = self.old_window
+
+    def test_str(self):
+        """Check packing and unpacking."""
+        for data in self.examples:
+            packed = PackedSeq(data, generic_nucleotide)
+            self.assertEqual(str(packed), data)
+            self.assertEqual(len(packed), len(data))
+            self.assertEqual(repr(packed),
+                             repr(Seq(data, generic_nucleotide)).replace(
+                                 "Seq(", "PackedSeq("))
+        self.assertRaises(TypeError, PackedSeq, Seq("ACGT"))
+
+    def test_memory(self):
+        """Check the packed data is a quarter of the sequence length."""
+        packed = PackedSeq(random_dna(10000, "ACGT"))
+        self.assertEqual(len(packed._packed), 2500)
+        packed = PackedSeq("N" * 1000 + random_dna(10000, "acgt"))
+        self.assertEqual(len(packed._packed), 2750)
+        self.assertEqual(len(packed._exceptions[0]), 1)
+        self.assertEqual(len(packed._masked[0]), 1)
+
+    def test_getitem(self):
+        """Check indexing and slicing."""
+        for data in self.examples:
+            packed = PackedSeq(data, generic_dna)
+            for i in range(-len(data), len(data)):
+                self.assertEqual(packed[i], data[i])
+            self.assertRaises(IndexError, packed.__getitem__, len(data))
+            for i in range(50):
+                start = random.randint(-5, len(data) + 5)
+                end = random.randint(-5, len(data) + 5)
+                for step in [None, 1, 2, 3, -1, -2]:
+                    sliced = packed[start:end:step]
+                    self.assertTrue(isinstance(sliced, PackedSeq))
+                    self.assertEqual(str(sliced), data[start:end:step])
+                    self.assertEqual(sliced.alphabet, generic_dna)
+                    # Slicing a slice:
+                    self.assertEqual(str(sliced[1:-1]), data[start:end:step][1:-1])
+
+    def test_complement(self):
+        """Check complement and reverse complement."""
+        for data in self.examples:
+            for alphabet in [generic_nucleotide, generic_dna, generic_rna]:
+                seq = Seq(data, alphabet)
+                packed = PackedSeq(data, alphabet)
+                try:
+                    expected = str(seq.complement())
+                except ValueError:
+                    self.assertRaises(ValueError, packed.complement)
+                    continue
+                self.assertEqual(str(packed.complement()), expected)
+                self.assertEqual(str(packed.reverse_complement()),
+                                 str(seq.reverse_complement()))
+                self.assertEqual(str(packed[3:-2].reverse_complement()[1:]),
+                                 str(seq[3:-2].reverse_complement()[1:]))
+                self.assertEqual(str(packed.reverse_complement().reverse_complement()),
+                                 data)
+        self.assertRaises(ValueError, PackedSeq("ACGUT").complement)
+        self.assertRaises(ValueError,
+                          PackedSeq("ACGT", generic_protein).complement)
+
+    def test_count_find(self):
+        """Check count and find."""
+        for data in self.examples:
+            packed = PackedSeq(data)
+            for sub in ["", "A", "a", "N", "R", "-", "AA", "ACG", "NNN",
+                        "AAAAAAAAA", "TTTTT", data[3:20], Seq("CG")]:
+                self.assertEqual(packed.count(sub), data.count(str(sub)))
+                self.assertEqual(packed.find(sub), data.find(str(sub)))
+                self.assertEqual(sub in packed, str(sub) in data)
+                for start, end in [(3, 80), (-20, -3), (500, 1000), (5, 2)]:
+                    self.assertEqual(packed.count(sub, start, end),
+                                     data.count(str(sub), start, end))
+                    self.assertEqual(packed.find(sub, start, end),
+                                     data.find(str(sub), start, end))
+        self.assertEqual(PackedSeq("A" * 50).count("AAA"), 16)
+        self.assertEqual(PackedSeq("AAT" * 20).count("ATA"), 19)
+
+    def test_case(self):
+        """Check upper and lower."""
+        for data in self.examples:
+            packed = PackedSeq(data)
+            self.assertEqual(str(packed.upper()), data.upper())
+            self.assertEqual(str(packed.lower()), data.lower())
+            self.assertEqual(str(packed[2:].lower()[1:]), data[2:].lower()[1:])
+
+    def test_translate(self):
+        """Check translation, including in several windows."""
+        PackedSeqModule._window = 30
+        for data in [random_dna(300, "ACGT"), random_dna(301, "ACGTacgtN"),
+                     "ATG" + random_dna(60, "CG") + "TAA" + "CCC" * 20]:
+            seq = Seq(data, generic_dna)
+            packed = PackedSeq(data, generic_dna)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", BiopythonWarning)
+                for options in [{}, {"to_stop": True}, {"table": 2},
+                                {"stop_symbol": "@"}]:
+                    self.assertEqual(repr(packed.translate(**options)),
+                                     repr(seq.translate(**options)))
+        self.assertEqual(str(packed[:-60].translate(cds=True)),
+                         str(seq[:-60].translate(cds=True)))
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always", BiopythonWarning)
+            PackedSeq(random_dna(100, "ACGT")).translate()
+            self.assertEqual(len(w), 1)
+
+    def test_seqrecord(self):
+        """Check use in a SeqRecord, and writing it out."""
+        records = list(SeqIO.parse("Fasta/f002", "fasta"))
+        packed_records = []
+        for record in records:
+            packed_records.append(SeqRecord(PackedSeq(str(record.seq),
+                                                      record.seq.alphabet),
+                                            id=record.id,
+                                            description=record.description))
+        for record, packed in zip(records, packed_records):
+            self.assertEqual(str(record[5:20].seq), str(packed[5:20].seq))
+            self.assertTrue(isinstance(packed[5:20].seq, PackedSeq))
+            self.assertEqual(str(record.reverse_complement().seq),
+                             str(packed.reverse_complement().seq))
+            self.assertEqual(str((packed + record).seq), str(record.seq) * 2)
+        for format in ["fasta", "tab"]:
+            expected = StringIO()
+            SeqIO.write(records, expected, format)
+            handle = StringIO()
+            SeqIO.write(packed_records, handle, format)
+            self.assertEqual(expected.getvalue(), handle.getvalue())
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
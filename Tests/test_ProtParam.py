@@ -12,6 +12,11 @@ from Bio.Alphabet import IUPAC
 from Bio.SeqUtils import ProtParam, ProtParamData
 from Bio.SeqUtils import molecular_weight
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 class ProtParamTest(unittest.TestCase):
     def setUp(self):
@@ -163,6 +168,61 @@ class ProtParamTest(unittest.TestCase):
         self.assertAlmostEqual(self.analysis.gravy(), -0.5974, places=4)
 
 
+if numpy is not None:
+    class ProtParamBatchTest(unittest.TestCase):
+        def setUp(self):
+            self.seqs = ["MAEGEITTFTALTEKFNLPPGNYKKPKLLYCSNGGHFLRILPDGTVDGTRDRSDQHIQLQLSAESVGEVYIKSTETGQYLAMDTSGLLYGSQTPSEECLFLERLEENHYNTYTSKKHAEKNWFVGLKKNGSCKRGPRTHYGQKAILFLPLPV",
+                         "DDDEEECCKR", "KKKKRRRHHHA", "MSPFW", "ACDEFGHIKLMNPQRSTVWY" * 3,
+                         "EGAMSPCTVKRHYWLNDQIFE"]
+            self.batch = ProtParam.ProteinAnalysisBatch(
+                [Seq(s, IUPAC.protein) for s in self.seqs])
+            self.single = [ProtParam.ProteinAnalysis(s) for s in self.seqs]
+
+        def check(self, method, *args):
+            values = getattr(self.batch, method)(*args)
+            self.assertEqual(len(values), len(self.seqs))
+            for value, analysis in zip(values, self.single):
+                expected = getattr(analysis, method)(*args)
+                self.assertTrue(numpy.allclose(value, expected),
+                                "%s: %r vs %r" % (method, value, expected))
+
+        def test_count_amino_acids(self):
+            counts = self.batch.count_amino_acids()
+            self.assertEqual(counts.shape, (len(self.seqs), 20))
+            for row, analysis in zip(counts, self.single):
+                expected = analysis.count_amino_acids()
+                self.assertEqual(list(row),
+                                 [expected[aa] for aa in self.batch.letters])
+
+        def test_values(self):
+            for method in ["molecular_weight", "aromaticity", "gravy",
+                           "instability_index", "isoelectric_point",
+                           "secondary_structure_fraction"]:
+                self.check(method)
+
+        def test_monoisotopic(self):
+            batch = ProtParam.ProteinAnalysisBatch(self.seqs, monoisotopic=True)
+            for value, seq in zip(batch.molecular_weight(), self.seqs):
+                self.assertAlmostEqual(value, molecular_weight(
+                    seq, "protein", monoisotopic=True))
+
+        def test_profiles(self):
+            self.check("flexibility")
+            self.check("protein_scale", ProtParamData.kd, 9, 0.4)
+            self.check("protein_scale", ProtParamData.kd, 5)
+            self.check("protein_scale", ProtParamData.ja, 6, 0.2)
+
+        def test_nonstandard(self):
+            batch = ProtParam.ProteinAnalysisBatch(["", "MXKA", "mkA"])
+            self.assertEqual(list(batch.lengths), [0, 4, 3])
+            self.assertTrue(numpy.isnan(batch.isoelectric_point()[0]))
+            self.assertTrue(numpy.isnan(batch.molecular_weight()[1]))
+            self.assertAlmostEqual(batch.molecular_weight()[2],
+                                   molecular_weight("MKA", "protein"))
+            self.assertAlmostEqual(batch.isoelectric_point()[1],
+                                   batch.isoelectric_point()[2])
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity = 2)
     unittest.main(testRunner=runner)
@@ -7,6 +7,11 @@ import unittest
 from Bio._py3k import StringIO
 
 from Bio import SeqIO
+from Bio.Alphabet import generic_dna
+from Bio.faidx import IndexedFasta
+from Bio.Seq import Seq
+from Bio.SeqIO import InsdcIO
+from Bio.SeqRecord import SeqRecord
 
 from seq_tests_common import compare_record
 
@@ -59,6 +64,42 @@ class TestEmblRewrite(unittest.TestCase):
         self.check_rewrite("EMBL/AE017046.embl")
 
 
+class TestChunkedWriting(unittest.TestCase):
+    """Check the sequence is written the same a chunk at a time."""
+
+    def setUp(self):
+        self.old_chunk = InsdcIO._InsdcWriter.SEQUENCE_CHUNK
+
+    def tearDown(self):
+        InsdcIO._InsdcWriter.SEQUENCE_CHUNK = self.old_chunk
+
+    def write(self, record, format):
+        handle = StringIO()
+        SeqIO.write(record, handle, format)
+        return handle.getvalue()
+
+    def test_chunks(self):
+        """Write GenBank and EMBL sequences in small chunks."""
+        fasta = IndexedFasta("GenBank/NC_005816.fna", alphabet=generic_dna)
+        name = "gi|45478711|ref|NC_005816.1|"
+        records = [SeqRecord(Seq(fasta.fetch(name, 0, length), generic_dna),
+                             id="Test", name="Test", description="Test")
+                   for length in [0, 1, 59, 60, 61, 119, 120, 121, 601]]
+        # This sequence is read from the file a chunk at a time
+        records.append(SeqRecord(fasta[name], id="Test", name="Test",
+                                 description="Test"))
+        for record in records:
+            for format in ["genbank", "embl"]:
+                handle = StringIO()
+                SeqIO.write(SeqRecord(Seq(str(record.seq), generic_dna),
+                                      id="Test", name="Test",
+                                      description="Test"), handle, format)
+                expected = handle.getvalue()
+                InsdcIO._InsdcWriter.SEQUENCE_CHUNK = 120
+                self.assertEqual(expected, self.write(record, format))
+                InsdcIO._InsdcWriter.SEQUENCE_CHUNK = self.old_chunk
+        fasta.close()
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
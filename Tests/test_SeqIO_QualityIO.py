@@ -10,6 +10,7 @@ from __future__ import print_function
 import os
 import unittest
 import warnings
+from array import array
 
 from Bio._py3k import range
 from Bio._py3k import StringIO
@@ -24,6 +25,11 @@ from Bio.Seq import Seq, UnknownSeq, MutableSeq
 from Bio.SeqRecord import SeqRecord
 from Bio.Data.IUPACData import ambiguous_dna_letters, ambiguous_rna_letters
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 BINARY_FORMATS = ["sff", "sff-trim"]
 
 
@@ -154,6 +160,14 @@ class TestFastqErrors(unittest.TestCase):
             title, seq, qual = next(tuples)  # Make sure no errors!
         self.assertRaises(ValueError, next, tuples)
         handle.close()
+        # Try the chunked bytes parser too, including with tiny chunks
+        for chunk_size in [1, 10, 1048576]:
+            with open(filename, "rb") as handle:
+                tuples = QualityIO.FastqBytesIterator(handle,
+                                                      chunk_size=chunk_size)
+                for i in range(good_count):
+                    title, seq, qual = next(tuples)
+                self.assertRaises(ValueError, next, tuples)
 
     def check_general_passes(self, filename, record_count):
         handle = open(filename, _universal_read_mode)
@@ -166,6 +180,9 @@ class TestFastqErrors(unittest.TestCase):
             count += 1
         self.assertEqual(count, record_count)
         handle.close()
+        with open(filename, "rb") as handle:
+            tuples = list(QualityIO.FastqBytesIterator(handle))
+        self.assertEqual(len(tuples), record_count)
 
     def check_all_fail(self, filename, count):
         self.check_fails(filename, count)
@@ -220,6 +237,199 @@ for base_name, good_count, full_count in tests:
     del funct
 
 
+class TestFastqBytes(unittest.TestCase):
+    """Compare FastqBytesIterator with FastqGeneralIterator."""
+    def check(self, filename):
+        with open(filename, _universal_read_mode) as handle:
+            expected = [tuple(s.encode() for s in values) for values
+                        in QualityIO.FastqGeneralIterator(handle)]
+        for chunk_size in [1, 3, 64, 1048576]:
+            with open(filename, "rb") as handle:
+                tuples = list(QualityIO.FastqBytesIterator(
+                    handle, chunk_size=chunk_size))
+            self.assertEqual(expected, tuples)
+        return expected
+
+    def test_good_files(self):
+        """Parse all the valid FASTQ files as bytes"""
+        names = [name for name in os.listdir("Quality")
+                 if name.endswith(".fastq") and not name.startswith("error_")]
+        self.assertTrue(names)
+        for name in names:
+            self.check(os.path.join("Quality", name))
+
+    def test_tricky(self):
+        """Parse tricky.fastq as bytes"""
+        tuples = self.check("Quality/tricky.fastq")
+        self.assertEqual(4, len(tuples))
+        self.assertEqual(tuples[3][1],
+                         b"TGGGAGGTTTTATGTGGAAAGCAGCAATGTACAAGA")
+
+    def test_dos(self):
+        """Parse FASTQ with DOS style line endings as bytes"""
+        tuples = self.check("Quality/example_dos.fastq")
+        with open("Quality/example.fastq", "rb") as handle:
+            self.assertEqual(tuples,
+                             list(QualityIO.FastqBytesIterator(handle)))
+
+    def test_no_final_new_line(self):
+        """Parse FASTQ as bytes without a trailing new line"""
+        handle = BytesIO(b"@a\nACGT\n+\nIIII\n@b\nAC\n+b\n!!")
+        self.assertEqual([(b"a", b"ACGT", b"IIII"), (b"b", b"AC", b"!!")],
+                         list(QualityIO.FastqBytesIterator(handle)))
+
+    def test_text_mode(self):
+        """Reject a text mode handle when parsing FASTQ as bytes"""
+        tuples = QualityIO.FastqBytesIterator(StringIO(u"@a\nA\n+\nI\n"))
+        self.assertRaises(ValueError, next, tuples)
+
+    if numpy is not None:
+        def test_quality_arrays(self):
+            """Parse FASTQ as bytes with NumPy quality arrays"""
+            for filename, format, offset in [
+                    ("Quality/example.fastq", "fastq", 33),
+                    ("Quality/tricky.fastq", "fastq", 33),
+                    ("Quality/zero_length.fastq", "fastq", 33),
+                    ("Quality/illumina_faked.fastq", "fastq-illumina", 64)]:
+                records = list(SeqIO.parse(filename, format))
+                with open(filename, "rb") as handle:
+                    tuples = list(QualityIO.FastqBytesIterator(handle,
+                                                               offset))
+                self.assertEqual(len(records), len(tuples))
+                for record, (title, seq, scores) in zip(records, tuples):
+                    self.assertEqual(str(record.seq), seq.decode())
+                    self.assertEqual(scores.dtype, numpy.uint8)
+                    self.assertEqual(record.letter_annotations["phred_quality"],
+                                     scores.tolist())
+
+        def test_quality_array_offset(self):
+            """Reject quality characters below the offset as arrays"""
+            with open("Quality/solexa_faked.fastq", "rb") as handle:
+                tuples = QualityIO.FastqBytesIterator(handle, 64)
+                self.assertRaises(ValueError, list, tuples)
+
+
+class TestQualityArrays(unittest.TestCase):
+    """PHRED qualities held as array("B") or NumPy uint8 arrays."""
+    def check_output(self, records, converter):
+        """Compare writing records with list and array based qualities."""
+        for format in ["fastq", "fastq-illumina", "fastq-solexa", "qual"]:
+            expected = StringIO()
+            with warnings.catch_warnings(record=True) as w1:
+                warnings.simplefilter("always", BiopythonWarning)
+                SeqIO.write(records, expected, format)
+            arrays = []
+            for record in records:
+                record = record[:]
+                record.letter_annotations["phred_quality"] = \
+                    converter(record.letter_annotations["phred_quality"])
+                arrays.append(record)
+            handle = StringIO()
+            with warnings.catch_warnings(record=True) as w2:
+                warnings.simplefilter("always", BiopythonWarning)
+                SeqIO.write(arrays, handle, format)
+            self.assertEqual(expected.getvalue(), handle.getvalue())
+            self.assertEqual(len(w1), len(w2))
+            self.assertEqual([str(w.message) for w in w1],
+                             [str(w.message) for w in w2])
+
+    def test_parse(self):
+        """Parse FASTQ with PHRED qualities as arrays"""
+        for filename, format, iterator in [
+                ("Quality/example.fastq", "fastq",
+                 QualityIO.FastqPhredIterator),
+                ("Quality/sanger_full_range_original_sanger.fastq", "fastq",
+                 QualityIO.FastqPhredIterator),
+                ("Quality/tricky.fastq", "fastq",
+                 QualityIO.FastqPhredIterator),
+                ("Quality/zero_length.fastq", "fastq",
+                 QualityIO.FastqPhredIterator),
+                ("Quality/illumina_full_range_original_illumina.fastq",
+                 "fastq-illumina", QualityIO.FastqIlluminaIterator)]:
+            records = list(SeqIO.parse(filename, format))
+            with open(filename) as handle:
+                arrays = list(iterator(handle, quality_array=True))
+            self.assertEqual(len(records), len(arrays))
+            for old, new in zip(records, arrays):
+                self.assertEqual(str(old.seq), str(new.seq))
+                quals = new.letter_annotations["phred_quality"]
+                self.assertTrue(isinstance(quals, array))
+                self.assertEqual(old.letter_annotations["phred_quality"],
+                                 quals.tolist())
+            self.check_output(records, lambda q: array("B", q))
+
+    def test_invalid(self):
+        """Reject bad quality characters when parsing as arrays"""
+        with open("Quality/solexa_faked.fastq") as handle:
+            records = QualityIO.FastqIlluminaIterator(handle,
+                                                      quality_array=True)
+            self.assertRaises(ValueError, next, records)
+        with open("Quality/error_qual_del.fastq") as handle:
+            records = QualityIO.FastqPhredIterator(handle, quality_array=True)
+            for i in range(3):
+                next(records)
+            self.assertRaises(ValueError, next, records)
+
+    def test_slice_and_reverse(self):
+        """Array qualities are kept by slicing and reverse complement"""
+        record = SeqIO.read("Quality/illumina_faked.fastq", "fastq-illumina")
+        quals = record.letter_annotations["phred_quality"]
+        record.letter_annotations["phred_quality"] = array("B", quals)
+        sub = record[5:20]
+        self.assertEqual(array("B", quals[5:20]),
+                         sub.letter_annotations["phred_quality"])
+        rc = record.reverse_complement(id=True, name=True, description=True)
+        self.assertEqual(array("B", quals[::-1]),
+                         rc.letter_annotations["phred_quality"])
+        both = record + record
+        self.assertEqual(array("B", quals + quals),
+                         both.letter_annotations["phred_quality"])
+        self.assertEqual(record.format("fastq"),
+                         rc.reverse_complement(id=True, name=True,
+                                               description=True).format("fastq"))
+
+    def test_add_mixed(self):
+        """Adding records with array and list qualities"""
+        filename = "Quality/example.fastq"
+        record = next(SeqIO.parse(filename, "fastq"))
+        with open(filename) as handle:
+            packed = next(QualityIO.FastqPhredIterator(handle,
+                                                       quality_array=True))
+        quals = record.letter_annotations["phred_quality"]
+        for both in (packed + record, record + packed):
+            self.assertEqual(array("B", quals + quals),
+                             both.letter_annotations["phred_quality"])
+        # Solexa scores can be negative, so don't fit in an array("B")
+        record.letter_annotations = {"solexa_quality": [-5] + quals[1:]}
+        packed.letter_annotations = {"solexa_quality": array("B", quals)}
+        both = packed + record
+        self.assertEqual(quals + [-5] + quals[1:],
+                         both.letter_annotations["solexa_quality"])
+
+    if numpy is not None:
+        def test_numpy(self):
+            """NumPy uint8 qualities in writers, slicing and addition"""
+            records = list(SeqIO.parse(
+                "Quality/sanger_full_range_original_sanger.fastq", "fastq"))
+            records.extend(SeqIO.parse("Quality/example.fastq", "fastq"))
+            self.check_output(records,
+                              lambda q: numpy.array(q, numpy.uint8))
+            record = records[-1]
+            quals = record.letter_annotations["phred_quality"]
+            record.letter_annotations["phred_quality"] = \
+                numpy.array(quals, numpy.uint8)
+            rc = record.reverse_complement(id=True, name=True,
+                                           description=True)
+            self.assertEqual(quals[::-1],
+                             rc.letter_annotations["phred_quality"].tolist())
+            both = record + record[:5]
+            self.assertEqual(quals + quals[:5],
+                             both.letter_annotations["phred_quality"].tolist())
+            self.assertEqual(record.format("fastq"),
+                             rc.reverse_complement(id=True, name=True,
+                                                   description=True).format("fastq"))
+
+
 class TestReferenceSffConversions(unittest.TestCase):
     def check(self, sff_name, sff_format, out_name, format):
         wanted = list(SeqIO.parse(out_name, format))
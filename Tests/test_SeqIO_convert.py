@@ -48,6 +48,14 @@ def check_convert(in_filename, in_format, out_format, alphabet=None):
         SeqIO.convert(in_filename, in_format, handle2, out_format, alphabet)
     # We could re-parse this, but it is simpler and stricter:
     assert handle.getvalue() == handle2.getvalue()
+    # And again, splitting the file between worker processes:
+    handle3 = StringIO()
+    with warnings.catch_warnings():
+        if qual_truncate:
+            warnings.simplefilter('ignore', UserWarning)
+        SeqIO.convert(in_filename, in_format, handle3, out_format, alphabet,
+                      processes=2)
+    assert handle.getvalue() == handle3.getvalue()
 
 
 def check_convert_fails(in_filename, in_format, out_format, alphabet=None):
@@ -77,6 +85,18 @@ def check_convert_fails(in_filename, in_format, out_format, alphabet=None):
         assert str(err1) == str(err2), \
                "Different failures, parse/write:\n%s\nconvert:\n%s" \
                % (err1, err2)
+    # And using worker processes (where the error may be found from
+    # a different point in the file, so the message can differ)...
+    try:
+        handle3 = StringIO()
+        with warnings.catch_warnings():
+            if qual_truncate:
+                warnings.simplefilter('ignore', UserWarning)
+            SeqIO.convert(in_filename, in_format, handle3, out_format,
+                          alphabet, processes=2)
+        assert False, "Convert with processes should have failed!"
+    except ValueError:
+        pass
 
 
 # TODO - move this to a shared test module...
@@ -240,6 +260,36 @@ for filename, format, alphabet in tests:
     del funct
 
 
+class ParallelConvertTests(unittest.TestCase):
+    """Checks specific to converting using multiple processes."""
+    def test_handle(self):
+        """Using processes requires an input filename"""
+        with open("Quality/example.fastq") as in_handle:
+            self.assertRaises(ValueError, SeqIO.convert, in_handle, "fastq",
+                              StringIO(), "fasta", processes=2)
+
+    def test_unsupported(self):
+        """Using processes requires splittable formats"""
+        self.assertRaises(ValueError, SeqIO.convert,
+                          "Roche/E3MFGYR02_random_10_reads.sff", "sff",
+                          StringIO(), "fasta", processes=2)
+        self.assertRaises(ValueError, SeqIO.convert,
+                          "Quality/example.fastq.bgz", "fastq",
+                          StringIO(), "fasta", processes=2)
+        self.assertRaises(ValueError, SeqIO.convert,
+                          "Quality/example.fastq", "fastq",
+                          StringIO(), "seqxml", processes=2)
+
+    def test_warnings(self):
+        """Warnings from worker processes are passed on"""
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            SeqIO.convert("Quality/sanger_93.fastq", "fastq", StringIO(),
+                          "fastq-solexa", processes=2)
+        self.assertTrue(caught)
+        self.assertTrue("Data loss" in str(caught[0].message))
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity = 2)
     unittest.main(testRunner=runner)
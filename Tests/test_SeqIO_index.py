@@ -350,6 +350,16 @@ class IndexDictTests(unittest.TestCase):
             pass
         self.assertEqual(rec_dict.get(chr(0)), None)
         self.assertEqual(rec_dict.get(chr(0), chr(1)), chr(1))
+        # Check bulk lookups, in the given order and in file order
+        pairs = list(rec_dict.get_many(keys[::-1]))
+        self.assertEqual(keys[::-1], [key for key, rec in pairs])
+        self.assertEqual(ids[::-1], [rec.id for key, rec in pairs])
+        pairs = list(rec_dict.get_many(keys, file_order=True))
+        self.assertEqual(set(keys), set(key for key, rec in pairs))
+        self.assertEqual(len(keys), len(pairs))
+        for key, rec in pairs:
+            self.assertEqual(ids[keys.index(key)], rec.id)
+        self.assertRaises(KeyError, rec_dict.get_many, keys + [chr(0)])
         if hasattr(dict, "iteritems"):
             # Python 2.x
             for key, rec in rec_dict.items():
@@ -376,7 +386,31 @@ class IndexDictTests(unittest.TestCase):
         self.assertRaises(NotImplementedError, rec_dict.copy)
         self.assertRaises(NotImplementedError, rec_dict.fromkeys, [])
 
-    def get_raw_check(self, filename, format, alphabet, comp):
+    def byte_ranges_check(self, filename, format, alphabet):
+        if format in SeqIO._BinaryFormats or format in ["ig", "uniprot-xml"]:
+            self.assertRaises(ValueError, SeqIO.byte_ranges,
+                              filename, format, 2)
+            return
+        ids = [r.id for r in SeqIO.parse(filename, format, alphabet)]
+        proxy = _FormatToRandomAccess[format](filename, format, alphabet)
+        starts = set(offset for key, offset, length in proxy)
+        proxy._handle.close()
+        size = os.path.getsize(filename)
+        starts.add(size)
+        for chunks in [1, 2, 3, 5, 10]:
+            ranges = SeqIO.byte_ranges(filename, format, chunks)
+            self.assertEqual(chunks, len(ranges))
+            self.assertEqual(0, ranges[0][0])
+            self.assertEqual(size, ranges[-1][1])
+            for (start, end), (next_start, next_end) in zip(ranges, ranges[1:]):
+                self.assertEqual(end, next_start)
+                self.assertTrue(end in starts, "%i not a record start" % end)
+            parsed = [r.id for start, end in ranges
+                      for r in SeqIO.parse_range(filename, format,
+                                                 start, end, alphabet)]
+            self.assertEqual(ids, parsed)
+
+    def get_raw_check(self, filename, format, alphabet, comp, use_mmap=False):
         # Also checking the key_function here
         if comp:
             h = gzip.open(filename, "rb")
@@ -397,10 +431,12 @@ class IndexDictTests(unittest.TestCase):
             with warnings.catch_warnings():
                 warnings.simplefilter('ignore', BiopythonParserWarning)
                 rec_dict = SeqIO.index(filename, format, alphabet,
-                                       key_function = lambda x: x.lower())
+                                       key_function = lambda x: x.lower(),
+                                       use_mmap=use_mmap)
         else:
             rec_dict = SeqIO.index(filename, format, alphabet,
-                                   key_function = lambda x: x.lower())
+                                   key_function = lambda x: x.lower(),
+                                   use_mmap=use_mmap)
 
         self.assertEqual(set(id_list), set(rec_dict))
         self.assertEqual(len(id_list), len(rec_dict))
@@ -450,6 +486,10 @@ class IndexDictTests(unittest.TestCase):
             else:
                 rec2 = SeqIO.read(handle, format, alphabet)
             self.assertEqual(True, compare_record(rec1, rec2))
+        raw_pairs = list(rec_dict.get_raw_many(id_list))
+        self.assertEqual(id_list, [key for key, raw in raw_pairs])
+        for key, raw in raw_pairs:
+            self.assertEqual(rec_dict.get_raw(key), raw)
         rec_dict.close()
         del rec_dict
 
@@ -560,6 +600,27 @@ for filename, format, alphabet in tests:
                 funct(filename, format, alphabet, comp))
         del funct
 
+        def funct(fn, fmt, alpha, c):
+            f = lambda x: x.get_raw_check(fn, fmt, alpha, c, use_mmap=True)
+            f.__doc__ = "Index %s file %s get_raw using mmap" % (fmt, fn)
+            return f
+        setattr(IndexDictTests, "test_%s_%s_get_raw_mmap"
+                    % (format, filename.replace("/", "_").replace(".", "_")),
+                funct(filename, format, alphabet, comp))
+        del funct
+
+        if comp:
+            continue
+
+        def funct(fn, fmt, alpha):
+            f = lambda x: x.byte_ranges_check(fn, fmt, alpha)
+            f.__doc__ = "Split %s file %s into byte ranges" % (fmt, fn)
+            return f
+        setattr(IndexDictTests, "test_%s_%s_byte_ranges"
+                    % (format, filename.replace("/", "_").replace(".", "_")),
+                funct(filename, format, alphabet))
+        del funct
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity = 2)
     unittest.main(testRunner=runner)
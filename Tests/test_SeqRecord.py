@@ -8,6 +8,9 @@
 Initially this takes matched tests of GenBank and FASTA files from the NCBI
 and confirms they are consistent using our different parsers.
 """
+import copy
+import pickle
+import random
 import unittest
 from Bio import SeqIO
 from Bio.Alphabet import generic_dna, generic_rna, generic_protein
@@ -15,6 +18,7 @@ from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
 from Bio.SeqFeature import SeqFeature, FeatureLocation, ExactPosition
 from Bio.SeqFeature import WithinPosition, BeforePosition, AfterPosition, OneOfPosition
+from Bio.SeqFeature import UnknownPosition
 
 
 class SeqRecordCreation(unittest.TestCase):
@@ -61,6 +65,42 @@ class SeqRecordCreation(unittest.TestCase):
         except (TypeError, ValueError) as e:
             pass
 
+    def test_slots(self):
+        """Pickle and copy SeqRecords with compact SeqFeatures"""
+        f1 = SeqFeature(FeatureLocation(0, ExactPosition(10), strand=-1),
+                        type="CDS", qualifiers={"gene": ["test"]})
+        f2 = SeqFeature(FeatureLocation(WithinPosition(12, left=12, right=15),
+                                        BeforePosition(22)) +
+                        FeatureLocation(AfterPosition(23), 26),
+                        type="misc_feature", id="f2")
+        rec = SeqRecord(Seq("ACGT" * 10, generic_dna),
+                        id="Test", name="Test", description="Test",
+                        annotations={"test": ["a test"]},
+                        letter_annotations={"q": list(range(40))},
+                        features=[f1, f2])
+        # The locations and positions no longer have a __dict__,
+        self.assertFalse(hasattr(f1.location, "__dict__"))
+        self.assertFalse(hasattr(f1.location.start, "__dict__"))
+        # but extra attributes can still be added to features and records
+        f1.extra = "value"
+        rec.extra = "value"
+        for copied in [copy.deepcopy(rec)] + \
+                [pickle.loads(pickle.dumps(rec, protocol))
+                 for protocol in range(pickle.HIGHEST_PROTOCOL + 1)]:
+            self.assertEqual(str(copied.seq), str(rec.seq))
+            self.assertEqual(copied.id, "Test")
+            self.assertEqual(copied.extra, "value")
+            self.assertEqual(copied.annotations, rec.annotations)
+            self.assertEqual(copied.letter_annotations, rec.letter_annotations)
+            self.assertEqual(len(copied.features), 2)
+            for old, new in zip(rec.features, copied.features):
+                self.assertEqual(repr(old), repr(new))
+                self.assertEqual(repr(old.location), repr(new.location))
+                self.assertEqual(old.qualifiers, new.qualifiers)
+            self.assertEqual(copied.features[0].extra, "value")
+            self.assertEqual(copied.features[1].id, "f2")
+            self.assertEqual(copied.features[0].location.strand, -1)
+
 
 class SeqRecordMethods(unittest.TestCase):
     """Test SeqRecord methods."""
@@ -219,6 +259,123 @@ class SeqRecordMethods(unittest.TestCase):
             self.assertEqual(rec.letter_annotations, {"fake":"X"*26})
             self.assertTrue(len(rec.features) <= len(self.record.features))
 
+class SeqRecordFeatureIndex(unittest.TestCase):
+    """Test the feature interval index against checking every feature."""
+
+    def setUp(self):
+        random.seed(2014)
+        self.length = 5000
+        self.record = SeqRecord(Seq("ACGT" * (self.length // 4), generic_dna),
+                                id="Test", features=[])
+        for i in range(500):
+            parts = []
+            for j in range(random.choice([1, 1, 1, 2, 3])):
+                start = random.randint(0, self.length)
+                end = min(self.length,
+                          start + random.choice([0, 1, 10, 100, 1000]))
+                parts.append(FeatureLocation(start, end,
+                                             random.choice([-1, 1])))
+            location = parts[0]
+            for part in parts[1:]:
+                location += part
+            self.record.features.append(SeqFeature(location, type="misc"))
+        self.record.features.insert(0, SeqFeature(FeatureLocation(0, self.length),
+                                                  type="source"))
+
+    def test_overlapping(self):
+        """Find features overlapping a region or position"""
+        features = self.record.features
+        for i in range(200):
+            start = random.randint(-10, self.length + 10)
+            end = start + random.choice([0, 1, 5, 50, 500])
+            expected = [f for f in features
+                        if any(part.nofuzzy_start < end and start < part.nofuzzy_end
+                               for part in f.location.parts)]
+            self.assertEqual(self.record.features_overlapping(start, end), expected)
+            self.assertEqual(self.record.features_containing(start),
+                             [f for f in features if start in f])
+
+    def test_slicing(self):
+        """Slice features using the index"""
+        for i in range(50):
+            start = random.randint(0, self.length)
+            end = random.randint(start, self.length)
+            expected = [str(f.location) for f in self.record.features
+                        if start <= f.location.nofuzzy_start
+                        and f.location.nofuzzy_end <= end]
+            self.assertEqual([str(f._shift(start).location)
+                              for f in self.record[start:end].features],
+                             expected)
+
+    def test_changes(self):
+        """Update the index when the features change"""
+        self.assertEqual(len(self.record.features_containing(10)), 1 +
+                         len([f for f in self.record.features[1:] if 10 in f]))
+        self.record.features.append(SeqFeature(FeatureLocation(5, 15)))
+        self.assertTrue(self.record.features[-1] in
+                        self.record.features_containing(10))
+        self.record.features = [SeqFeature(FeatureLocation(20, 30))]
+        self.assertEqual(self.record.features_containing(10), [])
+        self.assertEqual(self.record.features_overlapping(0, 25),
+                         self.record.features)
+        # Without a location, or an unknown position
+        self.record.features.append(SeqFeature())
+        self.record.features.append(
+            SeqFeature(FeatureLocation(UnknownPosition(), 40)))
+        self.assertEqual(self.record.features_overlapping(0, 100),
+                         self.record.features[:1])
+
+    def test_edit_location(self):
+        """Update the index after editing a location in place"""
+        record = self.record[:1000]
+        record.features = [SeqFeature(FeatureLocation(100, 200), type="a"),
+                           SeqFeature(FeatureLocation(700, 800), type="b")]
+        self.assertEqual(len(record[300:600].features), 0)
+        self.assertEqual(record.features_containing(400), [])
+        record.features[1].location = FeatureLocation(350, 450, 1)
+        record.features = record.features
+        self.assertEqual([f.type for f in record[300:600].features], ["b"])
+        self.assertEqual(record.features_containing(400), record.features[1:])
+        self.assertEqual(record.features_overlapping(440, 460),
+                         record.features[1:])
+        self.assertEqual(record.features_containing(750), [])
+
+    def test_replace_feature(self):
+        """Update the index after replacing a feature in the list"""
+        record = self.record[:1000]
+        record.features = [SeqFeature(FeatureLocation(100, 200), type="a"),
+                           SeqFeature(FeatureLocation(700, 800), type="b")]
+        self.assertEqual(len(record[50:250].features), 1)
+        self.assertEqual(record.features_containing(750), record.features[1:])
+        record.features[1] = SeqFeature(FeatureLocation(120, 180), type="c")
+        record.features = record.features
+        self.assertEqual([f.type for f in record[50:250].features],
+                         ["a", "c"])
+        self.assertEqual(record.features_containing(150), record.features)
+        self.assertEqual(record.features_overlapping(700, 800), [])
+
+    def test_no_rescan(self):
+        """Repeated queries do not look at every feature again"""
+        class CountingList(list):
+            iterations = 0
+
+            def __iter__(self):
+                CountingList.iterations += 1
+                return list.__iter__(self)
+
+        self.record.features = CountingList(self.record.features)
+        self.record.features_containing(10)
+        self.assertEqual(CountingList.iterations, 1)
+        for i in range(20):
+            self.record.features_overlapping(i * 100, i * 100 + 500)
+            self.record.features_containing(i * 50)
+            self.record[i * 10:i * 10 + 1000]
+        self.assertEqual(CountingList.iterations, 1)
+        self.record.features.append(SeqFeature(FeatureLocation(5, 15)))
+        self.record.features_containing(10)
+        self.assertEqual(CountingList.iterations, 2)
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity = 2)
     unittest.main(testRunner=runner)
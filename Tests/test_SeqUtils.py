@@ -4,6 +4,8 @@
 # as part of this package.
 
 import os
+import pickle
+import random
 import unittest
 
 from Bio import SeqIO
@@ -15,6 +17,13 @@ from Bio.SeqUtils.lcc import lcc_simp, lcc_mult
 from Bio.SeqUtils.CheckSum import crc32, crc64, gcg, seguid
 from Bio.SeqUtils.CodonUsage import CodonAdaptationIndex
 
+try:
+    import numpy
+    from Bio.SeqUtils.SlidingWindow import SlidingWindow
+    from Bio.SeqUtils import Kmers
+except ImportError:
+    numpy = None
+
 
 def u_crc32(seq):
     # NOTE - On Python 2 crc32 could return a signed int, but on Python 3 it is
@@ -149,6 +158,191 @@ class SeqUtilsTests(unittest.TestCase):
         self.assertEqual(seq3(seq1(s3)).upper(), s3.upper())
 
 
+if numpy is not None:
+    class SlidingWindowTests(unittest.TestCase):
+
+        def setUp(self):
+            record = SeqIO.read("GenBank/NC_005816.fna", "fasta")
+            self.seq = record.seq
+
+        def windows(self, seq, window, step, circular):
+            length = len(seq)
+            if circular:
+                seq = seq * (1 + window // length + 1)
+                starts = range(0, length, step)
+            else:
+                starts = range(0, length - window + 1, step)
+            return [seq[start:start + window] for start in starts]
+
+        def test_gc(self):
+            seq = str(self.seq)
+            for window, step, circular in [(100, 100, False), (1000, 250, False),
+                                           (500, 70, True), (7, 3, True),
+                                           (10000, 1, True)]:
+                windows = SlidingWindow(self.seq, window, step, circular)
+                expected = self.windows(seq, window, step, circular)
+                self.assertEqual(len(windows), len(expected))
+                self.assertEqual(list(windows.starts),
+                                 list(range(0, len(expected) * step, step)))
+                self.assertTrue(numpy.allclose(windows.gc_content(),
+                                               [GC(s) for s in expected]))
+                skews = []
+                for s in expected:
+                    g, c = s.count("G"), s.count("C")
+                    skews.append((g - c) / float(g + c) if g + c else 0.0)
+                self.assertTrue(numpy.allclose(windows.gc_skew(), skews))
+                self.assertTrue(numpy.allclose(windows.cumulative_gc_skew(),
+                                               numpy.cumsum(skews)))
+                skews = []
+                for s in expected:
+                    a, t = s.count("A"), s.count("T")
+                    skews.append((a - t) / float(a + t) if a + t else 0.0)
+                self.assertTrue(numpy.allclose(windows.at_skew(), skews))
+
+        def test_kmers(self):
+            seq = str(self.seq)[:5000].lower() + "NNNACGTnacg"
+            for window, step, circular in [(100, 100, False), (5, 2, True),
+                                           (1000, 333, True)]:
+                windows = SlidingWindow(seq, window, step, circular)
+                expected = [s.upper() for s in
+                            self.windows(seq, window, step, circular)]
+                for k in [1, 2, 3]:
+                    kmers, counts = windows.kmer_composition(k)
+                    self.assertEqual(len(kmers), 4 ** k)
+                    self.assertEqual(counts.shape, (len(expected), 4 ** k))
+                    for kmer in kmers[:8] + ["GC", "CG", "ACGT"]:
+                        wanted = [sum(1 for i in range(len(s) - len(kmer) + 1)
+                                      if s[i:i + len(kmer)] == kmer)
+                                  for s in expected]
+                        self.assertEqual(list(windows.kmer_count(kmer)), wanted)
+                        if kmer in kmers:
+                            self.assertEqual(list(counts[:, kmers.index(kmer)]),
+                                             wanted)
+
+        def test_short(self):
+            windows = SlidingWindow("ACGT", window=10)
+            self.assertEqual(len(windows), 0)
+            self.assertEqual(windows.kmer_composition(2)[1].shape, (0, 16))
+            windows = SlidingWindow("ACGT", window=10, step=3, circular=True)
+            self.assertEqual(list(windows.count("G")), [2, 2])
+            self.assertEqual(windows.graph_data(windows.count("G")),
+                             [(1, 2), (0, 2)])
+            self.assertRaises(ValueError, SlidingWindow, "ACGT", 0)
+            self.assertRaises(ValueError, windows.graph_data, [1, 2, 3])
+
+        def test_long_kmer(self):
+            # k-mer longer than the window
+            windows = SlidingWindow("ACGTACGTAC", window=1)
+            self.assertEqual(list(windows.kmer_count("ACG")), [0] * 10)
+            self.assertEqual(windows.kmer_composition(3)[1].sum(), 0)
+            windows = SlidingWindow("ACGTACGTAC", window=2, circular=True)
+            self.assertEqual(list(windows.kmer_count("ACG")), [0] * 5)
+            # k-mer longer than the sequence
+            windows = SlidingWindow("ACG", window=2, step=1)
+            self.assertEqual(list(windows.kmer_count("ACGTA")), [0, 0])
+            windows = SlidingWindow("ACG", window=2, step=1, circular=True)
+            self.assertEqual(list(windows.kmer_count("ACGTA")), [0, 0, 0])
+
+
+    class KmerTests(unittest.TestCase):
+
+        def setUp(self):
+            random.seed(2014)
+            self.seqs = ["".join(random.choice("ACGTacgtN") for i in range(n))
+                         for n in [0, 3, 10, 200, 1000]]
+
+        def brute_counts(self, seqs, k, canonical):
+            counts = {}
+            for seq in seqs:
+                seq = seq.upper()
+                for i in range(len(seq) - k + 1):
+                    kmer = seq[i:i + k]
+                    if "N" in kmer:
+                        continue
+                    if canonical:
+                        kmer = min(kmer, str(Seq(kmer).reverse_complement()))
+                    counts[kmer] = counts.get(kmer, 0) + 1
+            return counts
+
+        def test_counts(self):
+            for k in [1, 2, 5, 32]:
+                for canonical in [False, True]:
+                    expected = self.brute_counts(self.seqs, k, canonical)
+                    counts = Kmers.KmerCounts(k, canonical)
+                    counts.update(Seq(s) for s in self.seqs[:3])
+                    counts.update(SeqRecord(Seq(s)) for s in self.seqs[3:])
+                    self.assertEqual(dict(counts.items()), expected)
+                    self.assertEqual(counts.total(), sum(expected.values()))
+                    for kmer in list(expected)[:10]:
+                        self.assertEqual(counts[kmer], expected[kmer])
+                        self.assertTrue(kmer in counts)
+                    # Same again, counted separately then merged:
+                    other = Kmers.KmerCounts(k, canonical)
+                    other.update(self.seqs[3:])
+                    merged = Kmers.KmerCounts(k, canonical)
+                    merged.update(self.seqs[:3])
+                    merged.merge(pickle.loads(pickle.dumps(other)))
+                    self.assertEqual(dict(merged.items()), expected)
+            self.assertRaises(ValueError, Kmers.KmerCounts, 33)
+            self.assertRaises(ValueError, counts.merge, Kmers.KmerCounts(3))
+
+        def test_count_kmers_processes(self):
+            single = Kmers.count_kmers(self.seqs, 4)
+            multiple = Kmers.count_kmers(self.seqs, 4, processes=2,
+                                         batch_length=300)
+            self.assertEqual(list(single.items()), list(multiple.items()))
+            self.assertEqual(single.most_common(1), multiple.most_common(1))
+
+        def test_minimizers(self):
+            seq = self.seqs[-1]
+            k, w = 7, 5
+            positions, codes = Kmers.minimizers(seq, k, w, seed=3)
+            all_codes = dict(zip(range(len(seq)), [None] * len(seq)))
+            valid_codes, valid = Kmers._kmer_codes(seq, k, True)
+            for position, code in zip(valid, valid_codes):
+                all_codes[position] = code
+            hashes = dict((p, int(Kmers._hash_codes(numpy.array([c], numpy.uint64), 3)[0]))
+                          for p, c in all_codes.items() if c is not None)
+            expected = set()
+            for start in range(len(seq) - k - w + 2):
+                window = [p for p in range(start, start + w) if p in hashes]
+                if window:
+                    expected.add(min(window, key=lambda p: (hashes[p], p)))
+            self.assertEqual(list(positions), sorted(expected))
+            self.assertEqual([Kmers.decode_kmer(c, k) for c in codes],
+                             [Kmers.decode_kmer(all_codes[p], k) for p in positions])
+
+        def test_minhash(self):
+            record = SeqIO.read("GenBank/NC_005816.fna", "fasta")
+            whole = Kmers.MinHashSketch(k=12, size=200)
+            whole.add(record)
+            first = Kmers.MinHashSketch(k=12, size=200)
+            first.add(record.seq[:5000])
+            second = Kmers.MinHashSketch(k=12, size=200)
+            second.add(record.seq[4000:])
+            self.assertEqual(len(whole), 200)
+            self.assertEqual(whole.jaccard(whole), 1.0)
+            self.assertEqual(whole.mash_distance(whole), 0.0)
+            exact = Kmers.count_kmers([record.seq[:5000]], 12).jaccard(
+                Kmers.count_kmers([record.seq[4000:]], 12))
+            self.assertTrue(abs(first.jaccard(second) - exact) < 0.1,
+                            (first.jaccard(second), exact))
+            first.merge(second)
+            self.assertEqual(list(first.hashes), list(whole.hashes))
+            self.assertRaises(ValueError, whole.jaccard, Kmers.MinHashSketch())
+
+        def test_minhash_repeats(self):
+            random.seed(7)
+            seq = "A" * 50 + "".join(random.choice("ACGT") for i in range(200))
+            sketch = Kmers.MinHashSketch(k=4, size=20)
+            sketch.add(seq)
+            everything = Kmers.MinHashSketch(k=4, size=1000)
+            everything.add(seq)
+            self.assertTrue(len(everything) > 20)
+            self.assertEqual(list(sketch.hashes),
+                             list(numpy.unique(everything.hashes)[:20]))
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
@@ -22,6 +22,8 @@ from Bio.Alphabet.IUPAC import protein, extended_protein
 from Bio.Alphabet.IUPAC import unambiguous_dna, ambiguous_dna, ambiguous_rna
 from Bio.Data.IUPACData import ambiguous_dna_values, ambiguous_rna_values
 from Bio.Seq import Seq, UnknownSeq, MutableSeq, translate
+from Bio.Seq import translate_six_frames, _translate_str, _codon_lookups
+from Bio.Data import CodonTable as CodonTables
 from Bio.Data.CodonTable import TranslationError, CodonTable
 
 # This is just the standard table with less stop codons
@@ -595,6 +597,76 @@ class StringMethodTests(unittest.TestCase):
                         # TODO - Use the Bio.Data.IUPACData module for the
                         # ambiguous protein mappings?
 
+    def test_the_translation_lookups(self):
+        """Check bulk translation matches translating each codon in turn."""
+        import random
+        random.seed(64)
+        tables = [CodonTables.ambiguous_generic_by_id[1],
+                  CodonTables.ambiguous_dna_by_id[2],
+                  CodonTables.ambiguous_rna_by_id[11],
+                  CodonTables.unambiguous_dna_by_id[1],
+                  special_table, Chilodonella_uncinata_table]
+        for table in tables:
+            letters = sorted(set(table.nucleotide_alphabet.letters or "ACGTUN"))
+            # Long enough to use NumPy (if installed), with some ambiguity
+            seq = "".join(random.choice(letters + ["A", "C", "G"] * 3)
+                          for i in range(6000))
+            seq = seq.replace("U", "T") if "T" in letters else seq
+            for start, end in [(0, 6000), (6, 36), (600, 4800)]:
+                for options in [{}, {"to_stop": True}, {"stop_symbol": "@"},
+                                {"pos_stop": "?"}]:
+                    sub_seq = seq[start:end]
+                    try:
+                        expected = _translate_str(sub_seq, table, **options)
+                    except TranslationError as err:
+                        expected = err
+                    # Force use of the old per-codon loop to compare
+                    lookup = _codon_lookups[table]
+                    _codon_lookups[table] = None
+                    try:
+                        old = _translate_str(sub_seq, table, **options)
+                    except TranslationError as err:
+                        old = err
+                    _codon_lookups[table] = lookup
+                    if isinstance(old, TranslationError):
+                        self.assertTrue(isinstance(expected, TranslationError))
+                        self.assertEqual(str(old), str(expected))
+                    else:
+                        self.assertEqual(old, expected)
+                        if not options.get("to_stop"):
+                            self.assertEqual(len(old), (end - start) // 3)
+        table = CodonTables.ambiguous_dna_by_id[1]
+        seq = "ATG" + "CCN" * 2000 + "TAA"
+        self.assertEqual("M" + "P" * 2000, _translate_str(seq, table, cds=True))
+        self.assertRaises(TranslationError, _translate_str,
+                          seq + seq, table, cds=True)
+        self.assertEqual("P" * 2000 + "*" + "LMP",
+                         _translate_str(seq[3:] + "TTRATGCCC", table))
+        self.assertEqual("P" * 2000,
+                         _translate_str(seq[3:] + "TTRAT?CCC", table, to_stop=True))
+        self.assertRaises(TranslationError, _translate_str,
+                          seq[3:] + "TTRAT?CCC", table)
+
+    def test_the_six_frame_translation(self):
+        """Check translate_six_frames function."""
+        seq = "ATGGCCATTGTAATGGGCCGCTGAAAGGGTGCCCGATAGN"
+        frames = translate_six_frames(seq)
+        self.assertEqual(len(frames), 6)
+        rc = str(Seq(seq).reverse_complement())
+        for frame in range(3):
+            trimmed = seq[frame:frame + 3 * ((len(seq) - frame) // 3)]
+            self.assertEqual(frames[frame], translate(trimmed))
+            trimmed = rc[frame:frame + 3 * ((len(rc) - frame) // 3)]
+            self.assertEqual(frames[3 + frame], translate(trimmed))
+        for frame, protein in zip(frames, translate_six_frames(Seq(seq, generic_dna),
+                                                                table=2)):
+            self.assertTrue(isinstance(protein, Seq))
+            self.assertEqual(len(frame), len(protein))
+        frames = translate_six_frames(MutableSeq("ATGTAAC", generic_dna),
+                                      stop_symbol="@")
+        self.assertEqual([str(p) for p in frames], ["M@", "CN", "V", "VT", "LH", "Y"])
+        self.assertEqual(translate_six_frames("AC"), ("", "", "", "", "", ""))
+
     def test_init_typeerror(self):
         """Check Seq __init__ gives TypeError exceptions."""
         # Only expect it to take strings and unicode - not Seq objects!
@@ -4,10 +4,18 @@
 # license.  Please see the LICENSE file that should have been included
 # as part of this package.
 
+import os
 import re
 import unittest
+from io import BytesIO
 
 from Bio import SeqIO
+from Bio.SeqIO.SffIO import SffIterator, SffWriter, SffFlowgramIndex
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 # sffinfo E3MFGYR02_random_10_reads.sff | sed -n '/>\|Run Prefix\|Region\|XY/p'
 test_data = """
@@ -137,6 +145,107 @@ class TestConcatenated(unittest.TestCase):
             raise ValueError("Indxing Roche/invalid_paired_E3MFGYR02.sff should fail")
 
 
+if numpy is not None:
+    class TestFlowArrays(unittest.TestCase):
+        def check(self, filename):
+            with open(filename, "rb") as handle:
+                records = list(SffIterator(handle))
+            with open(filename, "rb") as handle:
+                arrays = list(SffIterator(handle, flow_arrays=True))
+            self.assertEqual(len(records), len(arrays))
+            for old, new in zip(records, arrays):
+                self.assertEqual(old.id, new.id)
+                self.assertEqual(str(old.seq), str(new.seq))
+                values = new.annotations["flow_values"]
+                self.assertTrue(isinstance(values, numpy.ndarray))
+                self.assertEqual(old.annotations["flow_values"], tuple(values))
+                index = new.annotations["flow_index"]
+                self.assertEqual(index.dtype, numpy.uint8)
+                self.assertEqual(old.annotations["flow_index"], tuple(index))
+            # Should be able to write the arrays back out again
+            handle = BytesIO()
+            SeqIO.write(arrays, handle, "sff")
+            handle.seek(0)
+            self.assertEqual([r.annotations["flow_values"] for r in records],
+                             [r.annotations["flow_values"]
+                              for r in SffIterator(handle)])
+
+        def test_10_reads(self):
+            self.check("Roche/E3MFGYR02_random_10_reads.sff")
+
+        def test_greek(self):
+            self.check("Roche/greek.sff")
+
+        def test_via_seqio(self):
+            record = next(SeqIO.parse("Roche/greek.sff", "sff",
+                                      flow_arrays=True))
+            self.assertEqual(len(record.annotations["flow_values"]), 800)
+            self.assertEqual(len(record.annotations["flow_index"]),
+                             len(record))
+
+    class TestFlowgramIndex(unittest.TestCase):
+        def check(self, filename):
+            records = list(SeqIO.parse(filename, "sff"))
+            with SffFlowgramIndex(filename) as reads:
+                self.assertEqual(len(reads), len(records))
+                self.assertEqual(reads.names, [r.id for r in records])
+                self.assertEqual(list(reads.read_headers["seq_len"]),
+                                 [len(r) for r in records])
+                values = reads.flow_values()
+                self.assertEqual(values.dtype, numpy.uint16)
+                self.assertEqual(values.shape,
+                                 (len(records),
+                                  len(records[0].annotations["flow_values"])))
+                for row, record in enumerate(records):
+                    self.assertTrue(record.id in reads)
+                    self.assertEqual(record.annotations["flow_values"],
+                                     tuple(values[row]))
+                    self.assertEqual(record.annotations["flow_values"],
+                                     tuple(reads.get_flow_values(record.id)))
+                    self.assertEqual(record.annotations["flow_index"],
+                                     tuple(reads.get_flow_index(record.id)))
+                    read = reads[record.id]
+                    self.assertEqual(str(record.seq), str(read.seq))
+                    self.assertEqual(record.annotations["clip_qual_left"],
+                                     read.annotations["clip_qual_left"])
+                    self.assertEqual(record.letter_annotations,
+                                     read.letter_annotations)
+                names = [records[-1].id, records[0].id]
+                self.assertEqual([records[-1].annotations["flow_values"],
+                                  records[0].annotations["flow_values"]],
+                                 [tuple(v) for v in reads.flow_values(names)])
+                self.assertRaises(KeyError, reads.get_flow_values, "missing")
+
+        def test_index_at_end(self):
+            self.check("Roche/E3MFGYR02_random_10_reads.sff")
+
+        def test_index_at_start(self):
+            self.check("Roche/E3MFGYR02_alt_index_at_start.sff")
+
+        def test_index_in_middle(self):
+            self.check("Roche/E3MFGYR02_index_in_middle.sff")
+
+        def test_no_manifest(self):
+            self.check("Roche/E3MFGYR02_no_manifest.sff")
+
+        def test_greek(self):
+            self.check("Roche/greek.sff")
+
+        def test_no_index(self):
+            filename = "temp_no_index.sff"
+            records = list(SeqIO.parse("Roche/greek.sff", "sff"))
+            with open(filename, "wb") as handle:
+                SffWriter(handle, index=False).write_file(records)
+            try:
+                self.check(filename)
+            finally:
+                os.remove(filename)
+
+        def test_concatenated(self):
+            self.assertRaises(ValueError, SffFlowgramIndex,
+                              "Roche/invalid_greek_E3MFGYR02.sff")
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity = 2)
     unittest.main(testRunner=runner)
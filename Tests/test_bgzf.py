@@ -9,8 +9,10 @@ See also the doctests in bgzf.py which are called via run_tests.py
 """
 
 import unittest
+import gc
 import gzip
 import os
+import threading
 from random import shuffle
 
 from Bio._py3k import _as_bytes, _as_string
@@ -52,12 +54,12 @@ class BgzfTests(unittest.TestCase):
         if os.path.isfile(self.temp_file):
             os.remove(self.temp_file)
 
-    def rewrite(self, compressed_input_file, output_file):
+    def rewrite(self, compressed_input_file, output_file, threads=1):
         h = gzip.open(compressed_input_file, "rb")
         data = h.read()
         h.close()
 
-        with bgzf.BgzfWriter(output_file, "wb") as h:
+        with bgzf.BgzfWriter(output_file, "wb", threads=threads) as h:
             h.write(data)
             self.assertFalse(h.seekable())
             self.assertFalse(h.isatty())
@@ -114,7 +116,7 @@ class BgzfTests(unittest.TestCase):
         self.assertEqual(len(old), len(new))
         self.assertEqual(old, new)
 
-    def check_by_line(self, old_file, new_file, old_gzip=False):
+    def check_by_line(self, old_file, new_file, old_gzip=False, threads=1):
         for mode in ["r", "rb"]:
             if old_gzip:
                 h = gzip.open(old_file, mode)
@@ -130,7 +132,8 @@ class BgzfTests(unittest.TestCase):
             h.close()
 
             for cache in [1, 10]:
-                h = bgzf.BgzfReader(new_file, mode, max_cache=cache)
+                h = bgzf.BgzfReader(new_file, mode, max_cache=cache,
+                                     threads=threads)
                 if "b" in mode:
                     new = _empty_bytes_string.join(line for line in h)
                 else:
@@ -142,7 +145,7 @@ class BgzfTests(unittest.TestCase):
                                  "%r vs %r, mode %r" % (old[:10], new[:10], mode))
                 self.assertEqual(old, new)
 
-    def check_by_char(self, old_file, new_file, old_gzip=False):
+    def check_by_char(self, old_file, new_file, old_gzip=False, threads=1):
         for mode in ["r", "rb"]:
             if old_gzip:
                 h = gzip.open(old_file, mode)
@@ -158,7 +161,8 @@ class BgzfTests(unittest.TestCase):
             h.close()
 
             for cache in [1, 10]:
-                h = bgzf.BgzfReader(new_file, mode, max_cache=cache)
+                h = bgzf.BgzfReader(new_file, mode, max_cache=cache,
+                                     threads=threads)
                 temp = []
                 while True:
                     char = h.read(1)
@@ -178,7 +182,7 @@ class BgzfTests(unittest.TestCase):
                                  "%r vs %r, mode %r" % (old[:10], new[:10], mode))
                 self.assertEqual(old, new)
 
-    def check_random(self, filename):
+    def check_random(self, filename, threads=1):
         """Check BGZF random access by reading blocks in forward & reverse order"""
         h = gzip.open(filename, "rb")
         old = h.read()
@@ -190,7 +194,7 @@ class BgzfTests(unittest.TestCase):
 
         # Forward, using explicit open/close
         new = _empty_bytes_string
-        h = bgzf.BgzfReader(filename, "rb")
+        h = bgzf.BgzfReader(filename, "rb", threads=threads)
         self.assertTrue(h.seekable())
         self.assertFalse(h.isatty())
         self.assertEqual(h.fileno(), h._handle.fileno())
@@ -207,7 +211,7 @@ class BgzfTests(unittest.TestCase):
 
         # Reverse, using with statement
         new = _empty_bytes_string
-        with bgzf.BgzfReader(filename, "rb") as h:
+        with bgzf.BgzfReader(filename, "rb", threads=threads) as h:
             for start, raw_len, data_start, data_len in blocks[::-1]:
                 h.seek(bgzf.make_virtual_offset(start, 0))
                 data = h.read(data_len)
@@ -219,7 +223,7 @@ class BgzfTests(unittest.TestCase):
 
         # Jump back - non-sequential seeking
         if len(blocks) >= 3:
-            h = bgzf.BgzfReader(filename, "rb", max_cache = 1)
+            h = bgzf.BgzfReader(filename, "rb", max_cache=1, threads=threads)
             # Seek to a late block in the file,
             # half way into the third last block
             start, raw_len, data_start, data_len = blocks[-3]
@@ -252,7 +256,7 @@ class BgzfTests(unittest.TestCase):
                 real_offset = data_start + within_offset
                 v_offsets.append((voffset, real_offset))
         shuffle(v_offsets)
-        h = bgzf.BgzfReader(filename, "rb", max_cache = 1)
+        h = bgzf.BgzfReader(filename, "rb", max_cache=1, threads=threads)
         for voffset, real_offset in v_offsets:
             h.seek(0)
             self.assertTrue(voffset >= 0 and real_offset >= 0)
@@ -263,6 +267,80 @@ class BgzfTests(unittest.TestCase):
             self.assertEqual(h.tell(), voffset)
         h.close()
 
+    def check_gzi(self, filename):
+        """Check seeking to uncompressed offsets via a .gzi block index"""
+        h = gzip.open(filename, "rb")
+        old = h.read()
+        h.close()
+
+        h = open(filename, "rb")
+        blocks = list(bgzf.BgzfBlocks(h))
+        h.seek(0)
+        index = bgzf.make_gzi_index(h)
+        h.close()
+        self.assertEqual(index, [(start, data_start) for
+                                 start, raw_len, data_start, data_len in blocks])
+
+        gzi_file = self.temp_file + ".gzi"
+        try:
+            with open(gzi_file, "wb") as h:
+                bgzf.write_gzi_index(h, index)
+            self.assertEqual(os.path.getsize(gzi_file), 16 * len(index) - 8)
+            with open(gzi_file, "rb") as h:
+                self.assertEqual(index, bgzf.read_gzi_index(h))
+
+            offsets = [0, 1, len(old) // 3, len(old) - 1, len(old)]
+            offsets.extend(data_start for start, raw_len, data_start, data_len
+                           in blocks)
+            shuffle(offsets)
+            with bgzf.BgzfReader(filename, "rb", gzi=gzi_file) as h:
+                for offset in offsets:
+                    voffset = h.seek_uncompressed(offset)
+                    self.assertEqual(voffset, h.tell())
+                    self.assertEqual(offset, h.tell_uncompressed())
+                    self.assertEqual(old[offset:offset + 1000], h.read(1000))
+        finally:
+            if os.path.isfile(gzi_file):
+                os.remove(gzi_file)
+
+    def test_gzi_bam_ex1_header(self):
+        """Check .gzi index random access to SamBam/ex1_header.bam"""
+        self.check_gzi("SamBam/ex1_header.bam")
+
+    def test_gzi_example_gb(self):
+        """Check .gzi index random access to GenBank/NC_000932.gb.bgz"""
+        self.check_gzi("GenBank/NC_000932.gb.bgz")
+
+    def test_gzi_skips_data(self):
+        """Check making a .gzi index does not read the compressed data"""
+        class CountingHandle(object):
+            def __init__(self, handle):
+                self.handle = handle
+                self.count = 0
+
+            def read(self, size):
+                data = self.handle.read(size)
+                self.count += len(data)
+                return data
+
+            def __getattr__(self, name):
+                return getattr(self.handle, name)
+
+        filename = "GenBank/NC_000932.gb.bgz"
+        with open(filename, "rb") as h:
+            index = bgzf.make_gzi_index(h)
+        with open(filename, "rb") as h:
+            counting = CountingHandle(h)
+            self.assertEqual(index, bgzf.make_gzi_index(counting))
+        # Just the 18 byte header and 4 byte length of each block
+        self.assertEqual(counting.count, 22 * len(index))
+
+    def test_gzi_needed(self):
+        """Check seeking to an uncompressed offset requires a .gzi index"""
+        with bgzf.BgzfReader("GenBank/NC_000932.gb.bgz", "rb") as h:
+            self.assertRaises(ValueError, h.seek_uncompressed, 100)
+            self.assertRaises(ValueError, h.tell_uncompressed)
+
     def test_random_bam_ex1(self):
         """Check random access to SamBam/ex1.bam"""
         self.check_random("SamBam/ex1.bam")
@@ -291,6 +369,14 @@ class BgzfTests(unittest.TestCase):
         """Check random access to GenBank/cor6_6.gb.bgz"""
         self.check_random("GenBank/cor6_6.gb.bgz")
 
+    def test_random_bam_ex1_threads(self):
+        """Check random access to SamBam/ex1.bam using threads"""
+        self.check_random("SamBam/ex1.bam", threads=3)
+
+    def test_random_example_cor6_threads(self):
+        """Check random access to GenBank/cor6_6.gb.bgz using threads"""
+        self.check_random("GenBank/cor6_6.gb.bgz", threads=2)
+
     def test_text_wnts_xml(self):
         """Check text mode access to Blast/wnts.xml.bgz"""
         self.check_text("Blast/wnts.xml", "Blast/wnts.xml.bgz")
@@ -321,6 +407,35 @@ class BgzfTests(unittest.TestCase):
         self.check_by_line("GenBank/NC_000932.gb", "GenBank/NC_000932.gb.bgz")
         self.check_by_char("GenBank/NC_000932.gb", "GenBank/NC_000932.gb.bgz")
 
+    def test_iter_example_gb_threads(self):
+        """Check iteration over GenBank/NC_000932.gb.bgz using threads"""
+        self.check_by_line("GenBank/NC_000932.gb", "GenBank/NC_000932.gb.bgz",
+                           threads=3)
+        self.check_by_char("GenBank/NC_000932.gb", "GenBank/NC_000932.gb.bgz",
+                           threads=3)
+
+    def test_iter_bam_ex1_threads(self):
+        """Check iteration over SamBam/ex1.bam using threads"""
+        self.check_by_char("SamBam/ex1.bam", "SamBam/ex1.bam", True, threads=4)
+
+    def test_threads_released(self):
+        """Check reader worker threads stop at EOF or when not closed"""
+        before = threading.active_count()
+        # Reading to the end of the file stops the threads, even if open
+        h = bgzf.BgzfReader("SamBam/ex1.bam", "rb", threads=3)
+        self.assertTrue(threading.active_count() > before)
+        while h.read(100000):
+            pass
+        self.assertEqual(threading.active_count(), before)
+        h.close()
+        # Dropping a reader without closing it also stops them
+        h = bgzf.BgzfReader("SamBam/ex1.bam", "rb", threads=3)
+        h.read(100)
+        self.assertTrue(threading.active_count() > before)
+        del h
+        gc.collect()
+        self.assertEqual(threading.active_count(), before)
+
     def test_bam_ex1(self):
         """Reproduce BGZF compression for BAM file"""
         temp_file = self.temp_file
@@ -337,6 +452,18 @@ class BgzfTests(unittest.TestCase):
         """Check iteration over SamBam/ex1.bam"""
         self.check_by_char("SamBam/ex1.bam", "SamBam/ex1.bam", True)
 
+    def test_bam_ex1_threads(self):
+        """Reproduce BGZF compression for BAM file using threads"""
+        temp_file = self.temp_file
+        self.rewrite("SamBam/ex1.bam", temp_file, threads=3)
+        self.check_blocks("SamBam/ex1.bam", temp_file)
+
+    def test_example_gb_threads(self):
+        """Reproduce BGZF compression for NC_000932 GenBank file using threads"""
+        temp_file = self.temp_file
+        self.rewrite("GenBank/NC_000932.gb.bgz", temp_file, threads=2)
+        self.check_blocks("GenBank/NC_000932.gb.bgz", temp_file)
+
     def test_example_fastq(self):
         """Reproduce BGZF compression for a FASTQ file"""
         temp_file = self.temp_file
@@ -363,9 +490,50 @@ class BgzfTests(unittest.TestCase):
 
     def test_write_tell(self):
         """Check offset works during BGZF writing"""
+        self.check_write_tell()
+
+    def test_write_tell_threads(self):
+        """Check offset works during BGZF writing using threads"""
+        self.check_write_tell(threads=4)
+
+    def test_write_tell_index_threads(self):
+        """Check offsets from threaded BGZF writing can be used to seek"""
+        temp_file = self.temp_file
+        offsets = []
+        with bgzf.BgzfWriter(temp_file, "w", threads=3) as h:
+            for i in range(5000):
+                if i % 10 == 0:
+                    offsets.append((i, h.tell()))
+                h.write("Line %i %s\n" % (i, "ACGT" * (i % 50)))
+        with bgzf.BgzfReader(temp_file, "r") as h:
+            for i, offset in offsets:
+                h.seek(offset)
+                self.assertEqual(h.readline(),
+                                 "Line %i %s\n" % (i, "ACGT" * (i % 50)))
+
+    def test_write_threads_released(self):
+        """Check writer worker threads stop when closed or not closed"""
+        temp_file = self.temp_file
+        before = threading.active_count()
+        # No threads until there is a block to compress
+        h = bgzf.BgzfWriter(temp_file, "wb", threads=3)
+        self.assertEqual(threading.active_count(), before)
+        h.write(b"ACGT" * 50000)
+        self.assertTrue(threading.active_count() > before)
+        h.close()
+        self.assertEqual(threading.active_count(), before)
+        # Dropping a writer without closing it also stops them
+        h = bgzf.BgzfWriter(temp_file, "wb", threads=3)
+        h.write(b"ACGT" * 50000)
+        self.assertTrue(threading.active_count() > before)
+        del h
+        gc.collect()
+        self.assertEqual(threading.active_count(), before)
+
+    def check_write_tell(self, threads=1):
         temp_file = self.temp_file
 
-        h = bgzf.open(temp_file, "w")  # Text mode!
+        h = bgzf.open(temp_file, "w", threads=threads)  # Text mode!
         # When opening new file, offset should be 0
         self.assertEqual(h.tell(), 0)
 
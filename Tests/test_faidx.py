@@ -0,0 +1,137 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+"""Tests for Bio.faidx (random access to FASTA files via a .fai index).
+
+See also the doctests in faidx.py which are called via run_tests.py
+"""
+
+import os
+import random
+import unittest
+from io import BytesIO
+
+from Bio import bgzf
+from Bio import SeqIO
+from Bio.faidx import IndexedFasta, IndexedFastaSeq
+from Bio.faidx import make_fai_index, read_fai_index, write_fai_index
+
+
+class FaidxTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_files = []
+
+    def tearDown(self):
+        for filename in self.temp_files:
+            if os.path.isfile(filename):
+                os.remove(filename)
+
+    def temp(self, filename):
+        self.temp_files.append(filename)
+        return filename
+
+    def check_file(self, filename, original=None):
+        """Compare random regions against the full sequences from SeqIO."""
+        if original is None:
+            original = filename
+        expected = [(r.id, str(r.seq)) for r in SeqIO.parse(original, "fasta")]
+        with IndexedFasta(filename) as fasta:
+            self.assertEqual([name for name, seq in expected], list(fasta))
+            self.assertEqual(len(expected), len(fasta))
+            for name, seq in expected:
+                self.assertTrue(name in fasta)
+                lazy = fasta[name]
+                self.assertTrue(isinstance(lazy, IndexedFastaSeq))
+                self.assertEqual(len(seq), len(lazy))
+                self.assertEqual(len(seq), fasta.get_length(name))
+                self.assertEqual(seq, str(lazy))
+                self.assertEqual(seq[-1], lazy[-1])
+                for i in range(50):
+                    start = random.randint(-len(seq), len(seq))
+                    end = random.randint(-len(seq), len(seq))
+                    self.assertEqual(seq[start:end], str(lazy[start:end]))
+                    step = random.choice([2, 3, -1, -2])
+                    self.assertEqual(seq[start:end:step],
+                                     str(lazy[start:end:step]))
+                self.assertEqual(seq[10:20], fasta.fetch(name, 10, 20))
+                self.assertEqual(seq[-10:], fasta.fetch(name, len(seq) - 10))
+                self.assertRaises(IndexError, lazy.__getitem__, len(seq))
+            self.assertRaises(KeyError, fasta.__getitem__, "missing")
+
+    def test_fna(self):
+        """Random access to single record FASTA file with 70 bases per line"""
+        self.check_file("GenBank/NC_005816.fna")
+
+    def test_ffn(self):
+        """Random access to multiple record FASTA file"""
+        self.check_file("GenBank/NC_005816.ffn")
+
+    def test_dos_newlines(self):
+        """Random access to FASTA file with DOS/Windows newlines"""
+        filename = self.temp("temp_dos.fasta")
+        with open("GenBank/NC_005816.ffn", "rb") as handle:
+            data = handle.read()
+        with open(filename, "wb") as handle:
+            handle.write(data.replace(b"\n", b"\r\n"))
+        with open(filename, "rb") as handle:
+            index = make_fai_index(handle)
+        self.assertEqual(70, index[0][3])
+        self.assertEqual(72, index[0][4])
+        self.check_file(filename, "GenBank/NC_005816.ffn")
+
+    def test_bgzf(self):
+        """Random access to multi-block BGZF compressed FASTA file"""
+        # Make a FASTA file big enough to span several BGZF blocks
+        random.seed(12345)
+        plain = self.temp("temp_faidx.fasta")
+        with open(plain, "w") as handle:
+            for i, width in enumerate([60, 70, 80]):
+                seq = "".join(random.choice("ACGTN") for j in range(100000))
+                handle.write(">seq%i description\n" % i)
+                for j in range(0, len(seq), width):
+                    handle.write(seq[j:j + width] + "\n")
+        compressed = self.temp("temp_faidx.fasta.bgz")
+        with open(plain, "rb") as handle:
+            data = handle.read()
+        with bgzf.BgzfWriter(compressed, "wb") as handle:
+            handle.write(data)
+        # Without any index files (build both in memory)
+        self.check_file(compressed, plain)
+        # With saved .fai and .gzi index files
+        with open(plain, "rb") as handle:
+            index = make_fai_index(handle)
+        with open(self.temp(compressed + ".fai"), "w") as handle:
+            write_fai_index(handle, index)
+        with open(compressed, "rb") as handle:
+            blocks = bgzf.make_gzi_index(handle)
+        self.assertTrue(len(blocks) > 3)
+        with open(self.temp(compressed + ".gzi"), "wb") as handle:
+            bgzf.write_gzi_index(handle, blocks)
+        self.check_file(compressed, plain)
+
+    def test_fai_round_trip(self):
+        """Write and read back a .fai index"""
+        with open("GenBank/NC_005816.ffn", "rb") as handle:
+            index = make_fai_index(handle)
+        self.assertEqual(10, len(index))
+        filename = self.temp("GenBank/NC_005816.ffn.fai")
+        with open(filename, "w") as handle:
+            write_fai_index(handle, index)
+        with open(filename) as handle:
+            self.assertEqual(index, read_fai_index(handle))
+
+    def test_bad_line_lengths(self):
+        """Reject FASTA records with inconsistent line lengths"""
+        self.assertRaises(ValueError, make_fai_index,
+                          BytesIO(b">alpha\nACGT\nACGTA\n"))
+        self.assertRaises(ValueError, make_fai_index,
+                          BytesIO(b">alpha\nACGT\nAC\nACGT\n"))
+        self.assertRaises(ValueError, make_fai_index,
+                          BytesIO(b">alpha\nACGT\n>alpha\nACGT\n"))
+        self.assertEqual([("alpha", 6, 7, 4, 5), ("beta", 0, 22, 0, 0)],
+                         make_fai_index(BytesIO(b">alpha\nACGT\nAC\n\n>beta\n")))
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)